@@ -1,81 +1,152 @@
-import os
-from src.core.entities.QueryEntities import QueryRequest, LLMResponse
 import asyncio
+import os
+from contextlib import asynccontextmanager
+from src.core.entities.QueryEntities import QueryRequest, LLMResponse, QueryBatchRequest
+from src.core.entities.SurveyPlan import SurveyPlanRequest
+from src.core.entities.user_entites.Department import Department
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from fastapi import FastAPI, Depends, HTTPException
+from typing import Optional
+from fastapi import FastAPI, Depends, HTTPException, Header, Request, Response, Query, WebSocket, WebSocketDisconnect
 from fastapi.security import APIKeyHeader
 from config import Config
+from src.application.admission.AdmissionController import AdmissionRejected
+from src.application.idempotency.ChatTurnLock import ChatBusyError
+from src.application.idempotency.IdempotencyCache import IdempotencyKeyReused
+from src.application.streaming.ChunkCoalescer import ChunkCoalescer
+from src.application.tenancy.FairScheduler import current_tenant
 from src.entrypoints.QuerySystem import QuerySystem
+from src.infrastructure.metrics.StreamStats import stream_stats
+from src.infrastructure.metrics.app_metrics import registry as metrics_registry, requests_in_flight
+from src.infrastructure.profiling.RequestProfilerMiddleware import ProfileStore, RequestProfilerMiddleware
+from src.infrastructure.profiling.SamplingProfiler import SamplingProfiler
+from src.core.entities.user_entites.ListUserPsychStatus import ListUserPsychStatus
+from src.infrastructure.serialization.serializer import dumps, encode_response, encode_stream_chunk, SSEFrameEncoder
 
-API_KEY = Config.API_KEY
 api_key_header = APIKeyHeader(name="X-API-Key")
+query_system = QuerySystem()
 
-def check_api_key(api_key: str = Depends(api_key_header)):
-    if api_key != API_KEY:
+
+async def check_api_key(api_key: str = Depends(api_key_header)):
+    # async, чтобы клиент в contextvar дошёл до обработчика и его фоновых задач
+    tenant = query_system.authenticate(api_key)
+    if tenant is None:
         raise HTTPException(status_code=401, detail="Invalid API Key")
+    current_tenant.set(tenant.name)
     return True
 
 
-app = FastAPI(title="PI-231's API", version="1.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Загружаем модели сразу после старта воркера, не дожидаясь первого запроса.
+
+    Инициализация идёт в фоне: процесс сразу отвечает на /health,
+    а /ready становится 200, когда модели загружены и прогреты.
+    Запросы, пришедшие раньше, дожидаются той же инициализации.
+    """
+    initialization = asyncio.create_task(query_system.initialize())
+    initialization.add_done_callback(_report_initialization)
+    yield
+    initialization.cancel()
+    await query_system.close()
+
+
+def _report_initialization(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception():
+        print(f"Initialization failed: {task.exception()}")
+
+
+app = FastAPI(title="PI-231's API", version="1.0", lifespan=lifespan)
+profile_store = ProfileStore()
+app.add_middleware(RequestProfilerMiddleware, store=profile_store, is_authorized=lambda key: query_system.authenticate(key) is not None)
+profiling_lock = asyncio.Lock()
 MAX_WORKERS = min(32, (os.cpu_count() or 1) * 2 + 1)
 thread_pool = ThreadPoolExecutor(max_workers=MAX_WORKERS)
 
-query_system = QuerySystem()
-@app.post("/query")
+chunk_coalescer = ChunkCoalescer(
+    max_delay=Config.SSE_COALESCE_MAX_DELAY_MS / 1000,
+    max_bytes=Config.SSE_COALESCE_MAX_BYTES
+)
+QUERY_IN_FLIGHT = requests_in_flight.labels("query")
+QUERY_STREAMING_IN_FLIGHT = requests_in_flight.labels("query_streaming")
+WS_SURVEY_IN_FLIGHT = requests_in_flight.labels("ws_survey")
+
+
+def rejection(e: AdmissionRejected | ChatBusyError) -> HTTPException:
+    """Отказ допуска — 429, занятый другим ходом чат — 409; оба с Retry-After"""
+    if isinstance(e, AdmissionRejected):
+        return HTTPException(status_code=429, detail=e.reason, headers={"Retry-After": str(e.retry_after)})
+    return HTTPException(status_code=409, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+
+@app.post("/query", response_model=LLMResponse)
 async def query(
         request: QueryRequest,
-        api_key: bool = Depends(check_api_key)
-) -> LLMResponse:
-    """Асинхронный запрос к системе"""
+        api_key: bool = Depends(check_api_key),
+        idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255)
+) -> Response:
+    """Асинхронный запрос к системе; повтор с тем же Idempotency-Key получает тот же ответ"""
 
     try:
-        return await query_system.query(request)
+        with QUERY_IN_FLIGHT.track_inprogress():
+            response = await query_system.query(request, idempotency_key)
 
+    except (AdmissionRejected, ChatBusyError) as e:
+        raise rejection(e)
+    except IdempotencyKeyReused as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error processing request: {str(e)}"
         )
 
+    if response is None:
+        raise HTTPException(status_code=500, detail="Error processing request")
+
+    return Response(content=encode_response(response), media_type="application/json")
+
 
 @app.post("/query-streaming")
 async def query_streaming(
         request: QueryRequest,
-        api_key: bool = Depends(check_api_key)
+        http_request: Request,
+        api_key: bool = Depends(check_api_key),
+        last_event_id: Optional[str] = Header(None, alias="Last-Event-ID")
 ):
-    """Streaming запрос к системе"""
+    """Streaming запрос к системе; с Last-Event-ID продолжает прерванную генерацию"""
     from starlette.responses import StreamingResponse
-    import json
+
+    if last_event_id and not query_system.has_stream(last_event_id):
+        raise HTTPException(status_code=404, detail="Stream not found or expired")
+
+    # Переподключение к уже идущей генерации не занимает новое место. Новую генерацию
+    # запускаем до ответа: тело может так и не начать читаться, а место освободит она сама
+    buffer = None
+    if not last_event_id:
+        try:
+            buffer = await query_system.start_stream(request)
+        except (AdmissionRejected, ChatBusyError) as e:
+            raise rejection(e)
 
     async def generate_stream():
         """Генерирует streaming response"""
+        stream = chunk_coalescer.coalesce(
+            query_system.query_stream(request, last_event_id, http_request.is_disconnected, buffer)
+        )
+        encoder = SSEFrameEncoder()
+        QUERY_STREAMING_IN_FLIGHT.inc()
         try:
-            async for chunk in query_system.query_stream(request):
-                chunk_data = {
-                    "content": chunk.content_chunk,
-                    "chat_id": chunk.chat_id,
-                    "is_completed": chunk.is_completed,
-                    "question_count": chunk.question_count,
-                    "total_questions": chunk.total_questions,
-                    "is_final_chunk": chunk.is_final_chunk
-                }
-
-                yield f"data: {json.dumps(chunk_data, ensure_ascii=False)}\n\n"
-
-                await asyncio.sleep(0.01)
+            async for chunk in stream:
+                yield encoder.encode(chunk)
 
         except Exception as e:
-            error_data = {
-                "content": f"Error: {str(e)}",
-                "chat_id": "",
-                "is_completed": True,
-                "question_count": 0,
-                "total_questions": 0,
-                "is_final_chunk": True,
-                "error": True
-            }
-            yield f"data: {json.dumps(error_data, ensure_ascii=False)}\n\n"
+            yield encoder.encode_error(f"Error: {str(e)}")
+
+        finally:
+            QUERY_STREAMING_IN_FLIGHT.dec()
+            # Закрываем подписку сразу при обрыве, а не при сборке мусора
+            await stream.aclose()
 
     return StreamingResponse(
         generate_stream(),
@@ -84,11 +155,240 @@ async def query_streaming(
             "Cache-Control": "no-cache",
             "Connection": "keep-alive",
             "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Headers": "X-API-Key, Content-Type",
+            "Access-Control-Allow-Headers": "X-API-Key, Content-Type, Last-Event-ID",
         }
     )
 
 
+@app.post("/query-batch")
+async def query_batch(
+        batch: QueryBatchRequest,
+        api_key: bool = Depends(check_api_key)
+):
+    """Пакетная обработка ходов разных чатов; результаты идут NDJSON по мере готовности"""
+    from starlette.responses import StreamingResponse
+
+    if len(batch.requests) > Config.BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch is limited to {Config.BATCH_MAX_ITEMS} items")
+
+    chat_ids = [request.chat_id for request in batch.requests if request.chat_id]
+    if len(chat_ids) != len(set(chat_ids)):
+        raise HTTPException(status_code=422, detail="Each chat_id may appear only once per batch")
+
+    max_concurrency = max(1, min(batch.max_concurrency, Config.BATCH_MAX_CONCURRENCY))
+
+    async def generate_results():
+        async for result in query_system.query_batch(batch.requests, max_concurrency):
+            yield dumps(result) + b"\n"
+
+    return StreamingResponse(generate_results(), media_type="application/x-ndjson")
+
+
+def survey_request(message, chat_id: Optional[str]) -> QueryRequest:
+    """Запрос хода из кадра клиента; ValueError — кадр не разобрать"""
+    if not isinstance(message, dict):
+        raise ValueError("Message must be a JSON object")
+    psych_status = message.get("list_user_psych_status")
+    return QueryRequest(
+        user_input=message.get("user_input", ""),
+        chat_id=chat_id,
+        max_questions=message.get("max_questions", 8),
+        max_history_messages=message.get("max_history_messages", 20),
+        # ValidationError и неизвестный отдел — тоже ValueError
+        list_user_psych_status=ListUserPsychStatus.model_validate(psych_status) if psych_status else None,
+        user_id=message.get("user_id"),
+        department=Department(message["department"]) if message.get("department") else None
+    )
+
+
+async def send_frame(websocket: WebSocket, text: str) -> None:
+    """Отправляет кадр; запись в мёртвый сокет завершает опрос как обычное отключение"""
+    try:
+        await websocket.send_text(text)
+    except (OSError, RuntimeError) as e:
+        raise WebSocketDisconnect(code=1006) from e
+
+
+@app.websocket("/ws/survey")
+async def survey_websocket(
+        websocket: WebSocket,
+        chat_id: Optional[str] = None,
+        api_key: Optional[str] = None
+):
+    """Опрос по WebSocket: ключ проверяется один раз, чат держится в памяти соединения.
+
+    Клиент шлёт JSON {"user_input": ..., "max_questions": ..., "list_user_psych_status": ...,
+    "user_id": ..., "department": ...},
+    в ответ идут JSON-кадры с токенами ассистента. Для продолжения опроса
+    после обрыва достаточно переподключиться с ?chat_id=...
+    Неразборчивый кадр получает {"error": ...}, соединение остаётся открытым.
+
+    Ключ передаётся заголовком X-API-Key. ?api_key=... — запасной вариант
+    только для браузеров, где WebSocket API не умеет ставить заголовки:
+    строка запроса попадает в access-логи uvicorn и прокси.
+    """
+    tenant = query_system.authenticate(websocket.headers.get("x-api-key") or api_key)
+    if tenant is None:
+        await websocket.close(code=1008)
+        return
+    current_tenant.set(tenant.name)
+
+    await websocket.accept()
+    session = await query_system.open_survey_session(chat_id)
+    try:
+        while True:
+            try:
+                # Невалидный JSON — тоже ValueError, бинарный кадр — KeyError
+                request = survey_request(await websocket.receive_json(), session.chat_id)
+            except (ValueError, TypeError, KeyError) as e:
+                await send_frame(websocket, dumps({"error": f"Invalid message: {str(e)}"}).decode())
+                continue
+
+            with WS_SURVEY_IN_FLIGHT.track_inprogress():
+                stream = chunk_coalescer.coalesce(session.query_stream(request))
+                try:
+                    async for chunk in stream:
+                        await send_frame(websocket, encode_stream_chunk(chunk).decode())
+                except WebSocketDisconnect:
+                    raise
+                except AdmissionRejected as e:
+                    await send_frame(websocket, dumps({"error": e.reason, "retry_after": e.retry_after}).decode())
+                except ChatBusyError as e:
+                    await send_frame(websocket, dumps({"error": str(e), "retry_after": e.retry_after}).decode())
+                except Exception as e:
+                    print(f"Error in websocket survey: {str(e)}")
+                    await send_frame(websocket, dumps({"error": f"Error: {str(e)}"}).decode())
+                finally:
+                    # Клиент ушёл посреди ответа: генерация останавливается и сохраняет недописанное
+                    await stream.aclose()
+
+    except WebSocketDisconnect:
+        pass
+
+    finally:
+        query_system.close_survey_session(session)
+
+
+@app.post("/survey-plan")
+async def create_survey_plan(
+        plan_request: SurveyPlanRequest,
+        api_key: bool = Depends(check_api_key)
+):
+    """Планирует старты опросов на неделю под мощность LLM и классификатора и сохраняет план"""
+    plan = await query_system.plan_surveys(plan_request.users, plan_request.week_start)
+    return {
+        "plan_id": plan.plan_id,
+        "week_start": plan.week_start,
+        "surveys_count": len(plan.surveys),
+        "unscheduled_user_ids": plan.unscheduled_user_ids,
+        "peak_utilization": max((point.utilization for point in plan.load), default=0.0)
+    }
+
+
+@app.get("/survey-plan/load")
+async def survey_plan_load(api_key: bool = Depends(check_api_key)):
+    """Прогноз нагрузки по слотам последнего плана"""
+    plan = await query_system.get_latest_survey_plan()
+    if plan is None:
+        raise HTTPException(status_code=404, detail="No survey plan yet")
+    return {
+        "plan_id": plan.plan_id,
+        "week_start": plan.week_start,
+        "slot_minutes": plan.slot_minutes,
+        "tokens_per_minute_capacity": plan.tokens_per_minute_capacity,
+        "analyses_per_minute_capacity": plan.analyses_per_minute_capacity,
+        "load": plan.load
+    }
+
+
+@app.get("/dashboard/rollups")
+async def dashboard_rollups(
+        department: Optional[Department] = None,
+        weeks: int = Query(8, ge=1, le=104),
+        api_key: bool = Depends(check_api_key)
+):
+    """Недельные агрегаты результатов выгорания по отделам для HR-дашборда"""
+    rollups = await query_system.get_department_rollups(department.value if department else None, weeks)
+    return {"rollups": rollups}
+
+
+@app.get("/users/{user_id}/trend")
+async def user_trend(
+        user_id: int,
+        n: int = Query(12, ge=1, le=200),
+        api_key: bool = Depends(check_api_key)
+):
+    """Динамика выгорания пользователя по последним n опросам"""
+    trend = await query_system.get_user_trend(user_id, n)
+    if trend is None:
+        raise HTTPException(status_code=404, detail="No survey history for user")
+    return trend
+
+
+@app.get("/admin/tenants")
+async def tenant_stats(api_key: bool = Depends(check_api_key)):
+    """Занятые места и очереди клиентов у планировщиков LLM и классификатора"""
+    return query_system.tenant_stats()
+
+
+@app.get("/usage")
+async def usage_summary(
+        days: int = Query(7, ge=1, le=366),
+        top: int = Query(20, ge=0, le=500),
+        api_key: bool = Depends(check_api_key)
+):
+    """Токены LLM по ключам API и типам ходов (вопрос / анализ) и самые дорогие чаты"""
+    return await query_system.usage_summary(days, top)
+
+
+@app.get("/metrics")
+async def metrics():
+    """Метрики в текстовом формате Prometheus"""
+    return Response(content=metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/admin/profile")
+async def profile_process(
+        seconds: float = Query(10.0, gt=0, le=120),
+        interval_ms: float = Query(5.0, ge=1, le=1000),
+        api_key: bool = Depends(check_api_key)
+):
+    """Сэмплирует стеки всех потоков процесса и отдаёт collapsed stacks для flamegraph"""
+    if profiling_lock.locked():
+        raise HTTPException(status_code=409, detail="Profiling is already running")
+
+    async with profiling_lock:
+        profiler = SamplingProfiler(interval=interval_ms / 1000)
+        collapsed = await asyncio.to_thread(profiler.sample, seconds)
+
+    return Response(
+        content=collapsed,
+        media_type="text/plain",
+        headers={"Content-Disposition": f'attachment; filename="profile-{os.getpid()}.collapsed"'}
+    )
+
+
+@app.get("/admin/profiles/{profile_id}")
+async def request_profile(profile_id: str, api_key: bool = Depends(check_api_key)):
+    """Сводка cProfile запроса, отправленного с заголовком X-Profile-Request"""
+    summary = profile_store.get(profile_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return Response(content=summary, media_type="text/plain")
+
+
+@app.get("/ready")
+async def readiness_check():
+    """Готовность принимать трафик: модели загружены и прогреты"""
+    if not query_system.is_ready():
+        return Response(
+            content=dumps({"status": "initializing"}),
+            status_code=503,
+            media_type="application/json"
+        )
+    return {"status": "ready"}
+
+
 @app.get("/health")
 async def health_check():
     """Проверка здоровья сервиса"""
@@ -97,7 +397,8 @@ async def health_check():
         "service": "It's me, PI-231!",
         "time": datetime.now().isoformat(),
         "thread_pool_workers": MAX_WORKERS,
-        "async": True
+        "async": True,
+        "streams": stream_stats.to_dict()
     }
 
 
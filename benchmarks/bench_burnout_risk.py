@@ -0,0 +1,102 @@
+"""Бенчмарк векторного скоринга риска выгорания по UserEntity.
+
+Запуск: python -m benchmarks.bench_burnout_risk [--users N] [--top-k K]
+"""
+import argparse
+import math
+import random
+import time
+from datetime import datetime, timedelta
+
+from src.application.scoring.BurnoutRiskScorer import (
+    BurnoutRiskScorer, DEFAULT_WEIGHTS, SHORT_TENURE_YEARS, SUBORDINATES_SATURATION, VACATION_GAP_SATURATION_DAYS
+)
+from src.core.entities.user_entites.Department import Department
+from src.core.entities.user_entites.Gender import Gender
+from src.core.entities.user_entites.UserEntity import UserEntity
+
+NOW = datetime(2025, 6, 1)
+
+
+def generate_users(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    departments = list(Department)
+    return [
+        UserEntity(
+            id=i,
+            full_name=f"Сотрудник {i}",
+            legal_entity="СДЭК",
+            gender=rng.choice(list(Gender)),
+            city="Новосибирск",
+            position="Специалист",
+            experience=rng.uniform(0, 20),
+            age=rng.randint(20, 60),
+            subordinates_count=rng.choice([0, 0, 0, 3, 10, 40]),
+            department=rng.choice(departments),
+            performance_metrics={"kpi": rng.random(), "quality": rng.random()},
+            certification_passed=rng.choice([True, False, None]),
+            training_completed=rng.random() < 0.7,
+            last_vacation=NOW - timedelta(days=rng.randint(0, 500)) if rng.random() < 0.9 else None,
+            sick_leave_2025=rng.random() < 0.2,
+            has_reprimand=rng.random() < 0.05,
+            corporate_activities_participation=rng.random() < 0.5,
+        )
+        for i in range(count)
+    ]
+
+
+def scalar_score(user: UserEntity) -> float:
+    """Построчный расчёт для сравнения (без перцентиля эффективности: берём 1 - среднее)"""
+    gap = (NOW - user.last_vacation).days if user.last_vacation else VACATION_GAP_SATURATION_DAYS
+    metrics = user.performance_metrics
+    features = {
+        "vacation_gap": min(max(gap / VACATION_GAP_SATURATION_DAYS, 0.0), 1.0),
+        "sick_leave": float(user.sick_leave_2025),
+        "reprimand": float(user.has_reprimand),
+        "low_performance": 1.0 - sum(metrics.values()) / len(metrics) if metrics else 0.5,
+        "management_load": min(math.log1p(user.subordinates_count) / math.log1p(SUBORDINATES_SATURATION), 1.0),
+        "short_tenure": min(max(1.0 - user.experience / SHORT_TENURE_YEARS, 0.0), 1.0),
+        "no_training": float(not user.training_completed),
+        "no_activities": float(not user.corporate_activities_participation),
+        "certification": 0.5 if user.certification_passed is None else float(not user.certification_passed),
+    }
+    return sum(DEFAULT_WEIGHTS[name] * value for name, value in features.items()) / sum(DEFAULT_WEIGHTS.values())
+
+
+def report(name: str, seconds: float, count: int) -> None:
+    print(f"{name:<28} {seconds * 1e3:9.2f} ms {count / seconds:14,.0f} records/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--top-k", type=int, default=20)
+    args = parser.parse_args()
+
+    users = generate_users(args.users)
+    scorer = BurnoutRiskScorer()
+
+    start = time.perf_counter()
+    ranked = sorted(((scalar_score(u), u.id) for u in users), reverse=True)
+    report("scalar loop + full sort", time.perf_counter() - start, len(users))
+
+    start = time.perf_counter()
+    columns, scores = scorer.score_users(users, reference_date=NOW)
+    columnar = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scores = scorer.score(columns)
+    vectorized = time.perf_counter() - start
+
+    start = time.perf_counter()
+    top = scorer.top_k_by_department(columns, scores, args.top_k)
+    top_k = time.perf_counter() - start
+
+    report("columnar load + score", columnar, len(users))
+    report("score only (vectorized)", vectorized, len(users))
+    report(f"top-{args.top_k} per department", top_k, len(users))
+    print(f"highest risk overall (scalar): {ranked[0][0]:.3f}; departments ranked: {len(top)}")
+
+
+if __name__ == "__main__":
+    main()
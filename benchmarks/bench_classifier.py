@@ -0,0 +1,270 @@
+"""Бенчмарк классификатора эмоций: сообщения в секунду и перцентили задержки.
+
+Сетка: бэкенд × размер батча × распределение длин ответов × потоки torch.
+Бэкенды:
+    sync     — classify_sync напрямую, чистая пропускная способность модели
+    batcher  — extract_emotion с конкурентными вызовами через MicroBatcher, как в сервисе
+    pool     — ProcessPoolClassifier (--workers процессов)
+    remote   — сервис классификатора по --classifier-url
+
+Запуск:
+    python -m benchmarks.bench_classifier --out classifier-baseline.json
+    python -m benchmarks.bench_classifier --model other/model --baseline classifier-baseline.json --threshold 0.1
+
+Код выхода 1, если по совпадающим конфигурациям пропускная способность упала
+или p95 вырос больше чем на --threshold.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from config import Config
+from src.infrastructure.metrics.bench_regressions import config_key, find_regressions
+
+PHRASES = [
+    "в целом справляюсь", "к концу недели сильно устаю", "работы стало заметно больше",
+    "руководитель поддерживает", "не хватает времени на семью", "клиенты часто раздражены",
+    "нравится помогать людям", "иногда хочется всё бросить", "коллеги выручают",
+    "плохо сплю перед сменой", "задачи стали однообразными", "чувствую, что расту",
+    "после отпуска стало легче", "постоянно отвлекают звонки", "не вижу смысла в отчётах",
+    "горжусь результатом команды", "боюсь ошибиться на складе", "переработки почти каждый день",
+]
+CONNECTORS = [", но ", ", и ", ". Кроме того, ", ", хотя ", ". Честно говоря, ", ", поэтому "]
+# (min, max) фраз в ответе
+LENGTHS = {"short": (1, 2), "medium": (4, 8), "long": (15, 30)}
+PERCENTILES = (50, 95, 99)
+
+
+def synthetic_answers(count: int, lengths: str, seed: int = 0) -> List[str]:
+    """Ответы на вопросы опроса; mixed — 50% коротких, 35% средних, 15% длинных"""
+    rng = random.Random(seed)
+
+    def answer(kind: str) -> str:
+        low, high = LENGTHS[kind]
+        parts = [rng.choice(PHRASES) for _ in range(rng.randint(low, high))]
+        text = parts[0]
+        for part in parts[1:]:
+            text += rng.choice(CONNECTORS) + part
+        return text[0].upper() + text[1:] + rng.choice([".", "!", "...", ""])
+
+    if lengths == "mixed":
+        return [answer(rng.choices(("short", "medium", "long"), (0.5, 0.35, 0.15))[0]) for _ in range(count)]
+    return [answer(lengths) for _ in range(count)]
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    points = np.percentile(np.asarray(values, dtype=np.float64), PERCENTILES)
+    return {f"p{p}": round(float(value) * 1000, 3) for p, value in zip(PERCENTILES, points)}
+
+
+def bench_sync(classify_sync: Callable, messages: List[str], batch_size: int) -> Dict:
+    """Задержка — на батч"""
+    latencies = []
+    started = time.perf_counter()
+    for start in range(0, len(messages), batch_size):
+        batch_started = time.perf_counter()
+        classify_sync(messages[start:start + batch_size])
+        latencies.append(time.perf_counter() - batch_started)
+    return _result(len(messages), time.perf_counter() - started, latencies, "batch")
+
+
+async def bench_concurrent(extract_emotion: Callable, messages: List[str], concurrency: int) -> Dict:
+    """Задержка — на сообщение при concurrency одновременных вызовах"""
+    latencies = []
+    queue = iter(messages)
+
+    async def caller():
+        for message in queue:
+            call_started = time.perf_counter()
+            await extract_emotion(message)
+            latencies.append(time.perf_counter() - call_started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(caller() for _ in range(concurrency)))
+    return _result(len(messages), time.perf_counter() - started, latencies, "message")
+
+
+async def bench_pool(classify: Callable, messages: List[str], batch_size: int, in_flight: int) -> Dict:
+    """Батчи уходят в пул процессов по in_flight одновременно; задержка — на батч"""
+    batches = [messages[start:start + batch_size] for start in range(0, len(messages), batch_size)]
+    latencies = []
+    semaphore = asyncio.Semaphore(in_flight)
+
+    async def run(batch: List[str]):
+        async with semaphore:
+            batch_started = time.perf_counter()
+            await classify(batch)
+            latencies.append(time.perf_counter() - batch_started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(run(batch) for batch in batches))
+    return _result(len(messages), time.perf_counter() - started, latencies, "batch")
+
+
+def _result(count: int, seconds: float, latencies: List[float], latency_unit: str) -> Dict:
+    return {
+        "messages": count,
+        "seconds": round(seconds, 4),
+        "messages_per_second": round(count / seconds, 2),
+        "latency_unit": latency_unit,
+        "latency_ms": percentiles(latencies)
+    }
+
+
+def environment(model_name: str) -> Dict:
+    info = {
+        "model": model_name,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "started_at": datetime.now().isoformat(timespec="seconds")
+    }
+    try:
+        import torch
+        info["torch"] = torch.__version__
+    except ImportError:
+        pass
+    return info
+
+
+async def run_grid(args) -> List[Dict]:
+    import torch
+    from src.infrastructure.emotion_classification.EmotionClassification import EmotionalClassification
+
+    corpora = {lengths: synthetic_answers(args.messages, lengths, args.seed) for lengths in args.lengths}
+    warmup = synthetic_answers(max(args.batch_sizes), "mixed", args.seed + 1)
+    results = []
+    classifier: Optional[EmotionalClassification] = None
+
+    for threads in args.threads:
+        torch.set_num_threads(threads)
+        in_process = {"sync", "batcher"} & set(args.backends)
+        if in_process and classifier is None:
+            classifier = EmotionalClassification()
+        if classifier is not None:
+            classifier.classify_sync(warmup)
+
+        for backend in args.backends:
+            if backend == "pool":
+                results += await _run_pool(args, corpora, warmup, threads)
+                continue
+            if backend == "remote":
+                if threads == args.threads[0]:  # потоки сервиса задаются при его запуске
+                    results += await _run_remote(args, corpora, warmup)
+                continue
+            for batch_size in args.batch_sizes:
+                for lengths, messages in corpora.items():
+                    if backend == "sync":
+                        result = bench_sync(classifier.classify_sync, messages, batch_size)
+                    else:
+                        classifier.batcher.max_batch_size = batch_size
+                        result = await bench_concurrent(classifier.extract_emotion, messages, args.concurrency)
+                    results.append(_report(backend, batch_size, lengths, threads, result))
+    return results
+
+
+async def _run_pool(args, corpora: Dict[str, List[str]], warmup: List[str], threads: int) -> List[Dict]:
+    from src.infrastructure.emotion_classification.ProcessPoolClassifier import ProcessPoolClassifier
+
+    pool = ProcessPoolClassifier(args.workers, torch_threads=threads)
+    results = []
+    try:
+        await asyncio.gather(*(pool.classify(warmup) for _ in range(args.workers)))
+        for batch_size in args.batch_sizes:
+            for lengths, messages in corpora.items():
+                result = await bench_pool(pool.classify, messages, batch_size, in_flight=args.workers)
+                results.append(_report(f"pool{args.workers}", batch_size, lengths, threads, result))
+    finally:
+        pool.close()
+    return results
+
+
+async def _run_remote(args, corpora: Dict[str, List[str]], warmup: List[str]) -> List[Dict]:
+    from src.infrastructure.emotion_classification.RemoteEmotionalClassification import (
+        RemoteEmotionalClassification,
+    )
+
+    results = []
+    for batch_size in args.batch_sizes:
+        remote = RemoteEmotionalClassification(args.classifier_url, timeout=60, max_batch_size=batch_size)
+        try:
+            await remote.extract_emotion_batch(warmup)
+            for lengths, messages in corpora.items():
+                result = await bench_concurrent(remote.extract_emotion, messages, args.concurrency)
+                results.append(_report("remote", batch_size, lengths, 0, result))
+        finally:
+            await remote.close()
+    return results
+
+
+def _report(backend: str, batch_size: int, lengths: str, threads: int, result: Dict) -> Dict:
+    row = {"backend": backend, "batch_size": batch_size, "lengths": lengths, "threads": threads, **result}
+    latency = "  ".join(f"{key} {value:8.1f}" for key, value in row["latency_ms"].items())
+    print(f"{config_key(row):<42} {row['messages_per_second']:10,.1f} msg/s  "
+          f"{latency} ms/{row['latency_unit']}", flush=True)
+    return row
+
+
+def parse_args():
+    def ints(value: str) -> List[int]:
+        return [int(item) for item in value.split(",")]
+
+    def names(value: str) -> List[str]:
+        return value.split(",")
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=Config.EMOTIONAL_CLASSIFICATION_MODEL_NAME)
+    parser.add_argument("--backends", type=names, default=["sync", "batcher"])
+    parser.add_argument("--batch-sizes", type=ints, default=[1, 8, 32, 64])
+    parser.add_argument("--lengths", type=names, default=["short", "medium", "long", "mixed"])
+    parser.add_argument("--threads", type=ints, default=[os.cpu_count() or 1])
+    parser.add_argument("--messages", type=int, default=512, help="сообщений на конфигурацию")
+    parser.add_argument("--concurrency", type=int, default=64, help="одновременных вызовов для batcher/remote")
+    parser.add_argument("--workers", type=int, default=2, help="процессов для pool")
+    parser.add_argument("--classifier-url", default=Config.CLASSIFIER_URL or "unix:///tmp/burnout-classifier.sock")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="сохранить результаты JSON")
+    parser.add_argument("--baseline", help="результаты прошлого прогона для сравнения")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+    unknown = set(args.lengths) - set(LENGTHS) - {"mixed"}
+    if unknown:
+        parser.error(f"unknown lengths: {', '.join(sorted(unknown))}")
+    return args
+
+
+async def main() -> int:
+    args = parse_args()
+    # Модель выбирается до создания классификатора, в том числе в процессах пула
+    Config.EMOTIONAL_CLASSIFICATION_MODEL_NAME = args.model
+    os.environ["EMOTIONAL_CLASSIFICATION_MODEL_NAME"] = args.model
+
+    report = {"environment": environment(args.model), "results": await run_grid(args)}
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline, encoding="utf-8") as file:
+        baseline = json.load(file)
+    if baseline.get("environment", {}).get("cpu_count") != report["environment"]["cpu_count"]:
+        print("Warning: baseline was recorded on a machine with a different CPU count", file=sys.stderr)
+    regressions = find_regressions(report["results"], baseline, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    print(f"{len(regressions)} regressions against {args.baseline} (threshold {args.threshold:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,67 @@
+"""Микробенчмарк кодирования SSE-кадров и ответов /query.
+
+Запуск: python -m benchmarks.bench_serialization [--frames N]
+"""
+import argparse
+import json
+import timeit
+
+from src.core.entities.QueryEntities import LLMResponse, LLMStreamResponse
+from src.infrastructure.serialization import serializer
+from src.infrastructure.serialization.serializer import SSEFrameEncoder, encode_response
+
+CHUNK = LLMStreamResponse(
+    content_chunk="Расскажите, ",
+    chat_id="b6e8bb10-16af-4ce7-b186-776bed94de90",
+    is_completed=False,
+    question_count=3,
+    total_questions=8,
+    event_id="5f0c2a8e9d7b4c1aa3e1f6b2d4c8e0a1:42",
+)
+
+RESPONSE = LLMResponse(
+    content="Насколько часто вы чувствуете усталость в конце рабочего дня? " * 4,
+    chat_id=CHUNK.chat_id,
+    is_completed=False,
+    question_count=3,
+    total_questions=8,
+)
+
+
+def legacy_frame(chunk: LLMStreamResponse) -> bytes:
+    chunk_data = {
+        "content": chunk.content_chunk,
+        "chat_id": chunk.chat_id,
+        "is_completed": chunk.is_completed,
+        "question_count": chunk.question_count,
+        "total_questions": chunk.total_questions,
+        "is_final_chunk": chunk.is_final_chunk
+    }
+    return f"id: {chunk.event_id}\ndata: {json.dumps(chunk_data, ensure_ascii=False)}\n\n".encode()
+
+
+def legacy_response(response: LLMResponse) -> bytes:
+    from dataclasses import asdict
+    return json.dumps(asdict(response), ensure_ascii=False).encode()
+
+
+def report(name: str, func, number: int) -> None:
+    seconds = min(timeit.repeat(func, number=number, repeat=5))
+    print(f"{name:<32} {seconds / number * 1e9:10.0f} ns/op")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=200_000)
+    args = parser.parse_args()
+
+    print(f"backend: {'orjson' if serializer.orjson is not None else 'json (stdlib)'}")
+    encoder = SSEFrameEncoder()
+    report("sse frame, dict + json.dumps", lambda: legacy_frame(CHUNK), args.frames)
+    report("sse frame, SSEFrameEncoder", lambda: encoder.encode(CHUNK), args.frames)
+    report("/query, asdict + json.dumps", lambda: legacy_response(RESPONSE), args.frames // 4)
+    report("/query, encode_response", lambda: encode_response(RESPONSE), args.frames // 4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""Нагрузочный тест: полные опросы через /query и /query-streaming.
+
+Каждый виртуальный пользователь проходит опрос от первого хода до анализа
+(8 ходов при max_questions=8) и сразу начинает следующий. В отчёте —
+перцентили по номеру хода, ход анализа отдельно, TTFT стрима и
+пропускная способность. Для воспроизводимых цифр сервис запускают
+против benchmarks.mock_llm_server.
+
+Запуск:
+    python -m benchmarks.load_surveys --mode streaming --concurrency 32 --surveys 200
+    python -m benchmarks.load_surveys --mode both --concurrency 64 --out load.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
+import numpy as np
+
+from config import Config
+
+ANSWERS = [
+    "В целом нормально, но к вечеру сильно устаю",
+    "Иногда бывает, особенно в понедельник",
+    "Интерес есть, хотя рутина утомляет",
+    "Стараюсь помочь, но порой раздражаюсь",
+    "Не всегда вижу результат своей работы",
+    "С трудом, часто проверяю рабочий чат",
+    "Закрыл сложный проект вместе с командой",
+    "Пожалуй, это всё, что я хотел сказать",
+]
+PERCENTILES = (50, 95, 99)
+
+
+@dataclass
+class TurnSample:
+    mode: str
+    turn: int
+    latency: float
+    ttft: Optional[float] = None
+    is_analysis: bool = False
+    error: Optional[str] = None
+
+
+class SurveyLoadGenerator:
+    def __init__(self, base_url: str, api_key: str, max_questions: int = 8, think_time: float = 0.0,
+                 timeout: float = 120.0):
+        self.base_url = base_url.rstrip("/")
+        self.headers = {"X-API-Key": api_key, "Content-Type": "application/json"}
+        self.max_questions = max_questions
+        self.think_time = think_time
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.samples: List[TurnSample] = []
+        self.completed_surveys = 0
+
+    async def run(self, mode: str, concurrency: int, surveys: int) -> float:
+        """Прогоняет surveys опросов силами concurrency пользователей; возвращает время прогона"""
+        remaining = iter(range(surveys))
+        connector = aiohttp.TCPConnector(limit=concurrency)
+        async with aiohttp.ClientSession(connector=connector, timeout=self.timeout) as session:
+            async def user(index: int):
+                for survey in remaining:
+                    survey_mode = mode if mode != "both" else ("query", "streaming")[survey % 2]
+                    await self._survey(session, survey_mode, random.Random(survey))
+
+            started = time.perf_counter()
+            await asyncio.gather(*(user(index) for index in range(concurrency)))
+            return time.perf_counter() - started
+
+    async def _survey(self, session: aiohttp.ClientSession, mode: str, rng: random.Random) -> None:
+        chat_id = None
+        for turn in range(1, self.max_questions + 1):
+            payload = {"user_input": rng.choice(ANSWERS), "max_questions": self.max_questions}
+            if chat_id:
+                payload["chat_id"] = chat_id
+            turn_fn = self._turn_streaming if mode == "streaming" else self._turn_query
+            sample, chat_id, is_completed = await turn_fn(session, payload, turn)
+            self.samples.append(sample)
+            if sample.error or not chat_id:
+                return
+            if is_completed:
+                self.completed_surveys += 1
+                return
+            if self.think_time:
+                await asyncio.sleep(rng.uniform(0.5, 1.5) * self.think_time)
+
+    async def _turn_query(self, session, payload: Dict, turn: int) -> Tuple[TurnSample, Optional[str], bool]:
+        started = time.perf_counter()
+        try:
+            async with session.post(f"{self.base_url}/query", json=payload, headers=self.headers) as response:
+                if response.status != 200:
+                    return self._failed("query", turn, started, f"HTTP {response.status}"), None, False
+                data = await response.json()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            return self._failed("query", turn, started, repr(e)), None, False
+
+        sample = TurnSample("query", turn, time.perf_counter() - started, is_analysis=bool(data.get("is_analysis")))
+        return sample, data.get("chat_id"), bool(data.get("is_completed"))
+
+    async def _turn_streaming(self, session, payload: Dict, turn: int) -> Tuple[TurnSample, Optional[str], bool]:
+        started = time.perf_counter()
+        ttft, final = None, None
+        try:
+            async with session.post(
+                    f"{self.base_url}/query-streaming", json=payload, headers=self.headers
+            ) as response:
+                if response.status != 200:
+                    return self._failed("streaming", turn, started, f"HTTP {response.status}"), None, False
+                async for line in response.content:
+                    if not line.startswith(b"data: "):
+                        continue
+                    frame = json.loads(line[6:])
+                    if frame.get("error"):
+                        return self._failed("streaming", turn, started, frame.get("content")), None, False
+                    if ttft is None and frame.get("content"):
+                        ttft = time.perf_counter() - started
+                    if frame.get("is_final_chunk"):
+                        final = frame
+                        break
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            return self._failed("streaming", turn, started, repr(e)), None, False
+
+        if final is None:
+            return self._failed("streaming", turn, started, "stream ended without final chunk"), None, False
+        # В SSE-кадрах нет is_analysis: анализ — последний ход полного опроса
+        is_analysis = bool(final.get("is_completed")) and turn == self.max_questions
+        sample = TurnSample("streaming", turn, time.perf_counter() - started, ttft, is_analysis)
+        return sample, final.get("chat_id"), bool(final.get("is_completed"))
+
+    @staticmethod
+    def _failed(mode: str, turn: int, started: float, error: str) -> TurnSample:
+        return TurnSample(mode, turn, time.perf_counter() - started, error=error)
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    points = np.percentile(np.asarray(values, dtype=np.float64), PERCENTILES)
+    return {f"p{p}": round(float(value), 4) for p, value in zip(PERCENTILES, points)}
+
+
+def build_report(samples: List[TurnSample], wall_seconds: float, completed_surveys: int) -> Dict:
+    report = {
+        "wall_seconds": round(wall_seconds, 3),
+        "turns": len(samples),
+        "errors": sum(1 for sample in samples if sample.error),
+        "completed_surveys": completed_surveys,
+        "turns_per_second": round(len(samples) / wall_seconds, 2),
+        "surveys_per_minute": round(completed_surveys / wall_seconds * 60, 2),
+        "modes": {}
+    }
+    for mode in sorted({sample.mode for sample in samples}):
+        ok = [sample for sample in samples if sample.mode == mode and not sample.error]
+        report["modes"][mode] = {
+            "turn": percentiles([sample.latency for sample in ok if not sample.is_analysis]),
+            "analysis_turn": percentiles([sample.latency for sample in ok if sample.is_analysis]),
+            "ttft": percentiles([sample.ttft for sample in ok if sample.ttft is not None]),
+            "by_turn": {
+                turn: percentiles([sample.latency for sample in ok if sample.turn == turn])
+                for turn in sorted({sample.turn for sample in ok})
+            },
+            "errors": sum(1 for sample in samples if sample.mode == mode and sample.error)
+        }
+    return report
+
+
+def print_report(report: Dict) -> None:
+    print(f"{report['turns']} turns in {report['wall_seconds']} s: {report['turns_per_second']} turns/s, "
+          f"{report['surveys_per_minute']} surveys/min, {report['errors']} errors")
+    for mode, summary in report["modes"].items():
+        print(f"\n[{mode}]")
+        for name in ("turn", "analysis_turn", "ttft"):
+            if summary[name]:
+                values = "  ".join(f"{key} {value * 1000:8.1f} ms" for key, value in summary[name].items())
+                print(f"  {name:<14} {values}")
+        for turn, values in summary["by_turn"].items():
+            print(f"  turn {turn:<9} " + "  ".join(f"{key} {value * 1000:8.1f} ms" for key, value in values.items()))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--api-key", default=Config.API_KEY)
+    parser.add_argument("--mode", choices=("query", "streaming", "both"), default="both")
+    parser.add_argument("--concurrency", type=int, default=16, help="одновременных пользователей")
+    parser.add_argument("--surveys", type=int, default=100, help="сколько опросов пройти всего")
+    parser.add_argument("--max-questions", type=int, default=8)
+    parser.add_argument("--think-ms", type=float, default=0, help="средняя пауза пользователя между ходами")
+    parser.add_argument("--out", help="сохранить отчёт JSON")
+    return parser.parse_args()
+
+
+async def main():
+    args = parse_args()
+    generator = SurveyLoadGenerator(args.url, args.api_key, args.max_questions, args.think_ms / 1000)
+    wall_seconds = await generator.run(args.mode, args.concurrency, args.surveys)
+    report = build_report(generator.samples, wall_seconds, generator.completed_surveys)
+    print_report(report)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as file:
+            json.dump({"args": vars(args) | {"api_key": None}, **report,
+                       "samples": [asdict(sample) for sample in generator.samples]}, file, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,225 @@
+"""Локальный OpenAI-совместимый сервер chat completions для нагрузочных тестов.
+
+Отвечает как DeepSeek API, которым пользуется DeepSeekLLM: обычные ответы
+и SSE-стрим с заданными временем до первого токена, скоростью генерации
+и долей ошибок. На обычный ход отдаёт вопрос опроса, на промпт анализа —
+JSON результата MBI.
+
+Запуск:
+    python -m benchmarks.mock_llm_server --port 8100 --ttft-ms 400 --tokens-per-second 40
+    LLM_BASE_URL=http://127.0.0.1:8100/v1 OPENAI_API_KEY=mock LLM_MODEL=mock uvicorn app:app
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+from src.core.prompts import ANALYSIS_PROMPT_PREFIX
+
+# По вопросу на каждый из 8 ходов опроса (max_questions по умолчанию)
+SURVEY_QUESTIONS = [
+    "Как бы вы описали своё самочувствие в конце обычного рабочего дня?",
+    "Бывает ли, что утром вам тяжело думать о предстоящей работе? Как часто это случается?",
+    "Насколько вам удаётся сохранять интерес к задачам, которые вы выполняете?",
+    "Как вы обычно реагируете, когда коллеги или клиенты обращаются к вам с проблемами?",
+    "Чувствуете ли вы, что ваша работа приносит ощутимый результат?",
+    "Удаётся ли вам отключаться от рабочих мыслей в выходные и во время отпуска?",
+    "Что за последний месяц в работе принесло вам больше всего удовлетворения?",
+    "Если бы вы могли изменить одну вещь в своей работе, что бы это было?",
+]
+
+ANALYSES = [
+    {
+        "emotional_exhaustion": 18, "depersonalization": 6, "reduction_of_achievements": 34,
+        "burnout_index": 0.44,
+        "recommendations": [
+            "Планируйте короткие перерывы в течение дня",
+            "Обсудите с руководителем распределение сложных обращений",
+            "Фиксируйте завершённые задачи, чтобы видеть результат",
+            "Умеренный риск выгорания: повторите опрос через месяц"
+        ]
+    },
+    {
+        "emotional_exhaustion": 29, "depersonalization": 12, "reduction_of_achievements": 28,
+        "burnout_index": 0.52,
+        "recommendations": [
+            "Сократите сверхурочную нагрузку и возьмите отпуск",
+            "Обратитесь к корпоративному психологу",
+            "Поставьте небольшие достижимые цели на неделю",
+            "Высокий риск выгорания: нужна поддержка руководителя"
+        ]
+    },
+]
+
+TOKEN_PATTERN = re.compile(r"\S+\s*|\s+")
+
+
+@dataclass
+class MockLLMSettings:
+    ttft: float = 0.3
+    tokens_per_second: float = 50.0
+    error_rate: float = 0.0
+    error_status: int = 500
+    ttft_jitter: float = 0.2  # доля случайного разброса TTFT
+    model: str = "mock"
+    seed: Optional[int] = None
+
+
+class MockLLMServer:
+    def __init__(self, settings: MockLLMSettings):
+        self.settings = settings
+        self.random = random.Random(settings.seed)
+        self.stats = {"requests": 0, "streams": 0, "errors": 0, "completion_tokens": 0}
+        self.app = web.Application()
+        for prefix in ("", "/v1"):
+            self.app.router.add_post(f"{prefix}/chat/completions", self._chat_completions)
+            self.app.router.add_get(f"{prefix}/models", self._models)
+        self.app.router.add_get("/stats", self._stats)
+        self._runner: Optional[web.AppRunner] = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8100) -> None:
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def _chat_completions(self, request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        self.stats["requests"] += 1
+        if self.random.random() < self.settings.error_rate:
+            self.stats["errors"] += 1
+            await asyncio.sleep(self._ttft() / 4)
+            return web.json_response(
+                {"error": {"message": "mock upstream error", "type": "server_error", "code": None}},
+                status=self.settings.error_status
+            )
+
+        messages = body.get("messages", [])
+        tokens = TOKEN_PATTERN.findall(self._completion(messages))
+        if body.get("max_tokens"):
+            tokens = tokens[:body["max_tokens"]]
+        self.stats["completion_tokens"] += len(tokens)
+        usage = {
+            "prompt_tokens": sum(len(message.get("content") or "") for message in messages) // 4,
+            "completion_tokens": len(tokens),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+
+        if body.get("stream"):
+            self.stats["streams"] += 1
+            include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+            return await self._stream(request, tokens, usage if include_usage else None)
+
+        await asyncio.sleep(self._ttft() + len(tokens) / self.settings.tokens_per_second)
+        return web.json_response({
+            "id": self._completion_id(),
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": self.settings.model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(tokens)},
+                "finish_reason": "stop"
+            }],
+            "usage": usage
+        })
+
+    async def _stream(self, request: web.Request, tokens: List[str], usage: Optional[Dict]) -> web.StreamResponse:
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+        await response.prepare(request)
+        completion_id, created = self._completion_id(), int(time.time())
+
+        def chunk(delta: Dict, finish_reason: Optional[str] = None) -> bytes:
+            return self._sse({
+                "id": completion_id, "object": "chat.completion.chunk", "created": created,
+                "model": self.settings.model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+            })
+
+        interval = 1 / self.settings.tokens_per_second
+        await asyncio.sleep(self._ttft())
+        await response.write(chunk({"role": "assistant", "content": ""}))
+        try:
+            for index, token in enumerate(tokens):
+                if index:
+                    await asyncio.sleep(interval)
+                await response.write(chunk({"content": token}))
+            await response.write(chunk({}, "stop"))
+            if usage is not None:
+                await response.write(self._sse({
+                    "id": completion_id, "object": "chat.completion.chunk", "created": created,
+                    "model": self.settings.model, "choices": [], "usage": usage
+                }))
+            await response.write(b"data: [DONE]\n\n")
+        except ConnectionResetError:
+            pass  # клиент отменил генерацию
+        return response
+
+    async def _models(self, request: web.Request) -> web.Response:
+        return web.json_response({"object": "list", "data": [{"id": self.settings.model, "object": "model"}]})
+
+    async def _stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats)
+
+    def _completion(self, messages: List[Dict]) -> str:
+        if messages and (messages[0].get("content") or "").startswith(ANALYSIS_PROMPT_PREFIX):
+            return json.dumps(self.random.choice(ANALYSES), ensure_ascii=False)
+        asked = sum(1 for message in messages if message.get("role") == "assistant")
+        return SURVEY_QUESTIONS[asked % len(SURVEY_QUESTIONS)]
+
+    def _ttft(self) -> float:
+        jitter = self.settings.ttft * self.settings.ttft_jitter
+        return max(0.0, self.settings.ttft + self.random.uniform(-jitter, jitter))
+
+    def _completion_id(self) -> str:
+        return f"chatcmpl-mock-{self.stats['requests']}"
+
+    @staticmethod
+    def _sse(payload: Dict) -> bytes:
+        return b"data: " + json.dumps(payload, ensure_ascii=False).encode() + b"\n\n"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--ttft-ms", type=float, default=300)
+    parser.add_argument("--tokens-per-second", type=float, default=50)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="доля запросов с ошибкой")
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=None)
+    return parser.parse_args()
+
+
+async def main():
+    args = parse_args()
+    server = MockLLMServer(MockLLMSettings(
+        ttft=args.ttft_ms / 1000,
+        tokens_per_second=args.tokens_per_second,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        seed=args.seed
+    ))
+    await server.start(args.host, args.port)
+    print(f"Mock LLM on http://{args.host}:{args.port}/v1 (TTFT {args.ttft_ms:.0f} ms, "
+          f"{args.tokens_per_second:.0f} tok/s, errors {args.error_rate:.0%})", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -6,6 +6,11 @@ load_dotenv()
 
 class Config:
     API_KEY = os.getenv("API_KEY")
+    # Ключи внутренних клиентов: {"имя": {"key": ..., "weight": 8, "requests_per_minute": 600}}
+    API_KEYS = os.getenv("API_KEYS", "")
+    # Места LLM и классификатора, которые делятся между клиентами по весам
+    TENANT_LLM_CONCURRENCY = int(os.getenv("TENANT_LLM_CONCURRENCY", "16"))
+    TENANT_CLASSIFIER_CONCURRENCY = int(os.getenv("TENANT_CLASSIFIER_CONCURRENCY", "64"))
 
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
     LLM_BASE_URL = os.getenv("LLM_BASE_URL")
@@ -15,3 +20,52 @@ class Config:
     MONGODB_DATABASE = os.getenv("MONGODB_DATABASE")
 
     EMOTIONAL_CLASSIFICATION_MODEL_NAME = os.getenv("EMOTIONAL_CLASSIFICATION_MODEL_NAME")
+    CLASSIFIER_MAX_BATCH_SIZE = int(os.getenv("CLASSIFIER_MAX_BATCH_SIZE", "32"))
+    CLASSIFIER_MAX_CONCURRENT_BATCHES = int(os.getenv("CLASSIFIER_MAX_CONCURRENT_BATCHES", "2"))
+    PRELOAD_MODEL = os.getenv("PRELOAD_MODEL", "false").lower() in ("1", "true", "yes")
+
+    # Пусто — модель в каждом воркере; иначе unix:///path.sock или http://host:port сервиса классификатора
+    CLASSIFIER_URL = os.getenv("CLASSIFIER_URL", "")
+    CLASSIFIER_TIMEOUT_SECONDS = float(os.getenv("CLASSIFIER_TIMEOUT_SECONDS", "5"))
+    CLASSIFIER_POOL_SIZE = int(os.getenv("CLASSIFIER_POOL_SIZE", "32"))
+    CLASSIFIER_FALLBACK = os.getenv("CLASSIFIER_FALLBACK", "true").lower() in ("1", "true", "yes")
+
+    # Запись трафика для воспроизведения: путь к NDJSON ({pid} — файл на воркер), пусто — выключено
+    TRAFFIC_RECORD_PATH = os.getenv("TRAFFIC_RECORD_PATH", "")
+    TRAFFIC_RECORD_SAMPLE_RATE = float(os.getenv("TRAFFIC_RECORD_SAMPLE_RATE", "1.0"))
+    # Одна на все воркеры, иначе ходы чата с разных воркеров не свяжутся; пусто — случайная
+    TRAFFIC_RECORD_SALT = os.getenv("TRAFFIC_RECORD_SALT", "")
+
+    STREAM_BUFFER_TTL_SECONDS = float(os.getenv("STREAM_BUFFER_TTL_SECONDS", "300"))
+    STREAM_RESUME_GRACE_SECONDS = float(os.getenv("STREAM_RESUME_GRACE_SECONDS", "15"))
+    STREAM_CHECKPOINT_INTERVAL_SECONDS = float(os.getenv("STREAM_CHECKPOINT_INTERVAL_SECONDS", "2"))
+
+    SSE_COALESCE_MAX_DELAY_MS = float(os.getenv("SSE_COALESCE_MAX_DELAY_MS", "50"))
+    SSE_COALESCE_MAX_BYTES = int(os.getenv("SSE_COALESCE_MAX_BYTES", "1024"))
+
+    ADMISSION_MAX_INFLIGHT_LLM = int(os.getenv("ADMISSION_MAX_INFLIGHT_LLM", "64"))
+    ADMISSION_MAX_CLASSIFIER_QUEUE = int(os.getenv("ADMISSION_MAX_CLASSIFIER_QUEUE", "32"))
+    ADMISSION_NEW_SURVEY_SHARE = float(os.getenv("ADMISSION_NEW_SURVEY_SHARE", "0.75"))
+
+    # Повтор /query с тем же Idempotency-Key в течение TTL получает сохранённый ответ
+    IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "300"))
+    # Ходы одного чата идут по очереди на всех воркерах: аренда в MongoDB продлевается, пока ход идёт
+    CHAT_LEASE_TTL_SECONDS = float(os.getenv("CHAT_LEASE_TTL_SECONDS", "30"))
+    CHAT_LEASE_WAIT_SECONDS = float(os.getenv("CHAT_LEASE_WAIT_SECONDS", "120"))
+
+    # Как часто воркер сбрасывает накопленные токены LLM в MongoDB
+    TOKEN_USAGE_FLUSH_SECONDS = float(os.getenv("TOKEN_USAGE_FLUSH_SECONDS", "30"))
+
+    BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "16"))
+    BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "500"))
+
+    PSYCH_CONTEXT_MAX_CHARS = int(os.getenv("PSYCH_CONTEXT_MAX_CHARS", "2000"))
+    PSYCH_CONTEXT_MAX_RECENT = int(os.getenv("PSYCH_CONTEXT_MAX_RECENT", "5"))
+
+    # Мощность бэкенда, под которую планировщик раскладывает опросы
+    SCHEDULER_LLM_TOKENS_PER_MINUTE = float(os.getenv("SCHEDULER_LLM_TOKENS_PER_MINUTE", "200000"))
+    SCHEDULER_ANALYSES_PER_MINUTE = float(os.getenv("SCHEDULER_ANALYSES_PER_MINUTE", "600"))
+    SCHEDULER_TARGET_UTILIZATION = float(os.getenv("SCHEDULER_TARGET_UTILIZATION", "0.8"))
+    SCHEDULER_SLOT_MINUTES = int(os.getenv("SCHEDULER_SLOT_MINUTES", "15"))
+    SCHEDULER_WORKDAY_START_HOUR = int(os.getenv("SCHEDULER_WORKDAY_START_HOUR", "9"))
+    SCHEDULER_WORKDAY_END_HOUR = int(os.getenv("SCHEDULER_WORKDAY_END_HOUR", "18"))
@@ -0,0 +1,42 @@
+"""Конфигурация gunicorn для нескольких uvicorn-воркеров.
+
+    gunicorn app:app -c gunicorn.conf.py
+
+При PRELOAD_MODEL=true модель эмоций загружается один раз в мастере
+и наследуется воркерами после fork; каждый воркер печатает, сколько
+его памяти разделяемо, а сколько приватно.
+
+Метрики у каждого воркера свои: /metrics отдаёт серии того воркера,
+который принял запрос, с меткой pid. Суммируйте их в Prometheus через
+sum without (pid) (...).
+"""
+import os
+import sys
+
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+from config import Config
+from src.infrastructure.memory_report.memory_report import format_memory_report
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "4"))
+worker_class = "uvicorn.workers.UvicornWorker"
+# Мастер импортирует приложение и грузит модель до fork: воркеры наследуют их страницы
+preload_app = Config.PRELOAD_MODEL
+
+
+def on_starting(server):
+    if not Config.PRELOAD_MODEL:
+        return
+    if not server.cfg.preload_app:
+        raise RuntimeError("PRELOAD_MODEL=true requires preload_app = True in gunicorn config")
+
+    from src.infrastructure.emotion_classification.preload import preload_emotion_model
+
+    preload_emotion_model(Config.EMOTIONAL_CLASSIFICATION_MODEL_NAME)
+    print(format_memory_report("master after preload"))
+
+
+def post_worker_init(worker):
+    print(format_memory_report(f"worker {worker.age}"))
@@ -1,49 +1,355 @@
-from typing import AsyncGenerator
+import asyncio
+from datetime import datetime, timedelta
+from typing import AsyncGenerator, Awaitable, Callable, List, Optional, Set
 
 from config import Config
+from src.application.sessions.SurveySession import SurveySession, SurveySessionRegistry
+from src.application.admission.AdmissionController import AdmissionController, AdmissionRejected, AdmissionTicket
+from src.application.idempotency.ChatTurnLock import ChatBusyError, ChatTurnLock
+from src.application.idempotency.IdempotencyCache import IdempotencyCache, request_fingerprint
+from src.application.streaming.StreamBuffer import parse_event_id, StreamBuffer
+from src.application.streaming.StreamBufferRegistry import StreamBufferRegistry
+from src.application.tenancy.FairScheduler import FairScheduler, current_tenant
+from src.application.tenancy.TenantRegistry import TenantRegistry
+from src.application.usage.TokenUsageFlusher import TokenUsageFlusher
+from src.application.use_cases.SurveySchedulingUseCase import SurveySchedulingUseCase
 from src.application.use_cases.factory.UseCaseFactory import UseCaseFactory
-from src.core.entities.QueryEntities import QueryRequest, LLMResponse, LLMStreamResponse
+from src.core.entities.BurnoutResults import DepartmentWeekRollup, week_start_of
+from src.core.entities.BurnoutTimeSeries import BurnoutTrend
+from src.core.entities.QueryEntities import QueryRequest, LLMResponse, LLMStreamResponse, BatchItemResult
+from src.core.entities.SurveyPlan import SurveyPlan
+from src.core.entities.Tenant import Tenant
+from src.core.entities.user_entites.UserEntity import UserEntity
+from src.core.interfaces.IBurnoutResultStorage import IBurnoutResultStorage
+from src.core.interfaces.IBurnoutTimeSeries import IBurnoutTimeSeries
+from src.infrastructure.metrics.TokenUsageStats import token_usage
 
 
 class APIApplication:
     def __init__(self, config: Config):
         self.config = config
         self.use_case = None
+        self.stream_registry = StreamBufferRegistry(
+            ttl_seconds=config.STREAM_BUFFER_TTL_SECONDS,
+            resume_grace_seconds=config.STREAM_RESUME_GRACE_SECONDS
+        )
+        self.admission = AdmissionController(
+            max_inflight_llm=config.ADMISSION_MAX_INFLIGHT_LLM,
+            max_classifier_queue=config.ADMISSION_MAX_CLASSIFIER_QUEUE,
+            classifier_queue_depth=self._classifier_queue_depth,
+            new_survey_share=config.ADMISSION_NEW_SURVEY_SHARE
+        )
+        self.tenants = TenantRegistry.from_config(config.API_KEY, config.API_KEYS)
+        self.llm_scheduler = FairScheduler("llm", config.TENANT_LLM_CONCURRENCY, self.tenants.weights())
+        self.classifier_scheduler = FairScheduler(
+            "classifier", config.TENANT_CLASSIFIER_CONCURRENCY, self.tenants.weights()
+        )
+        self.chat_locks = ChatTurnLock(
+            ttl_seconds=config.CHAT_LEASE_TTL_SECONDS,
+            wait_seconds=config.CHAT_LEASE_WAIT_SECONDS
+        )
+        self.idempotency = IdempotencyCache(ttl_seconds=config.IDEMPOTENCY_TTL_SECONDS)
+        self._batch_tasks: Set[asyncio.Task] = set()
+        self.survey_sessions = SurveySessionRegistry(self._get_use_case, self.chat_locks, self.admit)
+        self._init_lock = asyncio.Lock()
+        self.scheduling_use_case: Optional[SurveySchedulingUseCase] = None
+        self.result_storage: Optional[IBurnoutResultStorage] = None
+        self.timeseries: Optional[IBurnoutTimeSeries] = None
+        self.usage_flusher: Optional[TokenUsageFlusher] = None
+
+    @property
+    def is_ready(self) -> bool:
+        return self.use_case is not None
 
     async def initialize(self):
-        """Асинхронная инициализация"""
-        self.use_case = await UseCaseFactory.create_burnout_survey_use_case(
-            self.config.MONGODB_CONNECTION_STRING
-        )
+        """Асинхронная инициализация; конкурентные вызовы ждут одну и ту же загрузку"""
+        if self.use_case:
+            return
+
+        async with self._init_lock:
+            if self.use_case:
+                return
+
+            use_case = await UseCaseFactory.create_burnout_survey_use_case(
+                self.config.MONGODB_CONNECTION_STRING,
+                result_storage=self._get_result_storage(),
+                timeseries=self._get_timeseries(),
+                llm_scheduler=self.llm_scheduler,
+                classifier_scheduler=self.classifier_scheduler
+            )
+            # Прогрев: первый forward pass медленный, пусть его оплатит старт, а не клиент
+            await use_case.emotional_use_case.analyze_single_message("Прогрев модели")
+            self.chat_locks.lease = UseCaseFactory.create_chat_lease(self.config.MONGODB_CONNECTION_STRING)
+            self.idempotency.store = UseCaseFactory.create_idempotency_store(self.config.MONGODB_CONNECTION_STRING)
+            self.usage_flusher = TokenUsageFlusher(
+                token_usage,
+                UseCaseFactory.create_token_usage_storage(self.config.MONGODB_CONNECTION_STRING),
+                self.config.TOKEN_USAGE_FLUSH_SECONDS
+            )
+            self.usage_flusher.start()
+            self.use_case = use_case
+
+    async def _get_use_case(self):
+        if not self.use_case:
+            await self.initialize()
+        return self.use_case
+
+    async def open_survey_session(self, chat_id: Optional[str] = None) -> SurveySession:
+        """Сессия опроса с состоянием в памяти на время соединения"""
+        return await self.survey_sessions.open(chat_id)
 
-    async def query(self, query_request: QueryRequest) -> LLMResponse:
-        """Универсальный метод для создания или продолжения диалога"""
+    def close_survey_session(self, session: SurveySession) -> None:
+        self.survey_sessions.close(session)
+
+    def authenticate(self, api_key: Optional[str]) -> Optional[Tenant]:
+        return self.tenants.authenticate(api_key)
+
+    async def admit(self, query_request: QueryRequest, is_continuation: Optional[bool] = None) -> AdmissionTicket:
+        """Допускает ход опроса или бросает AdmissionRejected; продолжения опросов в приоритете.
+
+        Ход допускают уже под замком чата: очередь к чату не должна занимать
+        место, которое нужно ходам других чатов. Продолжением считается ход
+        чата, который есть в хранилище, а не любой присланный chat_id;
+        is_continuation передаёт тот, у кого чат уже загружен.
+        """
+        self.tenants.check_quota(current_tenant.get())
+        if is_continuation is None:
+            is_continuation = await self._chat_exists(query_request.chat_id)
+        return self.admission.admit(is_continuation=is_continuation)
+
+    async def _chat_exists(self, chat_id: Optional[str]) -> bool:
+        if not chat_id:
+            return False
         if not self.use_case:
             await self.initialize()
+        return await self.use_case.chat_storage.get_chat(chat_id) is not None
+
+    def tenant_stats(self) -> dict:
+        """Очереди и занятые места клиентов у планировщиков LLM и классификатора"""
+        return {
+            scheduler.resource: {"capacity": scheduler.capacity, "tenants": scheduler.snapshot()}
+            for scheduler in (self.llm_scheduler, self.classifier_scheduler)
+        }
+
+    async def usage_summary(self, days: int, top_chats: int) -> dict:
+        """Токены LLM за days дней по хранилищу всех воркеров и итоги этого процесса с запуска"""
+        summary = {"process": token_usage.snapshot()}
+        if self.usage_flusher:
+            await self.usage_flusher.flush()
+            since = datetime.now() - timedelta(days=days)
+            summary["stored"] = await self.usage_flusher.storage.get_summary(since, top_chats)
+        return summary
 
+    async def close(self) -> None:
+        """Доводит начатые ходы батчей и отправляет накопленные записи до остановки"""
+        if self._batch_tasks:
+            await asyncio.gather(*self._batch_tasks, return_exceptions=True)
+        if self.usage_flusher:
+            await self.usage_flusher.close()
+        close_storage = getattr(self.use_case.chat_storage, "close", None) if self.use_case else None
+        if close_storage:
+            await close_storage()
+
+    def _classifier_queue_depth(self) -> int:
+        if not self.use_case:
+            return 0
+        return self.use_case.emotional_use_case.emotional_classification.queue_depth()
+
+    async def query(self, query_request: QueryRequest, idempotency_key: Optional[str] = None) -> LLMResponse:
+        """Универсальный метод для создания или продолжения диалога.
+
+        Ходы одного чата выполняются по очереди на всех воркерах. С ключом
+        идемпотентности повтор запроса получает ответ первого, а не новый ход.
+        AdmissionRejected и ChatBusyError пробрасываются для ответа клиенту.
+        """
+        if not self.use_case:
+            await self.initialize()
 
-        response = await self.use_case.execute(query_request)
+        if idempotency_key:
+            key = f"{current_tenant.get()}:{idempotency_key}"
+            response = await self.idempotency.run(
+                key,
+                request_fingerprint(query_request),
+                lambda: self._execute_admitted(query_request),
+                # Новый чат держим по ключу: дубль на другом воркере не создаст второй чат
+                lambda: self.chat_locks.hold(query_request.chat_id or f"idempotency:{key}")
+            )
+        else:
+            async with self.chat_locks.hold(query_request.chat_id):
+                response = await self._execute_admitted(query_request)
         print(f"chat_id: {response.chat_id}\ncontent: {response.content}\n"
               f"total_questions: {response.total_questions}\nquestion_count: {response.question_count}\n"
               f"is_completed: {response.is_completed}")
 
         return response
 
-    async def query_stream(self, query_request: QueryRequest) -> AsyncGenerator[LLMStreamResponse, None]:
-        """Streaming версия запроса"""
+    async def _execute_admitted(self, query_request: QueryRequest) -> LLMResponse:
+        with await self.admit(query_request):
+            return await self.use_case.execute(query_request)
+
+    async def query_batch(
+            self,
+            query_requests: List[QueryRequest],
+            max_concurrency: int
+    ) -> AsyncGenerator[BatchItemResult, None]:
+        """Выполняет ходы разных чатов конкурентно и отдаёт результаты по мере готовности.
+
+        Одновременные ходы батча делят батчи классификатора и bulk-записи
+        хранилища. Если клиент ушёл, начатые ходы всё равно доводятся до
+        конца, чтобы не оставлять чаты с вопросом без ответа.
+        """
         if not self.use_case:
             await self.initialize()
 
-        if hasattr(self.use_case, 'execute_stream'):
-            async for chunk in self.use_case.execute_stream(query_request):
-                yield chunk
-        else:
-            response = await self.use_case.execute(query_request)
-            yield LLMStreamResponse(
-                content_chunk=response.content,
-                chat_id=response.chat_id,
-                is_completed=response.is_completed,
-                question_count=response.question_count,
-                total_questions=response.total_questions,
-                is_final_chunk=True
-            )
\ No newline at end of file
+        semaphore = asyncio.Semaphore(max_concurrency)
+        results: asyncio.Queue = asyncio.Queue()
+
+        async def run(index: int, query_request: QueryRequest):
+            async with semaphore:
+                try:
+                    async with self.chat_locks.hold(query_request.chat_id):
+                        response = await self._execute_admitted(query_request)
+                    result = BatchItemResult(index=index, response=response)
+                except AdmissionRejected as e:
+                    result = BatchItemResult(index=index, error=e.reason, retry_after=e.retry_after)
+                except ChatBusyError as e:
+                    result = BatchItemResult(index=index, error=str(e), retry_after=e.retry_after)
+                except Exception as e:
+                    print(f"Error in batch item {index}: {str(e)}")
+                    result = BatchItemResult(index=index, error=str(e))
+            await results.put(result)
+
+        for index, query_request in enumerate(query_requests):
+            task = asyncio.create_task(run(index, query_request))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+        for _ in query_requests:
+            yield await results.get()
+
+    def _get_scheduling_use_case(self) -> SurveySchedulingUseCase:
+        # Планировщику модель не нужна, поэтому он не ждёт initialize()
+        if not self.scheduling_use_case:
+            self.scheduling_use_case = UseCaseFactory.create_survey_scheduling_use_case(
+                self.config.MONGODB_CONNECTION_STRING
+            )
+        return self.scheduling_use_case
+
+    async def plan_surveys(self, users: List[UserEntity], week_start: Optional[datetime] = None) -> SurveyPlan:
+        """Планирует опросы на неделю с учётом мощности LLM и классификатора"""
+        return await self._get_scheduling_use_case().plan_week(users, week_start)
+
+    async def get_latest_survey_plan(self) -> Optional[SurveyPlan]:
+        return await self._get_scheduling_use_case().get_latest_plan()
+
+    def _get_result_storage(self) -> IBurnoutResultStorage:
+        if not self.result_storage:
+            self.result_storage = UseCaseFactory.create_burnout_result_storage(
+                self.config.MONGODB_CONNECTION_STRING
+            )
+        return self.result_storage
+
+    def _get_timeseries(self) -> IBurnoutTimeSeries:
+        if not self.timeseries:
+            self.timeseries = UseCaseFactory.create_burnout_timeseries(self.config.MONGODB_CONNECTION_STRING)
+        return self.timeseries
+
+    async def get_user_trend(self, user_id: int, n: int) -> Optional[BurnoutTrend]:
+        """Последний результат, изменение с прошлого опроса и наклон по последним n опросам"""
+        return await self._get_timeseries().get_trend(user_id, n)
+
+    async def get_department_rollups(self, department: Optional[str], weeks: int) -> List[DepartmentWeekRollup]:
+        """Недельные агрегаты результатов за последние weeks недель, включая текущую"""
+        current = week_start_of(datetime.now())
+        week_starts = [current - timedelta(weeks=i) for i in range(weeks)]
+        return await self._get_result_storage().get_rollups(department, week_starts)
+
+    def find_stream(self, last_event_id: str) -> Optional[StreamBuffer]:
+        """Ищет буфер генерации по Last-Event-ID переподключившегося клиента"""
+        parsed = parse_event_id(last_event_id)
+        if not parsed:
+            return None
+        return self.stream_registry.get(parsed[0])
+
+    async def start_stream(self, query_request: QueryRequest) -> StreamBuffer:
+        """Запускает генерацию хода в буфере, не дожидаясь, пока клиент начнёт читать ответ.
+
+        Возвращает буфер, когда генерация дождалась замка чата и получила
+        место у контроля допуска; ChatBusyError и AdmissionRejected
+        пробрасываются до начала ответа. Место держится, пока идёт
+        генерация, а не пока подключён клиент.
+        """
+        admitted = asyncio.get_running_loop().create_future()
+        buffer = self.stream_registry.start(
+            self._generate_stream(query_request, admitted),
+            # Отменённая генерация уже не дойдёт до допуска
+            on_done=admitted.cancel
+        )
+        await admitted
+        return buffer
+
+    async def query_stream(
+            self,
+            query_request: QueryRequest,
+            last_event_id: Optional[str] = None,
+            is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+            buffer: Optional[StreamBuffer] = None
+    ) -> AsyncGenerator[LLMStreamResponse, None]:
+        """Streaming версия запроса: генерация идёт в буфере и переживает обрыв соединения.
+
+        Если клиент ушёл и не вернулся за STREAM_RESUME_GRACE_SECONDS,
+        генерация отменяется вплоть до закрытия потока у провайдера.
+        """
+        after_seq = -1
+        if last_event_id:
+            buffer = self.find_stream(last_event_id)
+            if buffer is None:
+                raise StreamNotFoundError(f"Stream for event {last_event_id} not found or expired")
+            after_seq = parse_event_id(last_event_id)[1]
+        elif buffer is None:
+            buffer = await self.start_stream(query_request)
+
+        async for chunk in buffer.subscribe(after_seq, is_disconnected):
+            yield chunk
+
+    async def _generate_stream(
+            self,
+            query_request: QueryRequest,
+            admitted: asyncio.Future
+    ) -> AsyncGenerator[LLMStreamResponse, None]:
+        """Генерация в буфере; admitted завершается после допуска или с ошибкой отказа"""
+        try:
+            if not self.use_case:
+                await self.initialize()
+            async with self.chat_locks.hold(query_request.chat_id):
+                with await self.admit(query_request):
+                    if admitted.done():
+                        # Обработчик отменили, пока ход ждал очереди: ответ некому отдать
+                        return
+                    admitted.set_result(None)
+                    if hasattr(self.use_case, 'execute_stream'):
+                        async for chunk in self.use_case.execute_stream(query_request):
+                            yield chunk
+                    else:
+                        response = await self.use_case.execute(query_request)
+                        yield LLMStreamResponse(
+                            content_chunk=response.content,
+                            chat_id=response.chat_id,
+                            is_completed=response.is_completed,
+                            question_count=response.question_count,
+                            total_questions=response.total_questions,
+                            is_final_chunk=True
+                        )
+        except (ChatBusyError, AdmissionRejected) as e:
+            # Отказ бывает только до допуска; если обработчик уже ушёл, сообщать некому
+            if not admitted.done():
+                admitted.set_exception(e)
+        except Exception:
+            # Прочие ошибки до допуска клиент получит событием в самом потоке
+            if not admitted.done():
+                admitted.set_result(None)
+            raise
+
+
+class StreamNotFoundError(Exception):
+    pass
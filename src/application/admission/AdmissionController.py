@@ -0,0 +1,89 @@
+import math
+import time
+from typing import Callable
+
+from src.infrastructure.metrics.app_metrics import admission_rejected
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionTicket:
+    """Место под один ход опроса; освобождается ровно один раз"""
+
+    def __init__(self, controller: "AdmissionController"):
+        self.controller = controller
+        self.started_at = time.monotonic()
+        self.released = False
+
+    def release(self) -> None:
+        if self.released:
+            return
+        self.released = True
+        self.controller._release(time.monotonic() - self.started_at)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+class AdmissionController:
+    """Ранний отказ (429) при перегрузке LLM или очереди классификатора.
+
+    Продолжения опросов могут занять всю ёмкость, новым опросам доступна
+    только доля new_survey_share: начатый опрос дешевле довести до конца,
+    чем бросить на полпути.
+    """
+
+    def __init__(
+            self,
+            max_inflight_llm: int,
+            max_classifier_queue: int,
+            classifier_queue_depth: Callable[[], int] = lambda: 0,
+            new_survey_share: float = 0.75,
+            initial_turn_seconds: float = 5.0
+    ):
+        self.max_inflight_llm = max_inflight_llm
+        self.max_classifier_queue = max_classifier_queue
+        self.classifier_queue_depth = classifier_queue_depth
+        self.new_survey_share = new_survey_share
+        self.in_flight = 0
+        self.avg_turn_seconds = initial_turn_seconds
+
+    def admit(self, is_continuation: bool) -> AdmissionTicket:
+        share = 1.0 if is_continuation else self.new_survey_share
+        llm_limit = max(1, int(self.max_inflight_llm * share))
+        classifier_limit = max(1, int(self.max_classifier_queue * share))
+        kind = "continuation" if is_continuation else "new"
+
+        if self.in_flight >= llm_limit:
+            admission_rejected.labels(kind, "llm").inc()
+            raise AdmissionRejected(
+                "LLM capacity exhausted",
+                self._retry_after(self.in_flight - llm_limit + 1, llm_limit)
+            )
+
+        queue_depth = self.classifier_queue_depth()
+        if queue_depth >= classifier_limit:
+            admission_rejected.labels(kind, "classifier").inc()
+            raise AdmissionRejected(
+                "Classifier queue is full",
+                self._retry_after(queue_depth - classifier_limit + 1, classifier_limit)
+            )
+
+        self.in_flight += 1
+        return AdmissionTicket(self)
+
+    def _release(self, turn_seconds: float) -> None:
+        self.in_flight -= 1
+        self.avg_turn_seconds = 0.9 * self.avg_turn_seconds + 0.1 * turn_seconds
+
+    def _retry_after(self, excess: int, limit: int) -> int:
+        """Через сколько секунд освободится место, если ходы завершаются со средней скоростью"""
+        return max(1, math.ceil(self.avg_turn_seconds * excess / limit))
@@ -0,0 +1,102 @@
+import asyncio
+import os
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+from src.core.interfaces.IChatLease import IChatLease
+from src.infrastructure.metrics.app_metrics import chat_lease_wait
+
+
+class ChatBusyError(Exception):
+    def __init__(self, chat_id: str, retry_after: int):
+        super().__init__(f"Another turn of chat {chat_id} is in progress")
+        self.chat_id = chat_id
+        self.retry_after = retry_after
+
+
+class ChatTurnLock:
+    """Ходы одного чата выполняются по очереди.
+
+    Внутри процесса очередь держит asyncio.Lock, между воркерами — аренда
+    в общем хранилище. Аренда продлевается, пока ход идёт, и истекает сама,
+    если воркер упал. Без lease сериализация только в пределах процесса.
+    """
+
+    def __init__(
+            self,
+            lease: Optional[IChatLease] = None,
+            ttl_seconds: float = 30.0,
+            wait_seconds: float = 120.0,
+            poll_interval: float = 0.05,
+            max_poll_interval: float = 1.0
+    ):
+        self.lease = lease
+        self.ttl_seconds = ttl_seconds
+        self.wait_seconds = wait_seconds
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._waiters: Dict[str, int] = {}
+
+    @asynccontextmanager
+    async def hold(self, name: Optional[str]) -> AsyncIterator[None]:
+        """Держит чат на время блока; None — новый чат, держать нечего"""
+        if not name:
+            yield
+            return
+
+        started = time.monotonic()
+        lock = self._locks.setdefault(name, asyncio.Lock())
+        self._waiters[name] = self._waiters.get(name, 0) + 1
+        acquired = False
+        try:
+            try:
+                async with asyncio.timeout(self.wait_seconds):
+                    await lock.acquire()
+                    acquired = True
+            except TimeoutError:
+                raise ChatBusyError(name, self._retry_after()) from None
+
+            renewal = await self._acquire_lease(name, started)
+            chat_lease_wait.observe(time.monotonic() - started)
+            try:
+                yield
+            finally:
+                if renewal is not None:
+                    renewal.cancel()
+                    await self.lease.release(name, self.owner)
+        finally:
+            # Замок отпускается при любом выходе, в том числе при отмене сразу после захвата
+            if acquired:
+                lock.release()
+            self._waiters[name] -= 1
+            if not self._waiters[name]:
+                del self._waiters[name]
+                del self._locks[name]
+
+    async def _acquire_lease(self, name: str, started: float) -> Optional[asyncio.Task]:
+        if self.lease is None:
+            return None
+        interval = self.poll_interval
+        while not await self.lease.acquire(name, self.owner, self.ttl_seconds):
+            if time.monotonic() - started + interval > self.wait_seconds:
+                raise ChatBusyError(name, self._retry_after())
+            await asyncio.sleep(interval)
+            interval = min(interval * 2, self.max_poll_interval)
+        return asyncio.create_task(self._renew(name))
+
+    async def _renew(self, name: str) -> None:
+        while True:
+            await asyncio.sleep(self.ttl_seconds / 3)
+            try:
+                if not await self.lease.acquire(name, self.owner, self.ttl_seconds):
+                    print(f"Lease of chat {name} was taken over while the turn is running")
+                    return
+            except Exception as e:
+                print(f"Error renewing lease of chat {name}: {str(e)}")
+
+    def _retry_after(self) -> int:
+        return max(1, round(self.ttl_seconds / 3))
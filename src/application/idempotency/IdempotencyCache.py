@@ -0,0 +1,101 @@
+import asyncio
+import hashlib
+import json
+import time
+from dataclasses import asdict, dataclass
+from typing import AsyncContextManager, Awaitable, Callable, Dict, Optional
+
+from src.core.entities.QueryEntities import LLMResponse, QueryRequest
+from src.core.interfaces.IIdempotencyStore import IIdempotencyStore
+from src.infrastructure.metrics.app_metrics import idempotent_requests
+
+
+class IdempotencyKeyReused(Exception):
+    """Тот же ключ пришёл с другим телом запроса"""
+
+
+def request_fingerprint(query_request: QueryRequest) -> str:
+    payload = json.dumps(asdict(query_request), sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+@dataclass
+class _Entry:
+    fingerprint: str
+    future: asyncio.Future
+    expires_at: float = float("inf")  # пока ход идёт, запись не истекает
+
+
+class IdempotencyCache:
+    """Ответы /query по Idempotency-Key.
+
+    Повтор с тем же ключом получает готовый ответ, а пока первый запрос
+    ещё выполняется — ждёт его результат, не запуская вторую генерацию.
+    Ошибки не кэшируются: повтор после ошибки выполняется заново.
+    Общий store виден всем воркерам; его проверяют под арендой чата,
+    чтобы повтор на другом воркере дождался хода и взял его ответ.
+    """
+
+    def __init__(self, ttl_seconds: float = 300.0, store: Optional[IIdempotencyStore] = None):
+        self.ttl_seconds = ttl_seconds
+        self.store = store
+        self._entries: Dict[str, _Entry] = {}
+
+    async def run(
+            self,
+            key: str,
+            fingerprint: str,
+            compute: Callable[[], Awaitable[LLMResponse]],
+            guard: Callable[[], AsyncContextManager]
+    ) -> LLMResponse:
+        self._evict_expired()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.fingerprint != fingerprint:
+                raise IdempotencyKeyReused(f"Idempotency key {key} was used with a different request")
+            idempotent_requests.labels("in_flight" if not entry.future.done() else "replayed").inc()
+            # shield: отмена повтора не должна отменять исходный ход
+            return await asyncio.shield(entry.future)
+
+        entry = _Entry(fingerprint, asyncio.get_running_loop().create_future())
+        self._entries[key] = entry
+        try:
+            response = await self._compute_once(key, fingerprint, compute, guard)
+        except BaseException as e:
+            del self._entries[key]
+            if isinstance(e, Exception):
+                entry.future.set_exception(e)
+                entry.future.exception()  # ожидающих может не быть
+            else:
+                entry.future.cancel()
+            raise
+        entry.future.set_result(response)
+        entry.expires_at = time.monotonic() + self.ttl_seconds
+        return response
+
+    async def _compute_once(
+            self,
+            key: str,
+            fingerprint: str,
+            compute: Callable[[], Awaitable[LLMResponse]],
+            guard: Callable[[], AsyncContextManager]
+    ) -> LLMResponse:
+        async with guard():
+            stored = await self.store.get(key) if self.store else None
+            if stored is not None:
+                if stored["fingerprint"] != fingerprint:
+                    raise IdempotencyKeyReused(f"Idempotency key {key} was used with a different request")
+                idempotent_requests.labels("replayed").inc()
+                return LLMResponse(**stored["response"])
+
+            idempotent_requests.labels("executed").inc()
+            response = await compute()
+            if self.store:
+                await self.store.put(key, {"fingerprint": fingerprint, "response": asdict(response)}, self.ttl_seconds)
+            return response
+
+    def _evict_expired(self) -> None:
+        now = time.monotonic()
+        expired = [key for key, entry in self._entries.items() if entry.expires_at <= now]
+        for key in expired:
+            del self._entries[key]
@@ -0,0 +1,197 @@
+import asyncio
+import json
+import time
+from dataclasses import asdict
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from src.application.use_cases.QueryLLMUseCase import QueryLLMUseCase
+from src.core.entities.BurnoutResults import BurnoutResult
+from src.core.interfaces.ILLMProvider import ILLMProvider
+from src.infrastructure.extract_json_from_text.extract_json_from_text import extract_json_from_text
+from src.infrastructure.rate_limit.AsyncRateLimiter import AsyncRateLimiter
+from src.infrastructure.reanalysis.ReanalysisCheckpoint import ReanalysisCheckpoint
+
+Emotions = List[Tuple[str, float]]
+ClassifyFn = Callable[[List[str]], Awaitable[List[Emotions]]]
+WriteFn = Callable[[List[Dict]], Awaitable[None]]
+
+
+class ProgressReporter:
+    """Периодическая печать прогресса и пропускной способности.
+
+    Скорость и ETA считаются только по чатам этого запуска: после
+    продолжения с checkpoint уже обработанные чаты в них не входят.
+    """
+
+    def __init__(self, total_chats: Optional[int] = None, interval: float = 10.0):
+        self.total_chats = total_chats
+        self.interval = interval
+        self.started = time.monotonic()
+        self._last_report = self.started
+        self._start_chats = 0
+        self._last_messages = 0
+
+    def start(self, checkpoint: ReanalysisCheckpoint) -> None:
+        """Точка отсчёта скорости: состояние checkpoint в начале запуска"""
+        self.started = time.monotonic()
+        self._last_report = self.started
+        self._start_chats = checkpoint.chats
+        self._last_messages = checkpoint.messages
+
+    def update(self, checkpoint: ReanalysisCheckpoint, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._last_report < self.interval:
+            return
+        window = max(now - self._last_report, 1e-9)
+        rate = (checkpoint.messages - self._last_messages) / window
+        chats_rate = (checkpoint.chats - self._start_chats) / max(now - self.started, 1e-9)
+        line = (f"chats {checkpoint.chats}" + (f"/{self.total_chats}" if self.total_chats else "")
+                + f", messages {checkpoint.messages}, analyses {checkpoint.analyses}, {rate:,.0f} msg/s")
+        if self.total_chats and chats_rate > 0:
+            line += f", ETA {max(self.total_chats - checkpoint.chats, 0) / chats_rate / 60:.1f} min"
+        print(line, flush=True)
+        self._last_report = now
+        self._last_messages = checkpoint.messages
+
+
+class ReanalysisPipeline:
+    """Перерасчёт эмоций (и при необходимости анализа) по сохранённым чатам.
+
+    Чаты читаются батчами; сообщения батча сортируются по длине и режутся
+    на под-батчи классификатора, чтобы паддинг был минимальным. Запись
+    батча и checkpoint идут в фоне, пока классифицируется следующий;
+    checkpoint сохраняется только после успешной записи.
+    """
+
+    def __init__(
+            self,
+            classify: ClassifyFn,
+            write: WriteFn,
+            checkpoint: ReanalysisCheckpoint,
+            checkpoint_path: str,
+            model_name: str,
+            classifier_batch_size: int = 64,
+            chat_batch_size: int = 256,
+            llm_provider: Optional[ILLMProvider] = None,
+            rate_limiter: Optional[AsyncRateLimiter] = None,
+            llm_concurrency: int = 4,
+            progress: Optional[ProgressReporter] = None
+    ):
+        self.classify = classify
+        self.write = write
+        self.checkpoint = checkpoint
+        self.checkpoint_path = checkpoint_path
+        self.model_name = model_name
+        self.classifier_batch_size = classifier_batch_size
+        self.chat_batch_size = chat_batch_size
+        self.llm_provider = llm_provider
+        self.rate_limiter = rate_limiter
+        self._llm_semaphore = asyncio.Semaphore(llm_concurrency)
+        self.progress = progress or ProgressReporter()
+        self.analysis_prompt = QueryLLMUseCase._build_analysis_prompt()
+
+    async def run(self, chats: AsyncIterator[Tuple[str, Dict]]) -> ReanalysisCheckpoint:
+        pending_write: Optional[asyncio.Task] = None
+        batch: List[Tuple[str, Dict]] = []
+        self.progress.start(self.checkpoint)
+        try:
+            async for position, chat in chats:
+                batch.append((position, chat))
+                if len(batch) >= self.chat_batch_size:
+                    pending_write = await self._process(batch, pending_write)
+                    batch = []
+            if batch:
+                pending_write = await self._process(batch, pending_write)
+        finally:
+            if pending_write is not None:
+                await pending_write
+        self.progress.update(self.checkpoint, force=True)
+        return self.checkpoint
+
+    async def _process(self, batch: List[Tuple[str, Dict]], pending_write: Optional[asyncio.Task]) -> asyncio.Task:
+        chats = [chat for _, chat in batch]
+        user_messages = [
+            [message['content'] for message in chat.get('messages', [])
+             if message.get('role') == 'user' and message.get('content', '').strip()]
+            for chat in chats
+        ]
+        emotions = await self._classify_all(user_messages)
+
+        analyses: List[Optional[Dict]] = [None] * len(chats)
+        if self.llm_provider is not None:
+            analyses = await asyncio.gather(*(
+                self._analyze(chat, chat_emotions) for chat, chat_emotions in zip(chats, emotions)
+            ))
+
+        now = datetime.now()
+        records = [
+            {
+                'run_id': self.checkpoint.run_id,
+                'chat_id': str(chat['_id']),
+                'user_id': chat.get('user_id'),
+                'department': chat.get('department'),
+                'model_name': self.model_name,
+                'emotions': [dict(message_emotions) for message_emotions in chat_emotions],
+                'top_emotions': [list(message_emotions[0]) for message_emotions in chat_emotions],
+                'processed_at': now,
+                **(analysis or {})
+            }
+            for chat, chat_emotions, analysis in zip(chats, emotions, analyses)
+        ]
+
+        if pending_write is not None:
+            await pending_write
+        position = batch[-1][0]
+        messages_count = sum(len(messages) for messages in user_messages)
+        analyses_count = sum(1 for analysis in analyses if analysis and analysis.get('analysis'))
+        return asyncio.create_task(self._commit(records, position, messages_count, analyses_count))
+
+    async def _commit(self, records: List[Dict], position: str, messages_count: int, analyses_count: int):
+        await self.write(records)
+        self.checkpoint.position = position
+        self.checkpoint.chats += len(records)
+        self.checkpoint.messages += messages_count
+        self.checkpoint.analyses += analyses_count
+        self.checkpoint.save(self.checkpoint_path)
+        self.progress.update(self.checkpoint)
+
+    async def _classify_all(self, user_messages: List[List[str]]) -> List[List[Emotions]]:
+        """Все сообщения батча чатов одним набором под-батчей, отсортированных по длине"""
+        flat = [(chat_index, text) for chat_index, texts in enumerate(user_messages) for text in texts]
+        order = sorted(range(len(flat)), key=lambda i: len(flat[i][1]))
+        chunks = [order[i:i + self.classifier_batch_size] for i in range(0, len(order), self.classifier_batch_size)]
+        chunk_results = await asyncio.gather(*(self.classify([flat[i][1] for i in chunk]) for chunk in chunks))
+
+        results: List[Optional[Emotions]] = [None] * len(flat)
+        for chunk, chunk_result in zip(chunks, chunk_results):
+            for i, emotions in zip(chunk, chunk_result):
+                results[i] = emotions
+
+        per_chat: List[List[Emotions]] = [[] for _ in user_messages]
+        for (chat_index, _), emotions in zip(flat, results):
+            per_chat[chat_index].append(emotions)
+        return per_chat
+
+    async def _analyze(self, chat: Dict, emotions: List[Emotions]) -> Dict:
+        if not emotions:
+            return {'analysis': None, 'analysis_error': 'no user messages'}
+
+        messages = QueryLLMUseCase.build_analysis_messages(
+            self.analysis_prompt, chat.get('messages', []), [message_emotions[0] for message_emotions in emotions]
+        )
+        async with self._llm_semaphore:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire()
+            try:
+                response = await self.llm_provider.generate_response(messages)
+            except Exception as e:
+                return {'analysis': None, 'analysis_error': str(e)}
+
+        parsed = extract_json_from_text(response)
+        if not parsed:
+            return {'analysis': None, 'analysis_error': 'response is not JSON'}
+        try:
+            return {'analysis': asdict(BurnoutResult.from_dict(json.loads(parsed))), 'analysis_error': None}
+        except (KeyError, ValueError, TypeError) as e:
+            return {'analysis': None, 'analysis_error': f"invalid analysis: {e}"}
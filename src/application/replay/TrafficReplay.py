@@ -0,0 +1,266 @@
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.application.admission.AdmissionController import AdmissionRejected
+from src.application.idempotency.ChatTurnLock import ChatBusyError
+from src.application.tenancy.FairScheduler import current_tenant
+from src.core.entities.QueryEntities import QueryRequest
+from src.core.entities.user_entites.Department import Department
+from src.core.entities.user_entites.ListUserPsychStatus import ListUserPsychStatus
+from src.core.entities.user_entites.UserPsychStatus import UserPsychStatus
+from src.entrypoints.QuerySystem import QuerySystem
+from src.infrastructure.memory_store.InMemoryChatStorage import InMemoryChatStorage
+from src.infrastructure.traffic.ReplayBackends import ReplayTrace, replay_trace
+from src.infrastructure.traffic.TurnTrace import LLMCallTrace, TurnTrace
+
+PERCENTILES = (50, 90, 99)
+
+
+@dataclass
+class RecordedCall:
+    offset: float
+    op: str
+    tenant: str
+    duration: float
+    items: List[Dict]
+    responses: List[Optional[Dict]]
+    trace: TurnTrace
+    first_chunk: Optional[float] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class ReplayResult:
+    op: str
+    tenant: str
+    latency: float
+    recorded_latency: float
+    first_chunk: Optional[float] = None
+    recorded_first_chunk: Optional[float] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class ReplayReport:
+    speed: float
+    wall_seconds: float
+    ops: Dict[str, Dict] = field(default_factory=dict)
+    regressions: List[str] = field(default_factory=list)
+
+
+def load_calls(paths: List[str]) -> List[RecordedCall]:
+    """Вызовы из одного или нескольких файлов записи (по файлу на воркер) в порядке прихода"""
+    calls = []
+    for path in paths:
+        with open(path, encoding="utf-8") as file:
+            calls.extend(_parse_call(json.loads(line)) for line in file if line.strip())
+    calls.sort(key=lambda call: call.offset)
+    return calls
+
+
+def _parse_call(entry: Dict) -> RecordedCall:
+    return RecordedCall(
+        offset=entry["t"],
+        op=entry["op"],
+        tenant=entry.get("tenant") or "default",
+        duration=entry["duration"],
+        items=entry["items"],
+        responses=entry["responses"],
+        trace=TurnTrace.from_dict(entry["trace"]),
+        first_chunk=entry.get("first_chunk"),
+        error=entry.get("error")
+    )
+
+
+def mean_trace(calls: List[RecordedCall]) -> TurnTrace:
+    """Средние задержки записи: по одному значению на вид вызова"""
+    def mean(values: List[float]) -> List[float]:
+        return [float(np.mean(values))] if values else []
+
+    llm_calls = [call for recorded in calls for call in recorded.trace.llm_calls]
+    first_tokens = [call.first_token for call in llm_calls if call.first_token is not None]
+    return TurnTrace(
+        storage_reads=mean([value for call in calls for value in call.trace.storage_reads]),
+        storage_writes=mean([value for call in calls for value in call.trace.storage_writes]),
+        classifier_calls=mean([value for call in calls for value in call.trace.classifier_calls]),
+        llm_calls=[LLMCallTrace(
+            total=float(np.mean([call.total for call in llm_calls])),
+            first_token=float(np.mean(first_tokens)) if first_tokens else None,
+            chunks=int(np.mean([call.chunks for call in llm_calls])),
+            chars=int(np.mean([call.chars for call in llm_calls]))
+        )] if llm_calls else []
+    )
+
+
+def summarize(results: List[ReplayResult], speed: float, wall_seconds: float) -> ReplayReport:
+    """Перцентили задержек по операциям: при воспроизведении и в исходной записи"""
+    report = ReplayReport(speed=speed, wall_seconds=round(wall_seconds, 3))
+    for op in sorted({result.op for result in results}):
+        op_results = [result for result in results if result.op == op]
+        summary = {
+            "count": len(op_results),
+            "errors": sum(1 for result in op_results if result.error),
+            "latency": _percentiles([result.latency for result in op_results]),
+            "recorded_latency": _percentiles([result.recorded_latency for result in op_results])
+        }
+        first_chunks = [result.first_chunk for result in op_results if result.first_chunk is not None]
+        if first_chunks:
+            summary["first_chunk"] = _percentiles(first_chunks)
+            summary["recorded_first_chunk"] = _percentiles(
+                [result.recorded_first_chunk for result in op_results if result.recorded_first_chunk is not None]
+            )
+        report.ops[op] = summary
+    return report
+
+
+def compare(report: ReplayReport, baseline: Dict, threshold: float) -> List[str]:
+    """Перцентили, выросшие относительно базового прогона больше чем на threshold"""
+    regressions = []
+    for op, summary in report.ops.items():
+        base = baseline.get("ops", {}).get(op)
+        if not base:
+            continue
+        for metric in ("latency", "first_chunk"):
+            for name, value in summary.get(metric, {}).items():
+                base_value = base.get(metric, {}).get(name)
+                if base_value and value > base_value * (1 + threshold):
+                    regressions.append(f"{op} {metric} {name}: {base_value:.3f}s -> {value:.3f}s "
+                                       f"(+{(value / base_value - 1) * 100:.0f}%)")
+        if summary["errors"] > base.get("errors", 0):
+            regressions.append(f"{op} errors: {base.get('errors', 0)} -> {summary['errors']}")
+    return regressions
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    points = np.percentile(np.asarray(values, dtype=np.float64), PERCENTILES)
+    return {f"p{p}": round(float(value), 4) for p, value in zip(PERCENTILES, points)}
+
+
+class TrafficReplay:
+    """Повторяет записанные вызовы QuerySystem с исходными интервалами, ускоренными в speed раз.
+
+    Бэкенды — заглушки с записанными задержками, поэтому разница с записью
+    и с базовым прогоном показывает накладные расходы самого сервиса:
+    допуск, планировщики, стриминг, сериализацию. Ходы одного чата идут
+    строго друг за другом, как у настоящего клиента.
+    """
+
+    def __init__(self, system: QuerySystem, storage: InMemoryChatStorage, defaults: TurnTrace, speed: float = 1.0):
+        self.system = system
+        self.storage = storage
+        self.defaults = defaults
+        self.speed = speed
+        self._chat_ids: Dict[str, str] = {}
+        self._chat_turns: Dict[str, asyncio.Task] = {}
+
+    async def run(self, calls: List[RecordedCall]) -> ReplayReport:
+        started = time.perf_counter()
+        first_offset = calls[0].offset if calls else 0.0
+        tasks = []
+        for call in calls:
+            delay = (call.offset - first_offset) / self.speed - (time.perf_counter() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tokens = {item["chat"] for item in call.items if item["chat"]}
+            tokens |= {response["chat"] for response in call.responses if response and response.get("chat")}
+            previous = [self._chat_turns[token] for token in tokens if token in self._chat_turns]
+            task = asyncio.create_task(self._replay_after(previous, call))
+            for token in tokens:
+                self._chat_turns[token] = task
+            tasks.append(task)
+
+        results = [result for call_results in await asyncio.gather(*tasks) for result in call_results]
+        return summarize(results, self.speed, time.perf_counter() - started)
+
+    async def _replay_after(self, previous: List[asyncio.Task], call: RecordedCall) -> List[ReplayResult]:
+        await asyncio.gather(*previous, return_exceptions=True)
+
+        current_tenant.set(call.tenant)
+        replay_trace.set(ReplayTrace(call.trace, self.defaults))
+        requests = [self._build_request(item, response) for item, response in zip(call.items, call.responses)]
+
+        started = time.perf_counter()
+        if call.op == "query_batch":
+            results = []
+            async for result in self.system.query_batch(requests, max_concurrency=len(requests)):
+                if result.response is not None:
+                    self._remember_chat(call.responses[result.index], result.response.chat_id)
+                results.append(result)
+            latency = time.perf_counter() - started
+            error = next((result.error for result in results if result.error), None)
+            return [ReplayResult(call.op, call.tenant, latency, call.duration, error=error)]
+
+        first_chunk, error, chat_id = None, None, None
+        try:
+            if call.op == "query_stream":
+                buffer = await self.system.start_stream(requests[0])
+                async for chunk in self.system.query_stream(requests[0], buffer=buffer):
+                    if first_chunk is None:
+                        first_chunk = time.perf_counter() - started
+                    if chunk.is_final_chunk and not chunk.chat_id:
+                        error = chunk.content_chunk
+                    chat_id = chunk.chat_id or chat_id
+            else:
+                response = await self.system.query(requests[0])
+                chat_id = response.chat_id if response else None
+                error = None if response else "no response"
+        except AdmissionRejected as e:
+            return [ReplayResult(call.op, call.tenant, time.perf_counter() - started, call.duration,
+                                 error=f"rejected: {e.reason}")]
+        except ChatBusyError as e:
+            return [ReplayResult(call.op, call.tenant, time.perf_counter() - started, call.duration,
+                                 error=f"busy: {str(e)}")]
+
+        if chat_id:
+            self._remember_chat(call.responses[0], chat_id)
+        return [ReplayResult(
+            call.op, call.tenant, time.perf_counter() - started, call.duration,
+            first_chunk=first_chunk, recorded_first_chunk=call.first_chunk, error=error
+        )]
+
+    def _remember_chat(self, recorded_response: Optional[Dict], chat_id: str) -> None:
+        if recorded_response and recorded_response.get("chat"):
+            self._chat_ids[recorded_response["chat"]] = chat_id
+
+    def _build_request(self, item: Dict, recorded_response: Optional[Dict]) -> QueryRequest:
+        statuses = None
+        if item["psych_statuses"]:
+            statuses = ListUserPsychStatus(user_id=0, list_user_psych_status=[
+                UserPsychStatus(summary="Повторение записи", recommendations="Нет", status=[10, 5, 30, 0.3])
+                for _ in range(item["psych_statuses"])
+            ])
+        return QueryRequest(
+            user_input=("Ответ пользователя. " * (item["input_chars"] // 20 + 1))[:item["input_chars"]],
+            chat_id=self._live_chat_id(item, recorded_response),
+            max_questions=item["max_questions"],
+            max_history_messages=item["max_history_messages"],
+            list_user_psych_status=statuses,
+            department=Department(item["department"]) if item.get("department") else None
+        )
+
+    def _live_chat_id(self, item: Dict, recorded_response: Optional[Dict]) -> Optional[str]:
+        token = item["chat"]
+        if not token:
+            return None
+        if token not in self._chat_ids:
+            # Чат начался до записи: заводим его с тем же числом заданных вопросов
+            chat_id = str(len(self._chat_ids)) + ":" + token
+            question_count = max(0, (recorded_response or {}).get("question_count", 1) - 1)
+            self.storage.chats[chat_id] = {
+                '_id': chat_id,
+                'messages': [{"role": "system", "content": self.storage.system_prompt}],
+                'question_count': question_count,
+                'max_questions': item["max_questions"],
+                'status': 'active',
+                'user_id': None,
+                'department': item.get("department")
+            }
+            self._chat_ids[token] = chat_id
+        return self._chat_ids[token]
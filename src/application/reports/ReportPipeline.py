@@ -0,0 +1,156 @@
+import asyncio
+import sys
+import time
+import zipfile
+from collections import deque
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, Tuple, Union
+
+from src.core.entities.BurnoutReports import DepartmentReport, EmployeeReport, EmployeeSummary, ReportPeriod
+from src.core.entities.BurnoutResults import METRICS, SCALE_LEVELS, BurnoutResultRecord
+
+Report = Union[EmployeeReport, DepartmentReport]
+RenderFn = Callable[[Report], Awaitable[bytes]]
+# Отдел ещё не начат; None им быть не может — это отдел записей без отдела
+_NO_GROUP = object()
+
+
+@dataclass
+class ReportStats:
+    employees: int = 0
+    departments: int = 0
+    bytes_written: int = 0
+    skipped: int = 0  # результаты без сотрудника
+
+
+class ReportPipeline:
+    """Отчёты по сохранённым результатам: по сотруднику и сводный по отделу, в один zip.
+
+    Результаты читаются потоком в порядке отдел, сотрудник, время; отчёт
+    сотрудника уходит в рендер, как только закончились его результаты,
+    сводка отдела — когда закончился отдел. В рендере не больше
+    max_in_flight отчётов, готовые пишутся в zip по порядку, так что в
+    памяти только окно отчётов и краткие итоги текущего отдела.
+    Результаты без отдела сводятся в отдел unknown, результаты без
+    сотрудника пропускаются: их не к кому отнести.
+    """
+
+    def __init__(
+            self,
+            render: RenderFn,
+            archive: zipfile.ZipFile,
+            period: ReportPeriod,
+            max_in_flight: int = 16,
+            employee_reports: bool = True,
+            department_reports: bool = True,
+            progress_interval: float = 10.0
+    ):
+        self.render = render
+        self.archive = archive
+        self.period = period
+        self.max_in_flight = max(1, max_in_flight)
+        self.employee_reports = employee_reports
+        self.department_reports = department_reports
+        self.progress_interval = progress_interval
+        self.stats = ReportStats()
+        self._pending: Deque[Tuple[str, asyncio.Task]] = deque()
+        self._started = time.monotonic()
+        self._last_progress = self._started
+
+    async def run(self, records: AsyncIterator[BurnoutResultRecord]) -> ReportStats:
+        department: Union[Optional[str], object] = _NO_GROUP
+        employees: List[EmployeeSummary] = []
+        latest: List[BurnoutResultRecord] = []
+        group: List[BurnoutResultRecord] = []
+        try:
+            async for record in records:
+                if record.user_id is None:
+                    self.stats.skipped += 1
+                    continue
+                if group and (record.department, record.user_id) != (group[0].department, group[0].user_id):
+                    await self._finish_employee(group, employees, latest)
+                    group = []
+                if department is not _NO_GROUP and record.department != department:
+                    await self._finish_department(department, employees, latest)
+                    employees, latest = [], []
+                department = record.department
+                group.append(record)
+
+            if group:
+                await self._finish_employee(group, employees, latest)
+                await self._finish_department(department, employees, latest)
+            while self._pending:
+                await self._write_oldest()
+        finally:
+            for _, task in self._pending:
+                task.cancel()
+        self._report_progress(force=True)
+        return self.stats
+
+    async def _finish_employee(
+            self,
+            records: List[BurnoutResultRecord],
+            employees: List[EmployeeSummary],
+            latest: List[BurnoutResultRecord]
+    ) -> None:
+        last = records[-1]
+        latest.append(last)
+        employees.append(EmployeeSummary(
+            user_id=last.user_id,
+            surveys=len(records),
+            last_survey=last.created_at,
+            burnout_index=last.result.burnout_index,
+            levels=last.result.levels()
+        ))
+        if self.employee_reports:
+            name = f"{self._safe(last.department)}/employee_{last.user_id}.docx"
+            await self._submit(name, EmployeeReport(last.user_id, last.department or "unknown", self.period, records))
+            self.stats.employees += 1
+
+    async def _finish_department(
+            self, department: Optional[str], employees: List[EmployeeSummary], latest: List[BurnoutResultRecord]
+    ) -> None:
+        if not self.department_reports or not latest:
+            return
+        means = {metric: sum(getattr(record.result, metric) for record in latest) / len(latest) for metric in METRICS}
+        levels: Dict[str, Dict[str, int]] = {metric: {"low": 0, "medium": 0, "high": 0} for metric in SCALE_LEVELS}
+        for summary in employees:
+            for metric, level in summary.levels.items():
+                levels[metric][level] += 1
+        report = DepartmentReport(
+            department=department or "unknown",
+            period=self.period,
+            surveys=sum(summary.surveys for summary in employees),
+            means=means,
+            levels=levels,
+            employees=sorted(employees, key=lambda summary: summary.burnout_index, reverse=True)
+        )
+        await self._submit(f"{self._safe(department)}/department.docx", report)
+        self.stats.departments += 1
+
+    async def _submit(self, name: str, report: Report) -> None:
+        while len(self._pending) >= self.max_in_flight:
+            await self._write_oldest()
+        self._pending.append((name, asyncio.create_task(self.render(report))))
+
+    async def _write_oldest(self) -> None:
+        name, task = self._pending.popleft()
+        document = await task
+        # DOCX уже сжат: без повторного deflate
+        self.archive.writestr(name, document, compress_type=zipfile.ZIP_STORED)
+        self.stats.bytes_written += len(document)
+        self._report_progress()
+
+    def _report_progress(self, force: bool = False) -> None:
+        # stderr: архив может писаться в stdout
+        now = time.monotonic()
+        if not force and now - self._last_progress < self.progress_interval:
+            return
+        self._last_progress = now
+        done = self.stats.employees + self.stats.departments - len(self._pending)
+        print(f"reports {done}, {done / max(now - self._started, 1e-9):,.1f}/s, "
+              f"{self.stats.bytes_written / 2 ** 20:,.1f} MiB", file=sys.stderr, flush=True)
+
+    @staticmethod
+    def _safe(name: Optional[str]) -> str:
+        return (name or "unknown").replace("/", "_").replace("\\", "_")
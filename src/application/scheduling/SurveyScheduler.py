@@ -0,0 +1,152 @@
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.core.entities.SurveyPlan import LoadPoint, ScheduledSurvey, SurveyPlan
+from src.core.entities.user_entites.UserEntity import UserEntity
+
+
+@dataclass(frozen=True)
+class SurveyCost:
+    questions: int
+    tokens: int     # суммарно промпт + ответы за весь опрос, история растёт с каждым ходом
+    analyses: int   # вызовы классификатора эмоций, по одному на ответ пользователя
+
+
+SURVEY_COMPLEXITY_COSTS: Dict[str, SurveyCost] = {
+    "light": SurveyCost(questions=5, tokens=8_000, analyses=5),
+    "standard": SurveyCost(questions=8, tokens=15_000, analyses=8),
+    "deep": SurveyCost(questions=12, tokens=30_000, analyses=12),
+}
+DEFAULT_COMPLEXITY = "standard"
+
+
+class SurveyScheduler:
+    """Раскладывает старты опросов по слотам рабочей недели с учётом мощности LLM и классификатора.
+
+    Опрос учитывается целиком в слоте старта. Каждое вхождение кладётся
+    в наименее загруженный слот целевого дня, при переполнении — в наименее
+    загруженный слот недели; не влезшие попадают в unscheduled_user_ids.
+    """
+
+    def __init__(
+            self,
+            tokens_per_minute: float,
+            analyses_per_minute: float,
+            slot_minutes: int = 15,
+            workday_start_hour: int = 9,
+            workday_end_hour: int = 18,
+            working_days: int = 5,
+            target_utilization: float = 0.8,
+            costs: Optional[Dict[str, SurveyCost]] = None
+    ):
+        self.tokens_per_minute = tokens_per_minute
+        self.analyses_per_minute = analyses_per_minute
+        self.slot_minutes = slot_minutes
+        self.workday_start_hour = workday_start_hour
+        self.working_days = working_days
+        self.slots_per_day = (workday_end_hour - workday_start_hour) * 60 // slot_minutes
+        self.target_utilization = target_utilization
+        self.costs = costs or SURVEY_COMPLEXITY_COSTS
+
+    def plan(
+            self,
+            users: Sequence[UserEntity],
+            week_start: Optional[datetime] = None,
+            priorities: Optional[Dict[int, float]] = None
+    ) -> SurveyPlan:
+        """Строит план на неделю; пользователи с большим приоритетом размещаются первыми"""
+        week_start = week_start or next_week_start(datetime.now())
+        days, per_day = self.working_days, self.slots_per_day
+        token_capacity = self.tokens_per_minute * self.slot_minutes * self.target_utilization
+        analysis_capacity = self.analyses_per_minute * self.slot_minutes * self.target_utilization
+
+        token_load = np.zeros(days * per_day, dtype=np.float64)
+        analysis_load = np.zeros(days * per_day, dtype=np.float64)
+        surveys: List[ScheduledSurvey] = []
+        unscheduled: List[int] = []
+
+        for user in self._placement_order(users, priorities):
+            complexity = user.survey_complexity if user.survey_complexity in self.costs else DEFAULT_COMPLEXITY
+            cost = self.costs[complexity]
+            occurrences = max(0, user.surveys_per_week)
+            for i in range(occurrences):
+                # Вхождения равномерно по неделе, фаза от id разносит пользователей по дням
+                day = (user.id + i * days // occurrences) % days
+                day_slots = slice(day * per_day, (day + 1) * per_day)
+                utilization = np.maximum(
+                    (token_load + cost.tokens) / token_capacity,
+                    (analysis_load + cost.analyses) / analysis_capacity
+                )
+                slot = day * per_day + int(np.argmin(utilization[day_slots]))
+                if utilization[slot] > 1.0:
+                    slot = int(np.argmin(utilization))
+                    if utilization[slot] > 1.0:
+                        unscheduled.append(user.id)
+                        continue
+
+                token_load[slot] += cost.tokens
+                analysis_load[slot] += cost.analyses
+                surveys.append(ScheduledSurvey(
+                    user_id=user.id,
+                    start=self._slot_start(week_start, slot),
+                    complexity=complexity,
+                    tokens=cost.tokens,
+                    analyses=cost.analyses
+                ))
+
+        surveys.sort(key=lambda survey: survey.start)
+        return SurveyPlan(
+            plan_id=str(uuid.uuid4()),
+            week_start=week_start,
+            created_at=datetime.now(),
+            slot_minutes=self.slot_minutes,
+            tokens_per_minute_capacity=self.tokens_per_minute,
+            analyses_per_minute_capacity=self.analyses_per_minute,
+            load=self._load_curve(week_start, token_load, analysis_load),
+            surveys=surveys,
+            # Пользователь с несколькими невлезшими опросами указывается один раз
+            unscheduled_user_ids=list(dict.fromkeys(unscheduled))
+        )
+
+    def _placement_order(self, users: Sequence[UserEntity], priorities: Optional[Dict[int, float]]) -> List[UserEntity]:
+        """Сначала приоритетные, при равенстве — самые тяжёлые опросы (лучше упаковываются)"""
+        schedulable = [user for user in users if user.id is not None]
+
+        def key(user: UserEntity):
+            cost = self.costs.get(user.survey_complexity, self.costs[DEFAULT_COMPLEXITY])
+            priority = priorities.get(user.id, 0.0) if priorities else 0.0
+            return -priority, -cost.tokens * user.surveys_per_week
+
+        return sorted(schedulable, key=key)
+
+    def _slot_start(self, week_start: datetime, slot: int) -> datetime:
+        day, index = divmod(slot, self.slots_per_day)
+        return week_start + timedelta(
+            days=day, hours=self.workday_start_hour, minutes=index * self.slot_minutes
+        )
+
+    def _load_curve(self, week_start: datetime, token_load: np.ndarray, analysis_load: np.ndarray) -> List[LoadPoint]:
+        tokens_per_minute = token_load / self.slot_minutes
+        analyses_per_minute = analysis_load / self.slot_minutes
+        utilization = np.maximum(
+            tokens_per_minute / self.tokens_per_minute, analyses_per_minute / self.analyses_per_minute
+        )
+        return [
+            LoadPoint(
+                start=self._slot_start(week_start, slot),
+                tokens_per_minute=round(float(tokens_per_minute[slot]), 1),
+                analyses_per_minute=round(float(analyses_per_minute[slot]), 2),
+                utilization=round(float(utilization[slot]), 3)
+            )
+            for slot in range(len(token_load))
+        ]
+
+
+def next_week_start(now: datetime) -> datetime:
+    """Полночь ближайшего следующего понедельника"""
+    monday = now.date() + timedelta(days=7 - now.weekday())
+    return datetime(monday.year, monday.month, monday.day)
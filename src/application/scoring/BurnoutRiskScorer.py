@@ -0,0 +1,159 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.core.entities.user_entites.Department import Department
+from src.core.entities.user_entites.UserEntity import UserEntity
+
+DEPARTMENTS: Tuple[Department, ...] = tuple(Department)
+_DEPARTMENT_CODES = {department: code for code, department in enumerate(DEPARTMENTS)}
+
+# Веса признаков априорного риска; итоговая оценка нормируется в [0, 1]
+DEFAULT_WEIGHTS: Dict[str, float] = {
+    "vacation_gap": 0.25,
+    "sick_leave": 0.15,
+    "reprimand": 0.15,
+    "low_performance": 0.15,
+    "management_load": 0.10,
+    "short_tenure": 0.05,
+    "no_training": 0.05,
+    "no_activities": 0.05,
+    "certification": 0.05,
+}
+# Насыщение признаков: год без отпуска и 50 подчинённых дают максимум
+VACATION_GAP_SATURATION_DAYS = 365.0
+SUBORDINATES_SATURATION = 50
+SHORT_TENURE_YEARS = 3.0
+
+
+@dataclass
+class WorkforceColumns:
+    """Колоночное представление сотрудников для векторных расчётов"""
+    user_ids: np.ndarray
+    department_codes: np.ndarray
+    experience: np.ndarray
+    subordinates_count: np.ndarray
+    days_since_vacation: np.ndarray
+    performance_mean: np.ndarray
+    sick_leave: np.ndarray
+    has_reprimand: np.ndarray
+    training_completed: np.ndarray
+    corporate_activities: np.ndarray
+    certification: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.user_ids)
+
+    @classmethod
+    def from_users(cls, users: Sequence[UserEntity], reference_date: Optional[datetime] = None) -> "WorkforceColumns":
+        """Один проход по сущностям: каждая колонка собирается через np.fromiter"""
+        now = reference_date or datetime.now()
+        count = len(users)
+
+        def column(values, dtype) -> np.ndarray:
+            return np.fromiter(values, dtype=dtype, count=count)
+
+        return cls(
+            user_ids=column((u.id if u.id is not None else -1 for u in users), np.int64),
+            department_codes=column((_DEPARTMENT_CODES[u.department] for u in users), np.int8),
+            experience=column((u.experience for u in users), np.float32),
+            subordinates_count=column((u.subordinates_count for u in users), np.float32),
+            days_since_vacation=column(
+                ((now - u.last_vacation).days if u.last_vacation else np.nan for u in users), np.float32
+            ),
+            performance_mean=column(
+                (sum(m.values()) / len(m) if (m := u.performance_metrics) else np.nan for u in users), np.float32
+            ),
+            sick_leave=column((u.sick_leave_2025 for u in users), np.bool_),
+            has_reprimand=column((u.has_reprimand for u in users), np.bool_),
+            training_completed=column((u.training_completed for u in users), np.bool_),
+            corporate_activities=column((u.corporate_activities_participation for u in users), np.bool_),
+            # 1 — аттестация не пройдена, 0.5 — нет данных
+            certification=column(
+                (0.5 if u.certification_passed is None else float(not u.certification_passed) for u in users),
+                np.float32
+            ),
+        )
+
+
+class BurnoutRiskScorer:
+    """Априорный риск выгорания по кадровым данным без обращения к LLM"""
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None):
+        self.weights = dict(DEFAULT_WEIGHTS if weights is None else weights)
+        self._total_weight = sum(self.weights.values()) or 1.0
+
+    def features(self, columns: WorkforceColumns) -> Dict[str, np.ndarray]:
+        """Признаки в диапазоне [0, 1], чем больше — тем выше риск"""
+        # Нет данных об отпуске — считаем, что отпуска не было
+        vacation_gap = np.nan_to_num(columns.days_since_vacation, nan=VACATION_GAP_SATURATION_DAYS)
+        vacation_gap = np.clip(vacation_gap / VACATION_GAP_SATURATION_DAYS, 0.0, 1.0)
+
+        management_load = np.log1p(columns.subordinates_count) / np.log1p(SUBORDINATES_SATURATION)
+
+        return {
+            "vacation_gap": vacation_gap,
+            "sick_leave": columns.sick_leave.astype(np.float32),
+            "reprimand": columns.has_reprimand.astype(np.float32),
+            "low_performance": self._low_performance(columns.performance_mean),
+            "management_load": np.clip(management_load, 0.0, 1.0),
+            "short_tenure": np.clip(1.0 - columns.experience / SHORT_TENURE_YEARS, 0.0, 1.0),
+            "no_training": (~columns.training_completed).astype(np.float32),
+            "no_activities": (~columns.corporate_activities).astype(np.float32),
+            "certification": columns.certification,
+        }
+
+    def score(self, columns: WorkforceColumns) -> np.ndarray:
+        """Взвешенная сумма признаков, нормированная в [0, 1]"""
+        scores = np.zeros(len(columns), dtype=np.float32)
+        for name, values in self.features(columns).items():
+            weight = self.weights.get(name, 0.0)
+            if weight:
+                scores += np.float32(weight) * values
+        scores /= np.float32(self._total_weight)
+        return scores
+
+    def score_users(self, users: Sequence[UserEntity],
+                    reference_date: Optional[datetime] = None) -> Tuple[WorkforceColumns, np.ndarray]:
+        columns = WorkforceColumns.from_users(users, reference_date)
+        return columns, self.score(columns)
+
+    @staticmethod
+    def top_k_by_department(columns: WorkforceColumns, scores: np.ndarray,
+                            k: int) -> Dict[Department, List[Tuple[int, float]]]:
+        """Топ-k сотрудников по риску в каждом отделе: argpartition, затем сортировка только k элементов"""
+        result: Dict[Department, List[Tuple[int, float]]] = {}
+        if k <= 0:
+            return result
+
+        order = np.argsort(columns.department_codes, kind="stable")
+        bounds = np.searchsorted(columns.department_codes[order], np.arange(len(DEPARTMENTS) + 1))
+        for code, department in enumerate(DEPARTMENTS):
+            members = order[bounds[code]:bounds[code + 1]]
+            if not len(members):
+                continue
+            member_scores = scores[members]
+            if len(members) > k:
+                top = np.argpartition(-member_scores, k - 1)[:k]
+            else:
+                top = np.arange(len(members))
+            top = top[np.argsort(-member_scores[top], kind="stable")]
+            result[department] = [
+                (int(user_id), float(score))
+                for user_id, score in zip(columns.user_ids[members[top]], member_scores[top])
+            ]
+        return result
+
+    @staticmethod
+    def _low_performance(performance_mean: np.ndarray) -> np.ndarray:
+        """Перцентиль снизу по средней метрике эффективности; нет метрик — середина шкалы"""
+        result = np.full(len(performance_mean), 0.5, dtype=np.float32)
+        known = ~np.isnan(performance_mean)
+        known_count = int(known.sum())
+        if known_count > 1:
+            ranks = np.empty(known_count, dtype=np.float32)
+            ranks[np.argsort(performance_mean[known], kind="stable")] = np.arange(known_count, dtype=np.float32)
+            result[known] = 1.0 - ranks / (known_count - 1)
+        return result
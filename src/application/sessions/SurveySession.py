@@ -0,0 +1,117 @@
+import asyncio
+from typing import AsyncGenerator, Awaitable, Callable, Dict, Optional, Set
+
+from src.application.admission.AdmissionController import AdmissionTicket
+from src.application.idempotency.ChatTurnLock import ChatTurnLock
+from src.application.use_cases.QueryLLMUseCase import QueryLLMUseCase
+from src.core.entities.QueryEntities import QueryRequest, LLMStreamResponse
+from src.infrastructure.memory_store.SessionChatStorage import SessionChatStorage
+
+
+class SurveySession:
+    """Состояние опроса на время WebSocket-соединения"""
+
+    def __init__(
+            self,
+            use_case: QueryLLMUseCase,
+            storage: SessionChatStorage,
+            chat_id: Optional[str] = None,
+            on_chat_id: Optional[Callable[["SurveySession"], None]] = None,
+            chat_locks: Optional[ChatTurnLock] = None,
+            admit: Optional[Callable[[QueryRequest, bool], Awaitable[AdmissionTicket]]] = None
+    ):
+        self.use_case = use_case
+        self.storage = storage
+        self.chat_id = chat_id
+        self.on_chat_id = on_chat_id
+        self.chat_locks = chat_locks or ChatTurnLock()
+        self.admit = admit
+        self.connections = 0
+
+    async def query_stream(self, query_request: QueryRequest) -> AsyncGenerator[LLMStreamResponse, None]:
+        """Ход опроса под замком чата; место у контроля допуска берётся уже под замком.
+
+        Тот же чат могут продолжать через HTTP или второе соединение,
+        поэтому ходы сериализуются общим замком: под ним чат перечитывается
+        из основного хранилища, а записи хода доходят туда до снятия замка.
+        AdmissionRejected и ChatBusyError пробрасываются до первого чанка.
+        """
+        query_request.chat_id = self.chat_id
+        async with self.chat_locks.hold(self.chat_id):
+            try:
+                chat = await self.storage.refresh(self.chat_id) if self.chat_id else None
+                ticket = await self.admit(query_request, chat is not None) if self.admit else None
+                stream = self.use_case.execute_stream(query_request)
+                try:
+                    async for chunk in stream:
+                        if chunk.chat_id and chunk.chat_id != self.chat_id:
+                            self.chat_id = chunk.chat_id
+                            if self.on_chat_id:
+                                self.on_chat_id(self)
+                        yield chunk
+                finally:
+                    # Закрываем генерацию сразу: недописанный ответ должен попасть
+                    # в очередь записей до того, как её дождутся ниже
+                    await stream.aclose()
+                    if ticket:
+                        ticket.release()
+            finally:
+                await self.storage.flush()
+
+
+class SurveySessionRegistry:
+    """Сессии по chat_id: переподключение подхватывает ещё не сброшенное состояние"""
+
+    def __init__(
+            self,
+            base_use_case_provider,
+            chat_locks: Optional[ChatTurnLock] = None,
+            admit: Optional[Callable[[QueryRequest, bool], Awaitable[AdmissionTicket]]] = None
+    ):
+        self.base_use_case_provider = base_use_case_provider
+        self.chat_locks = chat_locks or ChatTurnLock()
+        self.admit = admit
+        self._sessions: Dict[str, SurveySession] = {}
+        self._closing: Set[asyncio.Task] = set()
+
+    async def open(self, chat_id: Optional[str] = None) -> SurveySession:
+        session = self._sessions.get(chat_id) if chat_id else None
+        if session is None:
+            base: QueryLLMUseCase = await self.base_use_case_provider()
+            storage = SessionChatStorage(base.chat_storage)
+            use_case = QueryLLMUseCase(
+                llm_provider=base.llm_provider,
+                chat_storage=storage,
+                emotional_use_case=base.emotional_use_case,
+                stream_checkpoint_interval=base.stream_checkpoint_interval,
+                result_storage=base.result_storage,
+                timeseries=base.timeseries
+            )
+            session = SurveySession(
+                use_case, storage, chat_id,
+                on_chat_id=self.register, chat_locks=self.chat_locks, admit=self.admit
+            )
+            # Регистрируем сразу: переподключение до закрытия этого соединения
+            # должно попасть в ту же сессию, а не завести вторую поверх того же чата
+            self.register(session)
+
+        session.connections += 1
+        return session
+
+    def register(self, session: SurveySession) -> None:
+        if session.chat_id:
+            self._sessions[session.chat_id] = session
+
+    def close(self, session: SurveySession) -> None:
+        """Отключение клиента: сбрасываем записи в фоне и забываем сессию, если к ней не вернулись"""
+        session.connections -= 1
+        task = asyncio.create_task(self._release(session))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _release(self, session: SurveySession) -> None:
+        await session.storage.flush()
+        if session.connections == 0:
+            await session.storage.close()
+            if self._sessions.get(session.chat_id) is session:
+                del self._sessions[session.chat_id]
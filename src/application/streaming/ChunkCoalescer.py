@@ -0,0 +1,104 @@
+import asyncio
+import time
+from typing import AsyncGenerator, AsyncIterator, List
+
+from src.core.entities.QueryEntities import LLMStreamResponse
+from src.infrastructure.metrics.StreamStats import stream_stats
+
+_END = object()
+
+
+class ChunkCoalescer:
+    """Склеивает мелкие чанки модели в SSE-кадры.
+
+    Первый токен и финальный чанк уходят сразу; остальные копятся,
+    пока не наберётся max_bytes или не пройдёт max_delay с первого
+    неотправленного чанка.
+    """
+
+    def __init__(self, max_delay: float = 0.05, max_bytes: int = 1024):
+        self.max_delay = max_delay
+        self.max_bytes = max_bytes
+
+    async def coalesce(self, source: AsyncIterator[LLMStreamResponse]) -> AsyncGenerator[LLMStreamResponse, None]:
+        """Источник читает одна задача на весь стрим, кадры собираются из её очереди.
+
+        Так источник живёт в одном контексте: contextvars, поставленные
+        внутри него (учёт токенов по клиенту), видны и на последнем чанке.
+        При закрытии источник закрывается до возврата, и недописанный
+        ответ успевает сохраниться раньше, чем вызывающий пойдёт дальше.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        pump = asyncio.create_task(self._pump(source.__aiter__(), queue))
+        pending: List[LLMStreamResponse] = []
+        pending_bytes = 0
+        deadline = 0.0
+        first_sent = False
+        started_at = time.monotonic()
+
+        try:
+            while True:
+                if pending:
+                    try:
+                        async with asyncio.timeout_at(deadline):
+                            item = await queue.get()
+                    except TimeoutError:
+                        yield self._flush(pending, pending_bytes)
+                        pending, pending_bytes = [], 0
+                        continue
+                else:
+                    item = await queue.get()
+
+                if item is _END:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+
+                if not pending:
+                    deadline = loop.time() + self.max_delay
+                pending.append(item)
+                pending_bytes += len(item.content_chunk.encode())
+
+                if not first_sent or item.is_final_chunk or pending_bytes >= self.max_bytes:
+                    yield self._flush(pending, pending_bytes)
+                    pending, pending_bytes = [], 0
+                    first_sent = True
+
+            if pending:
+                yield self._flush(pending, pending_bytes)
+        finally:
+            stream_stats.record_stream_duration(time.monotonic() - started_at)
+            pump.cancel()
+            # Дожидаемся закрытия источника: его finally должен отработать до нас
+            await asyncio.wait({pump})
+
+    @staticmethod
+    async def _pump(iterator: AsyncIterator[LLMStreamResponse], queue: asyncio.Queue) -> None:
+        try:
+            async for chunk in iterator:
+                await queue.put(chunk)
+            await queue.put(_END)
+        except Exception as e:
+            await queue.put(e)
+        finally:
+            # Отмена в queue.put оставляет источник на yield: закрываем его явно
+            await iterator.aclose()
+
+    @staticmethod
+    def _flush(pending: List[LLMStreamResponse], pending_bytes: int) -> LLMStreamResponse:
+        stream_stats.record_frame(len(pending), pending_bytes)
+        last = pending[-1]
+        if len(pending) == 1:
+            return last
+
+        return LLMStreamResponse(
+            content_chunk="".join(chunk.content_chunk for chunk in pending),
+            chat_id=last.chat_id,
+            is_completed=last.is_completed,
+            question_count=last.question_count,
+            total_questions=last.total_questions,
+            is_final_chunk=last.is_final_chunk,
+            is_analysis=last.is_analysis,
+            event_id=last.event_id,
+        )
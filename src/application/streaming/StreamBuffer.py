@@ -0,0 +1,83 @@
+import asyncio
+import time
+from typing import AsyncGenerator, Awaitable, Callable, List, Optional, Tuple
+
+from src.core.entities.QueryEntities import LLMStreamResponse
+
+
+def format_event_id(stream_id: str, seq: int) -> str:
+    return f"{stream_id}:{seq}"
+
+
+def parse_event_id(event_id: str) -> Optional[Tuple[str, int]]:
+    """Разбирает Last-Event-ID вида '<stream_id>:<seq>'"""
+    stream_id, _, seq = (event_id or "").strip().rpartition(":")
+    if not stream_id or not seq.isdigit():
+        return None
+    return stream_id, int(seq)
+
+
+class StreamBuffer:
+    """Буфер событий одной генерации, не зависящий от HTTP-соединения"""
+
+    def __init__(self, stream_id: str):
+        self.stream_id = stream_id
+        self.chat_id: Optional[str] = None
+        self.events: List[LLMStreamResponse] = []
+        self.is_finished = False
+        self.finished_at: Optional[float] = None
+        self.subscribers = 0
+        self.on_idle: Optional[Callable[["StreamBuffer"], None]] = None
+        self._changed = asyncio.Condition()
+
+    async def append(self, chunk: LLMStreamResponse) -> None:
+        chunk.event_id = format_event_id(self.stream_id, len(self.events))
+        if chunk.chat_id:
+            self.chat_id = chunk.chat_id
+        self.events.append(chunk)
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def finish(self) -> None:
+        self.is_finished = True
+        self.finished_at = time.monotonic()
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def subscribe(
+            self,
+            after_seq: int = -1,
+            is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+            poll_interval: float = 1.0
+    ) -> AsyncGenerator[LLMStreamResponse, None]:
+        """Отдаёт события начиная с after_seq + 1, затем продолжает в реальном времени.
+
+        Пока новых событий нет, раз в poll_interval проверяет is_disconnected,
+        чтобы заметить ушедшего клиента, даже если модель долго молчит.
+        """
+        position = after_seq + 1
+        self.subscribers += 1
+        try:
+            while True:
+                while position < len(self.events):
+                    yield self.events[position]
+                    position += 1
+
+                if self.is_finished:
+                    return
+
+                try:
+                    async with self._changed:
+                        await asyncio.wait_for(
+                            self._changed.wait_for(
+                                lambda: position < len(self.events) or self.is_finished
+                            ),
+                            timeout=poll_interval if is_disconnected else None
+                        )
+                except asyncio.TimeoutError:
+                    if await is_disconnected():
+                        return
+        finally:
+            self.subscribers -= 1
+            if self.subscribers == 0 and not self.is_finished and self.on_idle:
+                self.on_idle(self)
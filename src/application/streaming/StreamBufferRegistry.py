@@ -0,0 +1,97 @@
+import asyncio
+import time
+import uuid
+from typing import AsyncGenerator, Callable, Dict, Optional, Set
+
+from src.application.streaming.StreamBuffer import StreamBuffer
+from src.core.entities.QueryEntities import LLMStreamResponse
+from src.infrastructure.metrics.StreamStats import stream_stats
+
+
+class StreamBufferRegistry:
+    """Хранит буферы активных и недавно завершённых генераций процесса"""
+
+    def __init__(self, ttl_seconds: float = 300.0, resume_grace_seconds: float = 15.0):
+        self.ttl_seconds = ttl_seconds
+        self.resume_grace_seconds = resume_grace_seconds
+        self._buffers: Dict[str, StreamBuffer] = {}
+        self._producers: Dict[str, asyncio.Task] = {}
+        self._watchers: Set[asyncio.Task] = set()
+
+    def start(
+            self,
+            source: AsyncGenerator[LLMStreamResponse, None],
+            on_done: Optional[Callable[[], None]] = None
+    ) -> StreamBuffer:
+        """Запускает генерацию в фоне; она продолжается и после отключения клиента.
+
+        on_done вызывается по завершении генерации любым путём, в том числе
+        при отмене до первого шага, когда finally в source не выполняется.
+        """
+        self._evict_expired()
+
+        buffer = StreamBuffer(uuid.uuid4().hex)
+        buffer.on_idle = self._on_idle
+        self._buffers[buffer.stream_id] = buffer
+        producer = asyncio.create_task(self._produce(buffer, source))
+        if on_done is not None:
+            producer.add_done_callback(lambda _: on_done())
+        self._producers[buffer.stream_id] = producer
+        return buffer
+
+    def get(self, stream_id: str) -> Optional[StreamBuffer]:
+        self._evict_expired()
+        return self._buffers.get(stream_id)
+
+    async def _produce(self, buffer: StreamBuffer, source: AsyncGenerator[LLMStreamResponse, None]) -> None:
+        try:
+            async for chunk in source:
+                await buffer.append(chunk)
+        except asyncio.CancelledError:
+            print(f"Stream {buffer.stream_id} abandoned by client, generation cancelled")
+            # Отмена могла прийти в buffer.append, а не внутри source: закрываем его
+            # сразу, чтобы он сохранил недописанный ответ, а не ждал сборщика мусора
+            await source.aclose()
+            raise
+        except Exception as e:
+            print(f"Error in detached stream {buffer.stream_id}: {str(e)}")
+            await buffer.append(LLMStreamResponse(
+                content_chunk=f"Error: {str(e)}",
+                chat_id=buffer.chat_id or "",
+                is_completed=True,
+                question_count=0,
+                total_questions=0,
+                is_final_chunk=True
+            ))
+        finally:
+            self._producers.pop(buffer.stream_id, None)
+            await buffer.finish()
+
+    def _on_idle(self, buffer: StreamBuffer) -> None:
+        """Последний клиент ушёл: ждём переподключения, иначе отменяем генерацию"""
+        watcher = asyncio.create_task(self._abandon_if_idle(buffer))
+        self._watchers.add(watcher)
+        watcher.add_done_callback(self._watchers.discard)
+
+    async def _abandon_if_idle(self, buffer: StreamBuffer) -> None:
+        await asyncio.sleep(self.resume_grace_seconds)
+        if buffer.subscribers or buffer.is_finished:
+            return
+
+        producer = self._producers.get(buffer.stream_id)
+        if producer is None:
+            return
+
+        self._buffers.pop(buffer.stream_id, None)
+        stream_stats.record_abandoned_stream()
+        producer.cancel()
+
+    def _evict_expired(self) -> None:
+        now = time.monotonic()
+        expired = [
+            stream_id
+            for stream_id, buffer in self._buffers.items()
+            if buffer.is_finished and now - buffer.finished_at > self.ttl_seconds
+        ]
+        for stream_id in expired:
+            del self._buffers[stream_id]
@@ -0,0 +1,24 @@
+from typing import Any
+
+from src.application.tenancy.FairScheduler import FairScheduler
+from src.core.interfaces.IEmotionalClassification import IEmotionalClassification
+
+
+class FairEmotionalClassification(IEmotionalClassification):
+    """Сообщения попадают в батчи классификатора в порядке справедливого планировщика"""
+
+    def __init__(self, classification: IEmotionalClassification, scheduler: FairScheduler):
+        self.classification = classification
+        self.scheduler = scheduler
+
+    def __getattr__(self, name):
+        return getattr(self.classification, name)
+
+    async def extract_emotion(self, message: str) -> list[tuple[str | Any, Any]]:
+        async with self.scheduler.slot():
+            return await self.classification.extract_emotion(message)
+
+    def queue_depth(self) -> int:
+        # Ожидающие у планировщика не в счёт: их порядок уже справедлив, а
+        # число ходов ограничивает контроль допуска
+        return self.classification.queue_depth()
@@ -0,0 +1,24 @@
+from typing import AsyncGenerator
+
+from src.application.tenancy.FairScheduler import FairScheduler
+from src.core.interfaces.ILLMProvider import ILLMProvider
+
+
+class FairLLMProvider(ILLMProvider):
+    """Вызовы LLM проходят через справедливый планировщик; стрим держит место до конца генерации"""
+
+    def __init__(self, provider: ILLMProvider, scheduler: FairScheduler):
+        self.provider = provider
+        self.scheduler = scheduler
+
+    def __getattr__(self, name):
+        return getattr(self.provider, name)
+
+    async def generate_response(self, messages: list) -> str:
+        async with self.scheduler.slot():
+            return await self.provider.generate_response(messages)
+
+    async def generate_response_stream(self, messages: list) -> AsyncGenerator[str, None]:
+        async with self.scheduler.slot():
+            async for chunk in self.provider.generate_response_stream(messages):
+                yield chunk
@@ -0,0 +1,146 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Deque, Dict, List
+
+from src.core.entities.Tenant import DEFAULT_TENANT
+from src.infrastructure.metrics.app_metrics import tenant_queue_wait, tenant_queued, tenant_requests
+
+# Клиент, от имени которого выполняется текущий запрос; ставится при проверке ключа API
+current_tenant: ContextVar[str] = ContextVar("current_tenant", default=DEFAULT_TENANT)
+
+
+@dataclass(eq=False)
+class _Waiter:
+    future: asyncio.Future
+    cost: float
+    enqueued: float
+
+
+class FairScheduler:
+    """Взвешенное распределение мест ресурса между клиентами (deficit round robin).
+
+    Каждый клиент со своей очередью за один обход получает quantum * weight
+    единиц стоимости. Пока места есть, вызовы проходят сразу; под нагрузкой
+    массовый импорт с весом 1 не вытесняет интерактивный опрос с весом 8,
+    а лишь делит с ним места в пропорции 1:8.
+    """
+
+    def __init__(self, resource: str, capacity: int, weights: Dict[str, float], quantum: float = 1.0):
+        self.resource = resource
+        self.capacity = capacity
+        self.weights = weights
+        self.quantum = quantum
+        self.in_use = 0
+        self._in_use_by_tenant: Dict[str, int] = {}
+        self._queues: Dict[str, Deque[_Waiter]] = {}
+        self._active: Deque[str] = deque()
+        self._deficit: Dict[str, float] = {}
+        self._head_charged = False
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    @asynccontextmanager
+    async def slot(self, cost: float = 1.0):
+        """Место для вызова от имени current_tenant"""
+        tenant = current_tenant.get()
+        await self.acquire(tenant, cost)
+        try:
+            yield
+        finally:
+            self.release(tenant)
+
+    async def acquire(self, tenant: str, cost: float = 1.0) -> None:
+        queue = self._queues.get(tenant)
+        if self.in_use < self.capacity and not queue and not self._active:
+            self._grant(tenant, 0.0)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        if queue is None:
+            queue = self._queues[tenant] = deque()
+        if not queue:
+            self._active.append(tenant)
+            self._deficit[tenant] = 0.0
+        waiter = _Waiter(future, cost, time.perf_counter())
+        queue.append(waiter)
+        tenant_queued.labels(self.resource, tenant).inc()
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Место выдано, но ждущий отменён до пробуждения: возвращаем
+                self.release(tenant)
+            else:
+                self._remove_waiter(tenant, waiter)
+                tenant_queued.labels(self.resource, tenant).dec()
+            raise
+
+    def release(self, tenant: str) -> None:
+        self.in_use -= 1
+        self._in_use_by_tenant[tenant] -= 1
+        self._dispatch()
+
+    def _remove_waiter(self, tenant: str, waiter: _Waiter) -> None:
+        """Убирает отменённое ожидание сразу, а не когда до него дойдёт обход"""
+        queue = self._queues[tenant]
+        if waiter in queue:
+            queue.remove(waiter)
+        if queue or tenant not in self._active:
+            return
+        if self._active[0] == tenant:
+            self._head_charged = False
+        self._active.remove(tenant)
+        self._deficit[tenant] = 0.0
+
+    def snapshot(self) -> List[Dict]:
+        tenants = sorted(set(self._in_use_by_tenant) | set(self._queues))
+        return [
+            {
+                "tenant": tenant,
+                "weight": self.weights.get(tenant, 1.0),
+                "in_flight": self._in_use_by_tenant.get(tenant, 0),
+                "queued": len(self._queues.get(tenant, ()))
+            }
+            for tenant in tenants
+        ]
+
+    def _grant(self, tenant: str, waited: float) -> None:
+        self.in_use += 1
+        self._in_use_by_tenant[tenant] = self._in_use_by_tenant.get(tenant, 0) + 1
+        tenant_queue_wait.labels(self.resource, tenant).observe(waited)
+        tenant_requests.labels(self.resource, tenant).inc()
+
+    def _dispatch(self) -> None:
+        while self.in_use < self.capacity and self._active:
+            tenant = self._active[0]
+            queue = self._queues[tenant]
+            while queue and queue[0].future.done():
+                queue.popleft()  # отменены, но ещё не успели убрать себя сами
+            if not queue:
+                self._active.popleft()
+                self._deficit[tenant] = 0.0
+                self._head_charged = False
+                continue
+
+            if not self._head_charged:
+                self._deficit[tenant] += self.quantum * self.weights.get(tenant, 1.0)
+                self._head_charged = True
+
+            waiter = queue[0]
+            if self._deficit[tenant] < waiter.cost:
+                self._active.rotate(-1)
+                self._head_charged = False
+                continue
+
+            queue.popleft()
+            self._deficit[tenant] -= waiter.cost
+            tenant_queued.labels(self.resource, tenant).dec()
+            self._grant(tenant, time.perf_counter() - waiter.enqueued)
+            waiter.future.set_result(None)
@@ -0,0 +1,56 @@
+import json
+import math
+from typing import Dict, Iterable, Optional
+
+from src.application.admission.AdmissionController import AdmissionRejected
+from src.core.entities.Tenant import DEFAULT_TENANT, Tenant
+from src.infrastructure.metrics.app_metrics import tenant_quota_rejected
+from src.infrastructure.rate_limit.AsyncRateLimiter import AsyncRateLimiter
+
+
+class TenantRegistry:
+    """Ключи API внутренних клиентов с весами и квотами ходов в минуту"""
+
+    def __init__(self, tenants: Iterable[Tenant]):
+        self.tenants: Dict[str, Tenant] = {tenant.name: tenant for tenant in tenants}
+        self._by_key: Dict[str, Tenant] = {tenant.api_key: tenant for tenant in self.tenants.values()}
+        self._quotas: Dict[str, AsyncRateLimiter] = {
+            tenant.name: AsyncRateLimiter(tenant.requests_per_minute, burst=tenant.burst)
+            for tenant in self.tenants.values() if tenant.requests_per_minute > 0
+        }
+
+    @classmethod
+    def from_config(cls, api_key: Optional[str], api_keys_json: str) -> "TenantRegistry":
+        """API_KEY — ключ клиента default; API_KEYS — JSON вида
+
+        {"survey-bot": {"key": "...", "weight": 8},
+         "importer": {"key": "...", "weight": 1, "requests_per_minute": 600}}
+        """
+        tenants = [Tenant(DEFAULT_TENANT, api_key)] if api_key else []
+        for name, settings in (json.loads(api_keys_json) if api_keys_json else {}).items():
+            tenants.append(Tenant(
+                name=name,
+                api_key=settings["key"],
+                weight=float(settings.get("weight", 1.0)),
+                requests_per_minute=float(settings.get("requests_per_minute", 0.0)),
+                burst=int(settings.get("burst", 10))
+            ))
+        return cls(tenants)
+
+    def authenticate(self, api_key: Optional[str]) -> Optional[Tenant]:
+        if not api_key:
+            return None
+        return self._by_key.get(api_key)
+
+    def weights(self) -> Dict[str, float]:
+        return {name: tenant.weight for name, tenant in self.tenants.items()}
+
+    def check_quota(self, tenant_name: str) -> None:
+        """Списывает ход из квоты клиента или бросает AdmissionRejected"""
+        quota = self._quotas.get(tenant_name)
+        if quota is None:
+            return
+        wait = quota.try_acquire()
+        if wait > 0:
+            tenant_quota_rejected.labels(tenant_name).inc()
+            raise AdmissionRejected("API key quota exceeded", max(1, math.ceil(wait)))
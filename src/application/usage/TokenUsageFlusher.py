@@ -0,0 +1,44 @@
+import asyncio
+from datetime import datetime
+from typing import Optional
+
+from src.core.interfaces.ITokenUsageStorage import ITokenUsageStorage
+from src.infrastructure.metrics.TokenUsageStats import TokenUsageStats
+
+
+class TokenUsageFlusher:
+    """Раз в interval секунд переносит накопленные токены из памяти процесса в хранилище"""
+
+    def __init__(self, stats: TokenUsageStats, storage: ITokenUsageStorage, interval: float = 30.0):
+        self.stats = stats
+        self.storage = storage
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def flush(self) -> None:
+        # Один сброс за раз: иначе restore после ошибки перемешается с новым drain
+        async with self._lock:
+            deltas = self.stats.drain()
+            if not deltas:
+                return
+            try:
+                await self.storage.add_usage(deltas, datetime.now())
+            except Exception as e:
+                print(f"Error flushing token usage: {str(e)}")
+                self.stats.restore(deltas)
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
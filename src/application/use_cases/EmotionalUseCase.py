@@ -55,8 +55,8 @@ class EmotionalUseCase:
     async def analyze_messages_batch_top_emotions(self, messages: List[str]) -> List[Tuple[str, float]]:
         """Возвращает для каждого текста только эмоцию с наибольшим значением"""
         coefficients = await self.analyze_messages_batch(messages)
-        top_emotions = []
-        for coef in coefficients:
-            max_emotion = max(coef.__dict__.items(), key=lambda x: x[1])
-            top_emotions.append(max_emotion)
-        return top_emotions
+        return [self.top_emotion(coef) for coef in coefficients]
+
+    @staticmethod
+    def top_emotion(coefficient: EmotionalCoefficient) -> Tuple[str, float]:
+        return max(coefficient.__dict__.items(), key=lambda x: x[1])
@@ -1,16 +1,38 @@
-from typing import AsyncGenerator, List, Dict, Any
-
+import asyncio
+import json
+import time
+from dataclasses import asdict
+from datetime import datetime
+from typing import AsyncGenerator, List, Dict, Any, Optional, Union
+
+from src.application.tenancy.FairScheduler import current_tenant
 from src.application.use_cases.EmotionalUseCase import EmotionalUseCase
 from src.core.entities.QueryEntities import (
     QueryRequest,
     LLMResponse,
     LLMStreamResponse,
 )
+from src.core.entities.BurnoutResults import BurnoutResult, BurnoutResultRecord
+from src.core.entities.StreamStatus import StreamStatus
+from src.core.entities.TokenUsage import ANALYSIS_TURN, QUESTION_TURN
+from src.core.interfaces.IBurnoutResultStorage import IBurnoutResultStorage
+from src.core.interfaces.IBurnoutTimeSeries import IBurnoutTimeSeries
 from src.core.interfaces.IChatStorage import IChatStorage
 from src.core.interfaces.ILLMProvider import ILLMProvider
+from src.core.prompts import ANALYSIS_PROMPT_PREFIX
 from src.infrastructure.extract_json_from_text.extract_json_from_text import extract_json_from_text
+from src.infrastructure.metrics.app_metrics import (
+    ANALYSIS_TURNS,
+    LLM_TIME_TO_FIRST_TOKEN,
+    LLM_TOTAL,
+    QUESTION_TURNS,
+    TURN_TOTAL,
+    llm_tokens_per_second,
+)
+from src.infrastructure.metrics.TokenUsageStats import attributed
 
 ANALYSIS_TRIGGER_QUESTION = 7
+STREAM_CHECKPOINT_INTERVAL_SECONDS = 2.0
 
 
 class QueryLLMUseCase:
@@ -18,12 +40,18 @@ class QueryLLMUseCase:
             self,
             llm_provider: ILLMProvider,
             chat_storage: IChatStorage,
-            emotional_use_case: EmotionalUseCase
+            emotional_use_case: EmotionalUseCase,
+            stream_checkpoint_interval: float = STREAM_CHECKPOINT_INTERVAL_SECONDS,
+            result_storage: Optional[IBurnoutResultStorage] = None,
+            timeseries: Optional[IBurnoutTimeSeries] = None
     ):
         self.llm_provider = llm_provider
         self.chat_storage = chat_storage
         self.analysis_prompt = self._build_analysis_prompt()
         self.emotional_use_case = emotional_use_case
+        self.stream_checkpoint_interval = stream_checkpoint_interval
+        self.result_storage = result_storage
+        self.timeseries = timeseries
 
     async def _extract_user_messages(self, full_messages: List[Dict[str, Any]]) -> List[str]:
         """Асинхронно извлекает массив строк только с запросами от пользователя"""
@@ -34,6 +62,7 @@ class QueryLLMUseCase:
         ]
 
     async def execute(self, query_request: QueryRequest) -> LLMResponse:
+        turn_started = time.perf_counter()
         chat_id, current_question_count = await self._get_or_init_chat(query_request)
 
         await self.chat_storage.add_message(chat_id, "user", query_request.user_input)
@@ -42,29 +71,35 @@ class QueryLLMUseCase:
         full_messages = await self.chat_storage.get_chat_messages_with_timestamp(chat_id)
         should_use_analysis = self._should_run_analysis(full_messages, current_question_count)
 
+        emotion_vectors: List[List[float]] = []
         if should_use_analysis:
-            messages = await self._prepare_messages_for_analysis(full_messages, chat_id)
+            messages, emotion_vectors = await self._prepare_messages_for_analysis(full_messages, chat_id)
 
         else:
             messages = await self.chat_storage.get_chat_messages(chat_id)
 
-        assistant_response = await self.llm_provider.generate_response(messages)
+        llm_started = time.perf_counter()
+        with self._attribute_usage(chat_id, should_use_analysis):
+            assistant_response = await self.llm_provider.generate_response(messages)
+        LLM_TOTAL.observe(time.perf_counter() - llm_started)
 
         final_content, is_analysis = self._process_analysis_if_needed(
             should_use_analysis, assistant_response
         )
 
-        await self.chat_storage.add_message(
-            chat_id,
-            "assistant",
-            final_content if is_analysis else final_content,
-        )
+        await self.chat_storage.add_message(chat_id, "assistant", self._message_text(final_content))
+        if isinstance(final_content, BurnoutResult):
+            # Сохраняем до increment_question_count: завершённый чат удаляется
+            await self._save_burnout_result(chat_id, final_content, emotion_vectors)
         await self.chat_storage.increment_question_count(chat_id)
 
         updated_chat = await self.chat_storage.get_chat(chat_id)
         question_count = updated_chat["question_count"] if updated_chat else 0
         is_completed = await self.chat_storage.is_chat_completed(chat_id)
 
+        (ANALYSIS_TURNS if should_use_analysis else QUESTION_TURNS).inc()
+        TURN_TOTAL.observe(time.perf_counter() - turn_started)
+
         return LLMResponse(
             content=final_content,
             chat_id=chat_id,
@@ -77,6 +112,7 @@ class QueryLLMUseCase:
     async def execute_stream(
         self, query_request: QueryRequest
     ) -> AsyncGenerator[LLMStreamResponse, None]:
+        turn_started = time.perf_counter()
         chat_id, current_question_count = await self._get_or_init_chat(query_request)
 
         await self.chat_storage.add_message(chat_id, "user", query_request.user_input)
@@ -85,36 +121,68 @@ class QueryLLMUseCase:
         full_messages = await self.chat_storage.get_chat_messages_with_timestamp(chat_id)
         should_use_analysis = self._should_run_analysis(full_messages, current_question_count)
 
-        messages = (
-            await self._prepare_messages_for_analysis(chat_id)
-            if should_use_analysis
-            else await self.chat_storage.get_chat_messages(chat_id)
-        )
+        emotion_vectors: List[List[float]] = []
+        if should_use_analysis:
+            messages, emotion_vectors = await self._prepare_messages_for_analysis(full_messages, chat_id)
+        else:
+            messages = await self.chat_storage.get_chat_messages(chat_id)
 
         full_response = ""
-        async for chunk in self.llm_provider.generate_response_stream(messages):
-            full_response += chunk
-            yield LLMStreamResponse(
-                content_chunk=chunk,
-                chat_id=chat_id,
-                is_completed=False,
-                question_count=current_question_count,
-                total_questions=query_request.max_questions,
-                is_final_chunk=False,
-                is_analysis=should_use_analysis,
+        last_checkpoint = time.monotonic()
+        llm_started = time.perf_counter()
+        first_token_at = None
+        chunks_count = 0
+        try:
+            with self._attribute_usage(chat_id, should_use_analysis):
+                async for chunk in self.llm_provider.generate_response_stream(messages):
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                        LLM_TIME_TO_FIRST_TOKEN.observe(first_token_at - llm_started)
+                    chunks_count += 1
+                    full_response += chunk
+                    yield LLMStreamResponse(
+                        content_chunk=chunk,
+                        chat_id=chat_id,
+                        is_completed=False,
+                        question_count=current_question_count,
+                        total_questions=query_request.max_questions,
+                        is_final_chunk=False,
+                        is_analysis=should_use_analysis,
+                    )
+
+                    if time.monotonic() - last_checkpoint >= self.stream_checkpoint_interval:
+                        await self.chat_storage.save_partial_response(chat_id, full_response)
+                        last_checkpoint = time.monotonic()
+        except (asyncio.CancelledError, GeneratorExit):
+            # Клиент ушёл: генерация остановлена, сохраняем то, что успели получить.
+            # GeneratorExit — отмена пришла, пока потребитель стоял не внутри генератора
+            await self.chat_storage.save_partial_response(
+                chat_id, full_response, StreamStatus.ABANDONED
             )
+            raise
 
-        final_content_str, is_analysis = self._finalize_stream_analysis(
+        llm_finished = time.perf_counter()
+        LLM_TOTAL.observe(llm_finished - llm_started)
+        if first_token_at is not None and llm_finished > first_token_at:
+            llm_tokens_per_second.observe(chunks_count / (llm_finished - first_token_at))
+
+        final_content, is_analysis = self._finalize_stream_analysis(
             should_use_analysis, full_response
         )
 
-        await self.chat_storage.add_message(chat_id, "assistant", final_content_str)
+        await self.chat_storage.add_message(chat_id, "assistant", self._message_text(final_content))
+        await self.chat_storage.clear_partial_response(chat_id)
+        if isinstance(final_content, BurnoutResult):
+            await self._save_burnout_result(chat_id, final_content, emotion_vectors)
         await self.chat_storage.increment_question_count(chat_id)
 
         updated_chat = await self.chat_storage.get_chat(chat_id)
         question_count = updated_chat["question_count"] if updated_chat else 0
         is_completed = await self.chat_storage.is_chat_completed(chat_id)
 
+        (ANALYSIS_TURNS if should_use_analysis else QUESTION_TURNS).inc()
+        TURN_TOTAL.observe(time.perf_counter() - turn_started)
+
         yield LLMStreamResponse(
             content_chunk="",
             chat_id=chat_id,
@@ -130,7 +198,7 @@ class QueryLLMUseCase:
     @staticmethod
     def _build_analysis_prompt() -> str:
         return (
-            "ТЫ ДОЛЖЕН ВЫВЕСТИ ТОЛЬКО JSON БЕЗ ЛЮБЫХ ДОПОЛНИТЕЛЬНЫХ СЛОВ, "
+            f"{ANALYSIS_PROMPT_PREFIX} БЕЗ ЛЮБЫХ ДОПОЛНИТЕЛЬНЫХ СЛОВ, "
             "КОММЕНТАРИЕВ ИЛИ ФОРМАТИРОВАНИЯ.\n"
             "Ты профессиональный психолог. Проанализируй полученные ответы "
             "К каждому сообщению у тебя есть оценка самой высокой эмоции и её коэффициент от 0 до 1"
@@ -167,6 +235,8 @@ class QueryLLMUseCase:
         chat_id = await self.chat_storage.create_chat(
             list_user_psych_status=request.list_user_psych_status,
             max_questions=request.max_questions,
+            user_id=request.user_id,
+            department=request.department.value if request.department else None,
         )
         return chat_id, 0
 
@@ -180,11 +250,25 @@ class QueryLLMUseCase:
         if last.get("role") == "user":
             return True
 
-    async def _prepare_messages_for_analysis(self, full_messages, chat_id: str) -> List[Dict[str, str]]:
+    async def _prepare_messages_for_analysis(
+            self, full_messages, chat_id: str
+    ) -> tuple[List[Dict[str, str]], List[List[float]]]:
+        """Сообщения для анализа и векторы эмоций ответов пользователя"""
         all_messages = await self.chat_storage.get_chat_messages_with_timestamp(chat_id)
         user_messages = await self._extract_user_messages(full_messages)
-        top_emotions = await self.emotional_use_case.analyze_messages_batch_top_emotions(user_messages)
+        coefficients = await self.emotional_use_case.analyze_messages_batch(user_messages)
+        top_emotions = [self.emotional_use_case.top_emotion(coefficient) for coefficient in coefficients]
 
+        messages = self.build_analysis_messages(self.analysis_prompt, all_messages, top_emotions)
+        return messages, [coefficient.to_vector() for coefficient in coefficients]
+
+    @staticmethod
+    def build_analysis_messages(
+            analysis_prompt: str,
+            all_messages: List[Dict[str, Any]],
+            top_emotions: List[tuple]
+    ) -> List[Dict[str, str]]:
+        """Диалог с эмоциональной оценкой каждого ответа пользователя и промптом анализа"""
         user_iter = iter(top_emotions)
         dialog_messages = []
         for msg in all_messages:
@@ -196,12 +280,23 @@ class QueryLLMUseCase:
                         content += f"\nЭмоциональная оценка сообщения: {emo}"
                 dialog_messages.append({"role": msg["role"], "content": content})
 
-
-        return [{"role": "system", "content": f"{self.analysis_prompt}.\n"
+        return [{"role": "system", "content": f"{analysis_prompt}.\n"
                                 f"Ещё учитывай подсчёт эмоций на каждый вопрос:{top_emotions}"},
                 *dialog_messages]
 
-    def _process_analysis_if_needed(self, should_use_analysis: bool, assistant_response: str):
+    @staticmethod
+    def _attribute_usage(chat_id: str, is_analysis: bool):
+        """Токены вызова LLM учитываются по чату, типу хода и ключу API"""
+        return attributed(current_tenant.get(), chat_id, ANALYSIS_TURN if is_analysis else QUESTION_TURN)
+
+    def _process_analysis_if_needed(
+            self, should_use_analysis: bool, assistant_response: str
+    ) -> tuple[Union[str, BurnoutResult], bool]:
+        """Ответ анализа разбирается в BurnoutResult здесь и только здесь.
+
+        JSON с неполными или некорректными полями остаётся анализом,
+        но отдаётся строкой и не сохраняется в результаты.
+        """
         if not should_use_analysis:
             return assistant_response, False
 
@@ -209,11 +304,51 @@ class QueryLLMUseCase:
         if not parsed_result:
             return assistant_response, False
 
-        return parsed_result, True
+        try:
+            return BurnoutResult.from_dict(json.loads(parsed_result)), True
+        except (KeyError, ValueError, TypeError) as e:
+            print(f"Invalid burnout analysis: {str(e)}")
+            return parsed_result, True
 
-    def _finalize_stream_analysis(self, should_use_analysis: bool, full_response: str) -> tuple[str, bool]:
-        parsed_result = extract_json_from_text(full_response)
+    def _finalize_stream_analysis(
+            self, should_use_analysis: bool, full_response: str
+    ) -> tuple[Union[str, BurnoutResult], bool]:
+        return self._process_analysis_if_needed(should_use_analysis, full_response)
 
-        return parsed_result, False
+    @staticmethod
+    def _message_text(content: Union[str, BurnoutResult]) -> str:
+        """В истории чата результат анализа хранится нормализованным JSON"""
+        if isinstance(content, BurnoutResult):
+            return json.dumps(asdict(content), ensure_ascii=False)
+        return content
+
+    async def _save_burnout_result(
+            self, chat_id: str, result: BurnoutResult, emotion_vectors: List[List[float]]
+    ) -> None:
+        """Сохраняет результат анализа; ошибки хранилищ не ломают ход опроса"""
+        if self.result_storage is None and self.timeseries is None:
+            return
+        try:
+            chat = await self.chat_storage.get_chat(chat_id) or {}
+            created_at = datetime.now()
+            user_id = chat.get("user_id")
+            if self.result_storage is not None:
+                is_new = await self.result_storage.save_result(BurnoutResultRecord(
+                    chat_id=chat_id,
+                    created_at=created_at,
+                    result=result,
+                    user_id=user_id,
+                    department=chat.get("department")
+                ))
+                if not is_new:
+                    return
+            if self.timeseries is not None and user_id is not None:
+                await self.timeseries.append_scores(user_id, created_at, [
+                    result.emotional_exhaustion, result.depersonalization,
+                    result.reduction_of_achievements, result.burnout_index
+                ])
+                await self.timeseries.append_emotions(user_id, created_at, emotion_vectors)
+        except Exception as e:
+            print(f"Error saving burnout result for chat {chat_id}: {str(e)}")
 
 
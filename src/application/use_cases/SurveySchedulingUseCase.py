@@ -0,0 +1,35 @@
+import asyncio
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from src.application.scheduling.SurveyScheduler import SurveyScheduler
+from src.application.scoring.BurnoutRiskScorer import BurnoutRiskScorer
+from src.core.entities.SurveyPlan import SurveyPlan
+from src.core.entities.user_entites.UserEntity import UserEntity
+from src.core.interfaces.ISurveyPlanStorage import ISurveyPlanStorage
+
+
+class SurveySchedulingUseCase:
+    def __init__(self, scheduler: SurveyScheduler, plan_storage: ISurveyPlanStorage,
+                 risk_scorer: Optional[BurnoutRiskScorer] = None):
+        self.scheduler = scheduler
+        self.plan_storage = plan_storage
+        self.risk_scorer = risk_scorer or BurnoutRiskScorer()
+
+    async def plan_week(self, users: List[UserEntity], week_start: Optional[datetime] = None) -> SurveyPlan:
+        """Строит и сохраняет план; сотрудники с высоким априорным риском получают лучшие слоты"""
+        plan = await asyncio.to_thread(self._plan, users, week_start)
+        await self.plan_storage.save_plan(plan)
+        return plan
+
+    async def get_latest_plan(self) -> Optional[SurveyPlan]:
+        return await self.plan_storage.get_latest_plan()
+
+    def _plan(self, users: List[UserEntity], week_start: Optional[datetime]) -> SurveyPlan:
+        return self.scheduler.plan(users, week_start, self._priorities(users))
+
+    def _priorities(self, users: List[UserEntity]) -> Dict[int, float]:
+        if not users:
+            return {}
+        columns, scores = self.risk_scorer.score_users(users)
+        return {int(user_id): float(score) for user_id, score in zip(columns.user_ids, scores) if user_id >= 0}
@@ -1,23 +1,135 @@
+import asyncio
+from typing import Optional
+
+from config import Config
+from src.application.scheduling.SurveyScheduler import SurveyScheduler
+from src.application.tenancy.FairEmotionalClassification import FairEmotionalClassification
+from src.application.tenancy.FairLLMProvider import FairLLMProvider
+from src.application.tenancy.FairScheduler import FairScheduler
 from src.application.use_cases.EmotionalUseCase import EmotionalUseCase
 from src.application.use_cases.QueryLLMUseCase import QueryLLMUseCase
+from src.application.use_cases.SurveySchedulingUseCase import SurveySchedulingUseCase
+from src.core.interfaces.IBurnoutResultStorage import IBurnoutResultStorage
+from src.core.interfaces.IBurnoutTimeSeries import IBurnoutTimeSeries
+from src.core.interfaces.IChatLease import IChatLease
 from src.core.interfaces.IChatStorage import IChatStorage
 from src.core.interfaces.IEmotionalClassification import IEmotionalClassification
+from src.core.interfaces.IIdempotencyStore import IIdempotencyStore
 from src.core.interfaces.ILLMProvider import ILLMProvider
+from src.core.interfaces.ITokenUsageStorage import ITokenUsageStorage
 from src.infrastructure.emotion_classification.EmotionClassification import EmotionalClassification
+from src.infrastructure.emotion_classification.RemoteEmotionalClassification import RemoteEmotionalClassification
 from src.infrastructure.llm.DeepSeekLLM import DeepSeekLLM
+from src.infrastructure.metrics.InstrumentedChatStorage import InstrumentedChatStorage
+from src.infrastructure.mongodb_store.MongoDBBurnoutResultStorage import MongoDBBurnoutResultStorage
+from src.infrastructure.mongodb_store.MongoDBBurnoutTimeSeries import MongoDBBurnoutTimeSeries
+from src.infrastructure.mongodb_store.MongoDBChatLease import MongoDBChatLease
 from src.infrastructure.mongodb_store.MongoDBChatStorage import MongoDBChatStorage
+from src.infrastructure.mongodb_store.MongoDBIdempotencyStore import MongoDBIdempotencyStore
+from src.infrastructure.mongodb_store.MongoDBSurveyPlanStorage import MongoDBSurveyPlanStorage
+from src.infrastructure.mongodb_store.MongoDBTokenUsageStorage import MongoDBTokenUsageStorage
+from src.infrastructure.traffic.RecordingBackends import RecordingEmotionalClassification, RecordingLLMProvider
 
 
 class UseCaseFactory:
     @staticmethod
-    async def create_burnout_survey_use_case(mongo_connection_string: str) -> QueryLLMUseCase:
+    async def create_burnout_survey_use_case(
+            mongo_connection_string: str,
+            result_storage: Optional[IBurnoutResultStorage] = None,
+            timeseries: Optional[IBurnoutTimeSeries] = None,
+            llm_scheduler: Optional[FairScheduler] = None,
+            classifier_scheduler: Optional[FairScheduler] = None
+    ) -> QueryLLMUseCase:
+        timeseries = timeseries or MongoDBBurnoutTimeSeries(mongo_connection_string)
+        chat_storage: IChatStorage = InstrumentedChatStorage(MongoDBChatStorage(
+            mongo_connection_string,
+            context_max_chars=Config.PSYCH_CONTEXT_MAX_CHARS,
+            context_max_recent=Config.PSYCH_CONTEXT_MAX_RECENT,
+            history=timeseries
+        ))
         llm_provider: ILLMProvider = DeepSeekLLM()
-        chat_storage: IChatStorage = MongoDBChatStorage(mongo_connection_string)
-        emotional_classification: IEmotionalClassification = EmotionalClassification()
-        emotional_use_case = EmotionalUseCase(emotional_classification)
+        emotional_classification = await UseCaseFactory.create_emotional_classification()
+        if Config.TRAFFIC_RECORD_PATH:
+            # Внутри планировщика: в трассу идёт задержка бэкенда без ожидания места
+            llm_provider = RecordingLLMProvider(llm_provider)
+            emotional_classification = RecordingEmotionalClassification(emotional_classification)
+
+        return UseCaseFactory.assemble_burnout_survey_use_case(
+            llm_provider,
+            chat_storage,
+            emotional_classification,
+            result_storage=result_storage or MongoDBBurnoutResultStorage(mongo_connection_string),
+            timeseries=timeseries,
+            llm_scheduler=llm_scheduler,
+            classifier_scheduler=classifier_scheduler
+        )
+
+    @staticmethod
+    def assemble_burnout_survey_use_case(
+            llm_provider: ILLMProvider,
+            chat_storage: IChatStorage,
+            emotional_classification: IEmotionalClassification,
+            result_storage: Optional[IBurnoutResultStorage] = None,
+            timeseries: Optional[IBurnoutTimeSeries] = None,
+            llm_scheduler: Optional[FairScheduler] = None,
+            classifier_scheduler: Optional[FairScheduler] = None
+    ) -> QueryLLMUseCase:
+        """Сборка сценария из готовых бэкендов; её же использует воспроизведение трафика"""
+        if llm_scheduler:
+            llm_provider = FairLLMProvider(llm_provider, llm_scheduler)
+        if classifier_scheduler:
+            emotional_classification = FairEmotionalClassification(emotional_classification, classifier_scheduler)
 
         return QueryLLMUseCase(
             llm_provider=llm_provider,
             chat_storage=chat_storage,
-            emotional_use_case=emotional_use_case
-        )
\ No newline at end of file
+            emotional_use_case=EmotionalUseCase(emotional_classification),
+            stream_checkpoint_interval=Config.STREAM_CHECKPOINT_INTERVAL_SECONDS,
+            result_storage=result_storage,
+            timeseries=timeseries
+        )
+
+    @staticmethod
+    def create_burnout_result_storage(mongo_connection_string: str) -> IBurnoutResultStorage:
+        return MongoDBBurnoutResultStorage(mongo_connection_string)
+
+    @staticmethod
+    def create_burnout_timeseries(mongo_connection_string: str) -> IBurnoutTimeSeries:
+        return MongoDBBurnoutTimeSeries(mongo_connection_string)
+
+    @staticmethod
+    def create_chat_lease(mongo_connection_string: str) -> IChatLease:
+        return MongoDBChatLease(mongo_connection_string)
+
+    @staticmethod
+    def create_idempotency_store(mongo_connection_string: str) -> IIdempotencyStore:
+        return MongoDBIdempotencyStore(mongo_connection_string)
+
+    @staticmethod
+    def create_token_usage_storage(mongo_connection_string: str) -> ITokenUsageStorage:
+        return MongoDBTokenUsageStorage(mongo_connection_string)
+
+    @staticmethod
+    async def create_emotional_classification() -> IEmotionalClassification:
+        if Config.CLASSIFIER_URL:
+            return RemoteEmotionalClassification(
+                Config.CLASSIFIER_URL,
+                timeout=Config.CLASSIFIER_TIMEOUT_SECONDS,
+                pool_size=Config.CLASSIFIER_POOL_SIZE,
+                max_batch_size=Config.CLASSIFIER_MAX_BATCH_SIZE,
+                fallback_factory=EmotionalClassification if Config.CLASSIFIER_FALLBACK else None
+            )
+        # Загрузка модели блокирующая: уводим её из event loop
+        return await asyncio.to_thread(EmotionalClassification)
+
+    @staticmethod
+    def create_survey_scheduling_use_case(mongo_connection_string: str) -> SurveySchedulingUseCase:
+        scheduler = SurveyScheduler(
+            tokens_per_minute=Config.SCHEDULER_LLM_TOKENS_PER_MINUTE,
+            analyses_per_minute=Config.SCHEDULER_ANALYSES_PER_MINUTE,
+            slot_minutes=Config.SCHEDULER_SLOT_MINUTES,
+            workday_start_hour=Config.SCHEDULER_WORKDAY_START_HOUR,
+            workday_end_hour=Config.SCHEDULER_WORKDAY_END_HOUR,
+            target_utilization=Config.SCHEDULER_TARGET_UTILIZATION
+        )
+        return SurveySchedulingUseCase(scheduler, MongoDBSurveyPlanStorage(mongo_connection_string))
@@ -0,0 +1,46 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from src.core.entities.BurnoutResults import BurnoutResultRecord
+
+
+@dataclass
+class ReportPeriod:
+    department: Optional[str] = None  # None — все отделы
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+
+    def describe(self) -> str:
+        since = f"{self.since:%d.%m.%Y}" if self.since else "начала наблюдений"
+        until = f"{self.until:%d.%m.%Y}" if self.until else "сегодня"
+        return f"с {since} по {until}"
+
+
+@dataclass
+class EmployeeReport:
+    """Результаты одного сотрудника за период в порядке времени"""
+    user_id: Optional[int]
+    department: str
+    period: ReportPeriod
+    records: List[BurnoutResultRecord]
+
+
+@dataclass
+class EmployeeSummary:
+    user_id: Optional[int]
+    surveys: int
+    last_survey: datetime
+    burnout_index: float
+    levels: Dict[str, str]
+
+
+@dataclass
+class DepartmentReport:
+    """Сводка отдела: средние по последним результатам сотрудников и уровни шкал"""
+    department: str
+    period: ReportPeriod
+    surveys: int
+    means: Dict[str, float]
+    levels: Dict[str, Dict[str, int]]
+    employees: List[EmployeeSummary] = field(default_factory=list)
@@ -1,5 +1,30 @@
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+# Границы уровней шкал MBI из промпта анализа: (верх низкого, верх среднего)
+SCALE_LEVELS = {
+    "emotional_exhaustion": (15, 24),
+    "depersonalization": (5, 10),
+    "reduction_of_achievements": (30, 36),
+}
+METRICS = ("emotional_exhaustion", "depersonalization", "reduction_of_achievements", "burnout_index")
+BURNOUT_INDEX_BINS = 10
+
+
+def week_start_of(moment: datetime) -> datetime:
+    """Полночь понедельника недели, к которой относится момент"""
+    monday = moment.date() - timedelta(days=moment.weekday())
+    return datetime(monday.year, monday.month, monday.day)
+
+
+def _recommendations_list(value: Any) -> List[str]:
+    """LLM иногда отдаёт рекомендации одной строкой вместо списка"""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value] if value.strip() else []
+    return [str(item) for item in value]
 
 
 @dataclass
@@ -8,4 +33,46 @@ class BurnoutResult:
     depersonalization: int
     reduction_of_achievements: int
     burnout_index: float
-    recommendations: List[str]
\ No newline at end of file
+    recommendations: List[str]
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BurnoutResult":
+        """Результат из JSON анализа LLM; бросает KeyError/ValueError/TypeError на некорректных данных"""
+        return cls(
+            emotional_exhaustion=int(round(float(data["emotional_exhaustion"]))),
+            depersonalization=int(round(float(data["depersonalization"]))),
+            reduction_of_achievements=int(round(float(data["reduction_of_achievements"]))),
+            burnout_index=min(max(float(data["burnout_index"]), 0.0), 1.0),
+            recommendations=_recommendations_list(data.get("recommendations"))
+        )
+
+    def levels(self) -> Dict[str, str]:
+        """Уровень (low/medium/high) по каждой шкале"""
+        result = {}
+        for name, (low, medium) in SCALE_LEVELS.items():
+            value = getattr(self, name)
+            result[name] = "low" if value <= low else "medium" if value <= medium else "high"
+        return result
+
+    def burnout_index_bin(self) -> int:
+        return min(int(self.burnout_index * BURNOUT_INDEX_BINS), BURNOUT_INDEX_BINS - 1)
+
+
+@dataclass
+class BurnoutResultRecord:
+    chat_id: str
+    created_at: datetime
+    result: BurnoutResult
+    user_id: Optional[int] = None
+    department: Optional[str] = None
+
+
+@dataclass
+class DepartmentWeekRollup:
+    department: str
+    week_start: datetime
+    count: int
+    means: Dict[str, float] = field(default_factory=dict)
+    stdevs: Dict[str, float] = field(default_factory=dict)
+    levels: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    burnout_index_histogram: List[int] = field(default_factory=list)
@@ -0,0 +1,54 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List
+
+import numpy as np
+
+# Строка ряда: время (секунды epoch) + фиксированный вектор float32
+SCORE_DTYPE = np.dtype([("t", "<f8"), ("v", "<f4", 4)])
+EMOTION_DTYPE = np.dtype([("t", "<f8"), ("v", "<f4", 10)])
+SCORE_LABELS = ("ЭИ", "ДП", "РПД", "ИВ")
+SECONDS_PER_30_DAYS = 30 * 24 * 3600
+
+
+@dataclass
+class BurnoutTrend:
+    count: int
+    last_date: datetime
+    last: List[float]
+    delta: List[float] = field(default_factory=list)  # с прошлого опроса, пусто если он один
+    slope_per_30_days: List[float] = field(default_factory=list)
+
+    def render(self) -> str:
+        """Короткая сводка для системного промпта"""
+        def values(row: List[float], signed: bool = True) -> str:
+            spec = "+.2f" if signed else ".2f"
+            return " ".join(f"{label}={value:{spec}}" for label, value in zip(SCORE_LABELS, row))
+
+        lines = [f"История опросов: {self.count}, последний {self.last_date:%d.%m.%Y}: {values(self.last, False)}"]
+        if self.delta:
+            lines.append(f"Изменение с прошлого опроса: {values(self.delta)}")
+        if self.slope_per_30_days:
+            lines.append(f"Тренд за 30 дней: {values(self.slope_per_30_days)}")
+        return "\n".join(lines)
+
+
+def compute_trend(rows: np.ndarray) -> BurnoutTrend:
+    """Последние значения, дельта и наклон МНК по всем четырём шкалам сразу; rows упорядочены по времени"""
+    values = rows["v"].astype(np.float64)
+    last = values[-1]
+    trend = BurnoutTrend(
+        count=len(rows),
+        last_date=datetime.fromtimestamp(float(rows["t"][-1])),
+        last=[round(float(value), 3) for value in last]
+    )
+    if len(rows) < 2:
+        return trend
+
+    trend.delta = [round(float(value), 3) for value in last - values[-2]]
+    t = rows["t"] - rows["t"].mean()
+    denominator = float(np.dot(t, t))
+    if denominator > 0:
+        slope = t @ (values - values.mean(axis=0)) / denominator
+        trend.slope_per_30_days = [round(float(value), 3) for value in slope * SECONDS_PER_30_DAYS]
+    return trend
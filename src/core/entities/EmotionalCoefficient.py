@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, astuple
+from typing import List
 
 @dataclass
 class EmotionalCoefficient:
@@ -11,4 +12,7 @@ class EmotionalCoefficient:
     disgust: float
     fear: float
     guilt: float
-    shame: float
\ No newline at end of file
+    shame: float
+
+    def to_vector(self) -> List[float]:
+        return list(astuple(self))
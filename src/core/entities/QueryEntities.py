@@ -3,6 +3,7 @@ from dataclasses import dataclass
 from typing import List, Optional, Dict, Any, Union
 
 from src.core.entities.BurnoutResults import BurnoutResult
+from src.core.entities.user_entites.Department import Department
 from src.core.entities.user_entites.ListUserPsychStatus import ListUserPsychStatus
 
 
@@ -33,6 +34,14 @@ class QueryRequest:
     max_questions: int = 8
     max_history_messages: int = 20
     list_user_psych_status: Optional[ListUserPsychStatus] = None
+    user_id: Optional[int] = None
+    department: Optional[Department] = None
+
+
+@dataclass
+class QueryBatchRequest:
+    requests: List[QueryRequest]
+    max_concurrency: int = 8
 
 
 @dataclass
@@ -44,6 +53,11 @@ class LLMResponse:
     total_questions: int
     is_analysis: bool = False
 
+    def __post_init__(self):
+        # Ответ, восстановленный из JSON (например, хранилищем идемпотентности)
+        if isinstance(self.content, dict):
+            self.content = BurnoutResult.from_dict(self.content)
+
 
 @dataclass
 class LLMStreamResponse:
@@ -54,4 +68,12 @@ class LLMStreamResponse:
     total_questions: int
     is_final_chunk: bool = False
     is_analysis: bool = False
+    event_id: Optional[str] = None
+
 
+@dataclass
+class BatchItemResult:
+    index: int
+    response: Optional[LLMResponse] = None
+    error: Optional[str] = None
+    retry_after: Optional[int] = None
@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class StreamStatus(str, Enum):
+    STREAMING = "streaming"
+    ABANDONED = "abandoned"
@@ -0,0 +1,41 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional
+
+from src.core.entities.user_entites.UserEntity import UserEntity
+
+
+@dataclass
+class ScheduledSurvey:
+    user_id: int
+    start: datetime
+    complexity: str
+    tokens: int
+    analyses: int
+
+
+@dataclass
+class LoadPoint:
+    start: datetime
+    tokens_per_minute: float
+    analyses_per_minute: float
+    utilization: float
+
+
+@dataclass
+class SurveyPlan:
+    plan_id: str
+    week_start: datetime
+    created_at: datetime
+    slot_minutes: int
+    tokens_per_minute_capacity: float
+    analyses_per_minute_capacity: float
+    load: List[LoadPoint] = field(default_factory=list)
+    surveys: List[ScheduledSurvey] = field(default_factory=list)
+    unscheduled_user_ids: List[int] = field(default_factory=list)
+
+
+@dataclass
+class SurveyPlanRequest:
+    users: List[UserEntity]
+    week_start: Optional[datetime] = None
@@ -0,0 +1,12 @@
+from dataclasses import dataclass
+
+DEFAULT_TENANT = "default"
+
+
+@dataclass
+class Tenant:
+    name: str
+    api_key: str
+    weight: float = 1.0
+    requests_per_minute: float = 0.0  # 0 — без квоты
+    burst: int = 10
@@ -0,0 +1,57 @@
+from dataclasses import dataclass
+
+QUESTION_TURN = "question"
+ANALYSIS_TURN = "analysis"
+UNATTRIBUTED = "unattributed"  # вызовы вне хода опроса, например прогрев
+
+
+@dataclass
+class TokenUsage:
+    """Токены одного вызова LLM по данным провайдера"""
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+@dataclass(frozen=True)
+class UsageKey:
+    tenant: str
+    chat_id: str
+    turn_type: str
+
+
+@dataclass
+class UsageTotals:
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    llm_seconds: float = 0.0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def add(self, usage: TokenUsage, seconds: float) -> None:
+        self.calls += 1
+        self.prompt_tokens += usage.prompt_tokens
+        self.completion_tokens += usage.completion_tokens
+        self.llm_seconds += seconds
+
+    def merge(self, other: "UsageTotals") -> None:
+        self.calls += other.calls
+        self.prompt_tokens += other.prompt_tokens
+        self.completion_tokens += other.completion_tokens
+        self.llm_seconds += other.llm_seconds
+
+    def to_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens,
+            "llm_seconds": round(self.llm_seconds, 3),
+            "avg_prompt_tokens": round(self.prompt_tokens / self.calls, 1) if self.calls else 0.0
+        }
@@ -1,12 +1,31 @@
 import asyncio
-from typing import List
+from collections import OrderedDict
+from datetime import timezone
+from typing import List, Optional, Tuple
 from openai import BaseModel
-from src.core.entities.user_entites.UserPsychStatus import UserPsychStatus
+from pydantic import PrivateAttr
+from src.core.entities.user_entites.UserPsychStatus import UserPsychStatus, STATUS_LABELS
+
+# Бюджет контекста в символах (~4 символа на токен) и число записей, выводимых целиком
+CONTEXT_MAX_CHARS = 2000
+CONTEXT_MAX_RECENT = 5
+# Отрисованные контексты по (user_id, хэш содержимого, бюджет)
+_RENDER_CACHE_SIZE = 1024
+_render_cache: "OrderedDict[Tuple[int, int, int, int], str]" = OrderedDict()
+
+
+def _date_sort_key(status: UserPsychStatus) -> Tuple[bool, float]:
+    """Ключ сортировки по дате: без даты — самые старые, наивные даты считаются UTC"""
+    if status.date is None:
+        return False, 0.0
+    date = status.date if status.date.tzinfo else status.date.replace(tzinfo=timezone.utc)
+    return True, date.timestamp()
 
 
 class ListUserPsychStatus(BaseModel):
     list_user_psych_status: List[UserPsychStatus]
     user_id: int
+    _content_hash: Optional[int] = PrivateAttr(default=None)
 
     async def to_string(self) -> str:
         """Объединяет все статусы в одну строку"""
@@ -28,4 +47,83 @@ class ListUserPsychStatus(BaseModel):
             if i < len(status_strings):
                 result_parts.append("─" * 40)
 
-        return "\n".join(result_parts)
\ No newline at end of file
+        return "\n".join(result_parts)
+
+    def content_hash(self) -> int:
+        """Хэш содержимого статусов для ключа кэша; считается один раз на объект.
+
+        История приходит с запросом и дальше не меняется, поэтому изменённые
+        статусы нужно передавать новым объектом, а не правкой на месте.
+        """
+        if self._content_hash is None:
+            self._content_hash = hash(tuple(
+                (status.date, status.summary, status.recommendations, tuple(status.status))
+                for status in self.list_user_psych_status
+            ))
+        return self._content_hash
+
+    def render_context(self, max_chars: int = CONTEXT_MAX_CHARS, max_recent: int = CONTEXT_MAX_RECENT) -> str:
+        """Компактный контекст для системного промпта с кэшем по пользователю и содержимому"""
+        key = (self.user_id, self.content_hash(), max_chars, max_recent)
+        cached = _render_cache.get(key)
+        if cached is not None:
+            _render_cache.move_to_end(key)
+            return cached
+
+        rendered = self._render(max_chars, max_recent)
+        _render_cache[key] = rendered
+        if len(_render_cache) > _RENDER_CACHE_SIZE:
+            _render_cache.popitem(last=False)
+        return rendered
+
+    def _render(self, max_chars: int, max_recent: int) -> str:
+        """Последние записи целиком, более старые — числовой сводкой"""
+        if not self.list_user_psych_status:
+            return "Нет данных о прошлых оценках выгорания."
+
+        # Самые свежие оценки первыми, записи без даты считаются самыми старыми
+        ordered = sorted(self.list_user_psych_status, key=_date_sort_key, reverse=True)
+        header = f"Прошлые оценки выгорания пользователя {self.user_id} (всего {len(ordered)}, 0–1):"
+
+        lines = [header]
+        used = len(header)
+        kept = 0
+        for status in ordered[:max_recent]:
+            line = status.render_compact()
+            if used + len(line) + 1 > max_chars and kept:
+                break
+            lines.append(line)
+            used += len(line) + 1
+            kept += 1
+
+        # Сводка по старым записям важнее последней полной записи: освобождаем под неё место
+        summary = self._summarize(ordered[kept:]) if kept < len(ordered) else None
+        while summary and kept > 1 and used + len(summary) + 1 > max_chars:
+            used -= len(lines.pop()) + 1
+            kept -= 1
+            summary = self._summarize(ordered[kept:])
+        if summary:
+            lines.append(summary)
+
+        rendered = "\n".join(lines)
+        return rendered if len(rendered) <= max_chars else rendered[:max_chars - 1] + "…"
+
+    @staticmethod
+    def _summarize(statuses: List[UserPsychStatus]) -> str:
+        """Средние показатели и диапазон индекса выгорания по более старым записям"""
+        valid = [status.status for status in statuses if len(status.status) == len(STATUS_LABELS)]
+        dated = [status for status in statuses if status.date]
+        period = ""
+        if dated:
+            first, last = min(dated, key=_date_sort_key).date, max(dated, key=_date_sort_key).date
+            period = f" за {first:%m.%Y}–{last:%m.%Y}"
+        if not valid:
+            return f"Ранее: {len(statuses)} оценок{period} без корректных показателей."
+
+        means = " ".join(
+            f"{label}={sum(values[i] for values in valid) / len(valid):.2f}"
+            for i, label in enumerate(STATUS_LABELS)
+        )
+        burnout = [values[-1] for values in valid]
+        return (f"Ранее: {len(statuses)} оценок{period}, средние {means}, "
+                f"ИВ мин={min(burnout):.2f} макс={max(burnout):.2f}")
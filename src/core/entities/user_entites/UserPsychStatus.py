@@ -1,8 +1,17 @@
-import asyncio
 from datetime import datetime
 from typing import List
 from openai import BaseModel
 
+# Сокращения показателей MBI в компактном формате
+STATUS_LABELS = ("ЭИ", "ДП", "РПД", "ИВ")
+# Предел длины текстовых полей одной записи в контексте промпта
+MAX_TEXT_CHARS = 200
+
+
+def _clip(text: str, limit: int = MAX_TEXT_CHARS) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
 
 class UserPsychStatus(BaseModel):
     date: datetime = None
@@ -14,7 +23,6 @@ class UserPsychStatus(BaseModel):
         """Асинхронно форматирует дату"""
         if not self.date:
             return "Не указана"
-        await asyncio.sleep(0.001)
         return self.date.strftime("%d.%m.%Y в %H:%M")
 
     async def _analyze_status_components(self) -> str:
@@ -52,4 +60,13 @@ class UserPsychStatus(BaseModel):
             "────────────────────"
         )
 
-        return result
\ No newline at end of file
+        return result
+
+    def render_compact(self) -> str:
+        """Одна строка для системного промпта: дата, показатели, сводка, рекомендации"""
+        date_str = self.date.strftime("%d.%m.%Y") if self.date else "дата не указана"
+        if len(self.status) == len(STATUS_LABELS):
+            scores = " ".join(f"{label}={value:.2f}" for label, value in zip(STATUS_LABELS, self.status))
+        else:
+            scores = "показатели некорректны"
+        return f"{date_str}: {scores} | {_clip(self.summary)} | {_clip(self.recommendations)}"
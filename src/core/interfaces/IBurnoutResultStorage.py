@@ -0,0 +1,29 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import AsyncIterator, List, Optional
+
+from src.core.entities.BurnoutResults import BurnoutResultRecord, DepartmentWeekRollup
+
+
+class IBurnoutResultStorage(ABC):
+    @abstractmethod
+    async def save_result(self, record: BurnoutResultRecord) -> bool:
+        """Сохраняет результат и обновляет агрегаты; False, если результат чата уже сохранён"""
+        pass
+
+    @abstractmethod
+    async def get_user_results(self, user_id: int, limit: int = 20) -> List[BurnoutResultRecord]:
+        pass
+
+    @abstractmethod
+    async def get_rollups(
+            self, department: Optional[str], week_starts: List[datetime]
+    ) -> List[DepartmentWeekRollup]:
+        pass
+
+    @abstractmethod
+    def iter_results(
+            self, department: Optional[str], since: Optional[datetime], until: Optional[datetime]
+    ) -> AsyncIterator[BurnoutResultRecord]:
+        """Результаты за период в порядке отдел, сотрудник, время — без загрузки всех в память"""
+        pass
@@ -0,0 +1,28 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, Optional
+
+import numpy as np
+
+from src.core.entities.BurnoutTimeSeries import BurnoutTrend
+
+
+class IBurnoutTimeSeries(ABC):
+    @abstractmethod
+    async def append_scores(self, user_id: int, moment: datetime, scores: List[float]) -> None:
+        """Добавляет результат опроса: ЭИ, ДП, РПД, индекс выгорания"""
+        pass
+
+    @abstractmethod
+    async def append_emotions(self, user_id: int, moment: datetime, vectors: List[List[float]]) -> None:
+        """Добавляет векторы эмоций сообщений пользователя из одного опроса"""
+        pass
+
+    @abstractmethod
+    async def last_scores(self, user_id: int, n: int) -> np.ndarray:
+        """Последние n результатов в порядке времени, массив SCORE_DTYPE"""
+        pass
+
+    @abstractmethod
+    async def get_trend(self, user_id: int, n: int = 12) -> Optional[BurnoutTrend]:
+        pass
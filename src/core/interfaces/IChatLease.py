@@ -0,0 +1,14 @@
+from abc import ABC, abstractmethod
+
+
+class IChatLease(ABC):
+    """Аренда имени (чата) одним владельцем на ttl секунд, общая для всех воркеров"""
+
+    @abstractmethod
+    async def acquire(self, name: str, owner: str, ttl: float) -> bool:
+        """Берёт аренду или продлевает свою; False, если её держит другой владелец"""
+        pass
+
+    @abstractmethod
+    async def release(self, name: str, owner: str) -> None:
+        pass
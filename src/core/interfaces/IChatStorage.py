@@ -1,12 +1,19 @@
 from abc import ABC, abstractmethod
 from typing import Optional, Dict, List
 
+from src.core.entities.StreamStatus import StreamStatus
 from src.core.entities.user_entites.ListUserPsychStatus import ListUserPsychStatus
 
 
 class IChatStorage(ABC):
     @abstractmethod
-    async def create_chat(self, list_user_psych_status: Optional[ListUserPsychStatus], max_questions: int) -> str:
+    async def create_chat(
+            self,
+            list_user_psych_status: Optional[ListUserPsychStatus],
+            max_questions: int,
+            user_id: Optional[int] = None,
+            department: Optional[str] = None
+    ) -> str:
         pass
 
     @abstractmethod
@@ -35,4 +42,14 @@ class IChatStorage(ABC):
 
     @abstractmethod
     async def optimize_history(self, chat_id: str, max_messages: int) -> None:
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    async def save_partial_response(
+            self, chat_id: str, content: str, status: StreamStatus = StreamStatus.STREAMING
+    ) -> None:
+        pass
+
+    @abstractmethod
+    async def clear_partial_response(self, chat_id: str) -> None:
+        pass
@@ -5,4 +5,8 @@ from typing import Any
 class IEmotionalClassification(ABC):
     @abstractmethod
     async def extract_emotion(self, message: str) -> list[tuple[str | Any, Any]]:
-        pass
\ No newline at end of file
+        pass
+
+    def queue_depth(self) -> int:
+        """Сколько сообщений ждут или проходят классификацию"""
+        return 0
@@ -0,0 +1,15 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+
+
+class IIdempotencyStore(ABC):
+    """Завершённые ответы по ключу идемпотентности, общие для всех воркеров"""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Dict]:
+        """Запись {"fingerprint": ..., "response": {...}} или None, если её нет или срок истёк"""
+        pass
+
+    @abstractmethod
+    async def put(self, key: str, record: Dict, ttl: float) -> None:
+        pass
@@ -0,0 +1,20 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, Optional
+
+from src.core.entities.SurveyPlan import ScheduledSurvey, SurveyPlan
+
+
+class ISurveyPlanStorage(ABC):
+    @abstractmethod
+    async def save_plan(self, plan: SurveyPlan) -> None:
+        pass
+
+    @abstractmethod
+    async def get_latest_plan(self) -> Optional[SurveyPlan]:
+        """Последний план без списка приглашений"""
+        pass
+
+    @abstractmethod
+    async def get_due_surveys(self, plan_id: str, start: datetime, end: datetime) -> List[ScheduledSurvey]:
+        pass
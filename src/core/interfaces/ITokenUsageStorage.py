@@ -0,0 +1,17 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict
+
+from src.core.entities.TokenUsage import UsageKey, UsageTotals
+
+
+class ITokenUsageStorage(ABC):
+    @abstractmethod
+    async def add_usage(self, deltas: Dict[UsageKey, UsageTotals], moment: datetime) -> None:
+        """Прибавляет накопленные с прошлого сброса токены к чатам и дневным агрегатам"""
+        pass
+
+    @abstractmethod
+    async def get_summary(self, since: datetime, top_chats: int = 20) -> Dict:
+        """Токены по ключам API и типам ходов с since и самые дорогие чаты"""
+        pass
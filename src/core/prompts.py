@@ -0,0 +1,3 @@
+# Начало промпта анализа: по нему сценарий, воспроизведение трафика и mock LLM
+# отличают ход анализа от обычного вопроса опроса
+ANALYSIS_PROMPT_PREFIX = "ТЫ ДОЛЖЕН ВЫВЕСТИ ТОЛЬКО JSON"
@@ -1,7 +1,21 @@
-from typing import AsyncGenerator
+import time
+from datetime import datetime
+from typing import AsyncGenerator, Awaitable, Callable, Dict, List, Optional
 from src.application.APIApplication import APIApplication
-from src.core.entities.QueryEntities import LLMStreamResponse
+from src.application.admission.AdmissionController import AdmissionRejected
+from src.application.idempotency.ChatTurnLock import ChatBusyError
+from src.application.idempotency.IdempotencyCache import IdempotencyKeyReused
+from src.application.sessions.SurveySession import SurveySession
+from src.application.streaming.StreamBuffer import StreamBuffer
+from src.application.tenancy.FairScheduler import current_tenant
+from src.core.entities.BurnoutResults import DepartmentWeekRollup
+from src.core.entities.BurnoutTimeSeries import BurnoutTrend
+from src.core.entities.QueryEntities import LLMStreamResponse, BatchItemResult
 from src.core.entities.QueryEntities import QueryRequest, LLMResponse
+from src.core.entities.SurveyPlan import SurveyPlan
+from src.core.entities.Tenant import Tenant
+from src.core.entities.user_entites.UserEntity import UserEntity
+from src.infrastructure.traffic.TrafficRecorder import TrafficRecorder
 from config import Config
 
 
@@ -9,26 +23,124 @@ class QuerySystem:
     def __init__(self):
         self.config = Config()
         self.rag_app = APIApplication(self.config)
+        self.recorder: Optional[TrafficRecorder] = None
+        if self.config.TRAFFIC_RECORD_PATH:
+            self.recorder = TrafficRecorder(
+                self.config.TRAFFIC_RECORD_PATH,
+                self.config.TRAFFIC_RECORD_SAMPLE_RATE,
+                self.config.TRAFFIC_RECORD_SALT
+            )
         print("\nSystem Ready!")
 
     async def initialize(self):
         """Асинхронная инициализация"""
         await self.rag_app.initialize()
+        print("\nModels loaded, ready to serve!")
+
+    def is_ready(self) -> bool:
+        return self.rag_app.is_ready
 
-    async def query(self, query_request: QueryRequest) -> LLMResponse | None:
+    async def query(self, query_request: QueryRequest, idempotency_key: Optional[str] = None) -> LLMResponse | None:
+        """Ход опроса; отказ допуска, ChatBusyError и IdempotencyKeyReused пробрасываются для ответа клиенту"""
+        trace = self.recorder.start() if self.recorder else None
+        started = time.perf_counter()
+        response, error = None, None
         try:
-            return await self.rag_app.query(query_request)
+            response = await self.rag_app.query(query_request, idempotency_key)
+        except (AdmissionRejected, ChatBusyError, IdempotencyKeyReused):
+            raise
         except Exception as e:
             print(f"Error: {str(e)}")
-            return None
+            error = str(e)
+
+        if trace is not None:
+            await self.recorder.record(
+                "query", current_tenant.get(), [query_request], started, trace,
+                [self.recorder.response_shape(response, error)], error=error
+            )
+        return response
+
+    async def query_batch(
+            self,
+            query_requests: List[QueryRequest],
+            max_concurrency: int
+    ) -> AsyncGenerator[BatchItemResult, None]:
+        """Пакетная обработка ходов; ошибки отдельных элементов возвращаются в их результатах"""
+        trace = self.recorder.start() if self.recorder else None
+        started = time.perf_counter()
+        results: List[BatchItemResult] = []
+        async for result in self.rag_app.query_batch(query_requests, max_concurrency):
+            if trace is not None:
+                results.append(result)
+            yield result
+
+        if trace is not None:
+            await self.recorder.record(
+                "query_batch", current_tenant.get(), query_requests, started, trace,
+                [self.recorder.batch_item_shape(result) for result in sorted(results, key=lambda r: r.index)]
+            )
+
+    async def open_survey_session(self, chat_id: Optional[str] = None) -> SurveySession:
+        return await self.rag_app.open_survey_session(chat_id)
+
+    def close_survey_session(self, session: SurveySession) -> None:
+        self.rag_app.close_survey_session(session)
+
+    def authenticate(self, api_key: Optional[str]) -> Optional[Tenant]:
+        """Клиент по ключу API или None"""
+        return self.rag_app.authenticate(api_key)
+
+    def tenant_stats(self) -> dict:
+        return self.rag_app.tenant_stats()
+
+    async def usage_summary(self, days: int = 7, top_chats: int = 20) -> dict:
+        return await self.rag_app.usage_summary(days, top_chats)
+
+    async def plan_surveys(self, users: List[UserEntity], week_start: Optional[datetime] = None) -> SurveyPlan:
+        return await self.rag_app.plan_surveys(users, week_start)
+
+    async def get_latest_survey_plan(self) -> Optional[SurveyPlan]:
+        return await self.rag_app.get_latest_survey_plan()
+
+    async def get_user_trend(self, user_id: int, n: int) -> Optional[BurnoutTrend]:
+        return await self.rag_app.get_user_trend(user_id, n)
+
+    async def get_department_rollups(self, department: Optional[str], weeks: int) -> List[DepartmentWeekRollup]:
+        return await self.rag_app.get_department_rollups(department, weeks)
+
+    def has_stream(self, last_event_id: str) -> bool:
+        """Можно ли продолжить генерацию с указанного события"""
+        return self.rag_app.find_stream(last_event_id) is not None
+
+    async def start_stream(self, query_request: QueryRequest) -> StreamBuffer:
+        """Запускает генерацию, как только чат свободен и ход допущен; место освобождает она сама"""
+        return await self.rag_app.start_stream(query_request)
 
-    async def query_stream(self, query_request: QueryRequest) -> AsyncGenerator[LLMStreamResponse, None]:
+    async def query_stream(
+            self,
+            query_request: QueryRequest,
+            last_event_id: Optional[str] = None,
+            is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+            buffer: Optional[StreamBuffer] = None
+    ) -> AsyncGenerator[LLMStreamResponse, None]:
         """Streaming запрос"""
+        # Переподключение к идущей генерации не новый ход: его не записываем
+        trace = self.recorder.start() if self.recorder and not last_event_id else None
+        started = time.perf_counter()
+        first_chunk, chunks, final, error = None, 0, None, None
         try:
-            async for chunk in self.rag_app.query_stream(query_request):
+            async for chunk in self.rag_app.query_stream(
+                    query_request, last_event_id, is_disconnected, buffer
+            ):
+                if first_chunk is None:
+                    first_chunk = time.perf_counter()
+                chunks += 1
+                if chunk.is_final_chunk:
+                    final = chunk
                 yield chunk
         except Exception as e:
             print(f"Error in streaming: {str(e)}")
+            error = str(e)
             yield LLMStreamResponse(
                 content_chunk=f"Error: {str(e)}",
                 chat_id="",
@@ -37,5 +149,24 @@ class QuerySystem:
                 total_questions=0,
                 is_final_chunk=True
             )
+        finally:
+            if trace is not None:
+                await self.recorder.record(
+                    "query_stream", current_tenant.get(), [query_request], started, trace,
+                    [self._stream_response_shape(final, error)], first_chunk, chunks, error
+                )
 
+    def _stream_response_shape(self, final: Optional[LLMStreamResponse], error: Optional[str]) -> Dict:
+        if final is None:
+            return {"error": error or "stream interrupted"}
+        return {
+            "chat": self.recorder.anonymize(final.chat_id),
+            "question_count": final.question_count,
+            "is_completed": final.is_completed,
+            "is_analysis": final.is_analysis
+        }
 
+    async def close(self) -> None:
+        await self.rag_app.close()
+        if self.recorder:
+            await self.recorder.flush()
@@ -0,0 +1,56 @@
+"""Отдельный сервис классификатора эмоций.
+
+    python -m src.entrypoints.classifier_server --unix /tmp/burnout-classifier.sock
+    python -m src.entrypoints.classifier_server --port 8500 --processes 4
+
+API-воркеры подключаются к нему при CLASSIFIER_URL=unix:///tmp/burnout-classifier.sock
+(или http://127.0.0.1:8500).
+"""
+import argparse
+import asyncio
+
+from config import Config
+from src.infrastructure.classifier_server.ClassifierServer import BatchedClassification, ClassifierServer
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--unix", help="путь Unix-сокета; без него слушаем TCP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8500)
+    parser.add_argument("--processes", type=int, default=0,
+                        help="инференс в пуле процессов; 0 — потоки внутри этого процесса")
+    parser.add_argument("--torch-threads", type=int, default=None)
+    return parser.parse_args()
+
+
+async def main():
+    args = parse_args()
+
+    pool = None
+    if args.processes > 0:
+        from src.infrastructure.emotion_classification.ProcessPoolClassifier import ProcessPoolClassifier
+
+        pool = ProcessPoolClassifier(args.processes, args.torch_threads)
+        classifier = BatchedClassification(pool.classify, Config.CLASSIFIER_MAX_BATCH_SIZE, args.processes)
+    else:
+        from src.infrastructure.emotion_classification.EmotionClassification import EmotionalClassification
+
+        classifier = await asyncio.to_thread(EmotionalClassification)
+
+    server = ClassifierServer(classifier)
+    await server.start(args.host, args.port, args.unix)
+    print(f"Classifier server listening on {args.unix or f'{args.host}:{args.port}'}", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+        if pool is not None:
+            pool.close()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,88 @@
+"""Офлайн-перерасчёт эмоций и анализа выгорания по сохранённым чатам.
+
+Примеры:
+    python -m src.entrypoints.reanalyze --workers 8
+    python -m src.entrypoints.reanalyze --archive chats.jsonl --llm --llm-rpm 120
+    python -m src.entrypoints.reanalyze --resume   # продолжить с последнего checkpoint
+"""
+import argparse
+import asyncio
+import os
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from config import Config
+from src.application.reanalysis.ReanalysisPipeline import ProgressReporter, ReanalysisPipeline
+from src.infrastructure.rate_limit.AsyncRateLimiter import AsyncRateLimiter
+from src.infrastructure.reanalysis.MongoReanalysisSink import MongoReanalysisSink
+from src.infrastructure.emotion_classification.ProcessPoolClassifier import ProcessPoolClassifier
+from src.infrastructure.reanalysis.ReanalysisCheckpoint import ReanalysisCheckpoint
+from src.infrastructure.reanalysis.chat_sources import iter_archive_chats, iter_mongo_chats
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--archive", help="JSONL-архив чатов вместо коллекции chat_sessions")
+    parser.add_argument("--database", default="burnout_survey")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="процессы классификатора")
+    parser.add_argument("--torch-threads", type=int, default=None, help="потоки torch на процесс")
+    parser.add_argument("--batch-size", type=int, default=Config.CLASSIFIER_MAX_BATCH_SIZE,
+                        help="сообщений в одном forward pass")
+    parser.add_argument("--chat-batch", type=int, default=256, help="чатов между checkpoint'ами")
+    parser.add_argument("--llm", action="store_true", help="заново запустить анализ выгорания через LLM")
+    parser.add_argument("--llm-rpm", type=float, default=60, help="лимит запросов к LLM в минуту")
+    parser.add_argument("--llm-concurrency", type=int, default=4)
+    parser.add_argument("--checkpoint", default="reanalysis.checkpoint.json")
+    parser.add_argument("--resume", action="store_true", help="продолжить с позиции из --checkpoint")
+    parser.add_argument("--progress-interval", type=float, default=10.0)
+    return parser.parse_args()
+
+
+async def main():
+    args = parse_args()
+    source = args.archive or f"mongodb:{args.database}.chat_sessions"
+
+    checkpoint = ReanalysisCheckpoint.load(args.checkpoint) if args.resume else None
+    if checkpoint is not None and checkpoint.source != source:
+        raise SystemExit(f"Checkpoint {args.checkpoint} belongs to {checkpoint.source}, not {source}")
+    checkpoint = checkpoint or ReanalysisCheckpoint(source=source)
+    print(f"run {checkpoint.run_id}: {source}, from position {checkpoint.position or 'start'}")
+
+    total_chats = None
+    if args.archive:
+        chats = iter_archive_chats(args.archive, checkpoint.position)
+    else:
+        collection = AsyncIOMotorClient(Config.MONGODB_CONNECTION_STRING)[args.database]["chat_sessions"]
+        total_chats = await collection.count_documents({})
+        chats = iter_mongo_chats(collection, checkpoint.position)
+
+    llm_provider = None
+    if args.llm:
+        from src.infrastructure.llm.DeepSeekLLM import DeepSeekLLM
+        llm_provider = DeepSeekLLM()
+
+    classifier = ProcessPoolClassifier(args.workers, args.torch_threads)
+    sink = MongoReanalysisSink(Config.MONGODB_CONNECTION_STRING, args.database)
+    pipeline = ReanalysisPipeline(
+        classify=classifier.classify,
+        write=sink.write,
+        checkpoint=checkpoint,
+        checkpoint_path=args.checkpoint,
+        model_name=Config.EMOTIONAL_CLASSIFICATION_MODEL_NAME,
+        classifier_batch_size=args.batch_size,
+        chat_batch_size=args.chat_batch,
+        llm_provider=llm_provider,
+        rate_limiter=AsyncRateLimiter(args.llm_rpm) if args.llm else None,
+        llm_concurrency=args.llm_concurrency,
+        progress=ProgressReporter(total_chats, args.progress_interval)
+    )
+    try:
+        await pipeline.run(chats)
+    finally:
+        classifier.close()
+    print(f"done: {checkpoint.chats} chats, {checkpoint.messages} messages, {checkpoint.analyses} analyses")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
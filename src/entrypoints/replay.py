@@ -0,0 +1,73 @@
+"""Воспроизведение записанного трафика с заглушками LLM, классификатора и хранилища.
+
+Запись: TRAFFIC_RECORD_PATH=traffic-{pid}.ndjson TRAFFIC_RECORD_SALT=... в окружении сервиса.
+
+Примеры:
+    python -m src.entrypoints.replay traffic-*.ndjson --out baseline.json
+    python -m src.entrypoints.replay traffic-*.ndjson --speed 4 --baseline baseline.json --threshold 0.1
+
+Код выхода 1, если перцентили выросли относительно --baseline больше чем на --threshold.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from dataclasses import asdict
+
+from src.application.replay.TrafficReplay import TrafficReplay, compare, load_calls, mean_trace
+from src.application.use_cases.factory.UseCaseFactory import UseCaseFactory
+from src.entrypoints.QuerySystem import QuerySystem
+from src.infrastructure.memory_store.InMemoryChatStorage import InMemoryChatStorage
+from src.infrastructure.traffic.ReplayBackends import (
+    ReplayEmotionalClassification,
+    ReplayLLMProvider,
+    replay_storage_delay,
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("traces", nargs="+", help="файлы записи NDJSON")
+    parser.add_argument("--speed", type=float, default=1.0, help="во сколько раз ускорить приход запросов")
+    parser.add_argument("--out", help="куда сохранить отчёт JSON")
+    parser.add_argument("--baseline", help="отчёт базового прогона для сравнения")
+    parser.add_argument("--threshold", type=float, default=0.1, help="допустимый рост перцентилей, доля")
+    return parser.parse_args()
+
+
+async def main() -> int:
+    args = parse_args()
+    calls = load_calls(args.traces)
+    if not calls:
+        raise SystemExit("No recorded calls")
+    print(f"Replaying {len(calls)} calls at x{args.speed}")
+
+    system = QuerySystem()
+    system.recorder = None  # воспроизведение не пишет само себя
+    storage = InMemoryChatStorage(delay=replay_storage_delay)
+    system.rag_app.use_case = UseCaseFactory.assemble_burnout_survey_use_case(
+        ReplayLLMProvider(),
+        storage,
+        ReplayEmotionalClassification(),
+        llm_scheduler=system.rag_app.llm_scheduler,
+        classifier_scheduler=system.rag_app.classifier_scheduler
+    )
+
+    report = await TrafficReplay(system, storage, mean_trace(calls), args.speed).run(calls)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            report.regressions = compare(report, json.load(file), args.threshold)
+
+    rendered = json.dumps(asdict(report), ensure_ascii=False, indent=2)
+    print(rendered)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as file:
+            file.write(rendered)
+
+    for regression in report.regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if report.regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,67 @@
+"""Пакетная выгрузка DOCX-отчётов о выгорании по сохранённым результатам анализа.
+
+Отчёт на каждого сотрудника и сводка на каждый отдел, все в одном zip.
+Рендер идёт в пуле процессов, архив пишется потоком.
+
+Примеры:
+    python -m src.entrypoints.reports --out reports.zip
+    python -m src.entrypoints.reports --department IT --since 2026-01-01 --until 2026-04-01 --workers 8 --out it.zip
+    python -m src.entrypoints.reports --template company.docx --no-employees --out - > departments.zip
+"""
+import argparse
+import asyncio
+import os
+import sys
+import zipfile
+from datetime import datetime
+
+from config import Config
+from src.application.reports.ReportPipeline import ReportPipeline
+from src.core.entities.BurnoutReports import ReportPeriod
+from src.infrastructure.mongodb_store.MongoDBBurnoutResultStorage import MongoDBBurnoutResultStorage
+from src.infrastructure.reports.ProcessPoolReportRenderer import ProcessPoolReportRenderer
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--department", help="только этот отдел")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="начало периода, включительно")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="конец периода, не включительно")
+    parser.add_argument("--out", required=True, help="путь к zip или - для stdout")
+    parser.add_argument("--template", help="DOCX-шаблон со стилями и колонтитулами компании")
+    parser.add_argument("--database", default="burnout_survey")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="процессы рендера")
+    parser.add_argument("--in-flight", type=int, default=None, help="отчётов в рендере одновременно")
+    parser.add_argument("--no-employees", action="store_true", help="только сводки по отделам")
+    parser.add_argument("--no-departments", action="store_true", help="только отчёты сотрудников")
+    return parser.parse_args()
+
+
+async def main():
+    args = parse_args()
+    period = ReportPeriod(args.department, args.since, args.until)
+    storage = MongoDBBurnoutResultStorage(Config.MONGODB_CONNECTION_STRING, args.database)
+    renderer = ProcessPoolReportRenderer(args.workers, args.template)
+
+    output = sys.stdout.buffer if args.out == "-" else open(args.out, "wb")
+    try:
+        with zipfile.ZipFile(output, "w", allowZip64=True) as archive:
+            pipeline = ReportPipeline(
+                renderer.render,
+                archive,
+                period,
+                max_in_flight=args.in_flight or args.workers * 4,
+                employee_reports=not args.no_employees,
+                department_reports=not args.no_departments
+            )
+            stats = await pipeline.run(storage.iter_results(args.department, args.since, args.until))
+    finally:
+        renderer.close()
+        if output is not sys.stdout.buffer:
+            output.close()
+    print(f"done: {stats.employees} employee and {stats.departments} department reports, "
+          f"{stats.bytes_written / 2 ** 20:,.1f} MiB, {stats.skipped} results without user skipped", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,82 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Generic, List, Optional, Set, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """Непрерывный батчинг конкурентных вызовов.
+
+    Пока batch_fn обрабатывает один батч, новые элементы копятся в очереди
+    и уходят следующим батчем. Без конкуренции элемент отправляется сразу,
+    так что задержка добавляется только под нагрузкой. Если batch_fn вернул
+    исключение на месте результата, его получает только автор этого элемента.
+    """
+
+    def __init__(
+            self,
+            batch_fn: Callable[[List[T]], Awaitable[List[R]]],
+            max_batch_size: int = 32,
+            max_concurrent_batches: int = 1,
+            observe_wait: Optional[Callable[[float], None]] = None
+    ):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_concurrent_batches = max_concurrent_batches
+        self.observe_wait = observe_wait
+        self._queue: List[Tuple[T, asyncio.Future, float]] = []
+        self._running_batches = 0
+        self._running_items = 0
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def pending(self) -> int:
+        """Элементы в очереди и в обрабатываемых батчах"""
+        return len(self._queue) + self._running_items
+
+    async def submit(self, item: T) -> R:
+        future = asyncio.get_running_loop().create_future()
+        self._queue.append((item, future, time.perf_counter()))
+        self._maybe_start_batch()
+        return await future
+
+    def _maybe_start_batch(self) -> None:
+        while self._queue and self._running_batches < self.max_concurrent_batches:
+            batch = self._queue[:self.max_batch_size]
+            del self._queue[:self.max_batch_size]
+            self._running_batches += 1
+            self._running_items += len(batch)
+            task = asyncio.create_task(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def drain(self) -> None:
+        """Дожидается отправки очереди и всех запущенных батчей; вызывать при остановке"""
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _run_batch(self, batch: List[Tuple[T, asyncio.Future, float]]) -> None:
+        if self.observe_wait:
+            started = time.perf_counter()
+            for _, _, submitted in batch:
+                self.observe_wait(started - submitted)
+
+        try:
+            results = await self.batch_fn([item for item, _, _ in batch])
+            for (_, future, _), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            self._running_batches -= 1
+            self._running_items -= len(batch)
+            self._maybe_start_batch()
@@ -0,0 +1,68 @@
+import asyncio
+from typing import List, Optional, Tuple
+
+from aiohttp import web
+
+from src.core.interfaces.IEmotionalClassification import IEmotionalClassification
+from src.infrastructure.batching.MicroBatcher import MicroBatcher
+from src.infrastructure.serialization.serializer import dumps
+
+MAX_MESSAGES_PER_REQUEST = 1024
+
+
+class BatchedClassification(IEmotionalClassification):
+    """IEmotionalClassification поверх произвольной батч-функции, например пула процессов"""
+
+    def __init__(self, classify_batch, max_batch_size: int, max_concurrent_batches: int):
+        self.batcher = MicroBatcher(classify_batch, max_batch_size, max_concurrent_batches)
+
+    async def extract_emotion(self, message: str) -> List[Tuple[str, float]]:
+        return await self.batcher.submit(message)
+
+    def queue_depth(self) -> int:
+        return self.batcher.pending
+
+
+class ClassifierServer:
+    """HTTP-сервис классификатора эмоций для всех API-воркеров узла.
+
+    Сообщения всех запросов попадают в общий MicroBatcher классификатора,
+    поэтому батчи собираются поверх всех воркеров, а не внутри каждого.
+    """
+
+    def __init__(self, classifier: IEmotionalClassification):
+        self.classifier = classifier
+        self.app = web.Application()
+        self.app.router.add_post("/classify", self.classify)
+        self.app.router.add_get("/health", self.health)
+        self._runner: Optional[web.AppRunner] = None
+
+    async def classify(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        messages = payload.get("messages")
+        if not isinstance(messages, list) or not all(isinstance(message, str) for message in messages):
+            raise web.HTTPBadRequest(text="messages must be a list of strings")
+        if len(messages) > MAX_MESSAGES_PER_REQUEST:
+            raise web.HTTPRequestEntityTooLarge(MAX_MESSAGES_PER_REQUEST, len(messages))
+
+        results = await asyncio.gather(*(self.classifier.extract_emotion(message) for message in messages))
+        return web.Response(body=dumps({"results": results}), content_type="application/json")
+
+    async def health(self, request: web.Request) -> web.Response:
+        return web.Response(
+            body=dumps({"status": "ok", "queue_depth": self.classifier.queue_depth()}),
+            content_type="application/json"
+        )
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8500, unix_socket: Optional[str] = None) -> None:
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        if unix_socket:
+            site = web.UnixSite(self._runner, unix_socket)
+        else:
+            site = web.TCPSite(self._runner, host, port)
+        await site.start()
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
@@ -1,21 +1,37 @@
 import asyncio
+import time
 from typing import List, Tuple
 
-import torch
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-
 from config import Config
 from src.core.interfaces.IEmotionalClassification import IEmotionalClassification
 from src.infrastructure.async_decorator.run_in_executor import run_in_executor
+from src.infrastructure.batching.MicroBatcher import MicroBatcher
+from src.infrastructure.emotion_classification.preload import get_preloaded_model
+from src.infrastructure.metrics.app_metrics import CLASSIFIER_INFERENCE, CLASSIFIER_QUEUE_WAIT
 
 
 class EmotionalClassification(IEmotionalClassification):
     def __init__(self):
         self.config = Config()
         self.model_name = self.config.EMOTIONAL_CLASSIFICATION_MODEL_NAME
-        self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-        self.model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
-        self.model.eval()
+        self.batcher = MicroBatcher(
+            self._classify_batch,
+            max_batch_size=self.config.CLASSIFIER_MAX_BATCH_SIZE,
+            max_concurrent_batches=self.config.CLASSIFIER_MAX_CONCURRENT_BATCHES,
+            observe_wait=CLASSIFIER_QUEUE_WAIT.observe
+        )
+
+        preloaded = get_preloaded_model(self.model_name)
+        if preloaded:
+            # Веса загружены мастером gunicorn до fork и разделяются между воркерами
+            self.tokenizer, self.model = preloaded
+        else:
+            # torch/transformers тяжёлые: импортируем при создании, а не при старте процесса
+            from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+            self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+            self.model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
+            self.model.eval()
 
         self.label_names = {
             'neutral': 'нейтрально',
@@ -30,11 +46,12 @@ class EmotionalClassification(IEmotionalClassification):
             'shame': 'стыд'
         }
 
-    @run_in_executor
-    def _extract_emotion_sync(self, message: str) -> List[Tuple[str, float]]:
-        """Синхронная версия метода (запускается в отдельном потоке)"""
+    def classify_sync(self, messages: List[str]) -> List[List[Tuple[str, float]]]:
+        """Один forward pass на весь батч; блокирующий, вызывать вне event loop"""
+        import torch
+
         inputs = self.tokenizer(
-            message,
+            messages,
             return_tensors="pt",
             truncation=True,
             padding=True,
@@ -44,23 +61,39 @@ class EmotionalClassification(IEmotionalClassification):
         with torch.no_grad():
             outputs = self.model(**inputs)
 
-        probabilities = torch.nn.functional.softmax(outputs.logits, dim=-1)[0]
+        probabilities = torch.nn.functional.softmax(outputs.logits, dim=-1).tolist()
 
         id2label = self.model.config.id2label
-        emotion_scores = {}
+        labels = [self.label_names.get(id2label[i], id2label[i]) for i in range(len(id2label))]
+
+        return [
+            sorted(zip(labels, row), key=lambda x: x[1], reverse=True)
+            for row in probabilities
+        ]
 
-        for i, prob in enumerate(probabilities):
-            label_en = id2label[i]
-            label_ru = self.label_names.get(label_en, label_en)
-            emotion_scores[label_ru] = prob.item()
+    @run_in_executor
+    def _extract_emotion_batch_sync(self, messages: List[str]) -> Tuple[List[List[Tuple[str, float]]], float, float]:
+        """classify_sync в отдельном потоке.
 
-        return sorted(emotion_scores.items(), key=lambda x: x[1], reverse=True)
+        Возвращает также моменты начала и конца работы потока, чтобы
+        метрики записывались уже из event loop.
+        """
+        started = time.perf_counter()
+        results = self.classify_sync(messages)
+        return results, started, time.perf_counter()
+
+    async def _classify_batch(self, messages: List[str]) -> List[List[Tuple[str, float]]]:
+        results, started, finished = await self._extract_emotion_batch_sync(messages)
+        CLASSIFIER_INFERENCE.observe(finished - started)
+        return results
 
     async def extract_emotion(self, message: str) -> List[Tuple[str, float]]:
-        """Асинхронный интерфейс для анализа эмоций"""
-        return await self._extract_emotion_sync(message)
+        """Асинхронный интерфейс для анализа эмоций; конкурентные вызовы склеиваются в батчи"""
+        return await self.batcher.submit(message)
+
+    def queue_depth(self) -> int:
+        return self.batcher.pending
 
     async def extract_emotion_batch(self, messages: List[str]) -> List[List[Tuple[str, float]]]:
-        """Параллельная обработка батча сообщений"""
-        tasks = [self.extract_emotion(msg) for msg in messages]
-        return await asyncio.gather(*tasks)
\ No newline at end of file
+        """Обработка батча сообщений общими forward pass'ами"""
+        return await asyncio.gather(*(self.batcher.submit(msg) for msg in messages))
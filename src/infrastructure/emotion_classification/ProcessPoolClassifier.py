@@ -0,0 +1,43 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+_worker_classifier = None
+
+
+def _init_worker(torch_threads: int) -> None:
+    """Загружает модель один раз на процесс; потоки torch делят ядра между воркерами"""
+    global _worker_classifier
+    import torch
+    from src.infrastructure.emotion_classification.EmotionClassification import EmotionalClassification
+
+    torch.set_num_threads(torch_threads)
+    _worker_classifier = EmotionalClassification()
+
+
+def _classify_in_worker(messages: List[str]) -> List[List[Tuple[str, float]]]:
+    return _worker_classifier.classify_sync(messages)
+
+
+class ProcessPoolClassifier:
+    """Классификация эмоций в пуле процессов для офлайн-обработки на CPU"""
+
+    def __init__(self, workers: int, torch_threads: Optional[int] = None):
+        cpu_count = multiprocessing.cpu_count()
+        self.workers = max(1, workers)
+        threads = torch_threads or max(1, cpu_count // self.workers)
+        # spawn: не наследуем потоки torch и клиента Mongo родителя
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(threads,)
+        )
+
+    async def classify(self, messages: List[str]) -> List[List[Tuple[str, float]]]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.pool, _classify_in_worker, messages)
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,101 @@
+import asyncio
+import time
+from typing import Callable, List, Optional, Tuple
+
+import aiohttp
+
+from src.core.interfaces.IEmotionalClassification import IEmotionalClassification
+from src.infrastructure.batching.MicroBatcher import MicroBatcher
+from src.infrastructure.serialization.serializer import dumps
+
+UNIX_PREFIX = "unix://"
+
+
+class RemoteEmotionalClassification(IEmotionalClassification):
+    """Клиент сервиса классификатора (src/entrypoints/classifier_server.py).
+
+    Конкурентные вызовы воркера склеиваются в один POST /classify, соединения
+    переиспользуются из пула. Если сервис недоступен или не уложился в таймаут,
+    батч классифицируется моделью в процессе (загружается при первом сбое),
+    а сервис пробуется снова через retry_after секунд.
+    """
+
+    def __init__(
+            self,
+            url: str,
+            timeout: float = 5.0,
+            pool_size: int = 32,
+            max_batch_size: int = 64,
+            fallback_factory: Optional[Callable[[], IEmotionalClassification]] = None,
+            retry_after: float = 30.0
+    ):
+        if url.startswith(UNIX_PREFIX):
+            self.socket_path: Optional[str] = url[len(UNIX_PREFIX):]
+            self.base_url = "http://classifier"
+        else:
+            self.socket_path = None
+            self.base_url = url.rstrip("/")
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.fallback_factory = fallback_factory
+        self.retry_after = retry_after
+        self.batcher = MicroBatcher(self._classify_batch, max_batch_size=max_batch_size,
+                                    max_concurrent_batches=pool_size)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._fallback: Optional[IEmotionalClassification] = None
+        self._fallback_lock = asyncio.Lock()
+        self._remote_down_until = 0.0
+
+    async def extract_emotion(self, message: str) -> List[Tuple[str, float]]:
+        return await self.batcher.submit(message)
+
+    async def extract_emotion_batch(self, messages: List[str]) -> List[List[Tuple[str, float]]]:
+        return await asyncio.gather(*(self.batcher.submit(message) for message in messages))
+
+    def queue_depth(self) -> int:
+        return self.batcher.pending
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+
+    async def _classify_batch(self, messages: List[str]) -> List[List[Tuple[str, float]]]:
+        if time.monotonic() >= self._remote_down_until:
+            try:
+                return await self._classify_remote(messages)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if self.fallback_factory is None:
+                    raise
+                print(f"Classifier server unavailable, using in-process model: {e!r}")
+                self._remote_down_until = time.monotonic() + self.retry_after
+
+        fallback = await self._get_fallback()
+        return await asyncio.gather(*(fallback.extract_emotion(message) for message in messages))
+
+    async def _classify_remote(self, messages: List[str]) -> List[List[Tuple[str, float]]]:
+        async with self._get_session().post(
+                f"{self.base_url}/classify",
+                data=dumps({"messages": messages}),
+                headers={"Content-Type": "application/json"}
+        ) as response:
+            response.raise_for_status()
+            payload = await response.json()
+        return [[(label, score) for label, score in emotions] for emotions in payload["results"]]
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            if self.socket_path:
+                connector = aiohttp.UnixConnector(path=self.socket_path, limit=self.pool_size)
+            else:
+                connector = aiohttp.TCPConnector(limit=self.pool_size)
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._session
+
+    async def _get_fallback(self) -> IEmotionalClassification:
+        if self._fallback is None:
+            async with self._fallback_lock:
+                if self._fallback is None:
+                    self._fallback = await asyncio.to_thread(self.fallback_factory)
+        return self._fallback
@@ -0,0 +1,44 @@
+import gc
+from typing import Any, Optional, Tuple
+
+_preloaded_name: Optional[str] = None
+_preloaded: Optional[Tuple[Any, Any]] = None
+
+
+def preload_emotion_model(model_name: str) -> Tuple[Any, Any]:
+    """Загружает модель в мастер-процессе до fork, чтобы воркеры делили веса.
+
+    Веса читаются из safetensors через mmap и переносятся в разделяемую
+    память; после fork страницы остаются общими, пока их никто не пишет.
+    Чекпоинт только с pytorch_model.bin тоже загружается, но с
+    предупреждением: такие веса сначала читаются в память мастера целиком.
+    Инференс в мастере не запускаем: пулы потоков torch не переживают fork.
+    """
+    global _preloaded_name, _preloaded
+
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    try:
+        model = AutoModelForSequenceClassification.from_pretrained(model_name, use_safetensors=True)
+    except OSError as e:
+        print(f"No safetensors weights for {model_name}, loading pytorch_model.bin: {str(e)}")
+        model = AutoModelForSequenceClassification.from_pretrained(model_name, use_safetensors=False)
+    model.eval()
+    model.share_memory()
+
+    _preloaded_name = model_name
+    _preloaded = (tokenizer, model)
+
+    # Объекты, созданные до fork, не должны попадать под сборщик мусора в воркерах,
+    # иначе обход поколений GC трогает их заголовки и рвёт copy-on-write
+    gc.collect()
+    gc.freeze()
+    return _preloaded
+
+
+def get_preloaded_model(model_name: str) -> Optional[Tuple[Any, Any]]:
+    """Возвращает (tokenizer, model), если модель была загружена до fork"""
+    if _preloaded is not None and _preloaded_name == model_name:
+        return _preloaded
+    return None
@@ -6,10 +6,13 @@ def extract_json_from_text(text) -> str | None:
     pattern = r'```json\s*(.*?)\s*```'
     matches = re.findall(pattern, text, re.DOTALL)
 
-    if not matches:
-        return None
-
-    json_string = matches[0]
+    if matches:
+        json_string = matches[0]
+    else:
+        # Промпт анализа требует чистый JSON без ```json-обёртки
+        json_string = text.strip()
+        if not (json_string.startswith("{") and json_string.endswith("}")):
+            return None
 
     try:
         json.loads(json_string)  # проверка JSON корректности
@@ -1,7 +1,14 @@
+import asyncio
+import time
 from typing import AsyncGenerator
 from openai import AsyncOpenAI
 from config import Config
+from src.core.entities.TokenUsage import TokenUsage
 from src.core.interfaces.ILLMProvider import ILLMProvider
+from src.infrastructure.metrics.StreamStats import stream_stats
+from src.infrastructure.metrics.TokenUsageStats import token_usage
+
+MAX_STREAM_TOKENS = 1000
 
 
 class DeepSeekLLM(ILLMProvider):
@@ -14,17 +21,22 @@ class DeepSeekLLM(ILLMProvider):
         self.model = self.config.LLM_MODEL
 
     async def generate_response(self, messages: list) -> str:
+        started = time.perf_counter()
         try:
             chat_completion = await self.client.chat.completions.create(
                 model=self.model,
                 messages=messages
             )
+            self._record_usage(chat_completion.usage, started)
             return chat_completion.choices[0].message.content
         except Exception as e:
             raise LLMError(f"Ошибка при запросе к DeepSeek API: {e}")
 
     async def generate_response_stream(self, messages: list) -> AsyncGenerator[str, None]:
         """Настоящий streaming от DeepSeek API"""
+        stream = None
+        generated_chunks = 0
+        started = time.perf_counter()
         try:
             serializable_messages = self._make_messages_serializable(messages)
 
@@ -32,16 +44,38 @@ class DeepSeekLLM(ILLMProvider):
                 model=self.model,
                 messages=serializable_messages,
                 stream=True,
-                max_tokens=1000
+                max_tokens=MAX_STREAM_TOKENS,
+                stream_options={"include_usage": True}
             )
 
             async for chunk in stream:
-                if chunk.choices[0].delta.content is not None:
+                # Последний чанк с include_usage: пустые choices и usage за весь ответ
+                if chunk.usage is not None:
+                    self._record_usage(chunk.usage, started)
+                if chunk.choices and chunk.choices[0].delta.content is not None:
+                    generated_chunks += 1
                     yield chunk.choices[0].delta.content
 
+        except asyncio.CancelledError:
+            stream_stats.record_cancelled_generation(generated_chunks)
+            raise
+
         except Exception as e:
             yield f"⚠️ Ошибка: {str(e)}"
 
+        finally:
+            if stream is not None:
+                await stream.close()
+
+    @staticmethod
+    def _record_usage(usage, started: float) -> None:
+        if usage is None:
+            return
+        token_usage.record(
+            TokenUsage(prompt_tokens=usage.prompt_tokens or 0, completion_tokens=usage.completion_tokens or 0),
+            time.perf_counter() - started
+        )
+
     def _make_messages_serializable(self, messages: list) -> list:
         serializable_messages = []
         for msg in messages:
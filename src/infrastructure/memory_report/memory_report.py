@@ -0,0 +1,36 @@
+import os
+from typing import Dict
+
+SMAPS_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+def read_memory_rollup(pid: str = "self") -> Dict[str, int]:
+    """Читает сводку /proc/<pid>/smaps_rollup в килобайтах (только Linux)"""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            lines = f.readlines()
+    except OSError:
+        return {}
+
+    rollup = {}
+    for line in lines:
+        name, _, value = line.partition(":")
+        if name in SMAPS_FIELDS:
+            rollup[name] = int(value.split()[0])
+    return rollup
+
+
+def format_memory_report(label: str) -> str:
+    rollup = read_memory_rollup()
+    if not rollup:
+        return f"[memory] {label} pid={os.getpid()}: smaps_rollup недоступен"
+
+    shared = rollup.get("Shared_Clean", 0) + rollup.get("Shared_Dirty", 0)
+    private = rollup.get("Private_Clean", 0) + rollup.get("Private_Dirty", 0)
+    return (
+        f"[memory] {label} pid={os.getpid()}: "
+        f"rss={rollup.get('Rss', 0) // 1024} MiB, "
+        f"pss={rollup.get('Pss', 0) // 1024} MiB, "
+        f"shared={shared // 1024} MiB, "
+        f"private={private // 1024} MiB"
+    )
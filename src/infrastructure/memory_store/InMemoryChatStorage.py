@@ -0,0 +1,103 @@
+import uuid
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from src.core.entities.StreamStatus import StreamStatus
+from src.core.entities.user_entites.ListUserPsychStatus import ListUserPsychStatus
+from src.core.interfaces.IChatStorage import IChatStorage
+
+
+async def _no_delay(kind: str) -> None:
+    return None
+
+
+class InMemoryChatStorage(IChatStorage):
+    """Чаты в словаре процесса с той же логикой, что у MongoDBChatStorage.
+
+    delay("read" | "write") вызывается перед каждой операцией: воспроизведение
+    трафика подставляет туда записанные задержки хранилища.
+    """
+
+    def __init__(self, system_prompt: str = "", delay: Callable[[str], Awaitable[None]] = _no_delay):
+        self.system_prompt = system_prompt
+        self.delay = delay
+        self.chats: Dict[str, Dict] = {}
+
+    async def create_chat(
+            self,
+            list_user_psych_status: Optional[ListUserPsychStatus],
+            max_questions: int,
+            user_id: Optional[int] = None,
+            department: Optional[str] = None
+    ) -> str:
+        await self.delay("write")
+        chat_id = str(uuid.uuid4())
+        prompt = self.system_prompt
+        if list_user_psych_status is not None:
+            prompt = f"{prompt} \nЕщё учитывай контекст: {list_user_psych_status.render_context()}"
+        self.chats[chat_id] = {
+            '_id': chat_id,
+            'created_at': datetime.now(),
+            'messages': [{"role": "system", "content": prompt, "timestamp": datetime.now()}],
+            'question_count': 0,
+            'max_questions': max_questions,
+            'status': 'active',
+            'user_id': user_id,
+            'department': department
+        }
+        return chat_id
+
+    async def get_chat(self, chat_id: str) -> Optional[Dict]:
+        await self.delay("read")
+        return self.chats.get(chat_id)
+
+    async def add_message(self, chat_id: str, role: str, content: str) -> None:
+        await self.delay("write")
+        chat = self.chats.get(chat_id)
+        if chat and chat['status'] == 'active':
+            chat['messages'].append({"role": role, "content": content, "timestamp": datetime.now()})
+
+    async def increment_question_count(self, chat_id: str) -> None:
+        await self.delay("write")
+        chat = self.chats.get(chat_id)
+        if chat:
+            chat['question_count'] += 1
+            if chat['question_count'] >= chat['max_questions']:
+                chat['status'] = 'completed'
+
+    async def is_chat_completed(self, chat_id: str) -> bool:
+        await self.delay("read")
+        chat = self.chats.get(chat_id)
+        return bool(chat) and chat['status'] == 'completed'
+
+    async def get_chat_messages(self, chat_id: str) -> List[Dict]:
+        await self.delay("read")
+        chat = self.chats.get(chat_id)
+        if not chat:
+            return []
+        return [{"role": msg["role"], "content": msg["content"]} for msg in chat['messages']]
+
+    async def get_chat_messages_with_timestamp(self, chat_id: str) -> List[Dict]:
+        await self.delay("read")
+        chat = self.chats.get(chat_id)
+        return list(chat['messages']) if chat else []
+
+    async def optimize_history(self, chat_id: str, max_messages: int) -> None:
+        await self.delay("write")
+        chat = self.chats.get(chat_id)
+        if chat and len(chat['messages']) > max_messages + 1:
+            chat['messages'] = [chat['messages'][0]] + chat['messages'][-(max_messages - 1):]
+
+    async def save_partial_response(
+            self, chat_id: str, content: str, status: StreamStatus = StreamStatus.STREAMING
+    ) -> None:
+        await self.delay("write")
+        chat = self.chats.get(chat_id)
+        if chat:
+            chat['partial_response'] = {'content': content, 'status': status.value, 'updated_at': datetime.now()}
+
+    async def clear_partial_response(self, chat_id: str) -> None:
+        await self.delay("write")
+        chat = self.chats.get(chat_id)
+        if chat:
+            chat.pop('partial_response', None)
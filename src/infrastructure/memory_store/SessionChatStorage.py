@@ -0,0 +1,119 @@
+import asyncio
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from src.core.entities.StreamStatus import StreamStatus
+from src.core.entities.user_entites.ListUserPsychStatus import ListUserPsychStatus
+from src.core.interfaces.IChatStorage import IChatStorage
+
+
+class SessionChatStorage(IChatStorage):
+    """Хранилище на время WebSocket-сессии.
+
+    Чат живёт в памяти в пределах хода: в начале хода сессия перечитывает
+    его через refresh, ведь между ходами чат мог продолжить HTTP-запрос
+    или другой воркер. Записи применяются к копии сразу, а в основное
+    хранилище уходят по порядку из фоновой очереди; flush дожидается их.
+    """
+
+    def __init__(self, storage: IChatStorage):
+        self.storage = storage
+        self._chats: Dict[str, Dict] = {}
+        self._writes: asyncio.Queue = asyncio.Queue()
+        self._writer: Optional[asyncio.Task] = None
+
+    async def create_chat(
+            self,
+            list_user_psych_status: Optional[ListUserPsychStatus],
+            max_questions: int,
+            user_id: Optional[int] = None,
+            department: Optional[str] = None
+    ) -> str:
+        chat_id = await self.storage.create_chat(list_user_psych_status, max_questions, user_id, department)
+        await self._load(chat_id)
+        return chat_id
+
+    async def get_chat(self, chat_id: str) -> Optional[Dict]:
+        if chat_id in self._chats:
+            return self._chats[chat_id]
+        return await self._load(chat_id)
+
+    async def add_message(self, chat_id: str, role: str, content: str) -> None:
+        chat = await self.get_chat(chat_id)
+        if chat and chat.get('status') == 'active':
+            chat['messages'].append({"role": role, "content": content, "timestamp": datetime.now()})
+        self._persist(lambda: self.storage.add_message(chat_id, role, content))
+
+    async def increment_question_count(self, chat_id: str) -> None:
+        chat = await self.get_chat(chat_id)
+        if chat:
+            chat['question_count'] += 1
+            if chat['question_count'] >= chat['max_questions']:
+                chat['status'] = 'completed'
+        self._persist(lambda: self.storage.increment_question_count(chat_id))
+
+    async def is_chat_completed(self, chat_id: str) -> bool:
+        chat = await self.get_chat(chat_id)
+        return bool(chat) and chat.get('status') == 'completed'
+
+    async def get_chat_messages(self, chat_id: str) -> List[Dict]:
+        chat = await self.get_chat(chat_id)
+        if not chat:
+            return []
+        return [{"role": msg["role"], "content": msg["content"]} for msg in chat['messages']]
+
+    async def get_chat_messages_with_timestamp(self, chat_id: str) -> List[Dict]:
+        chat = await self.get_chat(chat_id)
+        return chat['messages'] if chat else []
+
+    async def optimize_history(self, chat_id: str, max_messages: int) -> None:
+        chat = await self.get_chat(chat_id)
+        if chat and len(chat['messages']) > max_messages + 1:
+            chat['messages'] = [chat['messages'][0]] + chat['messages'][-(max_messages - 1):]
+            self._persist(lambda: self.storage.optimize_history(chat_id, max_messages))
+
+    async def save_partial_response(
+            self, chat_id: str, content: str, status: StreamStatus = StreamStatus.STREAMING
+    ) -> None:
+        self._persist(lambda: self.storage.save_partial_response(chat_id, content, status))
+
+    async def clear_partial_response(self, chat_id: str) -> None:
+        self._persist(lambda: self.storage.clear_partial_response(chat_id))
+
+    async def refresh(self, chat_id: str) -> Optional[Dict]:
+        """Перечитывает чат из основного хранилища, дописав туда свои записи"""
+        await self.flush()
+        self._chats.pop(chat_id, None)
+        return await self._load(chat_id)
+
+    async def flush(self) -> None:
+        """Дожидается, пока все записи сессии дойдут до основного хранилища"""
+        await self._writes.join()
+
+    async def close(self) -> None:
+        await self.flush()
+        if self._writer:
+            self._writer.cancel()
+            self._writer = None
+
+    async def _load(self, chat_id: str) -> Optional[Dict]:
+        chat = await self.storage.get_chat(chat_id)
+        if chat:
+            chat = dict(chat, messages=list(chat['messages']))
+            self._chats[chat_id] = chat
+        return chat
+
+    def _persist(self, write: Callable[[], Awaitable[None]]) -> None:
+        self._writes.put_nowait(write)
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._write_loop())
+
+    async def _write_loop(self) -> None:
+        while True:
+            write = await self._writes.get()
+            try:
+                await write()
+            except Exception as e:
+                print(f"Error persisting session write: {str(e)}")
+            finally:
+                self._writes.task_done()
@@ -0,0 +1,66 @@
+from typing import Dict, List, Optional
+
+from src.core.entities.StreamStatus import StreamStatus
+from src.core.entities.user_entites.ListUserPsychStatus import ListUserPsychStatus
+from src.core.interfaces.IChatStorage import IChatStorage
+from src.infrastructure.metrics.app_metrics import STORAGE_READ, STORAGE_WRITE
+from src.infrastructure.traffic.TurnTrace import traced
+
+
+class InstrumentedChatStorage(IChatStorage):
+    """Обёртка над хранилищем, замеряющая время чтений и записей"""
+
+    def __init__(self, storage: IChatStorage):
+        self.storage = storage
+
+    def __getattr__(self, name):
+        # Методы вне интерфейса (обслуживание, статистика) отдаём без замеров
+        return getattr(self.storage, name)
+
+    async def create_chat(
+            self,
+            list_user_psych_status: Optional[ListUserPsychStatus],
+            max_questions: int,
+            user_id: Optional[int] = None,
+            department: Optional[str] = None
+    ) -> str:
+        with STORAGE_WRITE.time(), traced("storage_writes"):
+            return await self.storage.create_chat(list_user_psych_status, max_questions, user_id, department)
+
+    async def get_chat(self, chat_id: str) -> Optional[Dict]:
+        with STORAGE_READ.time(), traced("storage_reads"):
+            return await self.storage.get_chat(chat_id)
+
+    async def add_message(self, chat_id: str, role: str, content: str) -> None:
+        with STORAGE_WRITE.time(), traced("storage_writes"):
+            await self.storage.add_message(chat_id, role, content)
+
+    async def increment_question_count(self, chat_id: str) -> None:
+        with STORAGE_WRITE.time(), traced("storage_writes"):
+            await self.storage.increment_question_count(chat_id)
+
+    async def is_chat_completed(self, chat_id: str) -> bool:
+        with STORAGE_READ.time(), traced("storage_reads"):
+            return await self.storage.is_chat_completed(chat_id)
+
+    async def get_chat_messages(self, chat_id: str) -> List[Dict]:
+        with STORAGE_READ.time(), traced("storage_reads"):
+            return await self.storage.get_chat_messages(chat_id)
+
+    async def get_chat_messages_with_timestamp(self, chat_id: str) -> List[Dict]:
+        with STORAGE_READ.time(), traced("storage_reads"):
+            return await self.storage.get_chat_messages_with_timestamp(chat_id)
+
+    async def optimize_history(self, chat_id: str, max_messages: int) -> None:
+        with STORAGE_WRITE.time(), traced("storage_writes"):
+            await self.storage.optimize_history(chat_id, max_messages)
+
+    async def save_partial_response(
+            self, chat_id: str, content: str, status: StreamStatus = StreamStatus.STREAMING
+    ) -> None:
+        with STORAGE_WRITE.time(), traced("storage_writes"):
+            await self.storage.save_partial_response(chat_id, content, status)
+
+    async def clear_partial_response(self, chat_id: str) -> None:
+        with STORAGE_WRITE.time(), traced("storage_writes"):
+            await self.storage.clear_partial_response(chat_id)
@@ -0,0 +1,53 @@
+from dataclasses import dataclass
+from typing import Dict
+
+
+@dataclass
+class StreamStats:
+    """Счётчики потоковой выдачи: брошенные генерации и SSE-кадры"""
+    abandoned_streams: int = 0
+    cancelled_generations: int = 0
+    chunks_before_cancel: int = 0
+
+    frames_sent: int = 0
+    chunks_sent: int = 0
+    flushed_bytes: int = 0
+    max_flush_bytes: int = 0
+    streams_finished: int = 0
+    streaming_seconds: float = 0.0
+
+    def record_abandoned_stream(self) -> None:
+        self.abandoned_streams += 1
+
+    def record_cancelled_generation(self, chunks_received: int) -> None:
+        """chunks_received — чанки, полученные от LLM до отмены (измерено, не оценка)"""
+        self.cancelled_generations += 1
+        self.chunks_before_cancel += chunks_received
+
+    def record_frame(self, chunks: int, size: int) -> None:
+        self.frames_sent += 1
+        self.chunks_sent += chunks
+        self.flushed_bytes += size
+        if size > self.max_flush_bytes:
+            self.max_flush_bytes = size
+
+    def record_stream_duration(self, seconds: float) -> None:
+        self.streams_finished += 1
+        self.streaming_seconds += seconds
+
+    def to_dict(self) -> Dict[str, float]:
+        frames = self.frames_sent or 1
+        return {
+            "abandoned_streams": self.abandoned_streams,
+            "cancelled_generations": self.cancelled_generations,
+            "chunks_before_cancel": self.chunks_before_cancel,
+            "frames_sent": self.frames_sent,
+            "chunks_per_frame": round(self.chunks_sent / frames, 2),
+            "avg_flush_bytes": round(self.flushed_bytes / frames, 1),
+            "max_flush_bytes": self.max_flush_bytes,
+            "frames_per_second": round(self.frames_sent / self.streaming_seconds, 2)
+            if self.streaming_seconds else 0.0,
+        }
+
+
+stream_stats = StreamStats()
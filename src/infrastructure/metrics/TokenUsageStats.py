@@ -0,0 +1,53 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+from src.core.entities.TokenUsage import UNATTRIBUTED, TokenUsage, UsageKey, UsageTotals
+from src.infrastructure.metrics.app_metrics import llm_prompt_tokens, llm_tokens
+
+# (ключ API, chat_id, тип хода) текущего вызова LLM; ставит сценарий опроса
+usage_scope: ContextVar[Optional[Tuple[str, str, str]]] = ContextVar("usage_scope", default=None)
+
+
+@contextmanager
+def attributed(tenant: str, chat_id: str, turn_type: str):
+    """Токены вызовов LLM внутри блока относятся к этому чату и типу хода"""
+    token = usage_scope.set((tenant, chat_id, turn_type))
+    try:
+        yield
+    finally:
+        usage_scope.reset(token)
+
+
+class TokenUsageStats:
+    """Токены LLM процесса: итоги для сводки и приращения до следующего сброса в хранилище"""
+
+    def __init__(self):
+        self.totals: Dict[Tuple[str, str], UsageTotals] = {}
+        self._pending: Dict[UsageKey, UsageTotals] = {}
+
+    def record(self, usage: TokenUsage, seconds: float) -> None:
+        tenant, chat_id, turn_type = usage_scope.get() or (UNATTRIBUTED, UNATTRIBUTED, UNATTRIBUTED)
+        self.totals.setdefault((tenant, turn_type), UsageTotals()).add(usage, seconds)
+        self._pending.setdefault(UsageKey(tenant, chat_id, turn_type), UsageTotals()).add(usage, seconds)
+        llm_tokens.labels(tenant, turn_type, "prompt").inc(usage.prompt_tokens)
+        llm_tokens.labels(tenant, turn_type, "completion").inc(usage.completion_tokens)
+        llm_prompt_tokens.labels(turn_type).observe(usage.prompt_tokens)
+
+    def drain(self) -> Dict[UsageKey, UsageTotals]:
+        pending, self._pending = self._pending, {}
+        return pending
+
+    def restore(self, deltas: Dict[UsageKey, UsageTotals]) -> None:
+        """Возвращает несохранённые приращения, чтобы их забрал следующий сброс"""
+        for key, totals in deltas.items():
+            self._pending.setdefault(key, UsageTotals()).merge(totals)
+
+    def snapshot(self) -> Dict:
+        summary: Dict[str, Dict] = {}
+        for (tenant, turn_type), totals in sorted(self.totals.items()):
+            summary.setdefault(tenant, {})[turn_type] = totals.to_dict()
+        return summary
+
+
+token_usage = TokenUsageStats()
@@ -0,0 +1,103 @@
+from typing import Iterable, Tuple
+
+from src.infrastructure.metrics.MetricsRegistry import MetricsRegistry
+from src.infrastructure.metrics.StreamStats import stream_stats
+
+# Под gunicorn воркеров несколько, и у каждого свой реестр: серии метятся pid
+registry = MetricsRegistry(label_pid=True)
+
+stage_duration = registry.histogram(
+    "burnout_stage_duration_seconds",
+    "Длительность этапов обработки хода опроса",
+    labelnames=("stage",),
+)
+STORAGE_READ = stage_duration.labels("storage_read")
+STORAGE_WRITE = stage_duration.labels("storage_write")
+CLASSIFIER_QUEUE_WAIT = stage_duration.labels("classifier_queue_wait")
+CLASSIFIER_INFERENCE = stage_duration.labels("classifier_inference")
+LLM_TIME_TO_FIRST_TOKEN = stage_duration.labels("llm_time_to_first_token")
+LLM_TOTAL = stage_duration.labels("llm_total")
+TURN_TOTAL = stage_duration.labels("turn_total")
+
+llm_tokens_per_second = registry.histogram(
+    "burnout_llm_stream_tokens_per_second",
+    "Скорость потоковой генерации, чанков (≈токенов) в секунду",
+    buckets=(1, 5, 10, 20, 40, 60, 80, 120, 200),
+)
+
+requests_in_flight = registry.gauge(
+    "burnout_requests_in_flight",
+    "Запросы, которые обрабатываются прямо сейчас",
+    labelnames=("endpoint",),
+)
+
+turns_total = registry.counter(
+    "burnout_turns_total",
+    "Завершённые ходы опроса по типу",
+    labelnames=("kind",),
+)
+QUESTION_TURNS = turns_total.labels("question")
+ANALYSIS_TURNS = turns_total.labels("analysis")
+
+admission_rejected = registry.counter(
+    "burnout_admission_rejected_total",
+    "Запросы, отклонённые контролем допуска",
+    labelnames=("kind", "reason"),
+)
+
+
+tenant_queue_wait = registry.histogram(
+    "burnout_tenant_queue_wait_seconds",
+    "Ожидание места у справедливого планировщика по ключам API",
+    labelnames=("resource", "tenant"),
+)
+
+tenant_requests = registry.counter(
+    "burnout_tenant_requests_total",
+    "Вызовы LLM и классификатора, получившие место, по ключам API",
+    labelnames=("resource", "tenant"),
+)
+
+tenant_queued = registry.gauge(
+    "burnout_tenant_queued",
+    "Вызовы, ожидающие места у справедливого планировщика",
+    labelnames=("resource", "tenant"),
+)
+
+tenant_quota_rejected = registry.counter(
+    "burnout_tenant_quota_rejected_total",
+    "Ходы, отклонённые по квоте ключа API",
+    labelnames=("tenant",),
+)
+
+idempotent_requests = registry.counter(
+    "burnout_idempotent_requests_total",
+    "Запросы с Idempotency-Key: выполнены, дождались идущего хода или получили сохранённый ответ",
+    labelnames=("outcome",),
+)
+
+chat_lease_wait = registry.histogram(
+    "burnout_chat_lease_wait_seconds",
+    "Ожидание очереди хода чата, включая аренду между воркерами",
+)
+
+llm_tokens = registry.counter(
+    "burnout_llm_tokens_total",
+    "Токены LLM по данным провайдера: prompt и completion по ключам API и типам ходов",
+    labelnames=("tenant", "turn_type", "kind"),
+)
+
+llm_prompt_tokens = registry.histogram(
+    "burnout_llm_prompt_tokens",
+    "Размер промпта вызова LLM в токенах",
+    labelnames=("turn_type",),
+    buckets=(250, 500, 1000, 2000, 4000, 8000, 16000, 32000),
+)
+
+
+def _stream_stats_collector() -> Iterable[Tuple[str, str, float]]:
+    for name, value in stream_stats.to_dict().items():
+        yield f"burnout_stream_{name}", "gauge", value
+
+
+registry.add_collector(_stream_stats_collector)
@@ -0,0 +1,28 @@
+from typing import Dict, List
+
+
+def config_key(result: Dict) -> str:
+    return f"{result['backend']}/batch={result['batch_size']}/{result['lengths']}/threads={result['threads']}"
+
+
+def find_regressions(results: List[Dict], baseline: Dict, threshold: float) -> List[str]:
+    """Конфигурации, где пропускная способность упала или p95 вырос больше threshold.
+
+    Сравниваются только конфигурации, которые есть в обоих прогонах;
+    нулевой p95 в базе (слишком быстрая конфигурация) не сравнивается.
+    """
+    previous = {config_key(result): result for result in baseline.get("results", [])}
+    regressions = []
+    for result in results:
+        base = previous.get(config_key(result))
+        if base is None:
+            continue
+        throughput, base_throughput = result["messages_per_second"], base["messages_per_second"]
+        if throughput < base_throughput * (1 - threshold):
+            regressions.append(f"{config_key(result)}: {base_throughput:.1f} -> {throughput:.1f} msg/s "
+                               f"({(throughput / base_throughput - 1) * 100:.0f}%)")
+        p95, base_p95 = result["latency_ms"]["p95"], base["latency_ms"]["p95"]
+        if base_p95 and p95 > base_p95 * (1 + threshold):
+            regressions.append(f"{config_key(result)}: p95 {base_p95:.1f} -> {p95:.1f} ms "
+                               f"(+{(p95 / base_p95 - 1) * 100:.0f}%)")
+    return regressions
@@ -0,0 +1,157 @@
+import math
+from dataclasses import asdict
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import DuplicateKeyError
+
+from src.core.entities.BurnoutResults import (
+    BURNOUT_INDEX_BINS, METRICS, SCALE_LEVELS, BurnoutResult, BurnoutResultRecord, DepartmentWeekRollup, week_start_of
+)
+from src.core.entities.user_entites.Department import Department
+from src.core.interfaces.IBurnoutResultStorage import IBurnoutResultStorage
+
+UNKNOWN_DEPARTMENT = "unknown"
+
+
+class MongoDBBurnoutResultStorage(IBurnoutResultStorage):
+    """Результаты анализа и недельные агрегаты по отделам.
+
+    Агрегаты поддерживаются инкрементально через $inc при каждом новом
+    результате (суммы, суммы квадратов, уровни шкал, гистограмма индекса),
+    поэтому чтение дашборда — выборка документов по _id без агрегаций.
+    Агрегат помнит учтённые chat_id, так что повтор сохранения после сбоя
+    между двумя записями не задваивает его и не теряет результат.
+    """
+
+    def __init__(self, connection_string: str, database_name: str = "burnout_survey"):
+        self.client = AsyncIOMotorClient(connection_string)
+        self.db = self.client[database_name]
+        self.results = self.db["burnout_results"]
+        self.rollups = self.db["burnout_rollups"]
+        self._indexes_created = False
+
+    async def save_result(self, record: BurnoutResultRecord) -> bool:
+        """Сохраняет результат; False, если результат этого чата уже был сохранён"""
+        await self._ensure_indexes()
+        department = record.department or UNKNOWN_DEPARTMENT
+        week_start = week_start_of(record.created_at)
+        try:
+            # Сначала агрегат: $inc применяется только для ещё не учтённого chat_id,
+            # а для учтённого upsert упирается в существующий _id
+            await self.rollups.update_one(
+                {'_id': self._rollup_id(department, week_start), 'chat_ids': {'$ne': record.chat_id}},
+                {
+                    '$setOnInsert': {'department': department, 'week_start': week_start},
+                    '$inc': self._rollup_increment(record.result),
+                    '$push': {'chat_ids': record.chat_id}
+                },
+                upsert=True
+            )
+        except DuplicateKeyError:
+            pass
+
+        try:
+            # _id = chat_id: повторный анализ того же чата не задваивает историю
+            await self.results.insert_one({
+                '_id': record.chat_id,
+                'user_id': record.user_id,
+                'department': department,
+                'created_at': record.created_at,
+                **asdict(record.result)
+            })
+        except DuplicateKeyError:
+            return False
+        return True
+
+    async def get_user_results(self, user_id: int, limit: int = 20) -> List[BurnoutResultRecord]:
+        cursor = self.results.find({'user_id': user_id}).sort('created_at', -1).limit(limit)
+        return [self._to_record(document) async for document in cursor]
+
+    async def get_rollups(
+            self, department: Optional[str], week_starts: List[datetime]
+    ) -> List[DepartmentWeekRollup]:
+        departments = [department] if department else [item.value for item in Department] + [UNKNOWN_DEPARTMENT]
+        ids = [self._rollup_id(name, week_start) for name in departments for week_start in week_starts]
+        cursor = self.rollups.find({'_id': {'$in': ids}}, {'chat_ids': 0})
+        rollups = [self._to_rollup(document) async for document in cursor]
+        rollups.sort(key=lambda rollup: (rollup.department, rollup.week_start))
+        return rollups
+
+    async def iter_results(
+            self, department: Optional[str], since: Optional[datetime], until: Optional[datetime],
+            batch_size: int = 1000
+    ) -> AsyncIterator[BurnoutResultRecord]:
+        query: Dict = {'department': department} if department else {}
+        if since or until:
+            query['created_at'] = {
+                **({'$gte': since} if since else {}),
+                **({'$lt': until} if until else {})
+            }
+        cursor = self.results.find(query, allow_disk_use=True).sort(
+            [('department', 1), ('user_id', 1), ('created_at', 1)]
+        ).batch_size(batch_size)
+        async for document in cursor:
+            yield self._to_record(document)
+
+    @staticmethod
+    def _rollup_id(department: str, week_start: datetime) -> str:
+        return f"{department}:{week_start:%Y-%m-%d}"
+
+    @staticmethod
+    def _rollup_increment(result: BurnoutResult) -> Dict[str, float]:
+        increment: Dict[str, float] = {'count': 1}
+        for metric in METRICS:
+            value = getattr(result, metric)
+            increment[f'sum.{metric}'] = value
+            increment[f'sumsq.{metric}'] = value * value
+        for metric, level in result.levels().items():
+            increment[f'levels.{metric}.{level}'] = 1
+        increment[f'hist.{result.burnout_index_bin()}'] = 1
+        return increment
+
+    @staticmethod
+    def _to_rollup(document: Dict) -> DepartmentWeekRollup:
+        count = document['count']
+        means, stdevs = {}, {}
+        for metric in METRICS:
+            mean = document['sum'][metric] / count
+            variance = max(document['sumsq'][metric] / count - mean * mean, 0.0)
+            means[metric] = round(mean, 3)
+            stdevs[metric] = round(math.sqrt(variance), 3)
+
+        levels = {
+            metric: {level: document.get('levels', {}).get(metric, {}).get(level, 0)
+                     for level in ("low", "medium", "high")}
+            for metric in SCALE_LEVELS
+        }
+        histogram = document.get('hist', {})
+        return DepartmentWeekRollup(
+            department=document['department'],
+            week_start=document['week_start'],
+            count=count,
+            means=means,
+            stdevs=stdevs,
+            levels=levels,
+            burnout_index_histogram=[histogram.get(str(i), 0) for i in range(BURNOUT_INDEX_BINS)]
+        )
+
+    @staticmethod
+    def _to_record(document: Dict) -> BurnoutResultRecord:
+        return BurnoutResultRecord(
+            chat_id=document['_id'],
+            created_at=document['created_at'],
+            user_id=document.get('user_id'),
+            department=document.get('department'),
+            result=BurnoutResult(**{name: document[name] for name in (*METRICS, 'recommendations')})
+        )
+
+    async def _ensure_indexes(self):
+        if self._indexes_created:
+            return
+        await self.results.create_index([('user_id', 1), ('created_at', -1)])
+        await self.results.create_index([('department', 1), ('created_at', -1)])
+        await self.results.create_index([('created_at', -1)])
+        await self.results.create_index([('department', 1), ('user_id', 1), ('created_at', 1)])
+        self._indexes_created = True
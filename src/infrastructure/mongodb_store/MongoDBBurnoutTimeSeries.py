@@ -0,0 +1,77 @@
+from datetime import datetime
+from typing import List, Optional
+
+import numpy as np
+from bson import Binary
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from src.core.entities.BurnoutTimeSeries import EMOTION_DTYPE, SCORE_DTYPE, BurnoutTrend, compute_trend
+from src.core.interfaces.IBurnoutTimeSeries import IBurnoutTimeSeries
+
+
+def pack_rows(moment: datetime, vectors: List[List[float]], dtype: np.dtype) -> bytes:
+    """Строки фиксированной ширины: float64 время + float32 вектор"""
+    rows = np.empty(len(vectors), dtype=dtype)
+    rows["t"] = moment.timestamp()
+    rows["v"] = vectors
+    return rows.tobytes()
+
+
+def unpack_rows(chunks: List[bytes], dtype: np.dtype) -> np.ndarray:
+    rows = np.frombuffer(b"".join(chunks), dtype=dtype)
+    return rows[np.argsort(rows["t"], kind="stable")]
+
+
+class MongoDBBurnoutTimeSeries(IBurnoutTimeSeries):
+    """Ряды MBI и эмоций пользователя: документ на пользователя и месяц.
+
+    Каждое добавление — $push одного Binary со строками фиксированной
+    ширины (24 байта на результат, 48 на вектор эмоций), без перезаписи
+    документа. Чтение последних N идёт по месяцам от свежих к старым.
+    """
+
+    def __init__(self, connection_string: str, database_name: str = "burnout_survey"):
+        self.client = AsyncIOMotorClient(connection_string)
+        self.db = self.client[database_name]
+        self.series = self.db["burnout_timeseries"]
+        self._indexes_created = False
+
+    async def append_scores(self, user_id: int, moment: datetime, scores: List[float]) -> None:
+        await self._append(user_id, moment, "scores", pack_rows(moment, [scores], SCORE_DTYPE))
+
+    async def append_emotions(self, user_id: int, moment: datetime, vectors: List[List[float]]) -> None:
+        if vectors:
+            await self._append(user_id, moment, "emotions", pack_rows(moment, vectors, EMOTION_DTYPE))
+
+    async def last_scores(self, user_id: int, n: int) -> np.ndarray:
+        chunks: List[bytes] = []
+        collected = 0
+        cursor = self.series.find({'user_id': user_id}, {'scores': 1}).sort('month', -1)
+        async for document in cursor:
+            month_chunks = [bytes(chunk) for chunk in document.get('scores', [])]
+            chunks = month_chunks + chunks
+            collected += sum(len(chunk) for chunk in month_chunks) // SCORE_DTYPE.itemsize
+            if collected >= n:
+                break
+        return unpack_rows(chunks, SCORE_DTYPE)[-n:]
+
+    async def get_trend(self, user_id: int, n: int = 12) -> Optional[BurnoutTrend]:
+        rows = await self.last_scores(user_id, n)
+        if not len(rows):
+            return None
+        return compute_trend(rows)
+
+    async def _append(self, user_id: int, moment: datetime, field: str, packed: bytes):
+        await self._ensure_indexes()
+        month = f"{moment:%Y-%m}"
+        await self.series.update_one(
+            {'_id': f"{user_id}:{month}"},
+            {'$setOnInsert': {'user_id': user_id, 'month': month}, '$push': {field: Binary(packed)}},
+            upsert=True
+        )
+
+    async def _ensure_indexes(self):
+        if self._indexes_created:
+            return
+        await self.series.create_index([('user_id', 1), ('month', -1)])
+        self._indexes_created = True
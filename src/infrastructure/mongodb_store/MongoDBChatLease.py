@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import DuplicateKeyError
+
+from src.core.interfaces.IChatLease import IChatLease
+
+
+class MongoDBChatLease(IChatLease):
+    """Аренда — документ {_id: имя, owner, expires_at}.
+
+    Взять можно свободную, просроченную или свою аренду; занятая другим
+    владельцем не находится фильтром, и upsert падает на уникальном _id.
+    Просроченные документы удаляет TTL-индекс.
+    """
+
+    def __init__(self, connection_string: str, database_name: str = "burnout_survey"):
+        self.client = AsyncIOMotorClient(connection_string)
+        self.leases = self.client[database_name]["chat_leases"]
+        self._indexes_created = False
+
+    async def acquire(self, name: str, owner: str, ttl: float) -> bool:
+        await self._ensure_indexes()
+        now = datetime.utcnow()
+        try:
+            await self.leases.update_one(
+                {'_id': name, '$or': [{'owner': owner}, {'expires_at': {'$lte': now}}]},
+                {'$set': {'owner': owner, 'expires_at': now + timedelta(seconds=ttl)}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            return False
+        return True
+
+    async def release(self, name: str, owner: str) -> None:
+        await self.leases.delete_one({'_id': name, 'owner': owner})
+
+    async def _ensure_indexes(self):
+        if self._indexes_created:
+            return
+        await self.leases.create_index([('expires_at', 1)], expireAfterSeconds=0)
+        self._indexes_created = True
@@ -2,15 +2,30 @@ from typing import Optional, Dict, List
 import uuid
 from datetime import datetime
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure
 from src.application.use_cases.QueryLLMUseCase import IChatStorage
-from src.core.entities.user_entites.ListUserPsychStatus import ListUserPsychStatus
+from src.core.entities.StreamStatus import StreamStatus
+from src.core.interfaces.IBurnoutTimeSeries import IBurnoutTimeSeries
+from src.core.entities.user_entites.ListUserPsychStatus import (
+    ListUserPsychStatus, CONTEXT_MAX_CHARS, CONTEXT_MAX_RECENT
+)
+from src.infrastructure.batching.MicroBatcher import MicroBatcher
 
 
 class MongoDBChatStorage(IChatStorage):
-    def __init__(self, connection_string: str, database_name: str = "burnout_survey"):
+    def __init__(self, connection_string: str, database_name: str = "burnout_survey",
+                 context_max_chars: int = CONTEXT_MAX_CHARS, context_max_recent: int = CONTEXT_MAX_RECENT,
+                 history: Optional[IBurnoutTimeSeries] = None):
         self.client = AsyncIOMotorClient(connection_string)
         self.db = self.client[database_name]
         self.chats = self.db["chat_sessions"]
+        # Обновления от конкурентных запросов уходят общим неупорядоченным bulk_write:
+        # записи одного чата идут по очереди и в один батч не попадают
+        self._writes = MicroBatcher(self._bulk_write, max_batch_size=500)
+        self.context_max_chars = context_max_chars
+        self.context_max_recent = context_max_recent
+        self.history = history
 
         self.system_prompt = """
         Ты — психолог компании СДЭК, проводящий диагностику профессионального выгорания по методике MBI.
@@ -24,9 +39,26 @@ class MongoDBChatStorage(IChatStorage):
         Начни с первого вопроса.
     """
 
-    async def create_chat(self, list_user_psych_status: ListUserPsychStatus, max_questions: int) -> str:
+    async def create_chat(
+            self,
+            list_user_psych_status: Optional[ListUserPsychStatus],
+            max_questions: int,
+            user_id: Optional[int] = None,
+            department: Optional[str] = None
+    ) -> str:
         chat_id = str(uuid.uuid4())
-        full_prompt = f"{self.system_prompt} \nЕщё учитывай контекст: {await list_user_psych_status.to_string()}" if list_user_psych_status is not None else self.system_prompt
+        contexts = []
+        if list_user_psych_status is not None:
+            contexts.append(list_user_psych_status.render_context(self.context_max_chars, self.context_max_recent))
+        if user_id is not None and self.history is not None:
+            # История с сервера: клиенту не нужно присылать прошлые статусы
+            trend = await self.history.get_trend(user_id)
+            if trend is not None:
+                contexts.append(trend.render())
+        full_prompt = self.system_prompt
+        if contexts:
+            context = "\n".join(contexts)
+            full_prompt = f"{self.system_prompt} \nЕщё учитывай контекст: {context}"
         chat_session = {
             '_id': chat_id,
             'created_at': datetime.now(),
@@ -39,7 +71,9 @@ class MongoDBChatStorage(IChatStorage):
             ],
             'question_count': 0,
             'max_questions': max_questions,
-            'status': 'active'
+            'status': 'active',
+            'user_id': user_id,
+            'department': department
         }
 
         await self.chats.insert_one(chat_session)
@@ -56,25 +90,28 @@ class MongoDBChatStorage(IChatStorage):
             "timestamp": datetime.now()
         }
 
-        await self.chats.update_one(
+        await self._update(
             {'_id': chat_id, 'status': 'active'},
             {'$push': {'messages': message}}
         )
 
     async def increment_question_count(self, chat_id: str):
-        chat = await self.get_chat(chat_id)
-        if chat:
-            new_count = chat['question_count'] + 1 # Увеличение
-            update_data = {'$set': {'question_count': new_count}}
-
-            if new_count >= chat['max_questions']:
-                update_data['$set']['status'] = 'completed'
-                await self._schedule_chat_deletion(chat_id)
-
-            await self.chats.update_one(
-                {'_id': chat_id},
-                update_data
-            )
+        """Атомарный $inc со сменой статуса в том же обновлении: конкурентные ходы не теряют счёт"""
+        # Не через bulk_write: нужен документ после обновления. Предыдущие записи хода
+        # к этому моменту уже применены, submit ждёт их bulk_write
+        chat = await self.chats.find_one_and_update(
+            {'_id': chat_id},
+            [
+                {'$set': {'question_count': {'$add': ['$question_count', 1]}}},
+                {'$set': {'status': {'$cond': [
+                    {'$gte': ['$question_count', '$max_questions']}, 'completed', '$status'
+                ]}}}
+            ],
+            projection={'status': 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if chat and chat['status'] == 'completed':
+            await self._schedule_chat_deletion(chat_id)
 
     async def is_chat_completed(self, chat_id: str) -> bool:
         chat = await self.get_chat(chat_id)
@@ -107,11 +144,50 @@ class MongoDBChatStorage(IChatStorage):
             # Оставляем системное сообщение и последние N сообщений
             optimized_messages = [chat['messages'][0]] + chat['messages'][-(max_messages - 1):]
 
-            await self.chats.update_one(
+            await self._update(
                 {'_id': chat_id},
                 {'$set': {'messages': optimized_messages}}
             )
 
+    async def save_partial_response(
+            self, chat_id: str, content: str, status: StreamStatus = StreamStatus.STREAMING
+    ):
+        """Сохраняет недописанный ответ ассистента вместе со статусом генерации"""
+        await self._update(
+            {'_id': chat_id},
+            {'$set': {'partial_response': {
+                'content': content,
+                'status': status.value,
+                'updated_at': datetime.now()
+            }}}
+        )
+
+    async def clear_partial_response(self, chat_id: str):
+        await self._update(
+            {'_id': chat_id},
+            {'$unset': {'partial_response': ''}}
+        )
+
+    async def _update(self, filter_: Dict, update: Dict):
+        await self._writes.submit(UpdateOne(filter_, update))
+
+    async def _bulk_write(self, operations: List[UpdateOne]) -> List[Optional[Exception]]:
+        """Ошибка одной операции не мешает остальным и достаётся только её автору"""
+        results: List[Optional[Exception]] = [None] * len(operations)
+        try:
+            await self.chats.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            if e.details.get("writeConcernErrors"):
+                raise
+            for error in e.details.get("writeErrors", []):
+                results[error["index"]] = OperationFailure(error.get("errmsg"), error.get("code"), error)
+        return results
+
+    async def close(self) -> None:
+        """Дожидается отправки накопленных записей и закрывает клиент"""
+        await self._writes.drain()
+        self.client.close()
+
     async def _schedule_chat_deletion(self, chat_id: str):
         """Планирует удаление завершенного чата через 1 час"""
         import asyncio
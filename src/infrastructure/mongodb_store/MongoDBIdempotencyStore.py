@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from src.core.interfaces.IIdempotencyStore import IIdempotencyStore
+
+
+class MongoDBIdempotencyStore(IIdempotencyStore):
+    """Ответы по ключу идемпотентности; просроченные удаляет TTL-индекс"""
+
+    def __init__(self, connection_string: str, database_name: str = "burnout_survey"):
+        self.client = AsyncIOMotorClient(connection_string)
+        self.responses = self.client[database_name]["idempotent_responses"]
+        self._indexes_created = False
+
+    async def get(self, key: str) -> Optional[Dict]:
+        # TTL-монитор удаляет раз в минуту: просроченное отсекаем сами
+        return await self.responses.find_one(
+            {'_id': key, 'expires_at': {'$gt': datetime.utcnow()}},
+            {'_id': 0, 'fingerprint': 1, 'response': 1}
+        )
+
+    async def put(self, key: str, record: Dict, ttl: float) -> None:
+        await self._ensure_indexes()
+        await self.responses.replace_one(
+            {'_id': key},
+            {**record, 'expires_at': datetime.utcnow() + timedelta(seconds=ttl)},
+            upsert=True
+        )
+
+    async def _ensure_indexes(self):
+        if self._indexes_created:
+            return
+        await self.responses.create_index([('expires_at', 1)], expireAfterSeconds=0)
+        self._indexes_created = True
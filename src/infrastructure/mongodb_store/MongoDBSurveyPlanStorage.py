@@ -0,0 +1,68 @@
+from dataclasses import asdict
+from datetime import datetime
+from typing import List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from src.core.entities.SurveyPlan import LoadPoint, ScheduledSurvey, SurveyPlan
+from src.core.interfaces.ISurveyPlanStorage import ISurveyPlanStorage
+
+
+class MongoDBSurveyPlanStorage(ISurveyPlanStorage):
+    """План хранится сводкой с кривой нагрузки, приглашения — отдельными документами"""
+
+    def __init__(self, connection_string: str, database_name: str = "burnout_survey"):
+        self.client = AsyncIOMotorClient(connection_string)
+        self.db = self.client[database_name]
+        self.plans = self.db["survey_plans"]
+        self.invitations = self.db["survey_invitations"]
+        self._indexes_created = False
+
+    async def save_plan(self, plan: SurveyPlan) -> None:
+        await self._ensure_indexes()
+        await self.plans.insert_one({
+            '_id': plan.plan_id,
+            'week_start': plan.week_start,
+            'created_at': plan.created_at,
+            'slot_minutes': plan.slot_minutes,
+            'tokens_per_minute_capacity': plan.tokens_per_minute_capacity,
+            'analyses_per_minute_capacity': plan.analyses_per_minute_capacity,
+            'load': [asdict(point) for point in plan.load],
+            'unscheduled_user_ids': plan.unscheduled_user_ids,
+            'surveys_count': len(plan.surveys)
+        })
+        if plan.surveys:
+            # Десятки тысяч приглашений не помещаются в один документ (лимит 16 МБ)
+            await self.invitations.insert_many(
+                [{'plan_id': plan.plan_id, **asdict(survey)} for survey in plan.surveys],
+                ordered=False
+            )
+
+    async def get_latest_plan(self) -> Optional[SurveyPlan]:
+        document = await self.plans.find_one(sort=[('created_at', -1)])
+        if not document:
+            return None
+        return SurveyPlan(
+            plan_id=document['_id'],
+            week_start=document['week_start'],
+            created_at=document['created_at'],
+            slot_minutes=document['slot_minutes'],
+            tokens_per_minute_capacity=document['tokens_per_minute_capacity'],
+            analyses_per_minute_capacity=document['analyses_per_minute_capacity'],
+            load=[LoadPoint(**point) for point in document['load']],
+            unscheduled_user_ids=document['unscheduled_user_ids']
+        )
+
+    async def get_due_surveys(self, plan_id: str, start: datetime, end: datetime) -> List[ScheduledSurvey]:
+        cursor = self.invitations.find(
+            {'plan_id': plan_id, 'start': {'$gte': start, '$lt': end}},
+            {'_id': 0, 'plan_id': 0}
+        ).sort('start', 1)
+        return [ScheduledSurvey(**document) async for document in cursor]
+
+    async def _ensure_indexes(self):
+        if self._indexes_created:
+            return
+        await self.plans.create_index([('created_at', -1)])
+        await self.invitations.create_index([('plan_id', 1), ('start', 1)])
+        self._indexes_created = True
@@ -0,0 +1,86 @@
+from datetime import datetime
+from typing import Dict, List
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+from src.core.entities.TokenUsage import UsageKey, UsageTotals
+from src.core.interfaces.ITokenUsageStorage import ITokenUsageStorage
+
+FIELDS = ("calls", "prompt_tokens", "completion_tokens", "llm_seconds")
+
+
+class MongoDBTokenUsageStorage(ITokenUsageStorage):
+    """Токены по чатам (документ на чат, поля по типам ходов) и дневные агрегаты ключ API × тип хода.
+
+    Воркеры сбрасывают приращения через $inc, поэтому записи разных
+    процессов складываются без чтения.
+    """
+
+    def __init__(self, connection_string: str, database_name: str = "burnout_survey"):
+        self.client = AsyncIOMotorClient(connection_string)
+        self.db = self.client[database_name]
+        self.chats = self.db["llm_usage_chats"]
+        self.daily = self.db["llm_usage_daily"]
+        self._indexes_created = False
+
+    async def add_usage(self, deltas: Dict[UsageKey, UsageTotals], moment: datetime) -> None:
+        await self._ensure_indexes()
+        day = datetime(moment.year, moment.month, moment.day)
+        daily: Dict[tuple, UsageTotals] = {}
+        chat_updates: List[UpdateOne] = []
+        for key, totals in deltas.items():
+            daily.setdefault((key.tenant, key.turn_type), UsageTotals()).merge(totals)
+            chat_updates.append(UpdateOne(
+                {'_id': key.chat_id},
+                {
+                    '$inc': {
+                        'total_tokens': totals.total_tokens,
+                        **{f'{key.turn_type}.{field}': getattr(totals, field) for field in FIELDS}
+                    },
+                    '$set': {'tenant': key.tenant, 'updated_at': moment}
+                },
+                upsert=True
+            ))
+
+        await self.chats.bulk_write(chat_updates, ordered=False)
+        await self.daily.bulk_write([
+            UpdateOne(
+                {'day': day, 'tenant': tenant, 'turn_type': turn_type},
+                {'$inc': {field: getattr(totals, field) for field in FIELDS}},
+                upsert=True
+            )
+            for (tenant, turn_type), totals in daily.items()
+        ], ordered=False)
+
+    async def get_summary(self, since: datetime, top_chats: int = 20) -> Dict:
+        day = datetime(since.year, since.month, since.day)
+        rows = await self.daily.aggregate([
+            {'$match': {'day': {'$gte': day}}},
+            {'$group': {
+                '_id': {'tenant': '$tenant', 'turn_type': '$turn_type'},
+                **{field: {'$sum': f'${field}'} for field in FIELDS}
+            }}
+        ]).to_list(None)
+
+        summary: Dict[str, Dict] = {}
+        for row in rows:
+            totals = UsageTotals(**{field: row[field] for field in FIELDS})
+            summary.setdefault(row['_id']['tenant'], {})[row['_id']['turn_type']] = totals.to_dict()
+
+        cursor = self.chats.find({'updated_at': {'$gte': since}}).sort('total_tokens', -1).limit(top_chats)
+        return {
+            "since": since.isoformat(),
+            "tenants": summary,
+            "top_chats": [
+                {'chat_id': chat['_id'], 'tenant': chat.get('tenant'), 'total_tokens': chat['total_tokens']}
+                async for chat in cursor
+            ]
+        }
+
+    async def _ensure_indexes(self):
+        if self._indexes_created:
+            return
+        await self.daily.create_index([('day', 1), ('tenant', 1), ('turn_type', 1)], unique=True)
+        await self.chats.create_index([('updated_at', -1), ('total_tokens', -1)])
+        self._indexes_created = True
@@ -0,0 +1,84 @@
+import cProfile
+import io
+import pstats
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Callable, Optional
+
+PROFILE_REQUEST_HEADER = b"x-profile-request"
+API_KEY_HEADER = b"x-api-key"
+
+
+class ProfileStore:
+    """Последние сводки cProfile по отдельным запросам"""
+
+    def __init__(self, max_profiles: int = 20):
+        self.max_profiles = max_profiles
+        self._profiles: "OrderedDict[str, str]" = OrderedDict()
+
+    def put(self, profile_id: str, summary: str) -> None:
+        self._profiles[profile_id] = summary
+        while len(self._profiles) > self.max_profiles:
+            self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[str]:
+        return self._profiles.get(profile_id)
+
+
+class RequestProfilerMiddleware:
+    """ASGI middleware: cProfile для одного запроса с заголовком X-Profile-Request.
+
+    Профиль снимается с потока event loop, поэтому в него попадает и всё,
+    что loop выполнял параллельно. Id сводки возвращается в X-Profile-Id,
+    сама сводка доступна через /admin/profiles/{id}. Без заголовка
+    запрос проходит напрямую.
+    """
+
+    def __init__(self, app, store: ProfileStore, is_authorized: Callable[[str], bool], top: int = 40):
+        self.app = app
+        self.store = store
+        self.is_authorized = is_authorized
+        self.top = top
+        self._active = threading.Lock()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        # Одновременно активен только один cProfile на процесс
+        if not self._active.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+        profiler = cProfile.Profile()
+
+        async def send_with_header(message):
+            if message["type"] == "http.response.start":
+                message = dict(message)
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-id", profile_id.encode())
+                ]
+            await send(message)
+
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_with_header)
+        finally:
+            profiler.disable()
+            self._active.release()
+            self.store.put(profile_id, self._summarize(profiler))
+
+    def _wants_profile(self, scope) -> bool:
+        headers = dict(scope.get("headers") or ())
+        if PROFILE_REQUEST_HEADER not in headers:
+            return False
+        return self.is_authorized(headers.get(API_KEY_HEADER, b"").decode())
+
+    def _summarize(self, profiler: cProfile.Profile) -> str:
+        output = io.StringIO()
+        stats = pstats.Stats(profiler, stream=output)
+        stats.sort_stats("cumulative").print_stats(self.top)
+        return output.getvalue()
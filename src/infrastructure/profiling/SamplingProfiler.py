@@ -0,0 +1,51 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ",")
+
+
+class SamplingProfiler:
+    """Сэмплирующий профилировщик всех потоков процесса.
+
+    Раз в interval снимает стеки через sys._current_frames(): и поток
+    event loop, и потоки executor'а. Результат — collapsed stacks,
+    которые напрямую принимает flamegraph.pl / speedscope.
+    Пока профилировщик не запущен, он ничего не стоит.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples_taken = 0
+
+    def sample(self, duration: float) -> str:
+        """Блокирующий сбор сэмплов; вызывать из отдельного потока"""
+        own_ident = threading.get_ident()
+        stacks: Counter = Counter()
+        deadline = time.monotonic() + duration
+
+        while time.monotonic() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                labels.append(names.get(ident, f"thread-{ident}"))
+                stacks[";".join(reversed(labels))] += 1
+            self.samples_taken += 1
+            time.sleep(self.interval)
+
+        return self.to_collapsed(stacks)
+
+    @staticmethod
+    def to_collapsed(stacks: Dict[str, int]) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(stacks.items()))
@@ -0,0 +1,22 @@
+from typing import Dict, List
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+
+class MongoReanalysisSink:
+    """Результаты перерасчёта: документ на (run_id, chat_id), запись одним bulk_write на батч"""
+
+    def __init__(self, connection_string: str, database_name: str = "burnout_survey"):
+        self.client = AsyncIOMotorClient(connection_string)
+        self.results = self.client[database_name]["chat_reanalysis"]
+
+    async def write(self, records: List[Dict]) -> None:
+        if not records:
+            return
+        # upsert по _id: повтор батча после возобновления не создаёт дублей
+        await self.results.bulk_write(
+            [UpdateOne({'_id': f"{record['run_id']}:{record['chat_id']}"}, {'$set': record}, upsert=True)
+             for record in records],
+            ordered=False
+        )
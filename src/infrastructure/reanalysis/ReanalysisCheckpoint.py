@@ -0,0 +1,33 @@
+import json
+import os
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Optional
+
+
+@dataclass
+class ReanalysisCheckpoint:
+    run_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    source: str = ""
+    position: Optional[str] = None
+    chats: int = 0
+    messages: int = 0
+    analyses: int = 0
+    started_at: str = field(default_factory=lambda: datetime.now().isoformat())
+
+    @classmethod
+    def load(cls, path: str) -> Optional["ReanalysisCheckpoint"]:
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as file:
+            return cls(**json.load(file))
+
+    def save(self, path: str) -> None:
+        """Атомарная запись: при падении на диске остаётся прошлый checkpoint"""
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(asdict(self), file, ensure_ascii=False)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, path)
@@ -0,0 +1,37 @@
+import json
+from typing import AsyncGenerator, Dict, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+ChatWithPosition = Tuple[str, Dict]
+
+
+async def iter_mongo_chats(
+        collection: AsyncIOMotorCollection,
+        after_id: Optional[str] = None,
+        batch_size: int = 1000
+) -> AsyncGenerator[ChatWithPosition, None]:
+    """Чаты в порядке _id; позиция для возобновления — _id последнего чата"""
+    query = {'_id': {'$gt': after_id}} if after_id else {}
+    projection = {'messages.role': 1, 'messages.content': 1, 'user_id': 1, 'department': 1}
+    cursor = collection.find(query, projection).sort('_id', 1).batch_size(batch_size)
+    async for chat in cursor:
+        yield str(chat['_id']), chat
+
+
+async def iter_archive_chats(path: str, after_offset: Optional[str] = None) -> AsyncGenerator[ChatWithPosition, None]:
+    """Чаты из JSONL-архива (по документу на строку); позиция — смещение в байтах после строки"""
+    with open(path, 'rb') as archive:
+        if after_offset:
+            archive.seek(int(after_offset))
+        while True:
+            line = archive.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            chat = json.loads(line)
+            if isinstance(chat.get('_id'), dict):
+                # mongoexport пишет {"_id": {"$oid": ...}}
+                chat['_id'] = next(iter(chat['_id'].values()))
+            yield str(archive.tell()), chat
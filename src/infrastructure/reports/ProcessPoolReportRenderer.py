@@ -0,0 +1,45 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Union
+
+from src.core.entities.BurnoutReports import DepartmentReport, EmployeeReport
+
+_worker_template = None
+
+
+def _init_worker(template_path: Optional[str]) -> None:
+    """Разбирает шаблон один раз на процесс"""
+    global _worker_template
+    from src.infrastructure.reports.docx_reports import DocxTemplate
+
+    _worker_template = DocxTemplate(template_path)
+
+
+def _render_in_worker(report: Union[EmployeeReport, DepartmentReport]) -> bytes:
+    from src.infrastructure.reports.docx_reports import render_department_report, render_employee_report
+
+    if isinstance(report, DepartmentReport):
+        return render_department_report(_worker_template, report)
+    return render_employee_report(_worker_template, report)
+
+
+class ProcessPoolReportRenderer:
+    """Рендер DOCX-отчётов в пуле процессов: python-docx и lxml держат GIL"""
+
+    def __init__(self, workers: int, template_path: Optional[str] = None):
+        self.workers = max(1, workers)
+        # spawn: не наследуем клиента Mongo и event loop родителя
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(template_path,)
+        )
+
+    async def render(self, report: Union[EmployeeReport, DepartmentReport]) -> bytes:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.pool, _render_in_worker, report)
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,110 @@
+import copy
+import io
+from typing import Optional
+
+from docx import Document
+
+from src.core.entities.BurnoutReports import DepartmentReport, EmployeeReport
+from src.core.entities.BurnoutResults import SCALE_LEVELS
+
+SCALE_TITLES = {
+    "emotional_exhaustion": "Эмоциональное истощение",
+    "depersonalization": "Деперсонализация",
+    "reduction_of_achievements": "Редукция проф. достижений",
+    "burnout_index": "Индекс выгорания",
+}
+LEVEL_TITLES = {"low": "низкий", "medium": "средний", "high": "высокий"}
+
+
+class DocxTemplate:
+    """Шаблон DOCX, разобранный один раз; каждый отчёт пишется в тот же документ.
+
+    Между отчётами тело документа возвращается к копии тела шаблона,
+    а стили, нумерация и колонтитулы остаются разобранными.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.document = Document(path)
+        self._body = self.document.element.body
+        self._pristine = copy.deepcopy(self._body)
+        # В своём шаблоне может не быть стилей шаблона python-docx по умолчанию
+        self.styles = {style.name for style in self.document.styles}
+        self.table_style = "Table Grid" if "Table Grid" in self.styles else None
+
+    def fresh(self):
+        for child in list(self._body):
+            self._body.remove(child)
+        for child in self._pristine:
+            self._body.append(copy.deepcopy(child))
+        return self.document
+
+    def to_bytes(self) -> bytes:
+        buffer = io.BytesIO()
+        self.document.save(buffer)
+        return buffer.getvalue()
+
+    def paragraph(self, text: str, style: Optional[str] = None):
+        return self.document.add_paragraph(text, style=style if style in self.styles else None)
+
+    def table(self, header: list):
+        table = self.document.add_table(rows=1, cols=len(header))
+        if self.table_style:
+            table.style = self.table_style
+        for cell, title in zip(table.rows[0].cells, header):
+            cell.text = title
+        return table
+
+
+def render_employee_report(template: DocxTemplate, report: EmployeeReport) -> bytes:
+    document = template.fresh()
+    document.add_heading(f"Отчёт о профессиональном выгорании: сотрудник {report.user_id}", level=1)
+    template.paragraph(f"Отдел: {report.department}. Период: {report.period.describe()}. "
+                           f"Опросов: {len(report.records)}.")
+
+    table = template.table(["Дата", *SCALE_TITLES.values()])
+    for record in report.records:
+        result = record.result
+        cells = table.add_row().cells
+        cells[0].text = f"{record.created_at:%d.%m.%Y}"
+        cells[1].text = str(result.emotional_exhaustion)
+        cells[2].text = str(result.depersonalization)
+        cells[3].text = str(result.reduction_of_achievements)
+        cells[4].text = f"{result.burnout_index:.2f}"
+
+    latest = report.records[-1].result
+    document.add_heading("Уровни по последнему опросу", level=2)
+    for metric, level in latest.levels().items():
+        template.paragraph(f"{SCALE_TITLES[metric]}: {LEVEL_TITLES[level]}", "List Bullet")
+    if latest.recommendations:
+        document.add_heading("Рекомендации", level=2)
+        for recommendation in latest.recommendations:
+            template.paragraph(recommendation, "List Number")
+    return template.to_bytes()
+
+
+def render_department_report(template: DocxTemplate, report: DepartmentReport) -> bytes:
+    document = template.fresh()
+    document.add_heading(f"Сводный отчёт о выгорании: отдел {report.department}", level=1)
+    template.paragraph(f"Период: {report.period.describe()}. Сотрудников: {len(report.employees)}, "
+                           f"опросов: {report.surveys}.")
+
+    document.add_heading("Средние по последним результатам сотрудников", level=2)
+    table = template.table(["Шкала", "Среднее", *LEVEL_TITLES.values()])
+    for metric, title in SCALE_TITLES.items():
+        cells = table.add_row().cells
+        cells[0].text = title
+        cells[1].text = f"{report.means.get(metric, 0.0):.2f}"
+        if metric in SCALE_LEVELS:
+            for cell, level in zip(cells[2:], LEVEL_TITLES):
+                cell.text = str(report.levels[metric][level])
+
+    document.add_heading("Сотрудники по индексу выгорания", level=2)
+    table = template.table(["Сотрудник", "Опросов", "Последний опрос", "Индекс", "Истощение"])
+    for employee in report.employees:
+        cells = table.add_row().cells
+        cells[0].text = str(employee.user_id)
+        cells[1].text = str(employee.surveys)
+        cells[2].text = f"{employee.last_survey:%d.%m.%Y}"
+        cells[3].text = f"{employee.burnout_index:.2f}"
+        cells[4].text = LEVEL_TITLES[employee.levels["emotional_exhaustion"]]
+    return template.to_bytes()
@@ -0,0 +1,86 @@
+import json
+from dataclasses import asdict, is_dataclass
+from typing import Any, Optional
+
+from src.core.entities.QueryEntities import LLMResponse, LLMStreamResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson опционален
+    orjson = None
+
+
+def dumps(obj: Any) -> bytes:
+    """JSON сразу в bytes: orjson, если установлен, иначе stdlib"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    if is_dataclass(obj):
+        obj = asdict(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def encode_response(response: LLMResponse) -> bytes:
+    return dumps(response)
+
+
+def encode_stream_chunk(chunk: LLMStreamResponse) -> bytes:
+    """Чанк без SSE-обвязки, например для WebSocket-кадра"""
+    return dumps({
+        "content": chunk.content_chunk,
+        "chat_id": chunk.chat_id,
+        "is_completed": chunk.is_completed,
+        "question_count": chunk.question_count,
+        "total_questions": chunk.total_questions,
+        "is_final_chunk": chunk.is_final_chunk,
+        "is_analysis": chunk.is_analysis,
+    })
+
+
+_BOOLS = {True: b"true", False: b"false"}
+
+
+class SSEFrameEncoder:
+    """Кодирует LLMStreamResponse в SSE-кадры одного запроса.
+
+    chat_id и total_questions не меняются в пределах запроса, поэтому
+    их часть JSON кодируется один раз, а на каждый кадр кодируется
+    только текст чанка.
+    """
+
+    def __init__(self):
+        self._prefix_key: Optional[tuple] = None
+        self._prefix = b""
+
+    def encode(self, chunk: LLMStreamResponse) -> bytes:
+        key = (chunk.chat_id, chunk.total_questions)
+        if key != self._prefix_key:
+            self._prefix_key = key
+            self._prefix = (
+                b'{"chat_id":' + dumps(chunk.chat_id)
+                + b',"total_questions":' + str(chunk.total_questions).encode()
+                + b',"content":'
+            )
+
+        id_line = b"id: " + chunk.event_id.encode() + b"\n" if chunk.event_id else b""
+        return b"".join((
+            id_line,
+            b"data: ",
+            self._prefix,
+            dumps(chunk.content_chunk),
+            b',"is_completed":', _BOOLS[bool(chunk.is_completed)],
+            b',"question_count":', str(chunk.question_count).encode(),
+            b',"is_final_chunk":', _BOOLS[bool(chunk.is_final_chunk)],
+            b"}\n\n",
+        ))
+
+    @staticmethod
+    def encode_error(message: str) -> bytes:
+        return b"data: " + dumps({
+            "content": message,
+            "chat_id": "",
+            "is_completed": True,
+            "question_count": 0,
+            "total_questions": 0,
+            "is_final_chunk": True,
+            "error": True
+        }) + b"\n\n"
@@ -0,0 +1,55 @@
+import time
+from typing import Any, AsyncGenerator
+
+from src.core.interfaces.IEmotionalClassification import IEmotionalClassification
+from src.core.interfaces.ILLMProvider import ILLMProvider
+from src.infrastructure.traffic.TurnTrace import LLMCallTrace, current_trace, traced
+
+
+class RecordingLLMProvider(ILLMProvider):
+    """Пишет в трассу хода длительность, время до первого чанка и размер ответа LLM"""
+
+    def __init__(self, provider: ILLMProvider):
+        self.provider = provider
+
+    def __getattr__(self, name):
+        return getattr(self.provider, name)
+
+    async def generate_response(self, messages: list) -> str:
+        started = time.perf_counter()
+        response = await self.provider.generate_response(messages)
+        trace = current_trace.get()
+        if trace is not None:
+            trace.llm_calls.append(LLMCallTrace(total=time.perf_counter() - started, chars=len(response or "")))
+        return response
+
+    async def generate_response_stream(self, messages: list) -> AsyncGenerator[str, None]:
+        trace = current_trace.get()
+        started = time.perf_counter()
+        call = LLMCallTrace(total=0.0, chunks=0)
+        try:
+            async for chunk in self.provider.generate_response_stream(messages):
+                if call.first_token is None:
+                    call.first_token = time.perf_counter() - started
+                call.chunks += 1
+                call.chars += len(chunk)
+                yield chunk
+        finally:
+            call.total = time.perf_counter() - started
+            if trace is not None:
+                trace.llm_calls.append(call)
+
+
+class RecordingEmotionalClassification(IEmotionalClassification):
+    def __init__(self, classification: IEmotionalClassification):
+        self.classification = classification
+
+    def __getattr__(self, name):
+        return getattr(self.classification, name)
+
+    async def extract_emotion(self, message: str) -> list[tuple[str | Any, Any]]:
+        with traced("classifier_calls"):
+            return await self.classification.extract_emotion(message)
+
+    def queue_depth(self) -> int:
+        return self.classification.queue_depth()
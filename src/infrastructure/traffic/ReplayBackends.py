@@ -0,0 +1,104 @@
+import asyncio
+import json
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, AsyncGenerator, Deque, Optional
+
+from src.core.interfaces.IEmotionalClassification import IEmotionalClassification
+from src.core.interfaces.ILLMProvider import ILLMProvider
+from src.core.prompts import ANALYSIS_PROMPT_PREFIX
+from src.infrastructure.traffic.TurnTrace import LLMCallTrace, TurnTrace
+
+REPLAY_ANALYSIS = json.dumps({
+    "emotional_exhaustion": 20,
+    "depersonalization": 8,
+    "reduction_of_achievements": 33,
+    "burnout_index": 0.46,
+    "recommendations": ["Отдых", "Обратная связь", "Цели", "Общая рекомендация"]
+}, ensure_ascii=False)
+FILLER = "Как вы оцениваете свою нагрузку на этой неделе? "
+
+
+class ReplayTrace:
+    """Записанные задержки хода, которые заглушки бэкендов выдают по порядку.
+
+    Если вызовов при воспроизведении больше, чем записано (поменялся код),
+    берутся средние по всей записи из defaults.
+    """
+
+    def __init__(self, trace: TurnTrace, defaults: TurnTrace):
+        self.storage_reads: Deque[float] = deque(trace.storage_reads)
+        self.storage_writes: Deque[float] = deque(trace.storage_writes)
+        self.classifier_calls: Deque[float] = deque(trace.classifier_calls)
+        self.llm_calls: Deque[LLMCallTrace] = deque(trace.llm_calls)
+        self.defaults = defaults
+
+    def next_storage(self, kind: str) -> float:
+        queue = self.storage_reads if kind == "read" else self.storage_writes
+        if queue:
+            return queue.popleft()
+        fallback = self.defaults.storage_reads if kind == "read" else self.defaults.storage_writes
+        return fallback[0] if fallback else 0.0
+
+    def next_classifier(self) -> float:
+        if self.classifier_calls:
+            return self.classifier_calls.popleft()
+        return self.defaults.classifier_calls[0] if self.defaults.classifier_calls else 0.0
+
+    def next_llm(self) -> LLMCallTrace:
+        if self.llm_calls:
+            return self.llm_calls.popleft()
+        return self.defaults.llm_calls[0] if self.defaults.llm_calls else LLMCallTrace(total=0.0)
+
+
+replay_trace: ContextVar[Optional[ReplayTrace]] = ContextVar("replay_trace", default=None)
+
+
+async def replay_storage_delay(kind: str) -> None:
+    """Задержка для InMemoryChatStorage"""
+    trace = replay_trace.get()
+    if trace is not None:
+        await asyncio.sleep(trace.next_storage(kind))
+
+
+class ReplayLLMProvider(ILLMProvider):
+    """LLM-заглушка: отвечает с записанными задержками, длиной и числом чанков"""
+
+    async def generate_response(self, messages: list) -> str:
+        call = self._next_call()
+        await asyncio.sleep(call.total)
+        return self._content(messages, call)
+
+    async def generate_response_stream(self, messages: list) -> AsyncGenerator[str, None]:
+        call = self._next_call()
+        content = self._content(messages, call)
+        chunks = max(1, call.chunks)
+        first_token = call.first_token if call.first_token is not None else 0.0
+        interval = max(0.0, call.total - first_token) / chunks
+        size = max(1, -(-len(content) // chunks))
+
+        await asyncio.sleep(first_token)
+        for start in range(0, len(content), size):
+            if start:
+                await asyncio.sleep(interval)
+            yield content[start:start + size]
+
+    @staticmethod
+    def _next_call() -> LLMCallTrace:
+        trace = replay_trace.get()
+        return trace.next_llm() if trace is not None else LLMCallTrace(total=0.0)
+
+    @staticmethod
+    def _content(messages: list, call: LLMCallTrace) -> str:
+        if messages and messages[0]["content"].startswith(ANALYSIS_PROMPT_PREFIX):
+            return REPLAY_ANALYSIS
+        chars = max(1, call.chars)
+        return (FILLER * (chars // len(FILLER) + 1))[:chars]
+
+
+class ReplayEmotionalClassification(IEmotionalClassification):
+    async def extract_emotion(self, message: str) -> list[tuple[str | Any, Any]]:
+        trace = replay_trace.get()
+        if trace is not None:
+            await asyncio.sleep(trace.next_classifier())
+        return [("нейтрально", 1.0)]
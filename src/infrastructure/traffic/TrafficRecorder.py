@@ -0,0 +1,128 @@
+import asyncio
+import hashlib
+import hmac
+import os
+import time
+from typing import Dict, List, Optional
+
+from src.core.entities.QueryEntities import BatchItemResult, LLMResponse, QueryRequest
+from src.infrastructure.serialization.serializer import dumps
+from src.infrastructure.traffic.TurnTrace import TurnTrace, current_trace
+
+TRACE_FORMAT_VERSION = 1
+
+
+class TrafficRecorder:
+    """Запись вызовов QuerySystem для воспроизведения (src/entrypoints/replay.py).
+
+    В файл NDJSON попадают время прихода, длительность, задержки бэкендов
+    и форма запросов и ответов без содержимого: длины текстов, счётчики,
+    chat_id под HMAC с солью записи. Выборка идёт по чатам,
+    поэтому попавший в неё опрос записывается целиком. {pid} в пути даёт
+    каждому воркеру свой файл; время прихода — epoch, файлы можно слить.
+    """
+
+    def __init__(self, path: str, sample_rate: float = 1.0, salt: str = "", flush_every: int = 100):
+        self.path = path.format(pid=os.getpid())
+        self.sample_rate = sample_rate
+        self.flush_every = flush_every
+        # Общая соль нужна, чтобы ходы одного чата на разных воркерах совпали
+        self._salt = salt.encode() if salt else os.urandom(16)
+        self._lines: List[bytes] = []
+        self._flush_lock = asyncio.Lock()
+
+    def start(self) -> TurnTrace:
+        """Новая трасса для текущего вызова; бэкенды дописывают в неё свои задержки"""
+        trace = TurnTrace()
+        current_trace.set(trace)
+        return trace
+
+    def anonymize(self, chat_id: Optional[str]) -> Optional[str]:
+        if not chat_id:
+            return None
+        return hmac.new(self._salt, chat_id.encode(), hashlib.sha256).hexdigest()[:16]
+
+    async def record(
+            self,
+            op: str,
+            tenant: str,
+            requests: List[QueryRequest],
+            started: float,
+            trace: TurnTrace,
+            responses: List[Optional[Dict]],
+            first_chunk: Optional[float] = None,
+            chunks: Optional[int] = None,
+            error: Optional[str] = None
+    ) -> None:
+        finished = time.perf_counter()
+        items = [self.request_shape(request) for request in requests]
+        if not self._sampled(items, responses):
+            return
+
+        entry = {
+            "v": TRACE_FORMAT_VERSION,
+            "t": round(time.time() - (finished - started), 6),
+            "op": op,
+            "tenant": tenant,
+            "duration": round(finished - started, 6),
+            "first_chunk": None if first_chunk is None else round(first_chunk - started, 6),
+            "chunks": chunks,
+            "error": error,
+            "items": items,
+            "responses": responses,
+            "trace": trace.to_dict()
+        }
+        self._lines.append(dumps(entry) + b"\n")
+        if len(self._lines) >= self.flush_every:
+            await self.flush()
+
+    def request_shape(self, request: QueryRequest) -> Dict:
+        statuses = request.list_user_psych_status
+        return {
+            "chat": self.anonymize(request.chat_id),
+            "input_chars": len(request.user_input),
+            "max_questions": request.max_questions,
+            "max_history_messages": request.max_history_messages,
+            "psych_statuses": len(statuses.list_user_psych_status) if statuses else 0,
+            "has_user": request.user_id is not None,
+            "department": request.department.value if request.department else None
+        }
+
+    def response_shape(self, response: Optional[LLMResponse], error: Optional[str] = None) -> Optional[Dict]:
+        if response is None:
+            return {"error": error or "no response"}
+        content = response.content if isinstance(response.content, str) else ""
+        return {
+            "chat": self.anonymize(response.chat_id),
+            "chars": len(content),
+            "question_count": response.question_count,
+            "is_completed": response.is_completed,
+            "is_analysis": response.is_analysis
+        }
+
+    def batch_item_shape(self, result: BatchItemResult) -> Dict:
+        shape = self.response_shape(result.response, result.error)
+        shape["index"] = result.index
+        return shape
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            lines, self._lines = self._lines, []
+            if lines:
+                await asyncio.to_thread(self._append, lines)
+
+    def _append(self, lines: List[bytes]) -> None:
+        with open(self.path, "ab") as file:
+            file.writelines(lines)
+
+    def _sampled(self, items: List[Dict], responses: List[Optional[Dict]]) -> bool:
+        if self.sample_rate >= 1.0:
+            return True
+        # Новый чат решается по chat_id из ответа, продолжение — по chat_id запроса
+        token = next(
+            (item["chat"] for item in items if item["chat"]),
+            next((response.get("chat") for response in responses if response and response.get("chat")), None)
+        )
+        if token is None:
+            return False
+        return int(token[:8], 16) / 0xFFFFFFFF < self.sample_rate
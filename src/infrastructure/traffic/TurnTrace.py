@@ -0,0 +1,57 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+
+@dataclass
+class LLMCallTrace:
+    total: float
+    first_token: Optional[float] = None  # только для стрима
+    chunks: int = 1
+    chars: int = 0
+
+
+@dataclass
+class TurnTrace:
+    """Задержки бэкендов за один вызов QuerySystem, в секундах и в порядке вызовов"""
+    storage_reads: List[float] = field(default_factory=list)
+    storage_writes: List[float] = field(default_factory=list)
+    classifier_calls: List[float] = field(default_factory=list)
+    llm_calls: List[LLMCallTrace] = field(default_factory=list)
+
+    def to_dict(self) -> Dict:
+        return {
+            "storage_reads": [round(value, 6) for value in self.storage_reads],
+            "storage_writes": [round(value, 6) for value in self.storage_writes],
+            "classifier_calls": [round(value, 6) for value in self.classifier_calls],
+            "llm_calls": [asdict(call) for call in self.llm_calls]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "TurnTrace":
+        return cls(
+            storage_reads=list(data.get("storage_reads", [])),
+            storage_writes=list(data.get("storage_writes", [])),
+            classifier_calls=list(data.get("classifier_calls", [])),
+            llm_calls=[LLMCallTrace(**call) for call in data.get("llm_calls", [])]
+        )
+
+
+# Трасса текущего хода; None, если запись трафика выключена
+current_trace: ContextVar[Optional[TurnTrace]] = ContextVar("current_trace", default=None)
+
+
+@contextmanager
+def traced(bucket: str):
+    """Добавляет длительность блока в список bucket текущей трассы, если она есть"""
+    trace = current_trace.get()
+    if trace is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        getattr(trace, bucket).append(time.perf_counter() - started)
@@ -0,0 +1,96 @@
+import pytest
+
+from config import Config
+from src.application.APIApplication import APIApplication
+from src.application.admission.AdmissionController import AdmissionController, AdmissionRejected
+from src.application.use_cases.factory.UseCaseFactory import UseCaseFactory
+from src.core.entities.QueryEntities import QueryRequest
+from src.core.interfaces.IEmotionalClassification import IEmotionalClassification
+from src.core.interfaces.ILLMProvider import ILLMProvider
+from src.infrastructure.memory_store.InMemoryChatStorage import InMemoryChatStorage
+
+
+def test_new_surveys_are_limited_to_their_share():
+    controller = AdmissionController(max_inflight_llm=4, max_classifier_queue=10, new_survey_share=0.5)
+
+    controller.admit(is_continuation=False)
+    controller.admit(is_continuation=False)
+
+    with pytest.raises(AdmissionRejected):
+        controller.admit(is_continuation=False)
+
+    controller.admit(is_continuation=True)
+    controller.admit(is_continuation=True)
+    with pytest.raises(AdmissionRejected):
+        controller.admit(is_continuation=True)
+
+
+def test_release_frees_slot_once():
+    controller = AdmissionController(max_inflight_llm=1, max_classifier_queue=10)
+
+    ticket = controller.admit(is_continuation=True)
+    ticket.release()
+    ticket.release()
+
+    assert controller.in_flight == 0
+    with controller.admit(is_continuation=True):
+        assert controller.in_flight == 1
+    assert controller.in_flight == 0
+
+
+def test_classifier_queue_depth_rejects_new_work():
+    depth = {"value": 0}
+    controller = AdmissionController(
+        max_inflight_llm=100,
+        max_classifier_queue=8,
+        classifier_queue_depth=lambda: depth["value"],
+        new_survey_share=0.5
+    )
+
+    depth["value"] = 5
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.admit(is_continuation=False)
+    assert "Classifier" in rejected.value.reason
+
+    controller.admit(is_continuation=True)
+
+
+def test_retry_after_grows_with_turn_duration():
+    controller = AdmissionController(max_inflight_llm=2, max_classifier_queue=10, initial_turn_seconds=30)
+    controller.admit(is_continuation=True)
+    controller.admit(is_continuation=True)
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.admit(is_continuation=True)
+
+    assert rejected.value.retry_after == 15
+
+
+class QuestionLLM(ILLMProvider):
+    async def generate_response(self, messages: list) -> str:
+        return "Как вы?"
+
+    async def generate_response_stream(self, messages: list):
+        yield "Как вы?"
+
+
+class NeutralClassifier(IEmotionalClassification):
+    async def extract_emotion(self, message: str):
+        return [("нейтрально", 1.0)]
+
+
+@pytest.mark.asyncio
+async def test_made_up_chat_id_does_not_get_continuation_priority():
+    rag_app = APIApplication(Config())
+    rag_app.use_case = UseCaseFactory.assemble_burnout_survey_use_case(
+        QuestionLLM(), InMemoryChatStorage(), NeutralClassifier()
+    )
+    rag_app.admission = AdmissionController(max_inflight_llm=4, max_classifier_queue=10, new_survey_share=0.5)
+    chat_id = (await rag_app.query(QueryRequest(user_input="Привет"))).chat_id
+    rag_app.admission.admit(is_continuation=True)
+    rag_app.admission.admit(is_continuation=True)
+
+    with pytest.raises(AdmissionRejected):
+        await rag_app.admit(QueryRequest(user_input="Привет", chat_id="made-up"))
+    with await rag_app.admit(QueryRequest(user_input="Привет", chat_id=chat_id)):
+        assert rag_app.admission.in_flight == 3
@@ -0,0 +1,117 @@
+import json
+from dataclasses import asdict
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from src.application.use_cases.EmotionalUseCase import EmotionalUseCase
+from src.application.use_cases.QueryLLMUseCase import ANALYSIS_TRIGGER_QUESTION, QueryLLMUseCase
+from src.core.entities.BurnoutResults import BurnoutResult
+from src.core.entities.EmotionalCoefficient import EmotionalCoefficient
+from src.core.entities.QueryEntities import LLMResponse, QueryRequest
+from src.core.interfaces.IBurnoutResultStorage import IBurnoutResultStorage
+from src.core.interfaces.IBurnoutTimeSeries import IBurnoutTimeSeries
+from src.core.interfaces.IChatStorage import IChatStorage
+from src.core.interfaces.ILLMProvider import ILLMProvider
+
+ANALYSIS_JSON = ('{"emotional_exhaustion": 26, "depersonalization": 7.4, "reduction_of_achievements": 20, '
+                 '"burnout_index": 0.4, "recommendations": ["Отдых"]}')
+
+
+def make_use_case(llm_chunks):
+    chat = {"_id": "chat-1", "question_count": ANALYSIS_TRIGGER_QUESTION, "user_id": 42, "department": "it"}
+    chat_storage = Mock(spec=IChatStorage)
+    chat_storage.get_chat = AsyncMock(return_value=chat)
+    chat_storage.get_chat_messages_with_timestamp = AsyncMock(return_value=[
+        {"role": "system", "content": "prompt"}, {"role": "user", "content": "Устал"}
+    ])
+    chat_storage.is_chat_completed = AsyncMock(return_value=True)
+
+    llm = Mock(spec=ILLMProvider)
+
+    async def stream(messages):
+        for chunk in llm_chunks:
+            yield chunk
+
+    llm.generate_response_stream = stream
+    llm.generate_response = AsyncMock(return_value="".join(llm_chunks))
+
+    emotional_use_case = Mock(spec=EmotionalUseCase)
+    emotional_use_case.analyze_messages_batch = AsyncMock(return_value=[
+        EmotionalCoefficient(0.05, 0.0, 0.9, 0.0, 0.0, 0.0, 0.0, 0.05, 0.0, 0.0)
+    ])
+    emotional_use_case.top_emotion = EmotionalUseCase.top_emotion
+
+    result_storage = Mock(spec=IBurnoutResultStorage)
+    result_storage.save_result = AsyncMock(return_value=True)
+
+    use_case = QueryLLMUseCase(llm, chat_storage, emotional_use_case,
+                               result_storage=result_storage, timeseries=Mock(spec=IBurnoutTimeSeries))
+    return use_case, chat_storage, result_storage
+
+
+@pytest.mark.asyncio
+async def test_stream_analysis_is_parsed_and_saved_before_chat_completes():
+    use_case, chat_storage, result_storage = make_use_case([ANALYSIS_JSON[:40], ANALYSIS_JSON[40:]])
+
+    chunks = [chunk async for chunk in use_case.execute_stream(QueryRequest(user_input="Устал", chat_id="chat-1"))]
+
+    assert chunks[-1].is_analysis is True
+    record = result_storage.save_result.await_args.args[0]
+    assert record.chat_id == "chat-1"
+    assert record.user_id == 42 and record.department == "it"
+    assert record.result.depersonalization == 7
+    assert record.result.levels()["emotional_exhaustion"] == "high"
+    chat_storage.increment_question_count.assert_awaited_once()
+
+    timeseries = use_case.timeseries
+    assert timeseries.append_scores.await_args.args[0] == 42
+    assert timeseries.append_scores.await_args.args[2] == [26, 7, 20, 0.4]
+    assert timeseries.append_emotions.await_args.args[2][0][2] == 0.9
+
+
+@pytest.mark.asyncio
+async def test_repeated_result_is_not_appended_to_history():
+    use_case, _, result_storage = make_use_case([ANALYSIS_JSON])
+    result_storage.save_result = AsyncMock(return_value=False)
+
+    await use_case.execute(QueryRequest(user_input="Устал", chat_id="chat-1"))
+
+    use_case.timeseries.append_scores.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_non_json_analysis_is_not_saved():
+    use_case, _, result_storage = make_use_case(["Не могу дать оценку"])
+
+    response = await use_case.execute(QueryRequest(user_input="Устал", chat_id="chat-1"))
+
+    assert response.is_analysis is False
+    result_storage.save_result.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_invalid_analysis_fields_do_not_break_turn():
+    use_case, chat_storage, result_storage = make_use_case(['{"burnout_index": 0.5}'])
+
+    response = await use_case.execute(QueryRequest(user_input="Устал", chat_id="chat-1"))
+
+    assert response.is_analysis is True
+    result_storage.save_result.assert_not_awaited()
+    chat_storage.increment_question_count.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_analysis_content_is_structured_and_string_recommendations_are_listed():
+    analysis = ANALYSIS_JSON.replace('["Отдых"]', '"Больше отдыхать"')
+    use_case, chat_storage, result_storage = make_use_case([analysis])
+
+    response = await use_case.execute(QueryRequest(user_input="Устал", chat_id="chat-1"))
+
+    assert response.is_analysis is True
+    assert isinstance(response.content, BurnoutResult)
+    assert response.content.recommendations == ["Больше отдыхать"]
+    assert result_storage.save_result.await_args.args[0].result == response.content
+    stored = json.loads(chat_storage.add_message.await_args_list[-1].args[2])
+    assert stored["recommendations"] == ["Больше отдыхать"]
+    assert LLMResponse(**asdict(response)).content == response.content
@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from src.application.scoring.BurnoutRiskScorer import BurnoutRiskScorer, WorkforceColumns
+from src.core.entities.user_entites.Department import Department
+from src.core.entities.user_entites.Gender import Gender
+from src.core.entities.user_entites.UserEntity import UserEntity
+
+NOW = datetime(2025, 6, 1)
+
+
+def make_user(user_id: int, department: Department = Department.IT, **overrides) -> UserEntity:
+    fields = dict(
+        id=user_id,
+        full_name=f"Сотрудник {user_id}",
+        legal_entity="СДЭК",
+        gender=Gender.FEMALE,
+        city="Новосибирск",
+        position="Специалист",
+        experience=5.0,
+        age=30,
+        subordinates_count=0,
+        department=department,
+        performance_metrics={"kpi": 0.8},
+        certification_passed=True,
+        training_completed=True,
+        last_vacation=NOW - timedelta(days=30),
+        sick_leave_2025=False,
+        has_reprimand=False,
+        corporate_activities_participation=True,
+    )
+    fields.update(overrides)
+    return UserEntity(**fields)
+
+
+def test_risk_factors_raise_score():
+    users = [
+        make_user(1),
+        make_user(2, sick_leave_2025=True, has_reprimand=True),
+        make_user(3, last_vacation=None, sick_leave_2025=True, has_reprimand=True, performance_metrics={"kpi": 0.1}),
+    ]
+
+    _, scores = BurnoutRiskScorer().score_users(users, reference_date=NOW)
+
+    assert scores[0] < scores[1] < scores[2]
+    assert np.all((scores >= 0) & (scores <= 1))
+
+
+def test_columns_handle_missing_values():
+    columns = WorkforceColumns.from_users(
+        [make_user(1, last_vacation=None, performance_metrics={}, certification_passed=None)], NOW
+    )
+
+    assert np.isnan(columns.days_since_vacation[0])
+    assert np.isnan(columns.performance_mean[0])
+    assert columns.certification[0] == 0.5
+
+
+def test_top_k_by_department_matches_full_sort():
+    rng = np.random.default_rng(0)
+    departments = list(Department)
+    users = [
+        make_user(i, departments[i % len(departments)],
+                  last_vacation=NOW - timedelta(days=int(rng.integers(0, 400))),
+                  subordinates_count=int(rng.integers(0, 30)))
+        for i in range(200)
+    ]
+    scorer = BurnoutRiskScorer()
+    columns, scores = scorer.score_users(users, reference_date=NOW)
+
+    top = scorer.top_k_by_department(columns, scores, k=5)
+
+    assert set(top) == set(departments)
+    for department, ranked in top.items():
+        expected = sorted(
+            (float(scores[i]) for i, user in enumerate(users) if user.department == department), reverse=True
+        )[:5]
+        assert [score for _, score in ranked] == expected
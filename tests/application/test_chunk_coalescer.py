@@ -0,0 +1,121 @@
+import asyncio
+
+import pytest
+
+from src.application.streaming.ChunkCoalescer import ChunkCoalescer
+from src.core.entities.QueryEntities import LLMStreamResponse
+
+
+def make_chunk(text: str, is_final_chunk: bool = False, event_id: str = None) -> LLMStreamResponse:
+    return LLMStreamResponse(
+        content_chunk=text,
+        chat_id="chat-1",
+        is_completed=is_final_chunk,
+        question_count=1,
+        total_questions=8,
+        is_final_chunk=is_final_chunk,
+        event_id=event_id
+    )
+
+
+async def source_from(items):
+    for item in items:
+        if isinstance(item, float):
+            await asyncio.sleep(item)
+        else:
+            yield item
+
+
+async def collect(coalescer, items):
+    return [frame async for frame in coalescer.coalesce(source_from(items))]
+
+
+@pytest.mark.asyncio
+async def test_first_token_and_final_chunk_flush_immediately():
+    coalescer = ChunkCoalescer(max_delay=10, max_bytes=10_000)
+    items = [make_chunk("При"), make_chunk("вет"), make_chunk(", как"), make_chunk("", True, "s:3")]
+
+    frames = await collect(coalescer, items)
+
+    assert [f.content_chunk for f in frames] == ["При", "вет, как"]
+    assert frames[-1].is_final_chunk
+    assert frames[-1].event_id == "s:3"
+
+
+@pytest.mark.asyncio
+async def test_flushes_by_byte_threshold():
+    coalescer = ChunkCoalescer(max_delay=10, max_bytes=4)
+    items = [make_chunk("a")] + [make_chunk("bb") for _ in range(4)] + [make_chunk("", True)]
+
+    frames = await collect(coalescer, items)
+
+    assert [f.content_chunk for f in frames] == ["a", "bbbb", "bbbb", ""]
+
+
+@pytest.mark.asyncio
+async def test_flushes_by_delay_during_pause():
+    coalescer = ChunkCoalescer(max_delay=0.02, max_bytes=10_000)
+    items = [make_chunk("a"), make_chunk("b"), make_chunk("c"), 0.2, make_chunk("d"), make_chunk("", True)]
+
+    frames = await collect(coalescer, items)
+
+    assert [f.content_chunk for f in frames] == ["a", "bc", "d"]
+
+
+@pytest.mark.asyncio
+async def test_closing_output_closes_source():
+    closed = asyncio.Event()
+
+    async def endless():
+        try:
+            yield make_chunk("a")
+            while True:
+                await asyncio.sleep(1)
+        finally:
+            closed.set()
+
+    coalescer = ChunkCoalescer(max_delay=0.01)
+    frames = coalescer.coalesce(endless())
+    await frames.__anext__()
+    await frames.aclose()
+
+    await asyncio.wait_for(closed.wait(), timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_source_finalizer_completes_before_close_returns():
+    saved = []
+
+    async def answer():
+        try:
+            yield make_chunk("Как")
+            yield make_chunk(" вы")
+            await asyncio.sleep(10)
+        finally:
+            # Как сохранение недописанного ответа: запись в хранилище с await
+            await asyncio.sleep(0.01)
+            saved.append("partial")
+
+    frames = ChunkCoalescer(max_delay=0.01).coalesce(answer())
+    await frames.__anext__()
+    # Второй кадр уходит по таймеру, пока источник ещё генерирует
+    assert (await frames.__anext__()).content_chunk == " вы"
+    await frames.aclose()
+
+    assert saved == ["partial"]
+
+
+@pytest.mark.asyncio
+async def test_source_runs_in_one_task_from_first_to_last_chunk():
+    tasks = set()
+
+    async def answer():
+        for text in ("a", "b", "c"):
+            tasks.add(asyncio.current_task())
+            yield make_chunk(text)
+        tasks.add(asyncio.current_task())
+
+    frames = [frame async for frame in ChunkCoalescer(max_delay=0.01).coalesce(answer())]
+
+    assert "".join(frame.content_chunk for frame in frames) == "abc"
+    assert len(tasks) == 1
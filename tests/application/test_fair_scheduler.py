@@ -0,0 +1,107 @@
+import asyncio
+from collections import deque
+
+import pytest
+
+from src.application.admission.AdmissionController import AdmissionRejected
+from src.application.tenancy.FairScheduler import FairScheduler, current_tenant
+from src.application.tenancy.TenantRegistry import TenantRegistry
+from src.core.entities.Tenant import Tenant
+
+
+async def _occupy(scheduler: FairScheduler, tenant: str, order: list, release: asyncio.Event):
+    current_tenant.set(tenant)
+    async with scheduler.slot():
+        order.append(tenant)
+        await release.wait()
+
+
+@pytest.mark.asyncio
+async def test_slots_are_shared_by_weight_under_load():
+    scheduler = FairScheduler("llm", capacity=1, weights={"interactive": 3, "bulk": 1})
+    release = asyncio.Event()
+    done = asyncio.Event()
+    done.set()
+    order = []
+
+    blocker = asyncio.create_task(_occupy(scheduler, "bulk", [], release))
+    await asyncio.sleep(0)
+    # Массовый клиент успел поставить в очередь всё раньше интерактивного
+    tasks = [asyncio.create_task(_occupy(scheduler, "bulk", order, done)) for _ in range(8)]
+    tasks += [asyncio.create_task(_occupy(scheduler, "interactive", order, done)) for _ in range(6)]
+    await asyncio.sleep(0)
+    assert scheduler.waiting == 14
+
+    release.set()
+    await asyncio.gather(blocker, *tasks)
+
+    assert order[:8] == ["bulk", "interactive", "interactive", "interactive",
+                         "bulk", "interactive", "interactive", "interactive"]
+    assert scheduler.in_use == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_slot():
+    scheduler = FairScheduler("classifier", capacity=1, weights={})
+    release = asyncio.Event()
+    holder = asyncio.create_task(_occupy(scheduler, "a", [], release))
+    await asyncio.sleep(0)
+
+    waiter = asyncio.create_task(_occupy(scheduler, "b", [], asyncio.Event()))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+
+    release.set()
+    await holder
+    assert scheduler.in_use == 0
+    async with scheduler.slot():
+        assert scheduler.in_use == 1
+
+
+def test_quota_rejects_with_retry_after():
+    registry = TenantRegistry([Tenant("importer", "k1", requests_per_minute=60, burst=2), Tenant("bot", "k2")])
+
+    assert registry.authenticate("k1").name == "importer"
+    assert registry.authenticate("unknown") is None
+    registry.check_quota("importer")
+    registry.check_quota("importer")
+    with pytest.raises(AdmissionRejected) as rejected:
+        registry.check_quota("importer")
+    assert rejected.value.retry_after == 1
+    for _ in range(10):
+        registry.check_quota("bot")
+
+
+def test_registry_reads_default_key_and_json():
+    registry = TenantRegistry.from_config("main", '{"importer": {"key": "k1", "weight": 0.5}}')
+
+    assert registry.authenticate("main").name == "default"
+    assert registry.weights() == {"default": 1.0, "importer": 0.5}
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_queue_immediately():
+    scheduler = FairScheduler("llm", capacity=1, weights={})
+    release = asyncio.Event()
+    holder = asyncio.create_task(_occupy(scheduler, "a", [], release))
+    await asyncio.sleep(0)
+    waiters = [asyncio.create_task(_occupy(scheduler, tenant, [], asyncio.Event())) for tenant in ("b", "c", "c")]
+    await asyncio.sleep(0)
+
+    waiters[0].cancel()
+    waiters[2].cancel()
+    await asyncio.gather(waiters[0], waiters[2], return_exceptions=True)
+
+    assert scheduler.waiting == 1
+    queued = {item["tenant"]: item["queued"] for item in scheduler.snapshot()}
+    assert queued["b"] == 0 and queued["c"] == 1
+    assert scheduler._active == deque(["c"])
+
+    waiters[1].cancel()
+    await asyncio.gather(waiters[1], return_exceptions=True)
+    release.set()
+    await holder
+    # Очередь пуста: новый вызов снова проходит сразу, без ожидания в очереди
+    await asyncio.wait_for(scheduler.acquire("d"), timeout=0.1)
+    assert scheduler.in_use == 1
@@ -0,0 +1,154 @@
+import asyncio
+import time
+from typing import Dict, Optional
+
+import pytest
+
+from src.application.idempotency.ChatTurnLock import ChatBusyError, ChatTurnLock
+from src.application.idempotency.IdempotencyCache import IdempotencyKeyReused
+from src.application.use_cases.factory.UseCaseFactory import UseCaseFactory
+from src.core.entities.QueryEntities import QueryRequest
+from src.core.interfaces.IChatLease import IChatLease
+from src.core.interfaces.IEmotionalClassification import IEmotionalClassification
+from src.core.interfaces.IIdempotencyStore import IIdempotencyStore
+from src.core.interfaces.ILLMProvider import ILLMProvider
+from src.entrypoints.QuerySystem import QuerySystem
+from src.infrastructure.memory_store.InMemoryChatStorage import InMemoryChatStorage
+
+
+class CountingLLM(ILLMProvider):
+    def __init__(self):
+        self.calls = 0
+
+    async def generate_response(self, messages: list) -> str:
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return f"Вопрос {self.calls}"
+
+    async def generate_response_stream(self, messages: list):
+        yield await self.generate_response(messages)
+
+
+class NeutralClassifier(IEmotionalClassification):
+    async def extract_emotion(self, message: str):
+        return [("нейтрально", 1.0)]
+
+
+class SharedLease(IChatLease):
+    """Аренда в памяти, общая для нескольких «воркеров» теста"""
+
+    def __init__(self):
+        self.owners: Dict[str, tuple] = {}
+
+    async def acquire(self, name: str, owner: str, ttl: float) -> bool:
+        holder = self.owners.get(name)
+        if holder and holder[0] != owner and holder[1] > time.monotonic():
+            return False
+        self.owners[name] = (owner, time.monotonic() + ttl)
+        return True
+
+    async def release(self, name: str, owner: str) -> None:
+        if self.owners.get(name, (None,))[0] == owner:
+            del self.owners[name]
+
+
+class SharedStore(IIdempotencyStore):
+    def __init__(self):
+        self.records: Dict[str, Dict] = {}
+
+    async def get(self, key: str) -> Optional[Dict]:
+        return self.records.get(key)
+
+    async def put(self, key: str, record: Dict, ttl: float) -> None:
+        self.records[key] = record
+
+
+def _worker(llm: ILLMProvider, storage: InMemoryChatStorage, lease=None, store=None) -> QuerySystem:
+    system = QuerySystem()
+    system.recorder = None
+    system.rag_app.use_case = UseCaseFactory.assemble_burnout_survey_use_case(llm, storage, NeutralClassifier())
+    system.rag_app.chat_locks.lease = lease
+    system.rag_app.idempotency.store = store
+    return system
+
+
+@pytest.mark.asyncio
+async def test_retries_with_same_key_share_one_turn():
+    llm, storage = CountingLLM(), InMemoryChatStorage()
+    system = _worker(llm, storage)
+    request = QueryRequest(user_input="Устаю к вечеру")
+
+    first, duplicate = await asyncio.gather(
+        system.query(request, "retry-1"), system.query(request, "retry-1")
+    )
+    late_retry = await system.query(request, "retry-1")
+
+    assert llm.calls == 1
+    assert first.chat_id == duplicate.chat_id == late_retry.chat_id
+    assert len(storage.chats) == 1
+    with pytest.raises(IdempotencyKeyReused):
+        await system.query(QueryRequest(user_input="Другой ответ"), "retry-1")
+
+
+@pytest.mark.asyncio
+async def test_turns_of_one_chat_are_serialized_across_workers():
+    llm, storage, lease, store = CountingLLM(), InMemoryChatStorage(), SharedLease(), SharedStore()
+    first_worker = _worker(llm, storage, lease, store)
+    second_worker = _worker(llm, storage, lease, store)
+    chat_id = (await first_worker.query(QueryRequest(user_input="Привет"))).chat_id
+
+    # Два разных хода одного чата и повтор второго на другом воркере
+    turn = QueryRequest(user_input="Плохо сплю", chat_id=chat_id)
+    await asyncio.gather(
+        first_worker.query(QueryRequest(user_input="Много работы", chat_id=chat_id)),
+        first_worker.query(turn, "turn-3"),
+        second_worker.query(turn, "turn-3"),
+    )
+
+    assert llm.calls == 3
+    chat = storage.chats[chat_id]
+    assert chat["question_count"] == 3
+    roles = [message["role"] for message in chat["messages"][1:]]
+    assert roles == ["user", "assistant"] * 3
+
+
+@pytest.mark.asyncio
+async def test_chat_busy_when_lease_is_not_released_in_time():
+    lease = SharedLease()
+    await lease.acquire("chat-1", "crashed-worker", ttl=60)
+    lock = ChatTurnLock(lease, wait_seconds=0.1, poll_interval=0.01)
+
+    with pytest.raises(ChatBusyError):
+        async with lock.hold("chat-1"):
+            pass
+
+
+@pytest.mark.asyncio
+async def test_timed_out_and_cancelled_waiters_leave_lock_usable():
+    lock = ChatTurnLock(wait_seconds=0.05)
+    entered = asyncio.Event()
+    release = asyncio.Event()
+
+    async def holder():
+        async with lock.hold("chat-1"):
+            entered.set()
+            await release.wait()
+
+    async def waiter():
+        async with lock.hold("chat-1"):
+            pass
+
+    holding = asyncio.create_task(holder())
+    await entered.wait()
+    with pytest.raises(ChatBusyError):
+        await waiter()
+    lock.wait_seconds = 10
+    cancelled = asyncio.create_task(waiter())
+    await asyncio.sleep(0.01)
+    cancelled.cancel()
+    await asyncio.gather(cancelled, return_exceptions=True)
+
+    release.set()
+    await holding
+    assert not lock._locks and not lock._waiters
+    await asyncio.wait_for(waiter(), timeout=0.1)
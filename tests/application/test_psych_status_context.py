@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta, timezone
+
+from src.core.entities.user_entites.ListUserPsychStatus import ListUserPsychStatus
+from src.core.entities.user_entites.UserPsychStatus import UserPsychStatus
+
+
+def make_statuses(count: int, user_id: int = 1) -> ListUserPsychStatus:
+    return ListUserPsychStatus(
+        user_id=user_id,
+        list_user_psych_status=[
+            UserPsychStatus(
+                date=datetime(2024, 1 + i % 12, 1 + i // 12),
+                summary=f"Сводка {i} " * 10,
+                recommendations="Отдых и поддержка руководителя",
+                status=[0.1 * (i % 10), 0.2, 0.3, 0.05 * (i % 20)],
+            )
+            for i in range(count)
+        ],
+    )
+
+
+def test_recent_statuses_first_and_older_summarized():
+    statuses = make_statuses(12)
+
+    context = statuses.render_context(max_chars=2000, max_recent=3)
+    lines = context.split("\n")
+
+    assert lines[1].startswith("01.12.2024")
+    assert len(lines) == 5
+    assert lines[-1].startswith("Ранее: 9 оценок")
+
+
+def test_context_respects_budget():
+    context = make_statuses(200).render_context(max_chars=600, max_recent=50)
+
+    assert len(context) <= 600
+    assert "Ранее:" in context
+
+
+def test_render_is_cached_by_content():
+    statuses = make_statuses(5)
+    first = statuses.render_context()
+
+    assert statuses.render_context() is first
+
+    # Новая история приходит новым объектом вместе со следующим запросом
+    data = statuses.model_dump()
+    data["list_user_psych_status"][0]["summary"] = "Изменилось"
+    changed = ListUserPsychStatus.model_validate(data)
+    assert changed.render_context() is not first
+    assert "Изменилось" in changed.render_context()
+
+
+def test_mixed_aware_naive_and_missing_dates_are_ordered():
+    statuses = make_statuses(3)
+    statuses.list_user_psych_status[0].date = datetime(2025, 3, 1, tzinfo=timezone(timedelta(hours=7)))
+    statuses.list_user_psych_status[1].date = None
+
+    lines = statuses.render_context(max_chars=2000, max_recent=1).split("\n")
+
+    assert lines[1].startswith("01.03.2025")
+    assert lines[2].startswith("Ранее: 2 оценок за 03.2024–03.2024")
+
+
+def test_summary_fits_budget_instead_of_being_cut():
+    statuses = make_statuses(20)
+    full = statuses.render_context(max_chars=10000, max_recent=5)
+    budget = len("\n".join(full.split("\n")[:6])) + 10
+
+    context = statuses.render_context(max_chars=budget, max_recent=5)
+
+    assert len(context) <= budget
+    assert not context.endswith("…")
+    assert context.split("\n")[-1].startswith("Ранее:")
+
+
+def test_empty_history():
+    assert "Нет данных" in ListUserPsychStatus(user_id=1, list_user_psych_status=[]).render_context()
@@ -0,0 +1,116 @@
+import asyncio
+from typing import List
+
+import pytest
+
+from config import Config
+from src.application.APIApplication import APIApplication
+from src.application.use_cases.factory.UseCaseFactory import UseCaseFactory
+from src.core.entities.QueryEntities import BatchItemResult, QueryRequest
+from src.core.interfaces.IEmotionalClassification import IEmotionalClassification
+from src.core.interfaces.ILLMProvider import ILLMProvider
+from src.infrastructure.memory_store.InMemoryChatStorage import InMemoryChatStorage
+
+
+class EchoLLM(ILLMProvider):
+    async def generate_response(self, messages: list) -> str:
+        await asyncio.sleep(0.01)
+        return f"Вопрос после: {messages[-1]['content']}"
+
+    async def generate_response_stream(self, messages: list):
+        yield await self.generate_response(messages)
+
+
+class NeutralClassifier(IEmotionalClassification):
+    async def extract_emotion(self, message: str):
+        return [("нейтрально", 1.0)]
+
+
+def make_app(storage: InMemoryChatStorage) -> APIApplication:
+    rag_app = APIApplication(Config())
+    rag_app.use_case = UseCaseFactory.assemble_burnout_survey_use_case(EchoLLM(), storage, NeutralClassifier())
+    return rag_app
+
+
+async def collect(rag_app: APIApplication, requests: List[QueryRequest], max_concurrency: int = 4):
+    results: List[BatchItemResult] = [result async for result in rag_app.query_batch(requests, max_concurrency)]
+    return sorted(results, key=lambda result: result.index)
+
+
+@pytest.mark.asyncio
+async def test_batch_runs_turns_of_different_chats():
+    storage = InMemoryChatStorage()
+    rag_app = make_app(storage)
+    first = await rag_app.query(QueryRequest(user_input="Привет"))
+
+    results = await collect(rag_app, [
+        QueryRequest(user_input="Много работы", chat_id=first.chat_id),
+        QueryRequest(user_input="Новый опрос"),
+    ])
+
+    assert [result.error for result in results] == [None, None]
+    assert results[0].response.chat_id == first.chat_id
+    assert results[1].response.chat_id != first.chat_id
+    assert storage.chats[first.chat_id]["messages"][-2]["content"] == "Много работы"
+
+
+@pytest.mark.asyncio
+async def test_batch_item_errors_do_not_fail_the_batch():
+    storage = InMemoryChatStorage()
+    rag_app = make_app(storage)
+    rag_app.chat_locks.wait_seconds = 0.05
+    busy_chat = (await rag_app.query(QueryRequest(user_input="Привет"))).chat_id
+
+    async with rag_app.chat_locks.hold(busy_chat):
+        results = await collect(rag_app, [
+            QueryRequest(user_input="Ход занятого чата", chat_id=busy_chat),
+            QueryRequest(user_input="Новый опрос"),
+        ])
+
+    assert results[0].error and results[0].retry_after
+    assert results[1].error is None and results[1].response.question_count == 1
+    assert rag_app.admission.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_batch_item_rejected_by_admission_gets_retry_after():
+    rag_app = make_app(InMemoryChatStorage())
+    rag_app.admission.max_inflight_llm = 1
+
+    held = rag_app.admission.admit(is_continuation=True)
+    with held:
+        results = await collect(rag_app, [QueryRequest(user_input="Новый опрос")])
+
+    assert results[0].error == "LLM capacity exhausted"
+    assert results[0].retry_after >= 1
+
+
+@pytest.mark.asyncio
+async def test_turn_waiting_for_its_chat_does_not_hold_admission_slot():
+    storage = InMemoryChatStorage()
+    rag_app = make_app(storage)
+    rag_app.admission.max_inflight_llm = 1
+    busy_chat = (await rag_app.query(QueryRequest(user_input="Привет"))).chat_id
+    release = asyncio.Event()
+
+    async def hold_busy_chat():
+        async with rag_app.chat_locks.hold(busy_chat):
+            await release.wait()
+
+    holder = asyncio.create_task(hold_busy_chat())
+    await asyncio.sleep(0)
+    batch = asyncio.create_task(collect(rag_app, [
+        QueryRequest(user_input="Ход занятого чата", chat_id=busy_chat),
+        QueryRequest(user_input="Новый опрос"),
+    ]))
+    # Пока первый ход ждёт свой чат, единственное место достаётся новому опросу
+    for _ in range(100):
+        if len(storage.chats) == 2:
+            break
+        await asyncio.sleep(0.01)
+    release.set()
+    results = await asyncio.wait_for(batch, timeout=1)
+    await holder
+
+    assert [result.error for result in results] == [None, None]
+    assert rag_app.admission.in_flight == 0
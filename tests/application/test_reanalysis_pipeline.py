@@ -0,0 +1,122 @@
+import json
+from unittest.mock import Mock
+
+import pytest
+
+from src.application.reanalysis.ReanalysisPipeline import ProgressReporter, ReanalysisPipeline
+from src.core.interfaces.ILLMProvider import ILLMProvider
+from src.infrastructure.reanalysis.ReanalysisCheckpoint import ReanalysisCheckpoint
+from src.infrastructure.reanalysis.chat_sources import iter_archive_chats
+
+ANALYSIS = ('{"emotional_exhaustion": 20, "depersonalization": 4, "reduction_of_achievements": 33, '
+            '"burnout_index": 0.43, "recommendations": ["Отдых"]}')
+
+
+def write_archive(path, count):
+    with open(path, "w", encoding="utf-8") as archive:
+        for i in range(count):
+            archive.write(json.dumps({"_id": f"chat-{i}", "user_id": i, "messages": [
+                {"role": "system", "content": "prompt"},
+                {"role": "assistant", "content": "Как вы?"},
+                {"role": "user", "content": "устал " * (i + 1)},
+                {"role": "user", "content": "ok"},
+            ]}, ensure_ascii=False) + "\n")
+
+
+async def classify(texts):
+    return [[("грусть", 0.8), ("радость", 0.2)] if "устал" in text else [("радость", 0.9), ("грусть", 0.1)]
+            for text in texts]
+
+
+def make_pipeline(tmp_path, written, checkpoint=None, **kwargs):
+    async def write(records):
+        written.extend(records)
+
+    return ReanalysisPipeline(
+        classify=classify,
+        write=write,
+        checkpoint=checkpoint or ReanalysisCheckpoint(source="archive"),
+        checkpoint_path=str(tmp_path / "checkpoint.json"),
+        model_name="test-model",
+        classifier_batch_size=3,
+        chat_batch_size=2,
+        progress=ProgressReporter(interval=3600),
+        **kwargs
+    )
+
+
+@pytest.mark.asyncio
+async def test_emotions_are_mapped_back_to_their_chats(tmp_path):
+    archive = tmp_path / "chats.jsonl"
+    write_archive(archive, 5)
+    written = []
+
+    checkpoint = await make_pipeline(tmp_path, written).run(iter_archive_chats(str(archive)))
+
+    assert [record["chat_id"] for record in written] == [f"chat-{i}" for i in range(5)]
+    assert all(record["top_emotions"] == [["грусть", 0.8], ["радость", 0.9]] for record in written)
+    assert checkpoint.chats == 5 and checkpoint.messages == 10
+    assert ReanalysisCheckpoint.load(str(tmp_path / "checkpoint.json")).position == str(archive.stat().st_size)
+
+
+@pytest.mark.asyncio
+async def test_resume_continues_after_checkpoint(tmp_path):
+    archive = tmp_path / "chats.jsonl"
+    write_archive(archive, 5)
+    first = []
+    pipeline = make_pipeline(tmp_path, first)
+    chats = iter_archive_chats(str(archive))
+
+    async def first_four():
+        count = 0
+        async for item in chats:
+            yield item
+            count += 1
+            if count == 4:
+                return
+
+    await pipeline.run(first_four())
+    saved = ReanalysisCheckpoint.load(str(tmp_path / "checkpoint.json"))
+    rest = []
+    await make_pipeline(tmp_path, rest, checkpoint=saved).run(iter_archive_chats(str(archive), saved.position))
+
+    assert [record["chat_id"] for record in rest] == ["chat-4"]
+    assert {record["run_id"] for record in first + rest} == {saved.run_id}
+
+
+@pytest.mark.asyncio
+async def test_llm_analysis_is_parsed(tmp_path):
+    archive = tmp_path / "chats.jsonl"
+    write_archive(archive, 2)
+    llm = Mock(spec=ILLMProvider)
+    responses = iter([ANALYSIS, "не JSON"])
+
+    async def generate_response(messages):
+        assert "Эмоциональная оценка сообщения" in messages[-1]["content"]
+        return next(responses)
+
+    llm.generate_response = generate_response
+    written = []
+
+    checkpoint = await make_pipeline(tmp_path, written, llm_provider=llm).run(iter_archive_chats(str(archive)))
+
+    assert written[0]["analysis"]["burnout_index"] == 0.43
+    assert written[1]["analysis"] is None and written[1]["analysis_error"] == "response is not JSON"
+    assert checkpoint.analyses == 1
+
+
+def test_progress_after_resume_counts_only_this_run(monkeypatch, capsys):
+    clock = [1000.0]
+    monkeypatch.setattr("src.application.reanalysis.ReanalysisPipeline.time.monotonic", lambda: clock[0])
+    checkpoint = ReanalysisCheckpoint(chats=900, messages=9000)
+    progress = ProgressReporter(total_chats=1000, interval=0)
+
+    progress.start(checkpoint)
+    clock[0] += 60
+    checkpoint.chats, checkpoint.messages = 950, 9600
+    progress.update(checkpoint)
+
+    line = capsys.readouterr().out
+    # 50 чатов за минуту этого запуска: до конца ещё минута, сообщений — 600 за 60 с
+    assert "ETA 1.0 min" in line
+    assert "10 msg/s" in line
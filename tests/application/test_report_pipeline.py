@@ -0,0 +1,89 @@
+import io
+import zipfile
+from datetime import datetime, timedelta
+
+import pytest
+from docx import Document
+
+from src.application.reports.ReportPipeline import ReportPipeline
+from src.core.entities.BurnoutReports import DepartmentReport, ReportPeriod
+from src.core.entities.BurnoutResults import BurnoutResult, BurnoutResultRecord
+from src.infrastructure.reports.ProcessPoolReportRenderer import ProcessPoolReportRenderer
+
+
+async def _records():
+    """В порядке хранилища: отдел, сотрудник, время"""
+    started = datetime(2026, 3, 2)
+    for department, users in (("HR", (1, 2)), ("IT", (3, 4, 5))):
+        for user_id in users:
+            for week in range(3):
+                yield BurnoutResultRecord(
+                    chat_id=f"{user_id}-{week}",
+                    created_at=started + timedelta(weeks=week),
+                    user_id=user_id,
+                    department=department,
+                    result=BurnoutResult(10 + user_id * 3 + week, 4 + week, 30, 0.3 + user_id / 20,
+                                         ["Отдыхайте чаще", "Обсудите нагрузку"])
+                )
+
+
+@pytest.mark.asyncio
+async def test_reports_are_rendered_in_pool_and_streamed_into_zip():
+    output = io.BytesIO()
+    renderer = ProcessPoolReportRenderer(workers=2)
+    try:
+        with zipfile.ZipFile(output, "w") as archive:
+            pipeline = ReportPipeline(renderer.render, archive, ReportPeriod(since=datetime(2026, 3, 1)),
+                                      max_in_flight=2)
+            stats = await pipeline.run(_records())
+    finally:
+        renderer.close()
+
+    assert (stats.employees, stats.departments) == (5, 2)
+    with zipfile.ZipFile(output) as archive:
+        assert archive.namelist() == [
+            "HR/employee_1.docx", "HR/employee_2.docx", "HR/department.docx",
+            "IT/employee_3.docx", "IT/employee_4.docx", "IT/employee_5.docx", "IT/department.docx",
+        ]
+        employee = Document(io.BytesIO(archive.read("IT/employee_4.docx")))
+        department = Document(io.BytesIO(archive.read("IT/department.docx")))
+
+    # Тело шаблона сбрасывается между отчётами одного воркера
+    assert sum("сотрудник" in paragraph.text for paragraph in employee.paragraphs) == 1
+    assert len(employee.tables) == 1 and len(employee.tables[0].rows) == 4
+    assert "Обсудите нагрузку" in [paragraph.text for paragraph in employee.paragraphs]
+    # Сотрудники отдела по убыванию индекса выгорания
+    assert [row.cells[0].text for row in department.tables[1].rows[1:]] == ["5", "4", "3"]
+
+
+async def _records_without_department_or_user():
+    """Хранилище отдаёт записи без отдела первыми"""
+    started = datetime(2026, 3, 2)
+    for chat_id, department, user_id in (("a", None, 7), ("b", None, None), ("c", "HR", None), ("d", "HR", 1)):
+        yield BurnoutResultRecord(
+            chat_id=chat_id, created_at=started, user_id=user_id, department=department,
+            result=BurnoutResult(20, 5, 30, 0.4, ["Отдыхайте чаще"])
+        )
+
+
+@pytest.mark.asyncio
+async def test_records_without_department_get_own_summary_and_without_user_are_skipped():
+    reports = []
+
+    async def render(report) -> bytes:
+        reports.append(report)
+        return b"docx"
+
+    output = io.BytesIO()
+    with zipfile.ZipFile(output, "w") as archive:
+        pipeline = ReportPipeline(render, archive, ReportPeriod())
+        stats = await pipeline.run(_records_without_department_or_user())
+
+    assert (stats.employees, stats.departments, stats.skipped) == (2, 2, 2)
+    with zipfile.ZipFile(output) as archive:
+        assert archive.namelist() == [
+            "unknown/employee_7.docx", "unknown/department.docx", "HR/employee_1.docx", "HR/department.docx",
+        ]
+    unknown, hr = [report for report in reports if isinstance(report, DepartmentReport)]
+    assert [summary.user_id for summary in unknown.employees] == [7]
+    assert [summary.user_id for summary in hr.employees] == [1]
@@ -0,0 +1,189 @@
+import asyncio
+
+import pytest
+
+from src.application.streaming.StreamBuffer import parse_event_id
+from src.application.streaming.StreamBufferRegistry import StreamBufferRegistry
+from src.application.use_cases.factory.UseCaseFactory import UseCaseFactory
+from src.core.entities.QueryEntities import LLMStreamResponse, QueryRequest
+from src.core.entities.StreamStatus import StreamStatus
+from src.core.interfaces.IEmotionalClassification import IEmotionalClassification
+from src.core.interfaces.ILLMProvider import ILLMProvider
+from src.infrastructure.memory_store.InMemoryChatStorage import InMemoryChatStorage
+from src.infrastructure.metrics.StreamStats import stream_stats
+
+
+def make_chunk(text: str, is_final_chunk: bool = False) -> LLMStreamResponse:
+    return LLMStreamResponse(
+        content_chunk=text,
+        chat_id="chat-1",
+        is_completed=is_final_chunk,
+        question_count=1,
+        total_questions=8,
+        is_final_chunk=is_final_chunk
+    )
+
+
+async def slow_source(parts, release: asyncio.Event):
+    for i, part in enumerate(parts):
+        if i == 2:
+            await release.wait()
+        yield make_chunk(part)
+    yield make_chunk("", is_final_chunk=True)
+
+
+def test_parse_event_id():
+    assert parse_event_id("abc:12") == ("abc", 12)
+    assert parse_event_id("abc") is None
+    assert parse_event_id("abc:x") is None
+
+
+@pytest.mark.asyncio
+async def test_events_get_sequential_ids():
+    registry = StreamBufferRegistry()
+    release = asyncio.Event()
+    release.set()
+    buffer = registry.start(slow_source(["a", "b", "c"], release))
+
+    received = [chunk async for chunk in buffer.subscribe()]
+
+    assert [c.content_chunk for c in received] == ["a", "b", "c", ""]
+    assert [parse_event_id(c.event_id)[1] for c in received] == [0, 1, 2, 3]
+    assert buffer.chat_id == "chat-1"
+
+
+@pytest.mark.asyncio
+async def test_generation_survives_disconnect_and_replays_from_offset():
+    registry = StreamBufferRegistry()
+    release = asyncio.Event()
+    buffer = registry.start(slow_source(["a", "b", "c", "d"], release))
+
+    first_connection = buffer.subscribe()
+    first = [await first_connection.__anext__(), await first_connection.__anext__()]
+    await first_connection.aclose()
+
+    release.set()
+    last_event_id = first[-1].event_id
+    stream_id, seq = parse_event_id(last_event_id)
+    resumed = [chunk async for chunk in registry.get(stream_id).subscribe(seq)]
+
+    assert [c.content_chunk for c in resumed] == ["c", "d", ""]
+    assert resumed[-1].is_final_chunk
+
+
+@pytest.mark.asyncio
+async def test_source_error_finishes_stream():
+    async def failing_source():
+        yield make_chunk("a")
+        raise RuntimeError("boom")
+
+    registry = StreamBufferRegistry()
+    buffer = registry.start(failing_source())
+
+    received = [chunk async for chunk in buffer.subscribe()]
+
+    assert received[-1].is_final_chunk
+    assert "boom" in received[-1].content_chunk
+    assert buffer.is_finished
+
+
+@pytest.mark.asyncio
+async def test_generation_cancelled_when_client_does_not_return():
+    cancelled = asyncio.Event()
+    release = asyncio.Event()
+
+    async def endless_source():
+        try:
+            yield make_chunk("a")
+            await release.wait()
+            yield make_chunk("b")
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    registry = StreamBufferRegistry(resume_grace_seconds=0.01)
+    abandoned_before = stream_stats.abandoned_streams
+    buffer = registry.start(endless_source())
+
+    connection = buffer.subscribe()
+    await connection.__anext__()
+    await connection.aclose()
+
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+    await asyncio.sleep(0)
+
+    assert stream_stats.abandoned_streams == abandoned_before + 1
+    assert registry.get(buffer.stream_id) is None
+    assert buffer.is_finished
+
+
+@pytest.mark.asyncio
+async def test_reconnect_within_grace_keeps_generation():
+    release = asyncio.Event()
+    registry = StreamBufferRegistry(resume_grace_seconds=0.05)
+    buffer = registry.start(slow_source(["a", "b", "c"], release))
+
+    connection = buffer.subscribe()
+    first = await connection.__anext__()
+    await connection.aclose()
+
+    async def reconnect():
+        return [chunk async for chunk in buffer.subscribe(parse_event_id(first.event_id)[1])]
+
+    resumed = asyncio.create_task(reconnect())
+    await asyncio.sleep(0.1)
+    release.set()
+    rest = await resumed
+
+    assert [c.content_chunk for c in rest] == ["b", "c", ""]
+
+
+@pytest.mark.asyncio
+async def test_subscriber_stops_on_disconnect_while_idle():
+    release = asyncio.Event()
+    registry = StreamBufferRegistry(resume_grace_seconds=60)
+    buffer = registry.start(slow_source(["a", "b", "c"], release))
+
+    async def is_disconnected():
+        return True
+
+    received = [chunk async for chunk in buffer.subscribe(is_disconnected=is_disconnected, poll_interval=0.01)]
+
+    assert [c.content_chunk for c in received] == ["a", "b"]
+    assert buffer.subscribers == 0
+    release.set()
+
+
+@pytest.mark.asyncio
+async def test_partial_answer_saved_when_cancelled_outside_generation():
+    release = asyncio.Event()
+
+    class StuckLLM(ILLMProvider):
+        async def generate_response(self, messages: list) -> str:
+            return ""
+
+        async def generate_response_stream(self, messages: list):
+            yield "Как "
+            await release.wait()
+            yield "дела?"
+
+    class NeutralClassifier(IEmotionalClassification):
+        async def extract_emotion(self, message: str):
+            return [("нейтрально", 1.0)]
+
+    storage = InMemoryChatStorage()
+    use_case = UseCaseFactory.assemble_burnout_survey_use_case(StuckLLM(), storage, NeutralClassifier())
+    registry = StreamBufferRegistry()
+    buffer = registry.start(use_case.execute_stream(QueryRequest(user_input="Привет")))
+
+    # Продюсер получит первый чанк и встанет в buffer.append на занятом условии
+    await buffer._changed.acquire()
+    while not buffer.events:
+        await asyncio.sleep(0)
+    registry._producers[buffer.stream_id].cancel()
+    buffer._changed.release()
+    await asyncio.sleep(0.01)
+
+    partial = storage.chats[buffer.chat_id]["partial_response"]
+    assert partial["status"] == StreamStatus.ABANDONED.value
+    assert partial["content"] == "Как "
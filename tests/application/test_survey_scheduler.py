@@ -0,0 +1,98 @@
+from datetime import datetime
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from src.application.scheduling.SurveyScheduler import SURVEY_COMPLEXITY_COSTS, SurveyScheduler, next_week_start
+from src.application.use_cases.SurveySchedulingUseCase import SurveySchedulingUseCase
+from src.core.entities.user_entites.Department import Department
+from src.core.entities.user_entites.Gender import Gender
+from src.core.entities.user_entites.UserEntity import UserEntity
+from src.core.interfaces.ISurveyPlanStorage import ISurveyPlanStorage
+
+WEEK = datetime(2025, 6, 2)
+
+
+def make_user(user_id: int, surveys_per_week: int = 2, complexity: str = "standard", **overrides) -> UserEntity:
+    fields = dict(
+        id=user_id, full_name="Сотрудник", legal_entity="СДЭК", gender=Gender.MALE, city="Новосибирск",
+        position="Специалист", experience=3.0, age=30, subordinates_count=0, department=Department.SUPPORT,
+        performance_metrics={"kpi": 0.5}, training_completed=True, sick_leave_2025=False,
+        has_reprimand=False, corporate_activities_participation=True,
+        surveys_per_week=surveys_per_week, survey_complexity=complexity,
+    )
+    fields.update(overrides)
+    return UserEntity(**fields)
+
+
+def make_scheduler(**overrides) -> SurveyScheduler:
+    params = dict(tokens_per_minute=10_000, analyses_per_minute=100, slot_minutes=60,
+                  workday_start_hour=9, workday_end_hour=18, target_utilization=1.0)
+    params.update(overrides)
+    return SurveyScheduler(**params)
+
+
+def test_each_user_gets_weekly_frequency_on_distinct_days():
+    users = [make_user(i, surveys_per_week=3) for i in range(20)]
+
+    plan = make_scheduler().plan(users, WEEK)
+
+    assert not plan.unscheduled_user_ids
+    for user in users:
+        starts = [survey.start for survey in plan.surveys if survey.user_id == user.id]
+        assert len(starts) == 3
+        assert len({start.date() for start in starts}) == 3
+        assert all(9 <= start.hour < 18 and start.weekday() < 5 for start in starts)
+
+
+def test_load_stays_under_capacity_and_overflow_is_reported():
+    cost = SURVEY_COMPLEXITY_COSTS["standard"]
+    scheduler = make_scheduler()
+    per_slot = int(min(10_000 * 60 / cost.tokens, 100 * 60 / cost.analyses))
+    capacity = per_slot * scheduler.slots_per_day * scheduler.working_days
+    users = [make_user(i, surveys_per_week=1) for i in range(capacity + 7)]
+
+    plan = scheduler.plan(users, WEEK)
+
+    assert len(plan.surveys) == capacity
+    assert len(plan.unscheduled_user_ids) == 7
+    assert max(point.utilization for point in plan.load) <= 1.0
+    assert len(plan.load) == scheduler.slots_per_day * scheduler.working_days
+
+
+def test_unscheduled_users_are_listed_once():
+    scheduler = make_scheduler(tokens_per_minute=300, slot_minutes=540, workday_end_hour=18)
+    users = [make_user(i, surveys_per_week=3) for i in range(40)]
+
+    plan = scheduler.plan(users, WEEK)
+
+    assert plan.unscheduled_user_ids
+    assert len(plan.unscheduled_user_ids) == len(set(plan.unscheduled_user_ids))
+    missing = {user.id for user in users} - {survey.user_id for survey in plan.surveys}
+    assert missing <= set(plan.unscheduled_user_ids)
+
+
+def test_priority_users_are_placed_first():
+    scheduler = make_scheduler(tokens_per_minute=300, slot_minutes=540, workday_end_hour=18)
+    users = [make_user(i, surveys_per_week=1) for i in range(5 * 10 + 3)]
+
+    plan = scheduler.plan(users, WEEK, priorities={52: 1.0, 51: 0.9})
+
+    assert 52 not in plan.unscheduled_user_ids
+    assert 51 not in plan.unscheduled_user_ids
+
+
+def test_next_week_start_is_monday_midnight():
+    assert next_week_start(datetime(2025, 6, 4, 15, 30)) == datetime(2025, 6, 9)
+
+
+@pytest.mark.asyncio
+async def test_use_case_persists_plan():
+    storage = Mock(spec=ISurveyPlanStorage)
+    storage.save_plan = AsyncMock()
+    use_case = SurveySchedulingUseCase(make_scheduler(), storage)
+
+    plan = await use_case.plan_week([make_user(1, sick_leave_2025=True), make_user(2)], WEEK)
+
+    storage.save_plan.assert_awaited_once_with(plan)
+    assert len(plan.surveys) == 4
@@ -0,0 +1,53 @@
+import pytest
+
+from config import Config
+from src.application.APIApplication import APIApplication
+from src.application.use_cases.factory.UseCaseFactory import UseCaseFactory
+from src.core.entities.QueryEntities import QueryRequest
+from src.core.interfaces.IEmotionalClassification import IEmotionalClassification
+from src.core.interfaces.ILLMProvider import ILLMProvider
+from src.infrastructure.memory_store.InMemoryChatStorage import InMemoryChatStorage
+
+
+class RecordingLLM(ILLMProvider):
+    """Запоминает, с какой историей его спросили"""
+
+    def __init__(self):
+        self.prompts = []
+
+    async def generate_response(self, messages: list) -> str:
+        self.prompts.append([message["content"] for message in messages])
+        return "Следующий вопрос?"
+
+    async def generate_response_stream(self, messages: list):
+        yield await self.generate_response(messages)
+
+
+class NeutralClassifier(IEmotionalClassification):
+    async def extract_emotion(self, message: str):
+        return [("нейтрально", 1.0)]
+
+
+async def ws_turn(session, text: str):
+    return [chunk async for chunk in session.query_stream(QueryRequest(user_input=text, max_questions=8))]
+
+
+@pytest.mark.asyncio
+async def test_session_sees_turns_made_over_http_and_persists_before_unlock():
+    storage = InMemoryChatStorage()
+    llm = RecordingLLM()
+    rag_app = APIApplication(Config())
+    rag_app.use_case = UseCaseFactory.assemble_burnout_survey_use_case(llm, storage, NeutralClassifier())
+    session = await rag_app.open_survey_session()
+
+    await ws_turn(session, "Первый ответ")
+    # Ход уже в основном хранилище, хотя соединение ещё открыто
+    assert storage.chats[session.chat_id]["messages"][-1]["content"] == "Следующий вопрос?"
+    await rag_app.query(QueryRequest(user_input="Ответ по HTTP", chat_id=session.chat_id, max_questions=8))
+    await ws_turn(session, "Третий ответ")
+
+    assert "Ответ по HTTP" in " ".join(llm.prompts[-1])
+    assert storage.chats[session.chat_id]["question_count"] == 3
+    assert [m["content"] for m in storage.chats[session.chat_id]["messages"] if m["role"] == "user"][-3:] == [
+        "Первый ответ", "Ответ по HTTP", "Третий ответ"
+    ]
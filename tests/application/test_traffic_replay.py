@@ -0,0 +1,97 @@
+import asyncio
+import json
+
+import pytest
+
+from src.application.replay.TrafficReplay import ReplayReport, TrafficReplay, compare, load_calls, mean_trace
+from src.application.use_cases.factory.UseCaseFactory import UseCaseFactory
+from src.core.entities.QueryEntities import QueryRequest
+from src.core.interfaces.IEmotionalClassification import IEmotionalClassification
+from src.core.interfaces.ILLMProvider import ILLMProvider
+from src.entrypoints.QuerySystem import QuerySystem
+from src.infrastructure.memory_store.InMemoryChatStorage import InMemoryChatStorage
+from src.infrastructure.metrics.InstrumentedChatStorage import InstrumentedChatStorage
+from src.infrastructure.traffic.RecordingBackends import RecordingEmotionalClassification, RecordingLLMProvider
+from src.infrastructure.traffic.ReplayBackends import (
+    ReplayEmotionalClassification,
+    ReplayLLMProvider,
+    replay_storage_delay,
+)
+from src.infrastructure.traffic.TrafficRecorder import TrafficRecorder
+
+SECRET_INPUT = "Меня зовут Иван, я устал от начальника"
+
+
+class SlowLLM(ILLMProvider):
+    async def generate_response(self, messages: list) -> str:
+        await asyncio.sleep(0.05)
+        return "Как вы спите?"
+
+    async def generate_response_stream(self, messages: list):
+        await asyncio.sleep(0.03)
+        for chunk in ("Что ", "вас ", "радует?"):
+            await asyncio.sleep(0.01)
+            yield chunk
+
+
+class NeutralClassifier(IEmotionalClassification):
+    async def extract_emotion(self, message: str):
+        return [("нейтрально", 1.0)]
+
+
+async def _slow_storage(kind: str) -> None:
+    await asyncio.sleep(0.002)
+
+
+@pytest.mark.asyncio
+async def test_recorded_traffic_replays_with_recorded_latencies(tmp_path):
+    trace_path = str(tmp_path / "traffic.ndjson")
+    recorded = QuerySystem()
+    recorded.recorder = TrafficRecorder(trace_path, salt="test")
+    recorded.rag_app.use_case = UseCaseFactory.assemble_burnout_survey_use_case(
+        RecordingLLMProvider(SlowLLM()),
+        InstrumentedChatStorage(InMemoryChatStorage(delay=_slow_storage)),
+        RecordingEmotionalClassification(NeutralClassifier())
+    )
+
+    first = await recorded.query(QueryRequest(user_input=SECRET_INPUT))
+    chunks = [chunk async for chunk in recorded.query_stream(QueryRequest(user_input="Плохо", chat_id=first.chat_id))]
+    assert chunks[-1].is_final_chunk
+    await recorded.close()
+
+    with open(trace_path, encoding="utf-8") as file:
+        raw = file.read()
+    assert "Иван" not in raw and first.chat_id not in raw
+    calls = load_calls([trace_path])
+    assert [call.op for call in calls] == ["query", "query_stream"]
+    assert calls[0].trace.llm_calls[0].total >= 0.05
+    assert calls[1].trace.llm_calls[0].chunks == 3
+    assert calls[1].items[0]["chat"] == calls[0].responses[0]["chat"]
+    assert calls[0].trace.storage_writes
+
+    replayed = QuerySystem()
+    replayed.recorder = None
+    storage = InMemoryChatStorage(delay=replay_storage_delay)
+    replayed.rag_app.use_case = UseCaseFactory.assemble_burnout_survey_use_case(
+        ReplayLLMProvider(), storage, ReplayEmotionalClassification()
+    )
+    report = await TrafficReplay(replayed, storage, mean_trace(calls), speed=10).run(calls)
+
+    assert report.ops["query"]["count"] == 1 and report.ops["query"]["errors"] == 0
+    assert report.ops["query"]["latency"]["p50"] >= 0.05
+    assert report.ops["query_stream"]["first_chunk"]["p50"] >= 0.03
+    # Продолжение попало в чат, созданный первым ходом воспроизведения
+    assert len(storage.chats) == 1
+    assert next(iter(storage.chats.values()))["question_count"] == 2
+
+
+def test_compare_flags_percentile_growth_over_threshold():
+    report = ReplayReport(speed=1.0, wall_seconds=1.0, ops={
+        "query": {"count": 10, "errors": 0, "latency": {"p50": 0.2, "p99": 0.5}}
+    })
+    baseline = json.loads(json.dumps({"ops": {"query": {"errors": 0, "latency": {"p50": 0.19, "p99": 0.3}}}}))
+
+    regressions = compare(report, baseline, threshold=0.1)
+
+    assert len(regressions) == 1
+    assert regressions[0].startswith("query latency p99")
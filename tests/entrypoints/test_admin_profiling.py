@@ -0,0 +1,44 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import app as app_module
+from src.application.tenancy.TenantRegistry import TenantRegistry
+
+API_KEY = "admin-key"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(app_module.query_system.rag_app, "tenants", TenantRegistry.from_config(API_KEY, ""))
+    # Без with: lifespan не запускаем, модели и Mongo эндпоинтам профилирования не нужны
+    return TestClient(app_module.app)
+
+
+def test_admin_profile_returns_collapsed_stacks(client):
+    response = client.get("/admin/profile", params={"seconds": 0.05}, headers={"X-API-Key": API_KEY})
+
+    assert response.status_code == 200
+    assert response.headers["content-disposition"].endswith('.collapsed"')
+    assert response.text.strip()
+
+
+def test_request_profile_roundtrip(client):
+    profiled = client.get("/health", headers={"X-API-Key": API_KEY, "X-Profile-Request": "1"})
+    profile_id = profiled.headers["x-profile-id"]
+
+    response = client.get(f"/admin/profiles/{profile_id}", headers={"X-API-Key": API_KEY})
+
+    assert response.status_code == 200
+    assert "health_check" in response.text
+
+
+def test_admin_endpoints_require_api_key(client):
+    assert client.get("/admin/profile", params={"seconds": 0.05}, headers={"X-API-Key": "wrong"}).status_code == 401
+    assert client.get("/admin/profiles/any", headers={"X-API-Key": "wrong"}).status_code == 401
+    assert client.get("/admin/profiles/any").status_code in (401, 403)
+
+
+def test_unknown_profile_is_404(client):
+    response = client.get("/admin/profiles/missing", headers={"X-API-Key": API_KEY})
+
+    assert response.status_code == 404
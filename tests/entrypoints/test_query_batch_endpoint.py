@@ -0,0 +1,71 @@
+import asyncio
+
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+
+import app as app_module
+from config import Config
+from src.application.tenancy.TenantRegistry import TenantRegistry
+from src.application.use_cases.factory.UseCaseFactory import UseCaseFactory
+from src.core.interfaces.IEmotionalClassification import IEmotionalClassification
+from src.core.interfaces.ILLMProvider import ILLMProvider
+from src.infrastructure.memory_store.InMemoryChatStorage import InMemoryChatStorage
+
+API_KEY = "batch-key"
+
+
+class EchoLLM(ILLMProvider):
+    async def generate_response(self, messages: list) -> str:
+        await asyncio.sleep(0.01)
+        return f"Вопрос после: {messages[-1]['content']}"
+
+    async def generate_response_stream(self, messages: list):
+        yield await self.generate_response(messages)
+
+
+class NeutralClassifier(IEmotionalClassification):
+    async def extract_emotion(self, message: str):
+        return [("нейтрально", 1.0)]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    rag_app = app_module.query_system.rag_app
+    monkeypatch.setattr(rag_app, "tenants", TenantRegistry.from_config(API_KEY, ""))
+    monkeypatch.setattr(
+        rag_app, "use_case",
+        UseCaseFactory.assemble_burnout_survey_use_case(EchoLLM(), InMemoryChatStorage(), NeutralClassifier())
+    )
+    return TestClient(app_module.app)
+
+
+def test_query_batch_streams_ndjson_results(client):
+    response = client.post(
+        "/query-batch",
+        json={"requests": [{"user_input": "Привет"}, {"user_input": "Устал"}], "max_concurrency": 2},
+        headers={"X-API-Key": API_KEY}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    results = sorted((orjson.loads(line) for line in response.text.splitlines()), key=lambda r: r["index"])
+    assert [result["index"] for result in results] == [0, 1]
+    assert all(result["error"] is None and result["response"]["chat_id"] for result in results)
+
+
+def test_query_batch_rejects_oversized_and_duplicate_batches(client, monkeypatch):
+    monkeypatch.setattr(Config, "BATCH_MAX_ITEMS", 2)
+    headers = {"X-API-Key": API_KEY}
+
+    oversized = client.post("/query-batch", json={"requests": [{"user_input": "а"}] * 3}, headers=headers)
+    duplicate = client.post(
+        "/query-batch",
+        json={"requests": [{"user_input": "а", "chat_id": "c1"}, {"user_input": "б", "chat_id": "c1"}]},
+        headers=headers
+    )
+    unauthorized = client.post("/query-batch", json={"requests": []}, headers={"X-API-Key": "wrong"})
+
+    assert oversized.status_code == 413
+    assert duplicate.status_code == 422
+    assert unauthorized.status_code == 401
@@ -0,0 +1,159 @@
+import asyncio
+
+import httpx
+import orjson
+import pytest
+from starlette.requests import ClientDisconnect
+
+import app as app_module
+from src.application.tenancy.TenantRegistry import TenantRegistry
+from src.application.use_cases.factory.UseCaseFactory import UseCaseFactory
+from src.core.entities.QueryEntities import QueryRequest
+from src.core.interfaces.IEmotionalClassification import IEmotionalClassification
+from src.core.interfaces.ILLMProvider import ILLMProvider
+from src.infrastructure.memory_store.InMemoryChatStorage import InMemoryChatStorage
+
+API_KEY = "stream-key"
+
+
+class SlowLLM(ILLMProvider):
+    async def generate_response(self, messages: list) -> str:
+        return "Как вы?"
+
+    async def generate_response_stream(self, messages: list):
+        for word in ("Как ", "вы?"):
+            await asyncio.sleep(0.01)
+            yield word
+
+
+class NeutralClassifier(IEmotionalClassification):
+    async def extract_emotion(self, message: str):
+        return [("нейтрально", 1.0)]
+
+
+@pytest.mark.asyncio
+async def test_ticket_released_when_client_leaves_before_reading_body(monkeypatch):
+    rag_app = app_module.query_system.rag_app
+    storage = InMemoryChatStorage()
+    monkeypatch.setattr(rag_app, "tenants", TenantRegistry.from_config(API_KEY, ""))
+    monkeypatch.setattr(
+        rag_app, "use_case", UseCaseFactory.assemble_burnout_survey_use_case(SlowLLM(), storage, NeutralClassifier())
+    )
+    in_flight_before = rag_app.admission.in_flight
+
+    body = orjson.dumps({"user_input": "Привет"})
+    scope = {
+        "type": "http", "asgi": {"version": "3.0", "spec_version": "2.4"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": "/query-streaming", "raw_path": b"/query-streaming",
+        "query_string": b"", "root_path": "", "server": ("test", 80), "client": ("test", 1),
+        "headers": [(b"x-api-key", API_KEY.encode()), (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode())],
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        # Как uvicorn с ASGI 2.4: сокет уже закрыт, и заголовки ответа не уходят
+        raise OSError("client disconnected")
+
+    with pytest.raises(ClientDisconnect):
+        await app_module.app(scope, receive, send)
+
+    for _ in range(100):
+        if rag_app.admission.in_flight == in_flight_before:
+            break
+        await asyncio.sleep(0.01)
+    assert rag_app.admission.in_flight == in_flight_before
+    # Генерация, запущенная до ответа, доведена до конца и сохранена
+    chat = next(iter(storage.chats.values()))
+    assert chat["messages"][-1]["content"] == "Как вы?"
+
+
+@pytest.mark.asyncio
+async def test_stream_waits_for_its_chat_before_taking_admission_slot(monkeypatch):
+    rag_app = app_module.query_system.rag_app
+    storage = InMemoryChatStorage()
+    monkeypatch.setattr(
+        rag_app, "use_case", UseCaseFactory.assemble_burnout_survey_use_case(SlowLLM(), storage, NeutralClassifier())
+    )
+    in_flight_before = rag_app.admission.in_flight
+    chat_id = (await rag_app.query(QueryRequest(user_input="Привет"))).chat_id
+    release = asyncio.Event()
+
+    async def hold_chat():
+        async with rag_app.chat_locks.hold(chat_id):
+            await release.wait()
+
+    holder = asyncio.create_task(hold_chat())
+    await asyncio.sleep(0)
+    starting = asyncio.create_task(rag_app.start_stream(QueryRequest(user_input="Устал", chat_id=chat_id)))
+    await asyncio.sleep(0.05)
+
+    assert not starting.done()
+    assert rag_app.admission.in_flight == in_flight_before
+    release.set()
+    buffer = await asyncio.wait_for(starting, timeout=1)
+    await holder
+    chunks = [chunk async for chunk in buffer.subscribe(-1)]
+
+    assert chunks[-1].chat_id == chat_id
+    assert storage.chats[chat_id]["messages"][-1]["content"] == "Как вы?"
+
+
+@pytest.mark.asyncio
+async def test_stream_of_busy_chat_is_rejected_with_409(monkeypatch):
+    rag_app = app_module.query_system.rag_app
+    monkeypatch.setattr(rag_app, "tenants", TenantRegistry.from_config(API_KEY, ""))
+    monkeypatch.setattr(
+        rag_app, "use_case",
+        UseCaseFactory.assemble_burnout_survey_use_case(SlowLLM(), InMemoryChatStorage(), NeutralClassifier())
+    )
+    monkeypatch.setattr(rag_app.chat_locks, "wait_seconds", 0.05)
+    in_flight_before = rag_app.admission.in_flight
+    chat_id = (await rag_app.query(QueryRequest(user_input="Привет"))).chat_id
+
+    transport = httpx.ASGITransport(app=app_module.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        async with rag_app.chat_locks.hold(chat_id):
+            response = await client.post(
+                "/query-streaming",
+                json={"user_input": "Устал", "chat_id": chat_id},
+                headers={"x-api-key": API_KEY}
+            )
+
+    assert response.status_code == 409
+    assert int(response.headers["retry-after"]) >= 1
+    assert rag_app.admission.in_flight == in_flight_before
+
+
+@pytest.mark.asyncio
+async def test_handler_cancelled_during_admission_drops_the_turn_quietly(monkeypatch):
+    rag_app = app_module.query_system.rag_app
+    storage = InMemoryChatStorage()
+    monkeypatch.setattr(
+        rag_app, "use_case", UseCaseFactory.assemble_burnout_survey_use_case(SlowLLM(), storage, NeutralClassifier())
+    )
+    in_flight_before = rag_app.admission.in_flight
+    chat_id = (await rag_app.query(QueryRequest(user_input="Привет"))).chat_id
+    messages_before = len(storage.chats[chat_id]["messages"])
+    buffers_before = set(rag_app.stream_registry._buffers)
+
+    async with rag_app.chat_locks.hold(chat_id):
+        starting = asyncio.create_task(rag_app.start_stream(QueryRequest(user_input="Устал", chat_id=chat_id)))
+        await asyncio.sleep(0.01)
+        # Клиент ушёл, пока ход ждал очереди к чату
+        starting.cancel()
+        await asyncio.gather(starting, return_exceptions=True)
+
+    (stream_id,) = set(rag_app.stream_registry._buffers) - buffers_before
+    buffer = rag_app.stream_registry._buffers[stream_id]
+    for _ in range(100):
+        if buffer.is_finished:
+            break
+        await asyncio.sleep(0.01)
+
+    assert buffer.is_finished and buffer.events == []
+    assert rag_app.admission.in_flight == in_flight_before
+    assert len(storage.chats[chat_id]["messages"]) == messages_before
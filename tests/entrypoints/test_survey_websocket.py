@@ -0,0 +1,261 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+import app as app_module
+from src.application.tenancy.TenantRegistry import TenantRegistry
+from src.application.use_cases.factory.UseCaseFactory import UseCaseFactory
+from src.core.entities.QueryEntities import QueryRequest
+from src.core.entities.StreamStatus import StreamStatus
+from src.core.entities.TokenUsage import QUESTION_TURN, UNATTRIBUTED, TokenUsage, UsageKey
+from src.core.interfaces.IBurnoutResultStorage import IBurnoutResultStorage
+from src.core.interfaces.IBurnoutTimeSeries import IBurnoutTimeSeries
+from src.core.interfaces.IEmotionalClassification import IEmotionalClassification
+from src.core.interfaces.ILLMProvider import ILLMProvider
+from src.infrastructure.memory_store.InMemoryChatStorage import InMemoryChatStorage
+from src.infrastructure.metrics.TokenUsageStats import token_usage
+
+API_KEY = "ws-key"
+
+
+class WordsLLM(ILLMProvider):
+    async def generate_response(self, messages: list) -> str:
+        return "Как вы себя чувствуете?"
+
+    async def generate_response_stream(self, messages: list):
+        for word in ("Как ", "вы ", "себя ", "чувствуете?"):
+            await asyncio.sleep(0.01)
+            yield word
+
+
+class AnalysisLLM(ILLMProvider):
+    """На любой ход отвечает JSON анализа: вопросы тесту не важны, важен последний ход"""
+
+    async def generate_response(self, messages: list) -> str:
+        return ANALYSIS_JSON
+
+    async def generate_response_stream(self, messages: list):
+        yield ANALYSIS_JSON[:40]
+        yield ANALYSIS_JSON[40:]
+
+
+ANALYSIS_JSON = ('{"emotional_exhaustion": 26, "depersonalization": 7, "reduction_of_achievements": 20, '
+                 '"burnout_index": 0.4, "recommendations": ["Отдых"]}')
+
+
+class NeutralClassifier(IEmotionalClassification):
+    async def extract_emotion(self, message: str):
+        return [("нейтрально", 1.0)]
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    storage = InMemoryChatStorage()
+    rag_app = app_module.query_system.rag_app
+    monkeypatch.setattr(rag_app, "tenants", TenantRegistry.from_config(API_KEY, ""))
+    monkeypatch.setattr(
+        rag_app, "use_case", UseCaseFactory.assemble_burnout_survey_use_case(WordsLLM(), storage, NeutralClassifier())
+    )
+    return storage
+
+
+def test_connection_without_key_is_rejected_when_api_key_is_unset(monkeypatch):
+    monkeypatch.setattr(app_module.query_system.rag_app, "tenants", TenantRegistry.from_config(None, ""))
+    client = TestClient(app_module.app)
+
+    with pytest.raises(WebSocketDisconnect) as rejected:
+        with client.websocket_connect("/ws/survey"):
+            pass
+
+    assert rejected.value.code == 1008
+
+
+def test_malformed_frames_get_error_frames_and_keep_connection(storage):
+    client = TestClient(app_module.app)
+
+    with client.websocket_connect("/ws/survey", headers={"x-api-key": API_KEY}) as websocket:
+        for frame in ("[1, 2]", "{не json", '{"department": "Бухгалтерия Марса"}',
+                      '{"list_user_psych_status": {"user_id": "никто"}}'):
+            websocket.send_text(frame)
+            assert orjson.loads(websocket.receive_text())["error"].startswith("Invalid message")
+
+        websocket.send_json({"user_input": "Привет"})
+        frames = [orjson.loads(websocket.receive_text())]
+        while not frames[-1]["is_final_chunk"]:
+            frames.append(orjson.loads(websocket.receive_text()))
+
+    assert "".join(frame["content"] for frame in frames) == "Как вы себя чувствуете?"
+
+
+def test_reconnect_during_open_connection_reuses_session(storage):
+    client = TestClient(app_module.app)
+    sessions = app_module.query_system.rag_app.survey_sessions
+
+    with client.websocket_connect(f"/ws/survey?api_key={API_KEY}") as first:
+        first.send_json({"user_input": "Привет"})
+        frames = []
+        while not frames or not frames[-1]["is_final_chunk"]:
+            frames.append(orjson.loads(first.receive_text()))
+        chat_id = frames[-1]["chat_id"]
+        opened = sessions._sessions[chat_id]
+
+        with client.websocket_connect(f"/ws/survey?api_key={API_KEY}&chat_id={chat_id}"):
+            assert sessions._sessions[chat_id] is opened
+            assert opened.connections == 2
+
+
+@pytest.mark.asyncio
+async def test_dead_socket_ends_session_and_saves_partial_answer(storage):
+    sessions = app_module.query_system.rag_app.survey_sessions
+    scope = {
+        "type": "websocket", "asgi": {"version": "3.0", "spec_version": "2.4"}, "http_version": "1.1",
+        "scheme": "ws", "path": "/ws/survey", "raw_path": b"/ws/survey", "root_path": "",
+        "query_string": f"api_key={API_KEY}".encode(), "headers": [], "server": ("test", 80),
+        "client": ("test", 1), "subprotocols": [],
+    }
+    incoming = [
+        {"type": "websocket.connect"},
+        {"type": "websocket.receive", "text": orjson.dumps({"user_input": "Привет"}).decode()},
+    ]
+
+    async def receive():
+        if incoming:
+            return incoming.pop(0)
+        await asyncio.Event().wait()
+
+    async def send(message):
+        # Соединение оборвалось сразу после рукопожатия: первый же кадр не уходит
+        if message["type"] == "websocket.send":
+            raise OSError("connection reset")
+
+    await asyncio.wait_for(app_module.app(scope, receive, send), timeout=2)
+    await asyncio.gather(*sessions._closing)
+
+    chat = next(iter(storage.chats.values()))
+    assert chat["partial_response"]["status"] == StreamStatus.ABANDONED.value
+    assert chat["_id"] not in sessions._sessions
+
+
+def test_websocket_survey_saves_its_result(monkeypatch):
+    result_storage = Mock(spec=IBurnoutResultStorage)
+    result_storage.save_result = AsyncMock(return_value=True)
+    timeseries = Mock(spec=IBurnoutTimeSeries)
+    rag_app = app_module.query_system.rag_app
+    monkeypatch.setattr(rag_app, "tenants", TenantRegistry.from_config(API_KEY, ""))
+    monkeypatch.setattr(rag_app, "use_case", UseCaseFactory.assemble_burnout_survey_use_case(
+        AnalysisLLM(), InMemoryChatStorage(), NeutralClassifier(), result_storage=result_storage, timeseries=timeseries
+    ))
+    client = TestClient(app_module.app)
+
+    with client.websocket_connect(f"/ws/survey?api_key={API_KEY}") as websocket:
+        for _ in range(10):
+            websocket.send_json({"user_input": "Устаю к вечеру", "user_id": 42, "department": "it"})
+            frames = [orjson.loads(websocket.receive_text())]
+            while not frames[-1]["is_final_chunk"]:
+                frames.append(orjson.loads(websocket.receive_text()))
+            if frames[-1]["is_analysis"]:
+                break
+
+    assert frames[-1]["is_analysis"]
+    record = result_storage.save_result.await_args.args[0]
+    assert record.chat_id == frames[-1]["chat_id"]
+    assert record.user_id == 42 and record.result.emotional_exhaustion == 26
+    timeseries.append_scores.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_turn_of_busy_chat_gets_error_frame_without_taking_slot(storage, monkeypatch):
+    rag_app = app_module.query_system.rag_app
+    monkeypatch.setattr(rag_app.chat_locks, "wait_seconds", 0.05)
+    in_flight_before = rag_app.admission.in_flight
+    chat_id = (await rag_app.query(QueryRequest(user_input="Привет"))).chat_id
+    scope = {
+        "type": "websocket", "asgi": {"version": "3.0", "spec_version": "2.4"}, "http_version": "1.1",
+        "scheme": "ws", "path": "/ws/survey", "raw_path": b"/ws/survey", "root_path": "",
+        "query_string": f"api_key={API_KEY}&chat_id={chat_id}".encode(), "headers": [],
+        "server": ("test", 80), "client": ("test", 1), "subprotocols": [],
+    }
+    incoming = [
+        {"type": "websocket.connect"},
+        {"type": "websocket.receive", "text": orjson.dumps({"user_input": "Устал"}).decode()},
+    ]
+    frames = []
+
+    async def receive():
+        if incoming:
+            return incoming.pop(0)
+        return {"type": "websocket.disconnect", "code": 1000}
+
+    async def send(message):
+        if message["type"] == "websocket.send":
+            frames.append(orjson.loads(message["text"]))
+
+    # Ход чата уже идёт в другом соединении или через HTTP
+    async with rag_app.chat_locks.hold(chat_id):
+        await asyncio.wait_for(app_module.app(scope, receive, send), timeout=2)
+    await asyncio.gather(*rag_app.survey_sessions._closing)
+
+    assert frames[0]["retry_after"] >= 1 and "in progress" in frames[0]["error"]
+    assert rag_app.admission.in_flight == in_flight_before
+    assert storage.chats[chat_id]["messages"][-2]["content"] == "Привет"
+
+
+class UsageReportingLLM(ILLMProvider):
+    """Как DeepSeek с include_usage: usage приходит уже после последнего токена"""
+
+    async def generate_response(self, messages: list) -> str:
+        return "Как вы?"
+
+    async def generate_response_stream(self, messages: list):
+        for word in ("Как ", "вы?"):
+            await asyncio.sleep(0.01)
+            yield word
+        await asyncio.sleep(0.01)
+        token_usage.record(TokenUsage(prompt_tokens=120, completion_tokens=2), seconds=0.1)
+
+
+@pytest.mark.asyncio
+async def test_streamed_turn_usage_is_booked_to_its_tenant(monkeypatch):
+    rag_app = app_module.query_system.rag_app
+    storage = InMemoryChatStorage()
+    monkeypatch.setattr(rag_app, "tenants", TenantRegistry.from_config(None, '{"survey-bot": {"key": "bot-key"}}'))
+    monkeypatch.setattr(
+        rag_app, "use_case",
+        UseCaseFactory.assemble_burnout_survey_use_case(UsageReportingLLM(), storage, NeutralClassifier())
+    )
+    scope = {
+        "type": "websocket", "asgi": {"version": "3.0", "spec_version": "2.4"}, "http_version": "1.1",
+        "scheme": "ws", "path": "/ws/survey", "raw_path": b"/ws/survey", "root_path": "",
+        "query_string": b"", "headers": [(b"x-api-key", b"bot-key")], "server": ("test", 80),
+        "client": ("test", 1), "subprotocols": [],
+    }
+    incoming = [
+        {"type": "websocket.connect"},
+        {"type": "websocket.receive", "text": orjson.dumps({"user_input": "Привет"}).decode()},
+    ]
+    frames = []
+
+    async def receive():
+        if incoming:
+            return incoming.pop(0)
+        # Отключаемся только после финального кадра хода
+        while not frames or not frames[-1].get("is_final_chunk"):
+            await asyncio.sleep(0.01)
+        return {"type": "websocket.disconnect", "code": 1000}
+
+    async def send(message):
+        if message["type"] == "websocket.send":
+            frames.append(orjson.loads(message["text"]))
+
+    token_usage.drain()
+    await asyncio.wait_for(app_module.app(scope, receive, send), timeout=2)
+    await asyncio.gather(*rag_app.survey_sessions._closing)
+
+    chat_id = next(iter(storage.chats))
+    pending = token_usage.drain()
+    assert pending[UsageKey("survey-bot", chat_id, QUESTION_TURN)].prompt_tokens == 120
+    assert not any(key.tenant == UNATTRIBUTED for key in pending)
@@ -0,0 +1,17 @@
+import asyncio
+import time
+
+import pytest
+
+from src.infrastructure.rate_limit.AsyncRateLimiter import AsyncRateLimiter
+
+
+@pytest.mark.asyncio
+async def test_rate_is_limited_after_burst():
+    limiter = AsyncRateLimiter(rate_per_minute=600, burst=2)  # 10 в секунду
+
+    started = time.monotonic()
+    await asyncio.gather(*(limiter.acquire() for _ in range(5)))
+
+    # 2 сразу из всплеска, остальные 3 по 0.1 с
+    assert time.monotonic() - started == pytest.approx(0.3, abs=0.08)
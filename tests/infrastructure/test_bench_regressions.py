@@ -0,0 +1,26 @@
+from src.infrastructure.metrics.bench_regressions import find_regressions
+
+
+def row(backend: str, messages_per_second: float, p95: float, batch_size: int = 8) -> dict:
+    return {"backend": backend, "batch_size": batch_size, "lengths": "mixed", "threads": 4,
+            "messages_per_second": messages_per_second, "latency_ms": {"p50": p95 / 2, "p95": p95, "p99": p95 * 2}}
+
+
+def test_reports_throughput_drop_and_p95_growth_beyond_threshold():
+    baseline = {"results": [row("sync", 1000, 10.0), row("batcher", 500, 20.0)]}
+    results = [row("sync", 850, 10.5), row("batcher", 495, 25.0)]
+
+    regressions = find_regressions(results, baseline, threshold=0.1)
+
+    assert regressions == [
+        "sync/batch=8/mixed/threads=4: 1000.0 -> 850.0 msg/s (-15%)",
+        "batcher/batch=8/mixed/threads=4: p95 20.0 -> 25.0 ms (+25%)",
+    ]
+
+
+def test_changes_within_threshold_and_unmatched_configs_are_ignored():
+    baseline = {"results": [row("sync", 1000, 10.0), row("pool", 300, 0.0)]}
+    results = [row("sync", 910, 10.9), row("sync", 10, 99.0, batch_size=64), row("pool", 300, 5.0)]
+
+    assert find_regressions(results, baseline, threshold=0.1) == []
+    assert find_regressions(results, {}, threshold=0.1) == []
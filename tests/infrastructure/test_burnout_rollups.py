@@ -0,0 +1,88 @@
+from datetime import datetime
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from src.core.entities.BurnoutResults import BurnoutResult, BurnoutResultRecord, week_start_of
+from src.infrastructure.mongodb_store.MongoDBBurnoutResultStorage import MongoDBBurnoutResultStorage
+
+
+def apply_increments(results):
+    """Повторяет семантику $inc по вложенным путям"""
+    document = {"department": "it", "week_start": datetime(2025, 6, 2)}
+    for result in results:
+        for path, value in MongoDBBurnoutResultStorage._rollup_increment(result).items():
+            node = document
+            *parents, leaf = path.split(".")
+            for key in parents:
+                node = node.setdefault(key, {})
+            node[leaf] = node.get(leaf, 0) + value
+    return document
+
+
+def test_rollup_means_levels_and_histogram():
+    results = [
+        BurnoutResult(10, 4, 35, 0.25, []),
+        BurnoutResult(30, 12, 40, 0.65, []),
+    ]
+
+    rollup = MongoDBBurnoutResultStorage._to_rollup(apply_increments(results))
+
+    assert rollup.count == 2
+    assert rollup.means["emotional_exhaustion"] == 20
+    assert rollup.stdevs["emotional_exhaustion"] == 10
+    assert rollup.levels["emotional_exhaustion"] == {"low": 1, "medium": 0, "high": 1}
+    assert rollup.levels["reduction_of_achievements"] == {"low": 0, "medium": 1, "high": 1}
+    assert rollup.burnout_index_histogram[2] == 1 and rollup.burnout_index_histogram[6] == 1
+
+
+def test_week_start_of():
+    assert week_start_of(datetime(2025, 6, 8, 23, 59)) == datetime(2025, 6, 2)
+
+
+class FakeCollection:
+    """Минимальная семантика insert_one / update_one с upsert для проверки порядка записей"""
+
+    def __init__(self):
+        self.documents = {}
+        self.fail_next_insert = False
+
+    async def create_index(self, *args, **kwargs):
+        pass
+
+    async def insert_one(self, document):
+        if self.fail_next_insert:
+            self.fail_next_insert = False
+            raise ConnectionError("primary stepped down")
+        if document["_id"] in self.documents:
+            raise DuplicateKeyError("duplicate _id")
+        self.documents[document["_id"]] = dict(document)
+
+    async def update_one(self, filter_, update, upsert=False):
+        document = self.documents.get(filter_["_id"])
+        if document is not None and filter_["chat_ids"]["$ne"] in document["chat_ids"]:
+            if upsert:
+                raise DuplicateKeyError("duplicate _id")
+            return
+        if document is None:
+            document = self.documents[filter_["_id"]] = {"_id": filter_["_id"], "chat_ids": [], "count": 0}
+        document["count"] += update["$inc"]["count"]
+        document["chat_ids"].append(update["$push"]["chat_ids"])
+
+
+@pytest.mark.asyncio
+async def test_save_retry_after_partial_failure_counts_result_once():
+    storage = MongoDBBurnoutResultStorage("mongodb://localhost:27017")
+    storage.results, storage.rollups = FakeCollection(), FakeCollection()
+    record = BurnoutResultRecord(chat_id="chat-1", created_at=datetime(2025, 6, 4),
+                                 result=BurnoutResult(10, 4, 35, 0.25, []), user_id=42, department="it")
+
+    storage.results.fail_next_insert = True
+    with pytest.raises(ConnectionError):
+        await storage.save_result(record)
+    assert await storage.save_result(record) is True
+    assert await storage.save_result(record) is False
+
+    rollup = storage.rollups.documents[f"it:{week_start_of(record.created_at):%Y-%m-%d}"]
+    assert rollup["count"] == 1 and rollup["chat_ids"] == ["chat-1"]
+    assert "chat-1" in storage.results.documents
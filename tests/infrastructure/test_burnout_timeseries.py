@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from src.core.entities.BurnoutTimeSeries import EMOTION_DTYPE, SCORE_DTYPE, compute_trend
+from src.infrastructure.mongodb_store.MongoDBBurnoutTimeSeries import (
+    MongoDBBurnoutTimeSeries, pack_rows, unpack_rows
+)
+
+START = datetime(2025, 1, 1)
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def sort(self, key, direction):
+        self.documents = sorted(self.documents, key=lambda d: d[key], reverse=direction < 0)
+        return self
+
+    def __aiter__(self):
+        async def iterate():
+            for document in self.documents:
+                yield document
+        return iterate()
+
+
+def test_rows_are_fixed_width_and_round_trip():
+    packed = pack_rows(START, [[1.0] * 10, [2.0] * 10], EMOTION_DTYPE)
+
+    assert len(packed) == 2 * 48
+    rows = unpack_rows([packed], EMOTION_DTYPE)
+    assert rows["v"].dtype == np.float32
+    assert rows["v"][1, 0] == 2.0
+
+
+def test_trend_slope_and_delta():
+    rows = unpack_rows([
+        pack_rows(START + timedelta(days=30 * i), [[10 + 3 * i, 5, 30 - i, 0.2 + 0.05 * i]], SCORE_DTYPE)
+        for i in range(4)
+    ], SCORE_DTYPE)
+
+    trend = compute_trend(rows)
+
+    assert trend.count == 4
+    assert trend.last == [19.0, 5.0, 27.0, 0.35]
+    assert trend.delta == [3.0, 0.0, -1.0, 0.05]
+    assert trend.slope_per_30_days[0] == pytest.approx(3.0, abs=1e-3)
+    assert "Тренд за 30 дней" in trend.render()
+
+
+@pytest.mark.asyncio
+async def test_last_scores_reads_newest_months_first():
+    documents = [
+        {"month": f"2025-{month:02d}", "scores": [
+            pack_rows(datetime(2025, month, day), [[month, day, 0, 0.1]], SCORE_DTYPE) for day in (1, 15)
+        ]}
+        for month in (1, 2, 3)
+    ]
+    store = MongoDBBurnoutTimeSeries.__new__(MongoDBBurnoutTimeSeries)
+    store.series = Mock()
+    store.series.find = Mock(return_value=FakeCursor(documents))
+
+    rows = await store.last_scores(user_id=7, n=3)
+
+    assert [(row[0], row[1]) for row in rows["v"]] == [(2, 15), (3, 1), (3, 15)]
@@ -0,0 +1,75 @@
+import os
+
+from src.infrastructure.metrics.MetricsRegistry import MetricsRegistry
+
+
+def test_counter_and_gauge_render():
+    registry = MetricsRegistry()
+    turns = registry.counter("turns_total", "Ходы", labelnames=("kind",))
+    in_flight = registry.gauge("in_flight", "В работе")
+
+    turns.labels("analysis").inc()
+    turns.labels("analysis").inc(2)
+    with in_flight.labels().track_inprogress():
+        assert in_flight.labels().value == 1
+
+    text = registry.render()
+
+    assert "# TYPE turns_total counter" in text
+    assert 'turns_total{kind="analysis"} 3' in text
+    assert "in_flight 0" in text
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Задержка", buckets=(0.1, 1.0))
+
+    for value in (0.05, 0.5, 0.7, 3.0):
+        latency.observe(value)
+
+    lines = registry.render().splitlines()
+
+    assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{le="1.0"} 3' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 4' in lines
+    assert "latency_seconds_count 4" in lines
+    assert "latency_seconds_sum 4.25" in lines
+
+
+def test_collectors_are_rendered():
+    registry = MetricsRegistry()
+    registry.add_collector(lambda: [("custom_metric", "gauge", 7)])
+
+    assert registry.render().endswith("custom_metric 7\n")
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    rejected = registry.counter("rejected_total", "Отказы\nпо ключам", labelnames=("tenant",))
+
+    rejected.labels('acme "eu"\\prod\nline2').inc()
+
+    lines = registry.render().splitlines()
+
+    assert "# HELP rejected_total Отказы\\nпо ключам" in lines
+    assert 'rejected_total{tenant="acme \\"eu\\"\\\\prod\\nline2"} 1' in lines
+
+
+def test_pid_label_separates_worker_series():
+    registry = MetricsRegistry(label_pid=True)
+    turns = registry.counter("turns_total", "Ходы", labelnames=("kind",))
+    in_flight = registry.gauge("in_flight", "В работе")
+    latency = registry.histogram("latency_seconds", "Задержка", buckets=(1.0,))
+    registry.add_collector(lambda: [("custom_metric", "gauge", 7)])
+
+    turns.labels("analysis").inc()
+    latency.observe(0.5)
+
+    pid = f'pid="{os.getpid()}"'
+    lines = registry.render().splitlines()
+
+    assert f'turns_total{{kind="analysis",{pid}}} 1' in lines
+    assert f"in_flight{{{pid}}} 0" in lines
+    assert f'latency_seconds_bucket{{{pid},le="1.0"}} 1' in lines
+    assert f"latency_seconds_count{{{pid}}} 1" in lines
+    assert f"custom_metric{{{pid}}} 7" in lines
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from src.infrastructure.batching.MicroBatcher import MicroBatcher
+
+
+@pytest.mark.asyncio
+async def test_concurrent_submits_share_batches():
+    batches = []
+    release = asyncio.Event()
+
+    async def batch_fn(items):
+        batches.append(list(items))
+        await release.wait()
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=3)
+    tasks = [asyncio.create_task(batcher.submit(i)) for i in range(5)]
+    await asyncio.sleep(0)
+
+    assert batcher.pending == 5
+    release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert results == [0, 2, 4, 6, 8]
+    assert batches == [[0], [1, 2, 3], [4]]
+    assert batcher.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_single_submit_is_not_delayed():
+    async def batch_fn(items):
+        return items
+
+    batcher = MicroBatcher(batch_fn)
+
+    assert await asyncio.wait_for(batcher.submit("a"), timeout=0.1) == "a"
+
+
+@pytest.mark.asyncio
+async def test_batch_error_is_propagated_to_every_item():
+    async def batch_fn(items):
+        raise RuntimeError("bulk write failed")
+
+    batcher = MicroBatcher(batch_fn)
+    results = await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert batcher.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_item_error_goes_only_to_its_caller():
+    async def batch_fn(items):
+        return [ValueError(item) if item == "bad" else item for item in items]
+
+    batcher = MicroBatcher(batch_fn)
+    results = await asyncio.gather(
+        batcher.submit("a"), batcher.submit("bad"), batcher.submit("c"), return_exceptions=True
+    )
+
+    assert results[0] == "a" and results[2] == "c"
+    assert isinstance(results[1], ValueError)
+
+
+@pytest.mark.asyncio
+async def test_drain_waits_for_queued_batches():
+    written = []
+
+    async def batch_fn(items):
+        await asyncio.sleep(0.01)
+        written.extend(items)
+        return items
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=2)
+    for i in range(5):
+        asyncio.ensure_future(batcher.submit(i))
+    await asyncio.sleep(0)
+
+    await batcher.drain()
+
+    assert sorted(written) == [0, 1, 2, 3, 4]
+    assert batcher.pending == 0
@@ -0,0 +1,39 @@
+import asyncio
+
+import pytest
+from pymongo.errors import BulkWriteError, OperationFailure
+
+from src.infrastructure.mongodb_store.MongoDBChatStorage import MongoDBChatStorage
+
+
+class DuplicateOnSecondWrite:
+    """Коллекция, у которой вторая операция батча падает, а остальные применяются"""
+
+    def __init__(self):
+        self.batches = []
+
+    async def bulk_write(self, operations, ordered=True):
+        self.batches.append((list(operations), ordered))
+        if len(operations) > 1:
+            raise BulkWriteError({
+                "writeErrors": [{"index": 1, "code": 11000, "errmsg": "duplicate key"}],
+                "writeConcernErrors": [],
+                "nInserted": 0,
+                "nModified": len(operations) - 1,
+            })
+
+
+@pytest.mark.asyncio
+async def test_failed_bulk_operation_errors_only_its_caller():
+    storage = MongoDBChatStorage("mongodb://localhost:27017")
+    storage.chats = DuplicateOnSecondWrite()
+
+    results = await asyncio.gather(
+        *(storage.add_message(f"chat-{i}", "user", "Устал") for i in range(4)), return_exceptions=True
+    )
+
+    # Первая запись уходит сразу, остальные три — одним батчем, где падает вторая из них
+    assert [ordered for _, ordered in storage.chats.batches] == [False, False]
+    assert isinstance(results[2], OperationFailure) and results[2].code == 11000
+    assert results[0] is None and results[1] is None and results[3] is None
+    await storage.close()
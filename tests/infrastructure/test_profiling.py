@@ -0,0 +1,61 @@
+import threading
+
+import httpx
+import pytest
+
+from src.infrastructure.profiling.RequestProfilerMiddleware import ProfileStore, RequestProfilerMiddleware
+from src.infrastructure.profiling.SamplingProfiler import SamplingProfiler
+
+
+async def hello_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+    await send({"type": "http.response.body", "body": b"hello"})
+
+
+def profiled_client(store: ProfileStore) -> httpx.AsyncClient:
+    middleware = RequestProfilerMiddleware(hello_app, store, is_authorized=lambda key: key == "secret")
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=middleware), base_url="http://test")
+
+
+def busy_loop(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sampling_profiler_captures_other_threads():
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_loop, args=(stop,), name="busy-worker")
+    worker.start()
+    try:
+        collapsed = SamplingProfiler(interval=0.001).sample(0.05)
+    finally:
+        stop.set()
+        worker.join()
+
+    stacks = [line.rsplit(" ", 1) for line in collapsed.splitlines()]
+    assert any(stack.startswith("busy-worker;") and "busy_loop" in stack for stack, _ in stacks)
+    assert all(int(count) > 0 for _, count in stacks)
+
+
+@pytest.mark.asyncio
+async def test_request_with_header_is_profiled_and_saved():
+    store = ProfileStore()
+    async with profiled_client(store) as client:
+        response = await client.get("/", headers={"X-Profile-Request": "1", "X-API-Key": "secret"})
+
+    assert response.text == "hello"
+    summary = store.get(response.headers["x-profile-id"])
+    assert summary and "function calls" in summary
+
+
+@pytest.mark.asyncio
+async def test_requests_are_not_profiled_by_default():
+    store = ProfileStore()
+    async with profiled_client(store) as client:
+        plain = await client.get("/", headers={"X-API-Key": "secret"})
+        foreign = await client.get("/", headers={"X-Profile-Request": "1", "X-API-Key": "wrong"})
+
+    assert plain.text == foreign.text == "hello"
+    assert "x-profile-id" not in plain.headers
+    assert "x-profile-id" not in foreign.headers
+    assert not store._profiles
@@ -0,0 +1,66 @@
+import asyncio
+
+import aiohttp
+import pytest
+
+from src.core.interfaces.IEmotionalClassification import IEmotionalClassification
+from src.infrastructure.classifier_server.ClassifierServer import BatchedClassification, ClassifierServer
+from src.infrastructure.emotion_classification.RemoteEmotionalClassification import RemoteEmotionalClassification
+
+
+class RecordingBatches:
+    def __init__(self):
+        self.batches = []
+
+    async def __call__(self, messages):
+        self.batches.append(list(messages))
+        await asyncio.sleep(0.01)
+        return [[("радость", 0.7), ("грусть", 0.3)] if "рад" in message else [("грусть", 0.9)]
+                for message in messages]
+
+
+class LocalClassification(IEmotionalClassification):
+    async def extract_emotion(self, message):
+        return [("нейтрально", 1.0)]
+
+
+@pytest.mark.asyncio
+async def test_remote_calls_are_batched_over_unix_socket(tmp_path):
+    batches = RecordingBatches()
+    server = ClassifierServer(BatchedClassification(batches, max_batch_size=64, max_concurrent_batches=1))
+    socket_path = str(tmp_path / "classifier.sock")
+    await server.start(unix_socket=socket_path)
+    client = RemoteEmotionalClassification(f"unix://{socket_path}")
+
+    try:
+        results = await asyncio.gather(*(client.extract_emotion(text) for text in ["рад", "устал", "рад", "грустно"]))
+    finally:
+        await client.close()
+        await server.stop()
+
+    assert results[0] == [("радость", 0.7), ("грусть", 0.3)]
+    assert results[1] == [("грусть", 0.9)]
+    # Первое сообщение уходит сразу, остальные копятся и идут следующим батчем
+    assert sum(len(batch) for batch in batches.batches) == 4 and len(batches.batches) <= 2
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_in_process_model_when_server_is_down(tmp_path):
+    client = RemoteEmotionalClassification(
+        f"unix://{tmp_path / 'missing.sock'}", timeout=1.0, fallback_factory=LocalClassification
+    )
+
+    assert await client.extract_emotion("текст") == [("нейтрально", 1.0)]
+    # Сервис помечен недоступным: следующий вызов сразу идёт в локальную модель
+    assert client._remote_down_until > 0
+    assert await client.extract_emotion("ещё") == [("нейтрально", 1.0)]
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_without_fallback_errors_propagate(tmp_path):
+    client = RemoteEmotionalClassification(f"unix://{tmp_path / 'missing.sock'}", timeout=1.0)
+
+    with pytest.raises(aiohttp.ClientConnectionError):
+        await client.extract_emotion("текст")
+    await client.close()
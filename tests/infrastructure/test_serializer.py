@@ -0,0 +1,74 @@
+import json
+
+from src.core.entities.BurnoutResults import BurnoutResult
+from src.core.entities.QueryEntities import LLMResponse, LLMStreamResponse
+from src.infrastructure.serialization.serializer import SSEFrameEncoder, encode_response
+
+
+def make_chunk(text: str, event_id: str = "s:1", chat_id: str = "chat-1") -> LLMStreamResponse:
+    return LLMStreamResponse(
+        content_chunk=text,
+        chat_id=chat_id,
+        is_completed=False,
+        question_count=2,
+        total_questions=8,
+        event_id=event_id
+    )
+
+
+def parse_frame(frame: bytes):
+    lines = frame.decode().split("\n")
+    assert frame.endswith(b"\n\n")
+    fields = dict(line.split(": ", 1) for line in lines if line)
+    return fields.get("id"), json.loads(fields["data"])
+
+
+def test_frame_matches_legacy_payload():
+    event_id, data = parse_frame(SSEFrameEncoder().encode(make_chunk('Привет "мир"\n')))
+
+    assert event_id == "s:1"
+    assert data == {
+        "content": 'Привет "мир"\n',
+        "chat_id": "chat-1",
+        "is_completed": False,
+        "question_count": 2,
+        "total_questions": 8,
+        "is_final_chunk": False,
+    }
+
+
+def test_prefix_is_rebuilt_when_chat_id_changes():
+    encoder = SSEFrameEncoder()
+    encoder.encode(make_chunk("a", chat_id=""))
+    _, data = parse_frame(encoder.encode(make_chunk("b", chat_id="chat-2")))
+
+    assert data["chat_id"] == "chat-2"
+
+
+def test_frame_without_event_id_has_no_id_line():
+    frame = SSEFrameEncoder().encode(make_chunk("a", event_id=None))
+
+    assert frame.startswith(b"data: ")
+
+
+def test_error_frame():
+    _, data = parse_frame(SSEFrameEncoder.encode_error("Error: boom"))
+
+    assert data["error"] is True
+    assert data["is_final_chunk"] is True
+
+
+def test_encode_response_with_burnout_result():
+    response = LLMResponse(
+        content=BurnoutResult(10, 5, 20, 0.26, ["отдыхать"]),
+        chat_id="chat-1",
+        is_completed=True,
+        question_count=8,
+        total_questions=8,
+        is_analysis=True
+    )
+
+    data = json.loads(encode_response(response))
+
+    assert data["content"]["recommendations"] == ["отдыхать"]
+    assert data["is_analysis"] is True
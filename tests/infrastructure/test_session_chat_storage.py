@@ -0,0 +1,75 @@
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from src.core.interfaces.IChatStorage import IChatStorage
+from src.infrastructure.memory_store.SessionChatStorage import SessionChatStorage
+
+
+@pytest.fixture
+def base_storage():
+    storage = Mock(spec=IChatStorage)
+    storage.get_chat = AsyncMock(return_value={
+        "_id": "chat-1",
+        "messages": [{"role": "system", "content": "prompt"}],
+        "question_count": 1,
+        "max_questions": 2,
+        "status": "active",
+    })
+    storage.add_message = AsyncMock()
+    storage.increment_question_count = AsyncMock()
+    return storage
+
+
+@pytest.mark.asyncio
+async def test_chat_is_loaded_once(base_storage):
+    storage = SessionChatStorage(base_storage)
+
+    await storage.get_chat("chat-1")
+    await storage.get_chat_messages("chat-1")
+    await storage.is_chat_completed("chat-1")
+
+    base_storage.get_chat.assert_awaited_once_with("chat-1")
+
+
+@pytest.mark.asyncio
+async def test_writes_apply_locally_and_persist_in_order(base_storage):
+    calls = []
+    base_storage.add_message.side_effect = lambda chat_id, role, content: calls.append((role, content))
+    base_storage.increment_question_count.side_effect = lambda chat_id: calls.append(("increment",))
+    storage = SessionChatStorage(base_storage)
+
+    await storage.add_message("chat-1", "user", "ответ")
+    await storage.add_message("chat-1", "assistant", "вопрос")
+    await storage.increment_question_count("chat-1")
+
+    messages = await storage.get_chat_messages("chat-1")
+    assert [m["content"] for m in messages] == ["prompt", "ответ", "вопрос"]
+    assert await storage.is_chat_completed("chat-1")
+
+    await storage.close()
+    assert calls == [("user", "ответ"), ("assistant", "вопрос"), ("increment",)]
+
+
+@pytest.mark.asyncio
+async def test_persist_errors_do_not_stop_the_queue(base_storage):
+    base_storage.add_message.side_effect = [RuntimeError("mongo down"), None]
+    storage = SessionChatStorage(base_storage)
+
+    await storage.add_message("chat-1", "user", "a")
+    await storage.add_message("chat-1", "user", "b")
+    await storage.flush()
+
+    assert base_storage.add_message.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_refresh_persists_own_writes_then_rereads(base_storage):
+    storage = SessionChatStorage(base_storage)
+    await storage.add_message("chat-1", "user", "ответ")
+
+    chat = await storage.refresh("chat-1")
+
+    base_storage.add_message.assert_awaited_once_with("chat-1", "user", "ответ")
+    assert base_storage.get_chat.await_count == 2
+    assert chat["messages"] == [{"role": "system", "content": "prompt"}]
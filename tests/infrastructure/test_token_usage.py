@@ -0,0 +1,174 @@
+import asyncio
+import json
+import socket
+from datetime import datetime
+from typing import Dict
+
+import pytest
+from aiohttp import web
+
+from config import Config
+from src.application.usage.TokenUsageFlusher import TokenUsageFlusher
+from src.core.entities.TokenUsage import ANALYSIS_TURN, QUESTION_TURN, TokenUsage, UsageKey, UsageTotals
+from src.core.interfaces.ITokenUsageStorage import ITokenUsageStorage
+from src.infrastructure.llm.DeepSeekLLM import DeepSeekLLM
+from src.infrastructure.metrics.StreamStats import stream_stats
+from src.infrastructure.metrics.TokenUsageStats import TokenUsageStats, attributed, token_usage
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+RELEASE = web.AppKey("release", asyncio.Event)
+ANSWER_TOKENS = ["Как ", "вы ", "себя ", "чувствуете?"]
+
+
+def _sse(payload: Dict) -> bytes:
+    return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n".encode()
+
+
+async def _chat_completions(request: web.Request) -> web.StreamResponse:
+    """OpenAI-совместимый ответ: целиком или SSE с usage последним чанком"""
+    body = await request.json()
+    usage = {
+        "prompt_tokens": sum(len(message["content"]) for message in body["messages"]) // 4,
+        "completion_tokens": len(ANSWER_TOKENS),
+    }
+    usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+    base = {"id": "chatcmpl-test", "created": 0, "model": body["model"]}
+
+    if not body.get("stream"):
+        return web.json_response({**base, "object": "chat.completion", "usage": usage, "choices": [{
+            "index": 0, "message": {"role": "assistant", "content": "".join(ANSWER_TOKENS)}, "finish_reason": "stop"
+        }]})
+
+    response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+    await response.prepare(request)
+    for token in ANSWER_TOKENS:
+        await response.write(_sse({**base, "object": "chat.completion.chunk", "choices": [
+            {"index": 0, "delta": {"content": token}, "finish_reason": None}
+        ]}))
+    await response.write(_sse({**base, "object": "chat.completion.chunk", "choices": [
+        {"index": 0, "delta": {}, "finish_reason": "stop"}
+    ]}))
+    if (body.get("stream_options") or {}).get("include_usage"):
+        await response.write(_sse({**base, "object": "chat.completion.chunk", "choices": [], "usage": usage}))
+    await response.write(b"data: [DONE]\n\n")
+    return response
+
+
+async def _stalled_stream(request: web.Request) -> web.StreamResponse:
+    """Первый токен сразу, дальше провайдер молчит"""
+    body = await request.json()
+    response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+    await response.prepare(request)
+    await response.write(_sse({"id": "chatcmpl-test", "created": 0, "model": body["model"],
+                               "object": "chat.completion.chunk", "choices": [
+        {"index": 0, "delta": {"content": ANSWER_TOKENS[0]}, "finish_reason": None}
+    ]}))
+    await request.app[RELEASE].wait()
+    return response
+
+
+async def _serve(handler):
+    port = _free_port()
+    server = web.Application()
+    server[RELEASE] = asyncio.Event()
+    server.router.add_post("/v1/chat/completions", handler)
+    runner = web.AppRunner(server)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner, port
+
+
+class FailingOnceStorage(ITokenUsageStorage):
+    def __init__(self):
+        self.failures = 1
+        self.saved: Dict[UsageKey, UsageTotals] = {}
+
+    async def add_usage(self, deltas: Dict[UsageKey, UsageTotals], moment: datetime) -> None:
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("mongo is down")
+        self.saved.update(deltas)
+
+    async def get_summary(self, since: datetime, top_chats: int = 20) -> Dict:
+        return {}
+
+
+@pytest.mark.asyncio
+async def test_deepseek_reports_usage_for_unary_and_streaming_calls(monkeypatch):
+    runner, port = await _serve(_chat_completions)
+    monkeypatch.setattr(Config, "OPENAI_API_KEY", "mock")
+    monkeypatch.setattr(Config, "LLM_BASE_URL", f"http://127.0.0.1:{port}/v1")
+    monkeypatch.setattr(Config, "LLM_MODEL", "mock")
+    llm = DeepSeekLLM()
+    messages = [{"role": "system", "content": "Ты психолог" * 40}, {"role": "user", "content": "Устал"}]
+    token_usage.drain()
+
+    try:
+        with attributed("hr", "chat-1", QUESTION_TURN):
+            question = await llm.generate_response(messages)
+        with attributed("hr", "chat-1", ANALYSIS_TURN):
+            chunks = [chunk async for chunk in llm.generate_response_stream(messages)]
+    finally:
+        await runner.cleanup()
+
+    assert question == "".join(ANSWER_TOKENS) == "".join(chunks)
+    pending = token_usage.drain()
+    question_usage = pending[UsageKey("hr", "chat-1", QUESTION_TURN)]
+    analysis_usage = pending[UsageKey("hr", "chat-1", ANALYSIS_TURN)]
+    assert question_usage.calls == 1 and question_usage.prompt_tokens > 100
+    # Стрим: usage приходит последним чанком с пустыми choices
+    assert analysis_usage.calls == 1 and analysis_usage.completion_tokens == len(ANSWER_TOKENS)
+
+
+@pytest.mark.asyncio
+async def test_flusher_keeps_usage_until_storage_accepts_it():
+    stats = TokenUsageStats()
+    storage = FailingOnceStorage()
+    flusher = TokenUsageFlusher(stats, storage)
+    with attributed("hr", "chat-1", QUESTION_TURN):
+        stats.record(TokenUsage(prompt_tokens=500, completion_tokens=20), seconds=0.4)
+
+    await flusher.flush()
+    with attributed("hr", "chat-1", QUESTION_TURN):
+        stats.record(TokenUsage(prompt_tokens=700, completion_tokens=30), seconds=0.6)
+    await flusher.flush()
+
+    totals = storage.saved[UsageKey("hr", "chat-1", QUESTION_TURN)]
+    assert (totals.calls, totals.prompt_tokens, totals.completion_tokens) == (2, 1200, 50)
+    assert stats.snapshot()["hr"][QUESTION_TURN]["avg_prompt_tokens"] == 600.0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_stream_records_chunks_actually_received(monkeypatch):
+    runner, port = await _serve(_stalled_stream)
+    monkeypatch.setattr(Config, "OPENAI_API_KEY", "mock")
+    monkeypatch.setattr(Config, "LLM_BASE_URL", f"http://127.0.0.1:{port}/v1")
+    monkeypatch.setattr(Config, "LLM_MODEL", "mock")
+    llm = DeepSeekLLM()
+    received = []
+    first_chunk = asyncio.Event()
+    before = (stream_stats.cancelled_generations, stream_stats.chunks_before_cancel)
+
+    async def consume():
+        async for chunk in llm.generate_response_stream([{"role": "user", "content": "Устал"}]):
+            received.append(chunk)
+            first_chunk.set()
+
+    task = asyncio.create_task(consume())
+    try:
+        await asyncio.wait_for(first_chunk.wait(), timeout=10)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+    finally:
+        runner.app[RELEASE].set()
+        await runner.cleanup()
+
+    assert received == ANSWER_TOKENS[:1]
+    assert stream_stats.cancelled_generations - before[0] == 1
+    assert stream_stats.chunks_before_cancel - before[1] == 1